@@ -0,0 +1,242 @@
+"""
+Anti-Generic Screen — fast local pre-screen for clichéd concepts and keyframes.
+The red flags are read from the "ANTI-GENERIC FILTER" section of the system
+prompt; each flag is bound to a small regex lexicon below and compiled into one
+pattern per rule. Screening a concept or keyframe is a handful of regex scans,
+so it runs on every generation before anything is displayed. Items that fail are
+sent back for targeted regeneration instead of re-rolling the whole batch.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+
+PROMPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "brand_narrative_system_prompt.md")
+
+# An item fails when the weights of its hits add up to this
+FAIL_SCORE = 1.0
+
+# anchor (substring of the red-flag text in the prompt) → [(pattern, weight)]
+# Rules whose anchor no longer appears in the prompt are dropped at compile time.
+RED_FLAG_LEXICON = {
+    "slow establishing shot": [
+        (r"\bestablishing shot\b", 1.0),
+        (r"\bfades? (in|up) (from|on)\b|\bfade[- ]in\b", 1.0),
+        (r"\b(slow|sweeping) aerial\b|\bdrone shot\b", 0.6),
+    ],
+    "montage of pleasant moments": [
+        (r"\bmontage\b", 1.0),
+        (r"\bseries of (happy|joyful|pleasant|beautiful) (moments|scenes|shots)\b", 1.0),
+    ],
+    "people smiling": [
+        (r"\b(people|everyone|friends|they) (smil|laugh)\w*\b", 0.6),
+        (r"\bslow[- ]?(motion|mo) (smil|laugh)\w*|\b(smil|laugh)\w* in slow[- ]?(motion|mo)\b", 1.0),
+        (r"\bbeautiful people\b", 1.0),
+    ],
+    "product's features or quality": [
+        (r"\b(showcas|highlight|demonstrat)\w* (the |its )?(product|features?|quality|craftsmanship)\b", 1.0),
+        (r"\bclose[- ]up of the product\b", 0.6),
+    ],
+    "requires voiceover": [
+        (r"\bvoice[- ]?over (explains|describes|tells|narrates)\b", 1.0),
+        (r"\bnarrator (explains|describes)\b", 1.0),
+    ],
+    "Golden hour": [
+        (r"\bgolden[- ]hour\b", 0.6),
+        (r"\bslow[- ]?(motion|mo)\b", 0.4),
+        (r"\bshallow (depth of field|dof)\b|\bbokeh\b", 0.2),
+    ],
+    "brand appears in the first half": [],   # positional — see screen_keyframe
+    "Hands reaching": [
+        (r"\bhands? (reaching|touching|holding|grasping|caressing|grazing)\b", 0.6),
+        (r"\bfingertips? (brush|graz|touch)\w*\b", 0.6),
+    ],
+    "flat-lay": [
+        (r"\bflat[- ]?lay\b", 1.0),
+        (r"\boverhead (shot|view) of (products|items|objects)\b", 1.0),
+    ],
+    "staring meaningfully at camera": [
+        (r"\b(stares?|staring|gazes?|gazing|looks?|looking) (meaningfully |directly |straight |deeply )?(in)?to (the )?(camera|lens)\b", 1.0),
+    ],
+    "Lens flare": [
+        (r"\blens flares?\b", 1.0),
+        (r"\bsun flares?\b", 0.6),
+    ],
+    "Desaturated opening": [
+        (r"\bdesaturated\b[^.]{0,80}\b(saturat|vibrant|bursts?|floods?|blooms?)\w*", 1.0),
+        (r"\bblack[- ]and[- ]white\b[^.]{0,60}\b(in)?to (full )?colou?r\b", 1.0),
+        (r"\bcolou?r (floods|bursts|blooms|returns) (in|back)\b", 0.6),
+    ],
+    "Gen Z slang": [
+        (r"\b(no cap|slay(s|ing)?|it'?s giving|rizz|bussin|understood the assignment|main character energy)\b", 1.0),
+    ],
+    "trending format": [
+        (r"\btrending (sound|audio|format|dance)\b|\bviral (trend|challenge|dance)\b", 1.0),
+    ],
+}
+
+# Rules that only apply to the opening beat (keyframe 1 / the concept's hook)
+OPENING_ONLY = {"slow_establishing_shot"}
+
+CONCEPT_FIELDS = ("title", "summary", "hook", "human_truth")
+KEYFRAME_FIELDS = ("scene_description", "camera", "lighting", "color_palette", "composition_notes")
+
+
+@dataclass(frozen=True)
+class RedFlagRule:
+    rule_id: str
+    section: str          # "Narrative" / "Visual" / "Audience"
+    flag: str             # the checklist line from the system prompt
+    patterns: tuple       # ((compiled regex, weight), ...)
+
+
+@dataclass(frozen=True)
+class Hit:
+    rule_id: str
+    section: str
+    flag: str
+    field: str
+    match: str
+    weight: float
+
+
+def parse_red_flags(prompt_text: str) -> list[tuple[str, str]]:
+    """Extract ``(section, flag)`` pairs from the ANTI-GENERIC FILTER checklists."""
+    match = re.search(r"^## ANTI-GENERIC FILTER\s*$(.*?)(?=^## )", prompt_text, re.MULTILINE | re.DOTALL)
+    if not match:
+        return []
+    flags, section = [], ""
+    for line in match.group(1).splitlines():
+        heading = re.match(r"^###\s+(\w+) Red Flags", line)
+        if heading:
+            section = heading.group(1)
+            continue
+        item = re.match(r"^- \[ \]\s+(.+?)\s*$", line)
+        if item and section:
+            flags.append((section, item.group(1)))
+    return flags
+
+
+def compile_rules(prompt_text: str) -> tuple[RedFlagRule, ...]:
+    rules = []
+    for section, flag in parse_red_flags(prompt_text):
+        for anchor, patterns in RED_FLAG_LEXICON.items():
+            if anchor.lower() in flag.lower():
+                rules.append(RedFlagRule(
+                    rule_id=re.sub(r"[^a-z0-9]+", "_", anchor.lower()).strip("_"),
+                    section=section,
+                    flag=flag,
+                    patterns=tuple((re.compile(p, re.IGNORECASE), w) for p, w in patterns),
+                ))
+    return tuple(rules)
+
+
+_prefilters = {}
+
+
+def _prefilter(rules: tuple) -> re.Pattern:
+    """One alternation of every pattern — clean text (the common case) costs a single scan."""
+    cached = _prefilters.get(id(rules))
+    if cached and cached[0] is rules:
+        return cached[1]
+    sources = [p.pattern for rule in rules for p, _ in rule.patterns]
+    pattern = re.compile("|".join(f"(?:{s})" for s in sources) or r"(?!)", re.IGNORECASE)
+    _prefilters.clear()
+    _prefilters[id(rules)] = (rules, pattern)
+    return pattern
+
+
+_cache = {"mtime": None, "rules": ()}
+
+
+def get_rules(path: str = PROMPT_PATH) -> tuple[RedFlagRule, ...]:
+    """Compiled rules for the system prompt on disk, recompiled only when it changes."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return _cache["rules"]
+    if mtime != _cache["mtime"]:
+        with open(path, "r") as f:
+            _cache["rules"] = compile_rules(f.read())
+        _cache["mtime"] = mtime
+    return _cache["rules"]
+
+
+# ---------------------------------------------------------------------------
+# SCREENING
+# ---------------------------------------------------------------------------
+def _scan(fields: dict, rules: tuple, opening: bool = True) -> list[Hit]:
+    hits = []
+    prefilter = _prefilter(rules)
+    for field, text in fields.items():
+        if not text or not prefilter.search(text):
+            continue
+        for rule in rules:
+            if rule.rule_id in OPENING_ONLY and not opening:
+                continue
+            for pattern, weight in rule.patterns:
+                m = pattern.search(text)
+                if m:
+                    hits.append(Hit(rule.rule_id, rule.section, rule.flag, field, m.group(0), weight))
+    return hits
+
+
+def score(hits: list[Hit]) -> float:
+    """Sum of hit weights, counting each rule at most once per weight level."""
+    per_rule = {}
+    for hit in hits:
+        per_rule.setdefault(hit.rule_id, {})[hit.match.lower()] = hit.weight
+    return sum(min(FAIL_SCORE, sum(matches.values())) for matches in per_rule.values())
+
+
+def screen_concept(concept: dict, rules: tuple | None = None) -> list[Hit]:
+    rules = get_rules() if rules is None else tuple(rules)
+    return _scan({f: str(concept.get(f, "")) for f in CONCEPT_FIELDS}, rules)
+
+
+def screen_keyframe(keyframe: dict, position: int, brand_name: str = "",
+                    image_prompt: str = "", rules: tuple | None = None) -> list[Hit]:
+    """Screen one keyframe (1-based ``position``) and its image prompt.
+
+    Besides the lexicon, flags the brand name appearing in the first half of
+    the video (keyframes 1-2), which the Narrative checklist calls out.
+    """
+    rules = get_rules() if rules is None else tuple(rules)
+    fields = {f: str(keyframe.get(f, "")) for f in KEYFRAME_FIELDS}
+    fields["image_prompt"] = image_prompt
+    hits = _scan(fields, rules, opening=position == 1)
+    early = next((r for r in rules if r.rule_id == "brand_appears_in_the_first_half"), None)
+    if early and brand_name.strip() and position <= 2:
+        for field in ("scene_description", "text_overlay"):
+            match = brand_mention(str(keyframe.get(field, "")), brand_name)
+            if match:
+                hits.append(Hit(early.rule_id, early.section, early.flag, field, match, FAIL_SCORE))
+    return hits
+
+
+def brand_mention(text: str, brand_name: str) -> str:
+    """The first proper-noun mention of the brand in ``text``, or "".
+
+    Matched as written (or in all caps, as overlays often are), never case-folded,
+    so a brand named after a common word ("Hay", "Away") does not match the word.
+    A name typed all lowercase is matched capitalized.
+    """
+    name = brand_name.strip()
+    if name.islower():
+        name = name[0].upper() + name[1:]
+    m = re.search(rf"(?<![\w-])(?:{re.escape(name)}|{re.escape(name.upper())})(?![\w-])", text)
+    return m.group(0) if m else ""
+
+
+def fails(hits: list[Hit]) -> bool:
+    return score(hits) >= FAIL_SCORE
+
+
+def describe(hits: list[Hit]) -> str:
+    """Short human/LLM-readable reason list, e.g. ``flat-lay ("flat lay")``."""
+    seen, parts = set(), []
+    for hit in hits:
+        if hit.rule_id not in seen:
+            seen.add(hit.rule_id)
+            parts.append(f'{hit.flag.split(" (")[0]} ("{hit.match}")')
+    return "; ".join(parts)
@@ -0,0 +1,289 @@
+"""
+Artifact Store — process-level home for large per-session artifacts.
+Research dossiers, concept lists, storyboards, brand profiles and raw LLM text
+live here instead of in ``st.session_state``; the session keeps only a small
+``ArtifactRef``. The store holds recent artifacts in memory up to a byte
+budget and spills the least recently used ones to disk, so memory stays
+bounded no matter how many tabs are open.
+
+Disk is budgeted per owner (session). A session that spills more than
+``ARTIFACT_STORE_SESSION_DISK_MB`` loses its own oldest artifacts, never
+another session's. Artifacts are released when their session ends, as
+reported by the liveness check the app installs. Past the total
+``ARTIFACT_STORE_DISK_MB`` the store only warns, because everything left
+still belongs to a live session. A ref whose artifact is gone raises
+``ArtifactMissing`` rather than reading as "never stored".
+
+A value that was never stored (a plain dict set by a script or test) passes
+through ``resolve`` unchanged.
+"""
+
+import atexit
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+MAX_MEMORY_BYTES = int(os.environ.get("ARTIFACT_STORE_MEMORY_MB", "64")) * 1024 * 1024
+MAX_DISK_BYTES = int(os.environ.get("ARTIFACT_STORE_DISK_MB", "512")) * 1024 * 1024
+MAX_OWNER_DISK_BYTES = int(os.environ.get("ARTIFACT_STORE_SESSION_DISK_MB", "64")) * 1024 * 1024
+SWEEP_INTERVAL_S = 30       # how often ended sessions are looked for
+
+
+class ArtifactMissing(LookupError):
+    """The artifact behind a ref was evicted or lost; the caller must regenerate it deliberately."""
+
+    def __init__(self, ref: "ArtifactRef"):
+        super().__init__(f"artifact {ref.name or ref.artifact_id} of session {ref.owner or '-'} is no longer stored")
+        self.ref = ref
+
+
+@dataclass(frozen=True)
+class ArtifactRef:
+    """What session state holds in place of an artifact."""
+    artifact_id: str
+    name: str
+    owner: str
+    size: int       # pickled size in bytes
+
+
+@dataclass
+class _Entry:
+    ref: ArtifactRef
+    value: object = None
+    path: str | None = None     # set while spilled to disk
+
+
+class ArtifactStore:
+    def __init__(self, max_memory_bytes: int = MAX_MEMORY_BYTES, max_disk_bytes: int = MAX_DISK_BYTES,
+                 spill_dir: str | None = None, max_owner_disk_bytes: int = MAX_OWNER_DISK_BYTES):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_owner_disk_bytes = max_owner_disk_bytes
+        spill_dir = spill_dir or os.environ.get("ARTIFACT_STORE_DIR")
+        self._owns_dir = not spill_dir      # a temporary directory is removed on close
+        self.spill_dir = spill_dir or tempfile.mkdtemp(prefix="artifacts-")
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self._memory = OrderedDict()    # artifact_id → _Entry, least recently used first
+        self._disk = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._owner_disk = {}           # owner → spilled bytes
+        self._owner_seen = {}           # owner → monotonic time of its last put/get
+        self._lock = threading.Lock()
+        self._liveness = None
+        self._last_sweep = time.monotonic()
+        self._over_budget = False
+        self.spills = 0
+        self.evictions = 0
+        self.released = 0
+
+    # -- public -------------------------------------------------------------
+    def put(self, value, name: str = "", owner: str = "") -> ArtifactRef:
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        ref = ArtifactRef(uuid.uuid4().hex, name, owner, len(data))
+        with self._lock:
+            self._owner_seen[owner] = time.monotonic()
+            self._memory[ref.artifact_id] = _Entry(ref, value)
+            self._memory_bytes += ref.size
+            self._enforce()
+        return ref
+
+    def get(self, ref: ArtifactRef):
+        """The stored value, reloaded from disk if it was spilled.
+
+        Raises ``ArtifactMissing`` if the artifact was evicted or its file is unreadable.
+        """
+        with self._lock:
+            self._owner_seen[ref.owner] = time.monotonic()
+            entry = self._memory.get(ref.artifact_id)
+            if entry:
+                self._memory.move_to_end(ref.artifact_id)
+                return entry.value
+            entry = self._pop_disk(ref.artifact_id)
+            if entry is None:
+                raise ArtifactMissing(ref)
+            try:
+                with open(entry.path, "rb") as f:
+                    entry.value = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                self.evictions += 1
+                raise ArtifactMissing(ref) from None
+            finally:
+                _remove(entry.path)
+            entry.path = None
+            self._memory[ref.artifact_id] = entry
+            self._memory_bytes += entry.ref.size
+            self._enforce()
+            return entry.value
+
+    def discard(self, ref: ArtifactRef):
+        with self._lock:
+            entry = self._memory.pop(ref.artifact_id, None)
+            if entry:
+                self._memory_bytes -= entry.ref.size
+            entry = self._pop_disk(ref.artifact_id)
+            if entry:
+                _remove(entry.path)
+
+    def set_liveness(self, is_alive):
+        """Install ``is_alive(owner) -> bool``; artifacts of owners reported dead are released."""
+        self._liveness = is_alive
+
+    def release_owner(self, owner: str) -> int:
+        """Drop every artifact of a session that has ended; returns how many were released."""
+        with self._lock:
+            return self._release_owner(owner)
+
+    def location(self, ref: ArtifactRef) -> str:
+        """"memory", "disk" or "evicted"."""
+        with self._lock:
+            if ref.artifact_id in self._memory:
+                return "memory"
+            return "disk" if ref.artifact_id in self._disk else "evicted"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_artifacts": len(self._memory), "memory_bytes": self._memory_bytes,
+                "disk_artifacts": len(self._disk), "disk_bytes": self._disk_bytes,
+                "spills": self.spills, "evictions": self.evictions, "released": self.released,
+            }
+
+    def clear(self):
+        with self._lock:
+            for entry in self._disk.values():
+                _remove(entry.path)
+            self._memory.clear()
+            self._disk.clear()
+            self._owner_disk.clear()
+            self._owner_seen.clear()
+            self._memory_bytes = self._disk_bytes = 0
+
+    def close(self):
+        self.clear()
+        if self._owns_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    # -- eviction (lock held) -----------------------------------------------
+    def _pop_disk(self, artifact_id: str) -> _Entry | None:
+        entry = self._disk.pop(artifact_id, None)
+        if entry:
+            self._disk_bytes -= entry.ref.size
+            self._owner_disk[entry.ref.owner] -= entry.ref.size
+            if self._owner_disk[entry.ref.owner] <= 0:
+                del self._owner_disk[entry.ref.owner]
+        return entry
+
+    def _release_owner(self, owner: str) -> int:
+        released = 0
+        for artifact_id in [a for a, e in self._memory.items() if e.ref.owner == owner]:
+            self._memory_bytes -= self._memory.pop(artifact_id).ref.size
+            released += 1
+        for artifact_id in [a for a, e in self._disk.items() if e.ref.owner == owner]:
+            _remove(self._pop_disk(artifact_id).path)
+            released += 1
+        self._owner_seen.pop(owner, None)
+        self.released += released
+        return released
+
+    def _sweep(self):
+        """Release the artifacts of sessions the liveness check reports as ended."""
+        now = time.monotonic()
+        if self._liveness is None or now - self._last_sweep < SWEEP_INTERVAL_S:
+            return
+        self._last_sweep = now
+        owners = {e.ref.owner for e in self._memory.values()} | set(self._owner_disk)
+        for owner in owners:
+            # Recently active owners are left alone, whatever the check says
+            if now - self._owner_seen.get(owner, 0.0) < SWEEP_INTERVAL_S:
+                continue
+            try:
+                alive = self._liveness(owner)
+            except Exception:
+                alive = True
+            if not alive:
+                self._release_owner(owner)
+
+    def _enforce(self):
+        self._sweep()
+        # Always keep the most recent artifact in memory, even if it alone exceeds the budget
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            artifact_id, entry = self._memory.popitem(last=False)
+            self._memory_bytes -= entry.ref.size
+            self._spill(artifact_id, entry)
+        # A session over its own disk share loses its oldest spilled artifacts; other sessions are untouched
+        for owner in [o for o, size in self._owner_disk.items() if size > self.max_owner_disk_bytes]:
+            for artifact_id in [a for a, e in self._disk.items() if e.ref.owner == owner]:
+                if self._owner_disk.get(owner, 0) <= self.max_owner_disk_bytes:
+                    break
+                _remove(self._pop_disk(artifact_id).path)
+                self.evictions += 1
+        over = self._disk_bytes > self.max_disk_bytes
+        if over and not self._over_budget:
+            logger.warning("artifact store holds %.1f MB on disk, over its %.1f MB budget, all for live sessions",
+                           self._disk_bytes / 1048576, self.max_disk_bytes / 1048576)
+        self._over_budget = over
+
+    def _spill(self, artifact_id: str, entry: _Entry):
+        path = os.path.join(self.spill_dir, f"{artifact_id}.pkl")
+        try:
+            with open(path, "wb") as f:
+                pickle.dump(entry.value, f, pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            self.evictions += 1
+            return
+        entry.value, entry.path = None, path
+        self._disk[artifact_id] = entry
+        self._disk_bytes += entry.ref.size
+        self._owner_disk[entry.ref.owner] = self._owner_disk.get(entry.ref.owner, 0) + entry.ref.size
+        self.spills += 1
+
+
+def _remove(path: str | None):
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_store = {"store": None}
+_store_lock = threading.Lock()
+
+
+def get_store() -> ArtifactStore:
+    """The process-wide store shared by every session."""
+    with _store_lock:
+        if _store["store"] is None:
+            _store["store"] = ArtifactStore()
+            atexit.register(_store["store"].close)
+        return _store["store"]
+
+
+def resolve(value):
+    """Dereference an ``ArtifactRef``; any other value is returned as-is.
+
+    Raises ``ArtifactMissing`` when the ref's artifact is gone.
+    """
+    if isinstance(value, ArtifactRef):
+        return get_store().get(value)
+    return value
+
+
+def approx_size(value) -> int:
+    """Pickled size of a value, or 0 if it cannot be pickled."""
+    if isinstance(value, ArtifactRef):
+        return 0
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
@@ -0,0 +1,103 @@
+"""
+Async Bridge — one background event loop for the provider adapters.
+LLM calls run as coroutines on a single process-wide loop in a daemon thread,
+so hundreds of requests can be in flight without one OS thread each. Sync code
+(Streamlit callbacks, scripts) submits a coroutine with ``run_sync`` and blocks
+only its own thread; fan-out code hands a list of coroutines to ``gather_bounded``.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+import time
+
+MAX_IN_FLIGHT = 256     # concurrent coroutines per gather_bounded call
+
+_loop = {"loop": None, "thread": None}
+_loop_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """The shared event loop, started on first use."""
+    with _loop_lock:
+        if _loop["loop"] is None or _loop["loop"].is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="async-bridge", daemon=True)
+            thread.start()
+            _loop["loop"], _loop["thread"] = loop, thread
+        return _loop["loop"]
+
+
+def run_sync(coro, timeout: float | None = None, poll=None, poll_interval: float = 0.25):
+    """Run ``coro`` on the shared loop and wait for its result from a sync caller.
+
+    The coroutine runs in a copy of the caller's ``contextvars`` context, so
+    trace spans and deadlines opened by the caller still apply. ``poll`` is
+    called every ``poll_interval`` seconds while waiting; if it raises (or the
+    wait times out, or the caller is interrupted) the task is cancelled, which
+    aborts its in-flight HTTP request, and the exception propagates.
+
+    Must not be called from the loop thread itself (that would deadlock);
+    coroutines should ``await`` each other instead.
+    """
+    loop = get_loop()
+    if threading.current_thread() is _loop["thread"]:
+        coro.close()
+        raise RuntimeError("run_sync() called from the async bridge loop; await the coroutine instead")
+    context = contextvars.copy_context()
+    future = concurrent.futures.Future()
+    started = {}
+
+    def start():
+        if not future.set_running_or_notify_cancel():
+            coro.close()
+            return
+        started["task"] = loop.create_task(coro, context=context)
+        started["task"].add_done_callback(lambda t: _settle(future, t))
+
+    loop.call_soon_threadsafe(start)
+    expires = time.monotonic() + timeout if timeout is not None else None
+    try:
+        while True:
+            wait = poll_interval if poll else None
+            if expires is not None:
+                wait = max(0.0, min(wait if wait is not None else timeout, expires - time.monotonic()))
+            try:
+                return future.result(wait)
+            except concurrent.futures.TimeoutError:
+                if expires is not None and time.monotonic() >= expires:
+                    raise
+            poll()
+    except BaseException:
+        if not future.cancel():
+            loop.call_soon_threadsafe(lambda: started["task"].cancel() if "task" in started else None)
+        raise
+
+
+def bind_context(fn):
+    """Wrap ``fn`` to run in a copy of the caller's ``contextvars`` context (for thread-pool submits)."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+
+def _settle(future: concurrent.futures.Future, task: asyncio.Task):
+    if future.done():
+        return
+    if task.cancelled():
+        future.cancel()
+    elif task.exception() is not None:
+        future.set_exception(task.exception())
+    else:
+        future.set_result(task.result())
+
+
+async def gather_bounded(coros, limit: int = MAX_IN_FLIGHT, return_exceptions: bool = False) -> list:
+    """``asyncio.gather`` with at most ``limit`` coroutines running at once; results keep input order."""
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(bounded(c) for c in coros), return_exceptions=return_exceptions)
@@ -0,0 +1,557 @@
+"""
+Batch Runs — regenerate many brands offline through provider batch APIs.
+Research, concepts and storyboards run as three phases. Each phase packs one
+request per brand into a single batch job (Anthropic Message Batches, OpenAI
+Batch on the Responses endpoint, or a Gemini batch job), polls until it
+ends, and maps the results back to brands through the app's normal parsing
+path (research completion, JSON parsing, the anti-generic screen). Models and
+effort come from the routing policy (model_routing.py).
+
+Run state lives in ``<run_dir>/manifest.json``. It is rewritten after every
+submit and every collect, so an interrupted run resumes where it stopped:
+submitted batches are polled again, not resubmitted. Finished brands are
+written to ``<run_dir>/results/``.
+Brands found in the shared research cache (research_cache.py) skip the
+research batch; ``--refresh-research`` researches them again.
+
+    python batch_runs.py brands.jsonl --run-dir runs/nightly --provider Anthropic
+    python batch_runs.py --run-dir runs/nightly                  # resume
+    python batch_runs.py --run-dir runs/nightly --retry-failed   # resubmit brands that failed
+    python batch_runs.py brands.jsonl --run-dir runs/demo --provider Local --model fake-flaky
+
+Each line of ``brands.jsonl`` holds ``brand_name``, ``brand_url`` and
+``brand_category``, plus any other wizard answers (session-state keys). Research
+fills in the rest. ``Local`` is an offline stand-in: its batches are files in the
+run directory, answered by the Fake provider after ``--local-delay`` seconds.
+API keys come from ``ANTHROPIC_API_KEY``, ``OPENAI_API_KEY`` or ``GEMINI_API_KEY``.
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+
+from concept_index import ConceptIndex
+from fake_llm import FakeLLMConfig, FakeLLMError, fake_completion
+from model_routing import resolve_route
+from research import ResearchArtifact
+from research_cache import cache_key, get_research_cache
+
+logger = logging.getLogger(__name__)
+
+PHASES = ["research", "concepts", "storyboard"]
+POLL_INTERVAL_S = 60
+LOCAL_BATCH_DELAY_S = 2.0
+SCRAPE_WORKERS = 8
+MANIFEST_VERSION = 1
+
+
+def _app():
+    """The Streamlit app module, imported in bare mode for its prompt builders and parsers."""
+    return importlib.import_module("brand_narrative_app")
+
+
+@dataclass
+class BatchRequest:
+    custom_id: str
+    system: str
+    user: str
+    model: str
+    max_tokens: int
+    web_search: bool = False
+    max_search_uses: int | None = None
+    effort: str | None = None
+
+
+@dataclass
+class BatchStatus:
+    done: bool
+    state: str
+    counts: dict
+
+
+# ---------------------------------------------------------------------------
+# BACKENDS
+# ---------------------------------------------------------------------------
+class LocalBatchBackend:
+    """Offline stand-in: batches are JSON files, answered by the Fake provider once ``delay_s`` has passed."""
+
+    route_provider = "Fake"
+
+    def __init__(self, run_dir: str, delay_s: float = LOCAL_BATCH_DELAY_S):
+        self.dir = os.path.join(run_dir, "local_batches")
+        self.delay_s = delay_s
+        os.makedirs(self.dir, exist_ok=True)
+
+    def _path(self, batch_id: str) -> str:
+        return os.path.join(self.dir, f"{batch_id}.json")
+
+    def submit(self, requests: list[BatchRequest]) -> str:
+        batch_id = f"local_{uuid.uuid4().hex[:12]}"
+        _write_json(self._path(batch_id), {"submitted_at": time.time(), "requests": [asdict(r) for r in requests]})
+        return batch_id
+
+    def status(self, batch_id: str) -> BatchStatus:
+        with open(self._path(batch_id)) as f:
+            batch = json.load(f)
+        done = time.time() - batch["submitted_at"] >= self.delay_s
+        total = len(batch["requests"])
+        return BatchStatus(done, "ended" if done else "in_progress",
+                           {"succeeded": total if done else 0, "failed": 0, "pending": 0 if done else total})
+
+    def results(self, batch_id: str, custom_ids: list[str]) -> dict:
+        with open(self._path(batch_id)) as f:
+            requests = [BatchRequest(**r) for r in json.load(f)["requests"]]
+        out = {}
+        for r in requests:
+            # The batch already "took" its time; keep the preset's truncation and error rates
+            config = replace(FakeLLMConfig.for_model(r.model), latency_s=0.0, search_round_s=0.0, tokens_per_s=0.0)
+            try:
+                out[r.custom_id] = fake_completion(r.system, r.user, r.model, r.max_tokens, r.web_search, config=config)
+            except FakeLLMError as e:
+                out[r.custom_id] = f"__LLM_ERROR__: {e}"
+        return out
+
+
+class AnthropicBatchBackend:
+    """Message Batches API."""
+
+    route_provider = "Anthropic"
+
+    def __init__(self):
+        import anthropic
+        self.client = anthropic.Anthropic()
+
+    def submit(self, requests: list[BatchRequest]) -> str:
+        app = _app()
+        batch = self.client.messages.batches.create(requests=[
+            {"custom_id": r.custom_id,
+             "params": app.anthropic_request(r.system, r.user, r.model, r.max_tokens, r.web_search,
+                                             r.max_search_uses, r.effort)}
+            for r in requests
+        ])
+        return batch.id
+
+    def status(self, batch_id: str) -> BatchStatus:
+        batch = self.client.messages.batches.retrieve(batch_id)
+        c = batch.request_counts
+        return BatchStatus(batch.processing_status == "ended", batch.processing_status,
+                           {"succeeded": c.succeeded, "failed": c.errored + c.canceled + c.expired,
+                            "pending": c.processing})
+
+    def results(self, batch_id: str, custom_ids: list[str]) -> dict:
+        app = _app()
+        out = {}
+        for entry in self.client.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type == "succeeded":
+                out[entry.custom_id] = app.anthropic_text(result.message)
+            else:
+                error = getattr(getattr(result, "error", None), "error", None)
+                out[entry.custom_id] = f"__LLM_ERROR__: batch request {result.type}" + (f": {error.message}" if error else "")
+        return out
+
+
+class OpenAIBatchBackend:
+    """Batch API on the Responses endpoint, so web-search and plain requests share one job."""
+
+    route_provider = "OpenAI"
+    endpoint = "/v1/responses"
+
+    def __init__(self):
+        import openai
+        self.client = openai.OpenAI()
+
+    def submit(self, requests: list[BatchRequest]) -> str:
+        app = _app()
+        lines = "\n".join(json.dumps({
+            "custom_id": r.custom_id, "method": "POST", "url": self.endpoint,
+            "body": app.openai_responses_request(r.system, r.user, r.model, r.max_tokens, r.web_search, r.effort),
+        }) for r in requests)
+        upload = self.client.files.create(file=("batch.jsonl", lines.encode("utf-8")), purpose="batch")
+        batch = self.client.batches.create(input_file_id=upload.id, endpoint=self.endpoint, completion_window="24h")
+        return batch.id
+
+    def status(self, batch_id: str) -> BatchStatus:
+        batch = self.client.batches.retrieve(batch_id)
+        c = batch.request_counts
+        counts = {"succeeded": c.completed, "failed": c.failed, "pending": c.total - c.completed - c.failed} if c else {}
+        return BatchStatus(batch.status in ("completed", "failed", "expired", "cancelled"), batch.status, counts)
+
+    def results(self, batch_id: str, custom_ids: list[str]) -> dict:
+        batch = self.client.batches.retrieve(batch_id)
+        out = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                response = row.get("response") or {}
+                if response.get("status_code") == 200:
+                    out[row["custom_id"]] = _responses_text(response.get("body") or {})
+                else:
+                    error = row.get("error") or (response.get("body") or {}).get("error") or {}
+                    out[row["custom_id"]] = f"__LLM_ERROR__: {error.get('message', 'batch request failed')}"
+        return out
+
+
+def _responses_text(body: dict) -> str:
+    """``output_text`` of a Responses API body (the SDK property is not available on raw JSON)."""
+    return "".join(
+        part.get("text", "")
+        for item in body.get("output") or [] if item.get("type") == "message"
+        for part in item.get("content") or [] if part.get("type") == "output_text"
+    )
+
+
+class GoogleBatchBackend:
+    """Gemini batch jobs with inline requests (one model per job)."""
+
+    route_provider = "Google"
+    _done_states = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED",
+                    "JOB_STATE_PARTIALLY_SUCCEEDED"}
+
+    def __init__(self):
+        from google import genai
+        self.client = genai.Client()
+
+    def submit(self, requests: list[BatchRequest]) -> str:
+        from google.genai import types
+
+        app = _app()
+        models = {r.model for r in requests}
+        if len(models) != 1:
+            raise ValueError(f"a Gemini batch job takes one model, got {sorted(models)}")
+        job = self.client.batches.create(
+            model=models.pop(),
+            src=[types.InlinedRequest(
+                contents=r.user, metadata={"custom_id": r.custom_id},
+                config=types.GenerateContentConfig(**app.google_config(r.system, r.model, r.max_tokens,
+                                                                       r.web_search, r.effort)),
+            ) for r in requests],
+            config={"display_name": "brand-narrative-batch"},
+        )
+        return job.name
+
+    def status(self, batch_id: str) -> BatchStatus:
+        job = self.client.batches.get(name=batch_id)
+        state = job.state.name if job.state else "JOB_STATE_UNSPECIFIED"
+        return BatchStatus(state in self._done_states, state, {})
+
+    def results(self, batch_id: str, custom_ids: list[str]) -> dict:
+        job = self.client.batches.get(name=batch_id)
+        out = {}
+        responses = (job.dest.inlined_responses if job.dest else None) or []
+        for i, item in enumerate(responses):
+            # Responses keep request order; metadata carries the id when the API echoes it
+            custom_id = (item.metadata or {}).get("custom_id") or (custom_ids[i] if i < len(custom_ids) else None)
+            if custom_id is None:
+                continue
+            if item.response is not None:
+                out[custom_id] = item.response.text or ""
+            else:
+                out[custom_id] = f"__LLM_ERROR__: {item.error.message if item.error else 'no response'}"
+        return out
+
+
+BACKENDS = {
+    "Anthropic": AnthropicBatchBackend,
+    "OpenAI": OpenAIBatchBackend,
+    "Google": GoogleBatchBackend,
+    "Local": LocalBatchBackend,
+}
+
+
+def make_backend(provider: str, run_dir: str, local_delay_s: float = LOCAL_BATCH_DELAY_S):
+    if provider == "Local":
+        return LocalBatchBackend(run_dir, local_delay_s)
+    if provider not in BACKENDS:
+        raise ValueError(f"unknown batch provider {provider!r}; choose from {', '.join(BACKENDS)}")
+    return BACKENDS[provider]()
+
+
+# ---------------------------------------------------------------------------
+# RUN
+# ---------------------------------------------------------------------------
+def _write_json(path: str, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:40] or "brand"
+
+
+class BatchRun:
+    """One run directory: the manifest, phase by phase."""
+
+    def __init__(self, run_dir: str, manifest: dict):
+        self.run_dir = run_dir
+        self.manifest = manifest
+        self.refresh_research = False   # ignore the shared research cache for this run
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.run_dir, "manifest.json")
+
+    @classmethod
+    def create(cls, run_dir: str, brands: list[dict], provider: str, model: str) -> "BatchRun":
+        os.makedirs(run_dir, exist_ok=True)
+        manifest = {
+            "version": MANIFEST_VERSION, "provider": provider, "model": model, "created_at": time.time(),
+            "brands": {f"b{i:05d}": {"input": row, "profile": None, "research": None, "concepts": None,
+                                     "storyboard": None, "error": None}
+                       for i, row in enumerate(brands)},
+            "batches": {},
+        }
+        run = cls(run_dir, manifest)
+        run.save()
+        return run
+
+    @classmethod
+    def load(cls, run_dir: str) -> "BatchRun":
+        with open(os.path.join(run_dir, "manifest.json")) as f:
+            return cls(run_dir, json.load(f))
+
+    def save(self):
+        _write_json(self.path, self.manifest)
+
+    def retry_failed(self) -> int:
+        """Clear failed brands so the next run resubmits them from the phase they failed in."""
+        failed = [b for b in self.manifest["brands"].values() if b["error"]]
+        for brand in failed:
+            brand["error"] = None
+            brand.pop("pending_research", None)
+        if failed:
+            # Collected batches move to the history; one still in flight is kept and polled
+            batches = self.manifest["batches"]
+            self.manifest.setdefault("history", []).extend({"phase": p, **b} for p, b in batches.items() if b["collected"])
+            self.manifest["batches"] = {p: b for p, b in batches.items() if not b["collected"]}
+            self.save()
+        return len(failed)
+
+    def run(self, backend, poll_interval: float = POLL_INTERVAL_S) -> dict:
+        for phase in PHASES:
+            self.run_phase(phase, backend, poll_interval)
+        return self.summary()
+
+    def run_phase(self, phase: str, backend, poll_interval: float):
+        batch = self.manifest["batches"].get(phase)
+        if batch is None:
+            requests = self._build_requests(phase, backend.route_provider)
+            if not requests:
+                return
+            batch_id = backend.submit(requests)
+            batch = self.manifest["batches"][phase] = {
+                "batch_id": batch_id, "custom_ids": [r.custom_id for r in requests], "model": requests[0].model,
+                "submitted_at": time.time(), "collected": False,
+            }
+            self.save()
+            logger.info("%s: submitted %d requests as %s", phase, len(requests), batch_id)
+        if batch["collected"]:
+            return
+
+        while True:
+            status = backend.status(batch["batch_id"])
+            counts = " ".join(f"{k}={v}" for k, v in status.counts.items())
+            logger.info("%s %s: %s %s", phase, batch["batch_id"], status.state, counts)
+            if status.done:
+                break
+            time.sleep(poll_interval)
+
+        results = backend.results(batch["batch_id"], batch["custom_ids"])
+        for custom_id in batch["custom_ids"]:
+            brand_id = custom_id.split("-", 1)[1]
+            text = results.get(custom_id, "__LLM_ERROR__: no result in batch")
+            self._apply(phase, self.manifest["brands"][brand_id], text)
+        batch["collected"] = True
+        batch["collected_at"] = time.time()
+        self.save()
+        self._export()
+
+    # --- request building --------------------------------------------------
+    def _ready(self, phase: str) -> dict:
+        previous = {"research": None, "concepts": "research", "storyboard": "concepts"}[phase]
+        return {bid: b for bid, b in self.manifest["brands"].items()
+                if not b["error"] and b[phase] is None and (previous is None or b[previous])}
+
+    def _build_requests(self, phase: str, route_provider: str) -> list[BatchRequest]:
+        app = _app()
+        route = resolve_route(route_provider, phase, self.manifest["model"])
+        ready = self._ready(phase)
+
+        def request(bid: str, system: str, user: str, max_tokens: int, **extra) -> BatchRequest:
+            return BatchRequest(f"{phase}-{bid}", system, user, route.model, max_tokens, effort=route.effort, **extra)
+
+        if phase == "research":
+            cache = get_research_cache()
+
+            def prepare(item):
+                """Runs on a pool thread: looks up or scrapes one brand, without touching the manifest."""
+                bid, brand = item
+                row = brand["input"]
+                name, url = row.get("brand_name", ""), row.get("brand_url", "")
+                key = cache_key(name, url)
+                # Shared research cache (research_cache.py): recent or unchanged sites need no request
+                cached = None if self.refresh_research else cache.recent(key)
+                if cached is None:
+                    artifact, decision, system, user = app.prepare_brand_research(
+                        name, url, row.get("brand_category", ""), route_provider, route.model)
+                    cached = None if self.refresh_research else cache.revalidate(key, artifact)
+                if cached is not None:
+                    return bid, cached, None
+                return bid, artifact, request(bid, system, user, app.RESEARCH_MAX_TOKENS,
+                                              web_search=decision.web_search,
+                                              max_search_uses=decision.max_uses or None)
+
+            # Page fetches are the slow part of building research requests
+            with ThreadPoolExecutor(max_workers=SCRAPE_WORKERS) as pool:
+                prepared = list(pool.map(prepare, ready.items()))
+            requests = []
+            for bid, artifact, req in prepared:
+                if req is None:
+                    self._finish_research(ready[bid], artifact)
+                else:
+                    ready[bid]["pending_research"] = artifact.to_dict()
+                    requests.append(req)
+            served = len(prepared) - len(requests)
+            if served:
+                logger.info("research: %d brands served from the research cache", served)
+            self.save()
+            return requests
+
+        requests = []
+        for bid, brand in ready.items():
+            if phase == "concepts":
+                count = app.CONCEPTS_PER_BATCH
+                system, user = app.build_concepts_prompt(brand["profile"], count)
+                requests.append(request(bid, system, user, min(3000, 1000 * count + 200)))
+            else:
+                system, user = app.build_storyboard_prompt(brand["profile"], _pick_concept(brand["concepts"]))
+                requests.append(request(bid, system, user, 8000))
+        return requests
+
+    # --- results ------------------------------------------------------------
+    def _apply(self, phase: str, brand: dict, text: str):
+        app = _app()
+        if text.startswith("__LLM_"):
+            brand["error"] = f"{phase}: {text}"
+            return
+
+        if phase == "research":
+            artifact = app.complete_brand_research(ResearchArtifact.from_dict(brand.pop("pending_research")), text)
+            if artifact is None:
+                brand["error"] = "research: response did not parse"
+                return
+            row = brand["input"]
+            get_research_cache().put(cache_key(row.get("brand_name", ""), row.get("brand_url", "")), artifact)
+            self._finish_research(brand, artifact)
+
+        elif phase == "concepts":
+            # One round only: a batch result cannot be topped up; clichés stay, with their flags
+            try:
+                concepts, _ = app.generate_concepts(brand["profile"], app.CONCEPTS_PER_BATCH, [], ConceptIndex(),
+                                                    lambda needed, avoid: text, rounds=1)
+            except app.GenerationFailed:
+                brand["error"] = "concepts: response did not parse"
+                return
+            brand["concepts"] = concepts
+
+        else:
+            parsed = app.parse_storyboard(text)
+            if isinstance(parsed, dict) and parsed.get("keyframes"):
+                brand["storyboard"] = app.screen_and_repair_storyboard(parsed, brand["profile"]["brand_name"])
+            else:
+                brand["storyboard"] = parsed or {"raw": text}
+
+    def _finish_research(self, brand: dict, artifact: ResearchArtifact):
+        """Store the research and build the brand profile from it, as the app does after research."""
+        app = _app()
+        brand["research"] = artifact.to_dict()
+        state = {**app.DEFAULTS, **brand["input"], "scraped_data": artifact.profile}
+        app.apply_metadata_prefill(artifact, state)
+        brand["profile"] = app.build_brand_profile(state)
+
+    def _export(self):
+        """One JSON file per finished brand: profile, research identity, concepts, storyboard."""
+        out_dir = os.path.join(self.run_dir, "results")
+        os.makedirs(out_dir, exist_ok=True)
+        for bid, brand in self.manifest["brands"].items():
+            if brand["storyboard"] is None:
+                continue
+            name = brand["input"].get("brand_name", "")
+            _write_json(os.path.join(out_dir, f"{bid}-{_slug(name)}.json"), {
+                "brand_name": name, "profile": brand["profile"],
+                "research": (brand["research"] or {}).get("profile"),
+                "concepts": brand["concepts"], "selected_concept": _pick_concept(brand["concepts"]),
+                "storyboard": brand["storyboard"],
+            })
+
+    def summary(self) -> dict:
+        brands = self.manifest["brands"].values()
+        return {
+            "brands": len(self.manifest["brands"]),
+            **{phase: sum(1 for b in brands if b[phase]) for phase in PHASES},
+            "failed": sum(1 for b in brands if b["error"]),
+            "errors": [b["error"] for b in brands if b["error"]][:5],
+        }
+
+
+def _pick_concept(concepts: list[dict]) -> dict:
+    """The first concept that passed the anti-generic screen, else the first one."""
+    return next((c for c in concepts if not c.get("anti_generic_flags")), concepts[0])
+
+
+def load_brands(path: str) -> list[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Research, concepts and storyboards for many brands via batch APIs.")
+    parser.add_argument("brands", nargs="?", help="JSONL of brands (omit to resume --run-dir)")
+    parser.add_argument("--run-dir", required=True, help="Directory for the manifest, local batches and results")
+    parser.add_argument("--provider", default="Local", choices=list(BACKENDS), help="Batch backend")
+    parser.add_argument("--model", default="", help="Fallback model for stages without a route (Local: Fake preset)")
+    parser.add_argument("--poll", type=float, default=None, help="Seconds between status polls")
+    parser.add_argument("--retry-failed", action="store_true", help="Resubmit brands that failed in an earlier run")
+    parser.add_argument("--local-delay", type=float, default=LOCAL_BATCH_DELAY_S,
+                        help="Seconds before a Local batch completes")
+    parser.add_argument("--refresh-research", action="store_true",
+                        help="Research every brand again instead of using the shared research cache")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(module)s] %(message)s")
+
+    if os.path.exists(os.path.join(args.run_dir, "manifest.json")):
+        run = BatchRun.load(args.run_dir)
+        if args.brands:
+            logger.warning("%s already has a run; resuming it and ignoring %s", args.run_dir, args.brands)
+        if args.retry_failed:
+            logger.info("retrying %d failed brands", run.retry_failed())
+    elif args.brands:
+        model = args.model or ("fake-instant" if args.provider == "Local" else "")
+        run = BatchRun.create(args.run_dir, load_brands(args.brands), args.provider, model)
+    else:
+        parser.error("give a brands file to start a run, or a --run-dir that holds one")
+
+    run.refresh_research = args.refresh_research
+    provider = run.manifest["provider"]
+    backend = make_backend(provider, args.run_dir, args.local_delay)
+    poll = args.poll if args.poll is not None else (min(1.0, args.local_delay) if provider == "Local" else POLL_INTERVAL_S)
+    summary = run.run(backend, poll)
+    print(json.dumps(summary, indent=2))
+    raise SystemExit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
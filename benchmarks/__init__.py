@@ -0,0 +1 @@
+"""Offline benchmark suite for the Brand Narrative Director (see ``python -m benchmarks.run``)."""
@@ -0,0 +1,106 @@
+"""
+Cold start — first-call latency in a fresh process, with and without the SDK warm-up.
+Each sample is a new Python process that imports the app and then makes two
+identical small calls to the provider. In "warm" samples, sdk_warmup runs
+first and finishes before the calls, as it would while a user fills in step 1.
+The first-call penalty is the first call's latency minus the second's: SDK
+import, client construction, DNS, the TLS handshake and prompt-index parsing.
+
+    python -m benchmarks.cold_start --provider Anthropic           # key from ANTHROPIC_API_KEY
+    python -m benchmarks.cold_start --provider OpenAI --samples 5 --json cold.json
+
+Without a key, a placeholder key is sent. The call then ends in an auth
+error, after the same import and connection work. Without network access,
+only the import and client costs remain. Both calls then fail the same way,
+SDK retries included, so the penalty still isolates them.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.fixtures import import_app
+from model_routing import resolve_route
+from sdk_warmup import PROVIDERS, start_warmup, wait_warmup
+
+PROMPT = ("You are a terse assistant.", "Reply with the single word: ready")
+
+
+def child(provider: str, model: str, warm: bool) -> dict:
+    """One fresh-process sample; printed as a JSON line for the parent."""
+    started = time.perf_counter()
+    app = import_app()
+    sample = {"mode": "warm" if warm else "cold", "import_app_s": round(time.perf_counter() - started, 3)}
+    if warm:
+        start_warmup([provider], delay_s=0)
+        report = wait_warmup()
+        sample["warmup_s"] = report["total_s"]
+        sample["warmup_errors"] = report["errors"]
+    api_key = os.environ.get(PROVIDERS[provider]["key_env"]) or "sk-cold-start-placeholder"
+    for name in ("first_call_s", "second_call_s"):
+        started = time.perf_counter()
+        result = app.call_llm(*PROMPT, max_tokens=16, provider=provider, model=model, api_key=api_key)
+        sample[name] = round(time.perf_counter() - started, 3)
+    sample["result"] = result[:120]
+    sample["penalty_s"] = round(sample["first_call_s"] - sample["second_call_s"], 3)
+    return sample
+
+
+def run_samples(provider: str, model: str, samples: int) -> list[dict]:
+    rows = []
+    for i in range(samples):
+        for warm in (False, True):
+            command = [sys.executable, "-m", "benchmarks.cold_start", "--child", "--provider", provider,
+                       "--model", model] + (["--warm"] if warm else [])
+            env = {**os.environ, "SDK_WARMUP": ""}
+            out = subprocess.run(command, capture_output=True, text=True, env=env, check=True).stdout
+            rows.append(json.loads(out.strip().splitlines()[-1]))
+    return rows
+
+
+def print_report(provider: str, model: str, rows: list[dict]):
+    print(f"cold start — {provider} / {model}, {len(rows) // 2} fresh processes per mode")
+    print(f"{'mode':<5} {'first call':>11} {'second call':>12} {'penalty':>9} {'warm-up':>9}")
+    summary = {}
+    for mode in ("cold", "warm"):
+        picked = [r for r in rows if r["mode"] == mode]
+        summary[mode] = {k: statistics.median(r[k] for r in picked) for k in ("first_call_s", "second_call_s", "penalty_s")}
+        warmup = statistics.median(r["warmup_s"] for r in picked) if mode == "warm" else None
+        print(f"{mode:<5} {summary[mode]['first_call_s'] * 1000:>9.0f}ms {summary[mode]['second_call_s'] * 1000:>10.0f}ms "
+              f"{summary[mode]['penalty_s'] * 1000:>7.0f}ms " + (f"{warmup * 1000:>7.0f}ms" if warmup is not None else f"{'—':>9}"))
+    saved = summary["cold"]["first_call_s"] - summary["warm"]["first_call_s"]
+    print(f"first call {saved * 1000:.0f} ms faster after warm-up")
+    print(f"last result: {rows[-1]['result']}")
+    for row in rows:
+        for step, error in (row.get("warmup_errors") or {}).items():
+            print(f"  ! warm-up {step}: {error}")
+            break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold vs warm first-call latency in fresh processes.")
+    parser.add_argument("--provider", default="Anthropic", choices=list(PROVIDERS))
+    parser.add_argument("--model", help="defaults to the provider's research route")
+    parser.add_argument("--samples", type=int, default=3, help="fresh processes per mode")
+    parser.add_argument("--json", help="also write the raw samples to this path")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--warm", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    model = args.model or resolve_route(args.provider, "research", "").model
+
+    if args.child:
+        print(json.dumps(child(args.provider, model, args.warm)))
+        return
+    rows = run_samples(args.provider, model, max(1, args.samples))
+    print_report(args.provider, model, rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"provider": args.provider, "model": model, "samples": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
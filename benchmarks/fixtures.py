@@ -0,0 +1,206 @@
+"""
+Shared fixtures for benchmarks and load tests: a local HTTP brand site, sample
+wizard answers, representative raw LLM responses, and a bare-mode app import.
+"""
+
+import contextlib
+import importlib
+import json
+import os
+import struct
+import sys
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Benchmarks time the uncached research path unless a cache directory is given explicitly
+os.environ.setdefault("RESEARCH_CACHE_DIR", "")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "brand_narrative_app.py")
+
+
+def import_app():
+    """Import ``brand_narrative_app`` outside ``streamlit run`` (Streamlit bare mode).
+
+    Page config and CSS calls become no-ops; helpers that take explicit
+    arguments (parsing, prompt assembly, scraping) work normally.
+    """
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    return importlib.import_module("brand_narrative_app")
+
+
+# ---------------------------------------------------------------------------
+# LOCAL BRAND SITE
+# ---------------------------------------------------------------------------
+_NOISE = "".join(f'<script>window.__data_{i} = {json.dumps({"k": "v" * 200})};</script>' for i in range(20))
+_PRODUCTS = "".join(
+    f'<div class="product"><h3>Stacking Bracelet No. {i}</h3><p>Hand-enameled in New York. Made to be worn every day, layered, lost and found again.</p><span>$68</span></div>'
+    for i in range(40)
+)
+
+
+
+def _png(size: int, background: tuple, center: tuple) -> bytes:
+    """A square RGB PNG with a centered block of a second color (stand-in logo)."""
+    lo, hi = size // 4, size - size // 4
+    raw = b"".join(
+        b"\x00" + b"".join(bytes(center if lo <= x < hi and lo <= y < hi else background) for x in range(size))
+        for y in range(size)
+    )
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b""))
+
+
+FIXTURE_PAGES = {
+    "/": f"""<!doctype html><html><head>
+<title>Fixture Jewelry Co — Color, on purpose</title>
+<meta name="description" content="Hand-enameled jewelry designed to be stacked, mixed and worn every single day.">
+<meta property="og:description" content="Color, on purpose. Hand-enameled jewelry made in New York.">
+<meta name="theme-color" content="#ff3366">
+<link rel="stylesheet" href="/assets/theme.css">
+<link rel="icon" type="image/png" href="/favicon.png">
+<script type="application/ld+json">{{"@context": "https://schema.org", "@type": "Organization", "name": "Fixture Jewelry Co",
+"slogan": "Color, on purpose.", "description": "Hand-enameled jewelry designed to be stacked, mixed and worn every single day.",
+"foundingDate": "2009", "sameAs": ["https://instagram.com/fixturejewelry", "https://tiktok.com/@fixturejewelry"]}}</script>
+<style>:root {{ --brand-primary: #ff3366; --brand-accent: #1f6feb; }} body {{ color: #222; }}</style>
+{_NOISE}
+</head><body>
+<header><nav><a href="/">Home</a><a href="/collections/all">Shop</a><a href="/pages/our-journey">Our Journey</a><a href="/pages/sustainability">Sustainability</a><a href="/pages/press">Press</a></nav></header>
+<main>
+<h1>Color, on purpose.</h1>
+<p>We make joyful, hand-enameled jewelry for people who refuse to save the good stuff for later.</p>
+{_PRODUCTS}
+</main>
+<footer>© Fixture Jewelry Co</footer>
+</body></html>""",
+    "/pages/our-journey": """<!doctype html><html><head><title>Our Journey</title></head><body>
+<h1>Our Journey</h1>
+<p>Fixture Jewelry Co started at a kitchen table in 2009 with a box of enamel paint and a refusal to take jewelry too seriously.</p>
+<p>Our mission is simple: make color accessible, make stacking a form of self-expression, and never gatekeep joy.
+We believe the best pieces are the ones you wear to the grocery store, not the ones in the safe.</p>
+<p>Every bracelet is hand-finished by artisans we have worked with for over a decade.</p>
+</body></html>""",
+    "/pages/sustainability": """<!doctype html><html><body><h1>Sustainability</h1>
+<p>Recycled brass, plastic-free packaging, and a lifetime repair program for every piece we make.</p></body></html>""",
+    "/pages/press": """<!doctype html><html><body><h1>Press</h1><p>As seen in Vogue, The Cut, and Goop.</p></body></html>""",
+    "/assets/theme.css": """.btn { background-color: #ff3366; color: #ffffff; border: 1px solid #ff3366; }
+a, .link { color: #1f6feb; } .badge { background: #1f6feb; }
+body { background: #faf6f0; color: #222222; } .card { box-shadow: 0 1px 2px rgba(0, 0, 0, 0.2); }""",
+    "/favicon.png": _png(32, (255, 51, 102), (31, 111, 235)),
+    "/sitemap.xml": """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<url><loc>/</loc></url><url><loc>/pages/our-journey</loc></url>
+<url><loc>/pages/sustainability</loc></url><url><loc>/pages/press</loc></url>
+</urlset>""",
+}
+
+
+_CONTENT_TYPES = {".xml": "application/xml", ".css": "text/css", ".png": "image/png"}
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    pages = FIXTURE_PAGES
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        body = self.pages.get(path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        payload = body if isinstance(body, bytes) else body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", _CONTENT_TYPES.get(os.path.splitext(path)[1], "text/html; charset=utf-8"))
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections under concurrent scraping (1 s SYN retries)
+    request_queue_size = 128
+
+
+@contextlib.contextmanager
+def fixture_site(pages: dict | None = None):
+    """Serve a brand site on an ephemeral localhost port; yields the base URL."""
+    handler = type("FixtureHandler", (_FixtureHandler,), {"pages": pages or FIXTURE_PAGES})
+    server = _FixtureServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, name="fixture-site", daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# ---------------------------------------------------------------------------
+# SAMPLE WIZARD ANSWERS
+# ---------------------------------------------------------------------------
+SAMPLE_STATE = {
+    "brand_name": "Fixture Jewelry Co",
+    "brand_url": "",
+    "brand_category": "Jewelry",
+    "brand_description": "Colorful enamel jewelry designed to be stacked and layered.",
+    "scraped_data": {
+        "tagline": "Color, on purpose.",
+        "ethos": "Make color accessible and never gatekeep joy.",
+        "values": ["craft", "color", "humor"],
+        "anti_positioning": "Not precious, not exclusive.",
+        "emotional_territory": "Everyday joy",
+        "audience_description": "Self-expressive stackers who mix high and low.",
+        "aesthetic_description": "Saturated enamel on neutral skin tones.",
+        "price_tier": "accessible",
+        "confidence": "high",
+    },
+    "audience_lifestyle": "Fashion-forward people who mix high and low and discover brands through friends.",
+    "audience_brands": "Glossier, Jacquemus, Mejuri, Baggu",
+    "audience_platform": "Instagram Reels",
+    "personality_exclusive_accessible": 80,
+    "personality_serious_playful": 75,
+    "personality_minimal_expressive": 70,
+    "personality_classic_trendy": 55,
+    "personality_loud_quiet": 40,
+    "personality_luxury_everyday": 65,
+    "emotion_feel_after": "Like they were caught enjoying something small and decided not to apologize.",
+    "emotion_reject": "Exclusivity, pretension, velvet ropes.",
+    "emotion_movie_scene": "Friends getting ready together before a night out, borrowing each other's bracelets.",
+    "visual_selections": ["documentary", "maximalist", "organic"],
+    "color_primary": "#ff3366",
+    "color_secondary": "#f5efe6",
+    "color_accent": "#1f6feb",
+    "product_in_frame": "Ambient — worn/used naturally, never the focus",
+    "text_overlay_pref": "Tagline at end only",
+    "audio_direction": "Found-sound percussion, no voiceover.",
+}
+
+
+# ---------------------------------------------------------------------------
+# RAW LLM RESPONSES (parsing benchmarks)
+# ---------------------------------------------------------------------------
+def sample_responses() -> dict:
+    """Representative raw texts for each ``_parse_json_response`` code path."""
+    import random
+    from fake_llm import build_fake_payload
+
+    storyboard = build_fake_payload("storyboard", "Brand: Fixture Jewelry Co", random.Random(1))
+    concepts = build_fake_payload("concepts", "Brand: Fixture Jewelry Co", random.Random(2))
+    clean = json.dumps(storyboard, indent=2)
+    return {
+        "clean_storyboard": clean,
+        "fenced_concepts": "Here you go:\n```json\n" + json.dumps(concepts, indent=2) + "\n```\nLet me know!",
+        "preamble_storyboard": "Sure! Below is the storyboard.\n\n" + clean + "\n\nHope this helps.",
+        "trailing_commas": clean.replace('"\n  }', '",\n  }').replace("]\n}", "],\n}"),
+    }
@@ -0,0 +1,271 @@
+"""
+Load test — N concurrent simulated sessions walking all 7 wizard steps.
+Each session is a Streamlit ``AppTest`` driven in its own thread against the
+Fake provider (or a replay cassette) and the local fixture site: research,
+Continue through steps 1-6, concept generation, concept selection, storyboard.
+Every rerun is timed; per concurrency level the report shows rerun latency
+percentiles, throughput, resident memory per session, session-state size and
+peak thread count, so deployments can be sized and scaling regressions caught.
+
+The sessions share one process and a stand-in ``Runtime`` (see
+``share_runtime``), not a real ``streamlit run`` server: there is no
+websocket, forward-message queue or per-session server thread. Treat the
+figures as relative — compare runs of this harness against each other, not
+against production. ``share_runtime`` reaches into private Streamlit
+internals, so the harness refuses to run on a Streamlit minor version other
+than ``TESTED_STREAMLIT`` unless ``--any-streamlit`` is passed.
+
+    python -m benchmarks.load_test                          # 1, 5, 10, 25 sessions
+    python -m benchmarks.load_test --sessions 1,50 --model fake-realistic
+    python -m benchmarks.load_test --cassette sessions/roxanne.jsonl --latency zero
+    python -m benchmarks.load_test --json load.json         # also write the raw report
+"""
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from contextlib import nullcontext
+
+from benchmarks.fixtures import APP_PATH, SAMPLE_STATE, fixture_site, import_app
+
+# (label, button key) after the initial load; None = plain rerun
+SESSION_SCRIPT = [
+    ("research", "scrape_btn"),
+    ("step_1_next", "next_1"),
+    ("step_2_next", "next_2"),
+    ("step_3_next", "next_3"),
+    ("step_4_next", "next_4"),
+    ("step_5_next", "next_5"),
+    ("concepts", "next_6"),
+    ("select_concept", "select_concept_0"),
+    ("storyboard", "gen_storyboard"),
+]
+
+SAMPLE_INTERVAL_S = 0.05
+
+# Streamlit minor version whose private AppTest internals share_runtime patches
+TESTED_STREAMLIT = "1.66"
+_PATCHED_INTERNALS = ("MediaFileManager", "MemoryMediaFileStorage", "DataframeSourceManager",
+                      "MemoryCacheStorageManager", "BidiComponentManager", "ScriptCache", "patch_config_options")
+
+
+def _rss_mb() -> float:
+    """Current resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1048576
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class _Sampler(threading.Thread):
+    """Tracks peak thread count and RSS while a level runs."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak_threads = threading.active_count()
+        self.peak_rss_mb = _rss_mb()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(SAMPLE_INTERVAL_S):
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            self.peak_rss_mb = max(self.peak_rss_mb, _rss_mb())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def check_streamlit(allow_any: bool = False):
+    """Fail loudly when the installed Streamlit is not the version share_runtime was written against."""
+    import streamlit
+    from streamlit.testing.v1 import app_test
+
+    missing = [name for name in _PATCHED_INTERNALS if not hasattr(app_test, name)]
+    if missing:
+        raise SystemExit(f"load_test: streamlit {streamlit.__version__} lacks AppTest internals {missing}; "
+                         f"tested with {TESTED_STREAMLIT}.x")
+    if ".".join(streamlit.__version__.split(".")[:2]) != TESTED_STREAMLIT:
+        message = f"load_test: tested with streamlit {TESTED_STREAMLIT}.x, found {streamlit.__version__}"
+        if not allow_any:
+            raise SystemExit(message + " (pass --any-streamlit to run anyway)")
+        print(message + "; results may not be comparable")
+
+
+def share_runtime():
+    """Let AppTest instances run concurrently in one process.
+
+    ``AppTest.run`` installs a fresh mock ``Runtime`` singleton and a config
+    patch for the duration of each run and removes them afterwards, so two
+    overlapping runs tear down each other's runtime. It also recompiles the
+    script on every run, and concurrent ``ast.parse`` calls can fail on
+    Python 3.11. Pin one shared runtime and one script cache (as a real
+    server has) and set the app-test flag once instead.
+    """
+    from unittest.mock import MagicMock
+
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = app_test.MediaFileManager(app_test.MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = app_test.DataframeSourceManager()
+    runtime.cache_storage_manager = app_test.MemoryCacheStorageManager()
+    runtime.bidi_component_registry = app_test.BidiComponentManager()
+    Runtime.instance = classmethod(lambda cls: runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+    config.set_option("global.appTest", True)
+    app_test.patch_config_options = lambda options: nullcontext()
+    script_cache = app_test.ScriptCache()
+    script_cache.get_bytecode(APP_PATH)
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+
+def run_session(site_url: str, model: str, timeout: float, start: threading.Barrier) -> dict:
+    """Drive one session through the wizard; returns timings and the final AppTest."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.session_state["llm_provider"] = "Fake"
+    at.session_state["llm_model"] = model
+    # Answers for steps 2-5 are pre-seeded, as if typed; research fills the rest
+    for key, value in SAMPLE_STATE.items():
+        if key != "scraped_data":
+            at.session_state[key] = value
+    at.session_state["brand_url"] = site_url
+
+    reruns, error = [], None
+    start.wait()
+    try:
+        for label, key in [("load", None)] + SESSION_SCRIPT:
+            started = time.perf_counter()
+            (at.run() if key is None else at.button(key=key).click().run())
+            reruns.append((label, (time.perf_counter() - started) * 1000))
+            if at.exception:
+                error = f"{label}: {at.exception[0].message}"
+                break
+        else:
+            if not at.session_state["generated_storyboard"]:
+                error = "storyboard: none generated"
+    except Exception as e:
+        error = f"{reruns[-1][0] if reruns else 'load'}: {type(e).__name__}: {e}"
+    return {"reruns": reruns, "error": error, "app": at}
+
+
+def run_level(sessions: int, site_url: str, model: str, timeout: float) -> dict:
+    app = import_app()
+    baseline_rss = _rss_mb()
+    baseline_threads = threading.active_count()
+    results = [None] * sessions
+    start = threading.Barrier(sessions + 1)
+
+    def worker(i):
+        results[i] = run_session(site_url, model, timeout, start)
+
+    workers = [threading.Thread(target=worker, args=(i,), name=f"session-{i}") for i in range(sessions)]
+    for w in workers:
+        w.start()
+    sampler = _Sampler()
+    sampler.start()
+    start.wait()
+    started = time.perf_counter()
+    for w in workers:
+        w.join()
+    wall_s = time.perf_counter() - started
+    sampler.stop()
+
+    # Measured while every session's state is still alive
+    rss_per_session = (_rss_mb() - baseline_rss) / sessions
+    state_kb = statistics.fmean(
+        sum(row["session_bytes"] for row in app.session_memory_report(r["app"].session_state.to_dict())) / 1024
+        for r in results
+    )
+    latencies = [ms for r in results for _, ms in r["reruns"]]
+    by_action = {}
+    for r in results:
+        for label, ms in r["reruns"]:
+            by_action.setdefault(label, []).append(ms)
+    errors = [r["error"] for r in results if r["error"]]
+    return {
+        "sessions": sessions,
+        "wall_s": round(wall_s, 3),
+        "reruns": len(latencies),
+        "throughput_rps": round(len(latencies) / wall_s, 2) if wall_s else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 1),
+        "p95_ms": round(_percentile(latencies, 95), 1),
+        "p99_ms": round(_percentile(latencies, 99), 1),
+        "max_ms": round(max(latencies, default=0.0), 1),
+        "rss_mb_per_session": round(rss_per_session, 2),
+        "peak_rss_mb": round(sampler.peak_rss_mb, 1),
+        "session_state_kb": round(state_kb, 1),
+        "peak_threads": sampler.peak_threads,
+        "threads_per_session": round((sampler.peak_threads - baseline_threads) / sessions, 2),
+        "artifact_store": app.get_store().stats(),
+        "actions_p95_ms": {label: round(_percentile(ms, 95), 1) for label, ms in by_action.items()},
+        "errors": errors,
+    }
+
+
+def print_level(level: dict):
+    print(f"{level['sessions']:>8} {level['wall_s']:>8.2f} {level['throughput_rps']:>9.1f} "
+          f"{level['p50_ms']:>8.1f} {level['p95_ms']:>8.1f} {level['p99_ms']:>8.1f} "
+          f"{level['rss_mb_per_session']:>9.2f} {level['session_state_kb']:>9.1f} "
+          f"{level['peak_threads']:>8} {len(level['errors']):>7}")
+    for error in level["errors"][:3]:
+        print(f"{'':>8} error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive concurrent simulated sessions through the wizard.")
+    parser.add_argument("--sessions", default="1,5,10,25", help="Comma-separated concurrency levels")
+    parser.add_argument("--model", default="fake-instant", help="Fake provider model preset")
+    parser.add_argument("--cassette", default="", help="Replay LLM and HTTP traffic from this cassette")
+    parser.add_argument("--latency", default="original", help="Cassette replay latency: original, zero or a factor")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-rerun timeout in seconds")
+    parser.add_argument("--json", default="", help="Write the full report to this file")
+    parser.add_argument("--any-streamlit", action="store_true",
+                        help=f"Run on a Streamlit version other than {TESTED_STREAMLIT}.x")
+    args = parser.parse_args()
+    check_streamlit(args.any_streamlit)
+
+    from cassettes import use_cassette
+
+    import_app()
+    share_runtime()
+    levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+    cassette = use_cassette(args.cassette, mode="replay", latency=args.latency) if args.cassette else nullcontext()
+    import streamlit
+    report = {"model": args.model, "cassette": args.cassette or None, "streamlit": streamlit.__version__,
+              "levels": []}
+    with fixture_site() as site_url, cassette:
+        print(f"{'sessions':>8} {'wall s':>8} {'reruns/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'MB/sess':>9} {'state KB':>9} {'threads':>8} {'errors':>7}")
+        for n in levels:
+            level = run_level(n, site_url, args.model, args.timeout)
+            report["levels"].append(level)
+            print_level(level)
+
+    slowest = report["levels"][-1]["actions_p95_ms"] if report["levels"] else {}
+    if slowest:
+        print("\np95 by action at the highest level: " + ", ".join(f"{k} {v:.0f} ms" for k, v in slowest.items()))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    raise SystemExit(1 if any(level["errors"] for level in report["levels"]) else 0)
+
+
+if __name__ == "__main__":
+    main()
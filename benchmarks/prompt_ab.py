@@ -0,0 +1,229 @@
+"""
+Prompt format A/B — token cost and output quality of the compact profile
+serialization (prompt_format.py) against the old indented JSON.
+
+For a fixed set of brand profiles (rich, mid, sparse) it builds the concepts
+and storyboard prompts in both formats, counts tokens, then sends each prompt
+to the model and scores what comes back: JSON parse success, concept/keyframe
+count, the local anti-generic screen, and grounding (the share of the profile's
+anchor terms — brand, values, adjacent brands, platform — the output uses).
+
+    python -m benchmarks.prompt_ab                                   # Fake provider, offline
+    python -m benchmarks.prompt_ab --provider Anthropic --model claude-sonnet-4-5-20250929
+    python -m benchmarks.prompt_ab --check                           # exit 1 if compact loses quality
+    python -m benchmarks.prompt_ab --json ab.json                    # also write the raw report
+
+Keys for real providers come from ``ANTHROPIC_API_KEY``, ``OPENAI_API_KEY`` or
+``GEMINI_API_KEY``.
+"""
+
+import argparse
+import copy
+import json
+import os
+import re
+import statistics
+
+from benchmarks.fixtures import SAMPLE_STATE, import_app
+from prompt_format import ENUM_FIELDS, FORMATS, PROFILE_KEYS, format_profile
+from prompt_index import estimate_tokens
+
+API_KEY_ENV = {"Anthropic": "ANTHROPIC_API_KEY", "OpenAI": "OPENAI_API_KEY", "Google": "GEMINI_API_KEY"}
+
+# Wizard answers layered over SAMPLE_STATE; "sparse" is what a brand has right after step 1
+PROFILE_STATES = {
+    "rich": {},
+    "mid": {
+        "scraped_data": {"tagline": "Color, on purpose.", "values": ["craft", "color"]},
+        "audience_brands": "Glossier, Mejuri",
+        "emotion_reject": "",
+        "emotion_movie_scene": "",
+        "visual_selections": ["documentary"],
+        "audio_direction": "",
+    },
+    "sparse": {
+        "brand_description": "",
+        "scraped_data": None,
+        "audience_lifestyle": "",
+        "audience_brands": "",
+        "emotion_feel_after": "",
+        "emotion_reject": "",
+        "emotion_movie_scene": "",
+        "visual_selections": [],
+        "audio_direction": "",
+    },
+}
+
+# The concept the storyboard prompts are built around (fixed so both formats see the same one)
+CONCEPT = {
+    "title": "Borrowed Color",
+    "premise": "Two friends trade bracelets mid-conversation until neither remembers whose were whose.",
+    "human_truth": "The things we lend out are how we say we trust someone.",
+    "emotional_arc": "Casual → tender → gleeful",
+    "visual_approach": "Handheld, close on wrists, warm practical light",
+    "why_it_works": "Makes stacking social rather than precious.",
+}
+
+# Drop in quality (json − compact) that ``--check`` tolerates per metric
+TOLERANCE = {"parse_rate": 0.0, "count": 0.0, "anti_generic_pass": 0.1, "grounding": 0.1}
+
+
+def build_profiles(app) -> dict:
+    profiles = {}
+    for name, overrides in PROFILE_STATES.items():
+        state = {**copy.deepcopy(app.DEFAULTS), **copy.deepcopy(SAMPLE_STATE), **copy.deepcopy(overrides)}
+        profiles[name] = app.build_brand_profile(state)
+    return profiles
+
+
+def anchor_terms(profile: dict) -> list[str]:
+    """Profile facts a grounded output should reuse: brand, category, values, adjacent brands, platform."""
+    identity, audience = profile.get("identity") or {}, profile.get("audience") or {}
+    terms = [profile.get("brand_name", ""), profile.get("category", "")]
+    terms += identity.get("values") or []
+    terms += re.split(r",\s*", audience.get("adjacent_brands") or "")
+    terms.append(audience.get("primary_platform") or "")
+    seen = []
+    for term in (t.strip() for t in terms):
+        if term and term.lower() not in seen:
+            seen.append(term.lower())
+    return seen
+
+
+def grounding(text: str, terms: list[str]) -> float:
+    if not terms:
+        return 1.0
+    lowered = text.lower()
+    return sum(term in lowered for term in terms) / len(terms)
+
+
+def score_output(app, stage: str, text: str, profile: dict, expected: int) -> dict:
+    """Quality of one response; failed calls score zero everywhere."""
+    if text.startswith("__LLM_"):
+        return {"parse_rate": 0.0, "count": 0.0, "anti_generic_pass": 0.0, "grounding": 0.0, "error": text[:200]}
+    parsed = app.parse_storyboard(text) if stage == "storyboard" else app._parse_json_response(text)
+    if stage == "concepts":
+        items = [parsed] if isinstance(parsed, dict) else parsed if isinstance(parsed, list) else []
+        passed = [c for c in items if isinstance(c, dict) and not app.fails(app.screen_concept(c))]
+    else:
+        items = parsed.get("keyframes") or [] if isinstance(parsed, dict) else []
+        failing = app.screen_storyboard(parsed, profile.get("brand_name", "")) if items else {}
+        passed = [k for i, k in enumerate(items, 1) if i not in failing]
+    return {
+        "parse_rate": float(bool(items)),
+        "count": min(1.0, len(items) / expected) if expected else 1.0,
+        "anti_generic_pass": len(passed) / len(items) if items else 0.0,
+        "grounding": round(grounding(text, anchor_terms(profile)), 3),
+    }
+
+
+def enum_tokens(profile: dict, style: str) -> int:
+    """Tokens the wizard option fields take in the serialized profile."""
+    if style == "json":
+        prefixes = tuple(f'"{path.rsplit(".", 1)[-1]}":' for path in ENUM_FIELDS)
+    else:
+        prefixes = tuple(f"{PROFILE_KEYS[path]}:" for path in ENUM_FIELDS)
+    lines = format_profile(profile, style).splitlines()
+    return sum(estimate_tokens(line.strip()) for line in lines if line.strip().startswith(prefixes))
+
+
+def run_ab(provider: str, model: str, repeat: int = 1) -> dict:
+    app = import_app()
+    api_key = os.environ.get(API_KEY_ENV.get(provider, ""), "")
+    profiles = build_profiles(app)
+    rows = []
+    for profile_name, profile in profiles.items():
+        keyframes = profile.get("production", {}).get("keyframes") or 5
+        for stage in ("concepts", "storyboard"):
+            for style in FORMATS:
+                if stage == "concepts":
+                    system, user = app.build_concepts_prompt(profile, count=3, prompt_format=style)
+                    expected, max_tokens = 3, 4096
+                else:
+                    system, user = app.build_storyboard_prompt(profile, CONCEPT, prompt_format=style)
+                    expected, max_tokens = keyframes, 8000
+                scores = []
+                for attempt in range(repeat):
+                    # Vary the message so Fake (seeded by prompt) and provider caches do not repeat one answer
+                    message = user if attempt == 0 else f"{user}\n\n(run {attempt + 1})"
+                    text = app.call_llm(system, message, max_tokens=max_tokens, stage=stage,
+                                        provider=provider, model=model, api_key=api_key)
+                    scores.append(score_output(app, stage, text, profile, expected))
+                errors = [s["error"] for s in scores if "error" in s]
+                rows.append({
+                    "profile": profile_name, "stage": stage, "format": style,
+                    "user_tokens": estimate_tokens(user),
+                    "enum_tokens": enum_tokens(profile, style),
+                    "total_tokens": estimate_tokens(system) + estimate_tokens(user),
+                    **{metric: round(statistics.fmean(s[metric] for s in scores), 3) for metric in TOLERANCE},
+                    **({"errors": errors} if errors else {}),
+                })
+    return {"provider": provider, "model": model, "repeat": repeat, "rows": rows}
+
+
+def compare(report: dict) -> list[dict]:
+    """One row per (profile, stage): token savings and per-metric quality delta (compact − json)."""
+    by_key = {(r["profile"], r["stage"], r["format"]): r for r in report["rows"]}
+    out = []
+    for (profile, stage, style), old in by_key.items():
+        if style != "json":
+            continue
+        new = by_key[(profile, stage, "compact")]
+        out.append({
+            "profile": profile, "stage": stage,
+            "json_tokens": old["user_tokens"], "compact_tokens": new["user_tokens"],
+            "saved_pct": round(100 * (1 - new["user_tokens"] / old["user_tokens"]), 1),
+            "total_saved_pct": round(100 * (1 - new["total_tokens"] / old["total_tokens"]), 1),
+            "enum_json_tokens": old["enum_tokens"], "enum_compact_tokens": new["enum_tokens"],
+            "delta": {metric: round(new[metric] - old[metric], 3) for metric in TOLERANCE},
+        })
+    return out
+
+
+def regressions(comparison: list[dict]) -> list[str]:
+    return [
+        f"{row['profile']}/{row['stage']}: {metric} {row['delta'][metric]:+.3f}"
+        for row in comparison for metric, tolerance in TOLERANCE.items()
+        if row["delta"][metric] < -tolerance
+    ]
+
+
+def print_report(report: dict, comparison: list[dict]):
+    print(f"prompt format A/B — {report['provider']} / {report['model']} × {report['repeat']}")
+    print(f"{'profile':<8} {'stage':<11} {'json tok':>9} {'compact':>8} {'saved':>7} {'of total':>9} "
+          f"{'enum j/c':>9}   "
+          + "  ".join(f"{m:>17}" for m in TOLERANCE))
+    for row in comparison:
+        quality = "  ".join(f"{row['delta'][m]:>+17.3f}" for m in TOLERANCE)
+        print(f"{row['profile']:<8} {row['stage']:<11} {row['json_tokens']:>9} {row['compact_tokens']:>8} "
+              f"{row['saved_pct']:>6.1f}% {row['total_saved_pct']:>8.1f}% "
+              f"{row['enum_json_tokens']:>4}/{row['enum_compact_tokens']:<4}   {quality}")
+    for row in report["rows"]:
+        for error in row.get("errors", []):
+            print(f"  ! {row['profile']}/{row['stage']}/{row['format']}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="A/B the compact prompt format against indented JSON.")
+    parser.add_argument("--provider", default="Fake")
+    parser.add_argument("--model", default="fake-instant")
+    parser.add_argument("--repeat", type=int, default=1, help="calls per prompt and format")
+    parser.add_argument("--json", help="also write the raw report to this path")
+    parser.add_argument("--check", action="store_true", help="exit 1 if compact scores below json beyond tolerance")
+    args = parser.parse_args()
+
+    report = run_ab(args.provider, args.model, max(1, args.repeat))
+    comparison = compare(report)
+    print_report(report, comparison)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({**report, "comparison": comparison}, f, indent=2)
+    if args.check:
+        failed = regressions(comparison)
+        for line in failed:
+            print(f"REGRESSION {line}")
+        raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
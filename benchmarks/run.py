@@ -0,0 +1,236 @@
+"""
+Benchmark runner — times parsing, profile building, prompt assembly, scraping
+and full wizard runs against the Fake provider and a local fixture site.
+
+    python -m benchmarks.run                  # run everything, append to history
+    python -m benchmarks.run --filter parse   # subset by name
+    python -m benchmarks.run --check          # exit 1 if any benchmark regressed
+
+Each run is appended to ``benchmarks/results/history.jsonl``; a benchmark
+regresses when its median exceeds the median of the last ``--window`` runs by
+more than ``--threshold`` percent.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+
+from benchmarks.fixtures import APP_PATH, REPO_ROOT, SAMPLE_STATE, fixture_site, import_app, sample_responses
+
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+HISTORY_PATH = os.path.join(RESULTS_DIR, "history.jsonl")
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str, repeat: int = 50, warmup: int = 3):
+    """Register ``setup() -> callable`` as a named benchmark."""
+    def decorator(setup):
+        BENCHMARKS[name] = {"setup": setup, "repeat": repeat, "warmup": warmup}
+        return setup
+    return decorator
+
+
+def measure(fn, repeat: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "min_ms": round(samples[0], 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "runs": repeat,
+    }
+
+
+# ---------------------------------------------------------------------------
+# BENCHMARKS
+# ---------------------------------------------------------------------------
+def _parse_bench(key: str):
+    def setup():
+        app = import_app()
+        text = sample_responses()[key]
+        return lambda: app._parse_json_response(text)
+    return setup
+
+
+for _key in ["clean_storyboard", "fenced_concepts", "preamble_storyboard", "trailing_commas"]:
+    benchmark(f"parse.{_key}", repeat=200)(_parse_bench(_key))
+
+
+@benchmark("profile.build", repeat=500)
+def _bench_profile():
+    app = import_app()
+    return lambda: app.build_brand_profile(SAMPLE_STATE)
+
+
+@benchmark("prompt.concepts", repeat=200)
+def _bench_prompt_concepts():
+    app = import_app()
+    profile = app.build_brand_profile(SAMPLE_STATE)
+    return lambda: app.build_concepts_prompt(profile)
+
+
+@benchmark("prompt.storyboard", repeat=200)
+def _bench_prompt_storyboard():
+    app = import_app()
+    from fake_llm import build_fake_payload
+    import random
+    profile = app.build_brand_profile(SAMPLE_STATE)
+    concept = build_fake_payload("concepts", "Brand: Fixture Jewelry Co", random.Random(0))[0]
+    return lambda: app.build_storyboard_prompt(profile, concept)
+
+
+@benchmark("llm.fake_storyboard", repeat=100)
+def _bench_fake_llm():
+    app = import_app()
+    profile = app.build_brand_profile(SAMPLE_STATE)
+    system, user = app.build_storyboard_prompt(profile, {"title": "Bench"})
+    return lambda: app.call_llm(system, user, max_tokens=8000, provider="Fake", model="fake-instant")
+
+
+@benchmark("palette.extract", repeat=100)
+def _bench_palette():
+    from benchmarks.fixtures import FIXTURE_PAGES
+    from palette import extract_palette
+    from site_metadata import inline_css
+    stylesheets = inline_css(FIXTURE_PAGES["/"]) + [FIXTURE_PAGES["/assets/theme.css"]]
+    return lambda: extract_palette(stylesheets, [FIXTURE_PAGES["/favicon.png"]], hints=["#ff3366"])
+
+
+_SITE = {}
+
+
+def _site_url() -> str:
+    """Start the fixture site once per benchmark process."""
+    if "url" not in _SITE:
+        _SITE["ctx"] = fixture_site()
+        _SITE["url"] = _SITE["ctx"].__enter__()
+    return _SITE["url"]
+
+
+@benchmark("scrape.homepage", repeat=30)
+def _bench_scrape_homepage():
+    app = import_app()
+    url = _site_url()
+    return lambda: app._fetch_website_text(url)
+
+
+@benchmark("scrape.about_page", repeat=20)
+def _bench_scrape_about():
+    app = import_app()
+    url = _site_url()
+    return lambda: app._try_fetch_about_page(url)
+
+
+@benchmark("wizard.full_run", repeat=5, warmup=1)
+def _bench_wizard():
+    from streamlit.testing.v1 import AppTest
+
+    def run():
+        at = AppTest.from_file(APP_PATH, default_timeout=120)
+        at.session_state["llm_provider"] = "Fake"
+        at.session_state["llm_model"] = "fake-instant"
+        for key in ("brand_name", "brand_category"):
+            at.session_state[key] = SAMPLE_STATE[key]
+        at.session_state["brand_url"] = _site_url()
+        at.run()
+        at.button(key="autofill_btn").click().run()
+        at.button(key="next_6").click().run()
+        at.button(key="select_concept_0").click().run()
+        at.button(key="gen_storyboard").click().run()
+        assert at.session_state["generated_storyboard"], "wizard run produced no storyboard"
+    return run
+
+
+# ---------------------------------------------------------------------------
+# HISTORY & REGRESSIONS
+# ---------------------------------------------------------------------------
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def load_history() -> list[dict]:
+    if not os.path.exists(HISTORY_PATH):
+        return []
+    with open(HISTORY_PATH, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_regressions(results: dict, history: list[dict], window: int, threshold: float) -> list[str]:
+    regressions = []
+    for name, stats in results.items():
+        if "median_ms" not in stats:
+            continue
+        past = [run["results"][name]["median_ms"] for run in history[-window:]
+                if "median_ms" in run["results"].get(name, {})]
+        if not past:
+            continue
+        baseline = statistics.median(past)
+        if baseline > 0 and stats["median_ms"] > baseline * (1 + threshold / 100):
+            regressions.append(f"{name}: {stats['median_ms']:.3f} ms vs baseline {baseline:.3f} ms "
+                               f"(+{(stats['median_ms'] / baseline - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this string")
+    parser.add_argument("--window", type=int, default=5, help="Past runs used as the regression baseline")
+    parser.add_argument("--threshold", type=float, default=25.0, help="Allowed slowdown in percent")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero when a regression is found")
+    parser.add_argument("--no-save", action="store_true", help="Do not append this run to the history")
+    args = parser.parse_args()
+
+    results = {}
+    for name, spec in BENCHMARKS.items():
+        if args.filter and args.filter not in name:
+            continue
+        try:
+            fn = spec["setup"]()
+            results[name] = measure(fn, spec["repeat"], spec["warmup"])
+            print(f"{name:<32} median {results[name]['median_ms']:>10.3f} ms   p95 {results[name]['p95_ms']:>10.3f} ms")
+        except ImportError as e:
+            results[name] = {"skipped": f"missing dependency: {e.name}"}
+            print(f"{name:<32} skipped ({results[name]['skipped']})")
+
+    history = load_history()
+    regressions = find_regressions(results, history, args.window, args.threshold)
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        with open(HISTORY_PATH, "a") as f:
+            f.write(json.dumps({
+                "timestamp": datetime.now().isoformat(),
+                "git_rev": _git_rev(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            }) + "\n")
+
+    if regressions:
+        print("\nREGRESSIONS:")
+        for line in regressions:
+            print(f"  {line}")
+    if "ctx" in _SITE:
+        _SITE["ctx"].__exit__(None, None, None)
+    raise SystemExit(1 if regressions and args.check else 0)
+
+
+if __name__ == "__main__":
+    main()
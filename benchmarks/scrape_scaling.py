@@ -0,0 +1,99 @@
+"""
+Scrape scaling — page throughput with HTML parsing in-process vs. a process pool.
+Many threads fetch and parse the local fixture site's pages at once, as
+concurrent research sessions or a batch run do. Each ``--workers`` level
+reconfigures html_extract's pool (0 = parse in the fetching thread), warms it,
+then times the same page list. It reports pages/s, the speedup over
+in-process parsing, and p50/p95 per-page latency.
+
+    python -m benchmarks.scrape_scaling                          # 0, 1, 2, 4, 8 workers
+    python -m benchmarks.scrape_scaling --workers 0,4 --pages 400 --threads 32
+    python -m benchmarks.scrape_scaling --parse-only             # pre-fetched pages, parsing alone
+    python -m benchmarks.scrape_scaling --json scaling.json
+
+Speedup is bounded by the cores available. With one core, every level
+measures the same CPU, plus the pool's pickling overhead. The fixture server
+runs in this process and takes its own share of the GIL. ``--parse-only``
+leaves it out and measures the parse stage alone.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import html_extract
+from benchmarks.fixtures import fixture_site, import_app
+
+PAGES = ["/", "/pages/our-journey", "/pages/sustainability", "/pages/press"]
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_level(app, urls: list[str], workers: int, threads: int, pages: dict | None = None) -> dict:
+    """Time ``urls`` through fetch + parse, or through ``parse_page`` alone when ``pages`` (url → html) is given."""
+    html_extract.configure(workers)
+    # Start the worker processes before timing
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        list(pool.map(lambda _: html_extract.parse_page("<p>warm-up</p>"), range(max(1, workers) * 2)))
+
+    latencies = []
+
+    def scrape(url: str) -> int:
+        started = time.perf_counter()
+        page = html_extract.parse_page(pages[url]) if pages else app._fetch_website_page(url)
+        latencies.append(time.perf_counter() - started)
+        return len(page["text"])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        chars = list(pool.map(scrape, urls))
+    wall = time.perf_counter() - started
+    return {
+        "workers": workers, "pages": len(urls), "threads": threads, "wall_s": round(wall, 3),
+        "pages_per_s": round(len(urls) / wall, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+        "empty_pages": sum(1 for c in chars if not c),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape throughput across HTML parse worker counts.")
+    parser.add_argument("--workers", default="0,1,2,4,8", help="comma-separated pool sizes (0 = in-process)")
+    parser.add_argument("--pages", type=int, default=200, help="pages fetched per level")
+    parser.add_argument("--threads", type=int, default=16, help="concurrent fetching threads")
+    parser.add_argument("--parse-only", action="store_true", help="fetch each page once, then time parsing alone")
+    parser.add_argument("--json", help="also write the raw report to this path")
+    args = parser.parse_args()
+
+    app = import_app()
+    levels = [int(w) for w in args.workers.split(",") if w.strip()]
+    rows = []
+    with fixture_site() as url:
+        urls = [url.rstrip("/") + PAGES[i % len(PAGES)] for i in range(args.pages)]
+        pages = {u: app._http_get_text(u) for u in set(urls)} if args.parse_only else None
+        for workers in levels:
+            rows.append(run_level(app, urls, workers, args.threads, pages))
+    html_extract.configure(html_extract.HTML_PARSE_WORKERS, html_extract.HTML_PARSE_QUEUE)
+
+    baseline = next((r["pages_per_s"] for r in rows if r["workers"] == 0), rows[0]["pages_per_s"])
+    mode = "parse only" if args.parse_only else "fetch + parse"
+    print(f"scrape scaling ({mode}) — {args.pages} pages, {args.threads} threads, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'pages/s':>9} {'speedup':>8} {'p50 ms':>8} {'p95 ms':>8} {'empty':>6}")
+    for row in rows:
+        row["speedup"] = round(row["pages_per_s"] / baseline, 2) if baseline else None
+        print(f"{row['workers']:>7} {row['pages_per_s']:>9.1f} {row['speedup']:>7.2f}x "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['empty_pages']:>6}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"cpus": os.cpu_count(), "parse_only": args.parse_only, "rows": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
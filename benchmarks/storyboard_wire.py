@@ -0,0 +1,121 @@
+"""
+Storyboard wire format — output tokens, latency and export completeness of the
+lean storyboard schema (storyboard_format.py) against the full one.
+
+For the prompt A/B profiles (rich, mid, sparse) it requests a storyboard in
+each format and times the call. It counts prompt and response tokens, then
+expands the response and checks the export shape: 5 keyframes, one image
+prompt per keyframe ending with the style suffix, 4 complete animation
+prompts. It also reports the local anti-generic screen pass rate.
+
+    python -m benchmarks.storyboard_wire                           # Fake at 60 tok/s (~2 min)
+    FAKE_LLM_TOKENS_PER_S=600 python -m benchmarks.storyboard_wire # quick run
+    python -m benchmarks.storyboard_wire --provider Anthropic --model claude-sonnet-4-5-20250929 --repeat 3
+    python -m benchmarks.storyboard_wire --json wire.json
+
+The Fake provider streams at the preset token rate, so its latency follows
+output length; real providers add their own variance, so use ``--repeat``.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+from benchmarks.fixtures import import_app
+from benchmarks.prompt_ab import API_KEY_ENV, CONCEPT, build_profiles
+from prompt_index import estimate_tokens
+from storyboard_format import FORMATS, TRANSITION_KEYS
+
+CHECKS = ("parse_rate", "keyframes_ok", "image_prompts_ok", "animation_ok", "anti_generic_pass")
+
+
+def check_export(app, storyboard, brand_name: str, keyframes: int = 5) -> dict:
+    """Export-shape checks for one expanded storyboard; anything unparsed scores zero."""
+    if not (isinstance(storyboard, dict) and storyboard.get("keyframes")):
+        return dict.fromkeys(CHECKS, 0.0)
+    frames, prompts = storyboard["keyframes"], storyboard.get("image_prompts") or []
+    suffix = (storyboard.get("style_suffix") or "").strip().rstrip(".")
+    animations = storyboard.get("animation_prompts") or []
+    required = ["transition", *TRANSITION_KEYS, "emotional_trajectory"]
+    failing = app.screen_storyboard(storyboard, brand_name)
+    return {
+        "parse_rate": 1.0,
+        "keyframes_ok": float(len(frames) == keyframes),
+        "image_prompts_ok": float(len(prompts) == len(frames) and all(
+            isinstance(p, str) and p.strip().rstrip(".").endswith(suffix) for p in prompts)),
+        "animation_ok": float(len(animations) == keyframes - 1 and all(
+            isinstance(a, dict) and all(a.get(k) for k in required) for a in animations)),
+        "anti_generic_pass": 1 - len(failing) / len(frames),
+    }
+
+
+def run_wire(provider: str, model: str, repeat: int = 1) -> dict:
+    app = import_app()
+    api_key = os.environ.get(API_KEY_ENV.get(provider, ""), "")
+    rows = []
+    for profile_name, profile in build_profiles(app).items():
+        keyframes = profile.get("production", {}).get("keyframes") or 5
+        for style in FORMATS:
+            system, user = app.build_storyboard_prompt(profile, CONCEPT, storyboard_format=style)
+            samples = []
+            for attempt in range(repeat):
+                message = user if attempt == 0 else f"{user}\n\n(run {attempt + 1})"
+                started = time.perf_counter()
+                text = app.call_llm(system, message, max_tokens=8000, stage="storyboard",
+                                    provider=provider, model=model, api_key=api_key)
+                elapsed = time.perf_counter() - started
+                if text.startswith("__LLM_"):
+                    samples.append({"latency_s": elapsed, "output_tokens": 0, "error": text[:200],
+                                    **dict.fromkeys(CHECKS, 0.0)})
+                    continue
+                samples.append({"latency_s": elapsed, "output_tokens": estimate_tokens(text),
+                                **check_export(app, app.parse_storyboard(text), profile["brand_name"], keyframes)})
+            errors = [s["error"] for s in samples if "error" in s]
+            rows.append({
+                "profile": profile_name, "format": style,
+                "prompt_tokens": estimate_tokens(system) + estimate_tokens(user),
+                "output_tokens": round(statistics.fmean(s["output_tokens"] for s in samples)),
+                "latency_s": round(statistics.fmean(s["latency_s"] for s in samples), 2),
+                **{check: round(statistics.fmean(s[check] for s in samples), 3) for check in CHECKS},
+                **({"errors": errors} if errors else {}),
+            })
+    return {"provider": provider, "model": model, "repeat": repeat, "rows": rows}
+
+
+def print_report(report: dict):
+    print(f"storyboard wire format — {report['provider']} / {report['model']} × {report['repeat']}")
+    print(f"{'profile':<8} {'format':<6} {'prompt tok':>10} {'output tok':>10} {'latency s':>10}   "
+          + "  ".join(f"{c:>17}" for c in CHECKS))
+    for row in report["rows"]:
+        checks = "  ".join(f"{row[c]:>17.3f}" for c in CHECKS)
+        print(f"{row['profile']:<8} {row['format']:<6} {row['prompt_tokens']:>10} {row['output_tokens']:>10} "
+              f"{row['latency_s']:>10.2f}   {checks}")
+        for error in row.get("errors", []):
+            print(f"  ! {error}")
+    by_format = {style: [r for r in report["rows"] if r["format"] == style] for style in FORMATS}
+    if all(by_format.values()):
+        full, lean = ({k: sum(r[k] for r in by_format[s]) for k in ("output_tokens", "latency_s")}
+                      for s in ("full", "lean"))
+        print(f"lean vs full: output tokens {100 * (1 - lean['output_tokens'] / max(1, full['output_tokens'])):.1f}% "
+              f"fewer, latency {100 * (1 - lean['latency_s'] / max(1e-9, full['latency_s'])):.1f}% lower")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the lean and full storyboard wire formats.")
+    parser.add_argument("--provider", default="Fake")
+    parser.add_argument("--model", default="fake-realistic")
+    parser.add_argument("--repeat", type=int, default=1, help="calls per profile and format")
+    parser.add_argument("--json", help="also write the raw report to this path")
+    args = parser.parse_args()
+
+    report = run_wire(args.provider, args.model, max(1, args.repeat))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,19 +5,59 @@ generates narrative concepts via LLM, and outputs pipeline-ready storyboards.
 """
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import asyncio
+import base64
+import contextlib
+import hashlib
 import json
+import logging
 import os
 import re
+import sys
 import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
 from datetime import datetime
+from urllib.parse import urljoin, urlsplit
 
 try:
     import requests
-    from bs4 import BeautifulSoup
     HAS_SCRAPING = True
 except ImportError:
     HAS_SCRAPING = False
 
+from anti_generic import describe, fails, screen_concept, screen_keyframe
+from artifact_store import ArtifactMissing, ArtifactRef, approx_size, get_store, resolve
+from async_bridge import MAX_IN_FLIGHT, bind_context, gather_bounded, run_sync
+from cassettes import get_active_cassette
+from concept_index import ConceptIndex
+from deadlines import (DeadlineExceeded, current_deadline, poller, remaining, stage_deadline, wait_hook,
+                       with_deadline)
+from evidence import FULL_SEARCH_USES, decide_search
+from fake_llm import FakeLLMConfig, fake_completion_async
+from html_extract import parse_page, pool_workers
+from model_routing import (EFFORTS, STAGES, Route, latency_report, record_latency, resolve_route,
+                           thinking_budget)
+from narrative_service import start_service
+from page_discovery import ABOUT_PAGES_MAX, extract_links, parse_sitemap, rank_candidates
+from palette import Palette, extract_palette
+from prompt_format import format_concept, format_json, format_profile
+from prompt_index import compile_system_prompt, prompt_savings
+from research import ResearchArtifact, format_dossier, research_key
+from rerun_profiler import RERUN_PROFILE, begin_rerun, end_rerun, recent_profiles, section_report, to_folded
+from research_cache import cache_key, get_research_cache
+from sdk_warmup import http_client, start_warmup
+from site_metadata import format_facts, inline_css
+from storyboard_format import (expand_keyframe, expand_storyboard, image_prompt, repair_schema, response_schema,
+                               wire_keyframes)
+from storyboard_pipeline import PlaceholderBackend, run_pipeline
+from tracing import current_span, span, traced
+
+logger = logging.getLogger(__name__)
+
 # ---------------------------------------------------------------------------
 # PAGE CONFIG
 # ---------------------------------------------------------------------------
@@ -28,6 +68,10 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Sample this script run when the sidebar's "Profile reruns" toggle (or RERUN_PROFILE) is on (rerun_profiler.py)
+_rerun_sampler = (begin_rerun(RERUN_PROFILE or st.session_state.get("profile_reruns", False), __file__)
+                  if __name__ == "__main__" else None)
+
 # ---------------------------------------------------------------------------
 # CUSTOM CSS — Dark, editorial, high-end creative tool aesthetic
 # ---------------------------------------------------------------------------
@@ -354,6 +398,8 @@ DEFAULTS = {
     # LLM Settings
     "llm_provider": "Anthropic",
     "llm_model": "claude-sonnet-4-20250514",
+    "model_routing": True,        # per-stage models and effort (model_routing.py); off = sidebar model everywhere
+    "stage_routes": None,         # stage → Route overriding the provider default
     "api_key": "",
     "api_key_set": False,
     # Brand data
@@ -361,8 +407,9 @@ DEFAULTS = {
     "brand_url": "",
     "brand_category": "",
     "brand_description": "",
-    "scraped_data": None,
+    "scraped_data": None,         # ArtifactRef, like the other large values below
     "scrape_attempted": False,
+    "research_artifacts": None,   # research_key → ArtifactRef of a ResearchArtifact; shared by research-only and auto-fill
     "audience_lifestyle": "",
     "audience_brands": "",
     "audience_platform": "Instagram Reels",
@@ -383,11 +430,21 @@ DEFAULTS = {
     "text_overlay_pref": "Tagline at end only",
     "audio_direction": "",
     "generated_narratives": None,
+    "concepts_filtered": None,    # {"duplicates": n, "cliches": n} from the last generation
+    "concept_indexes": None,      # brand key → ConceptIndex of every concept seen
+    "prompt_token_stats": None,   # stage → system prompt savings of this session's last call
     "selected_narrative": None,
     "generated_storyboard": None,
     "brand_profile_json": None,
+    "brand_profile_digest": None, # digest of the stored profile; step_review re-stores only on change
+    "concepts_cancelled": False,  # user cancelled concept generation; don't restart it until asked
+    "session_id": None,           # owner tag for this session's artifacts in the artifact store
 }
 
+# scraped_data, generated_narratives, generated_storyboard, brand_profile_json and
+# the research artifacts live in the process-wide artifact store (artifact_store.py);
+# session state keeps an ArtifactRef. Read with load_artifact, write with save_artifact.
+
 # ---------------------------------------------------------------------------
 # LLM PROVIDER CONFIGURATIONS
 # ---------------------------------------------------------------------------
@@ -429,6 +486,17 @@ LLM_PROVIDERS = {
         "key_placeholder": "AIzaSy...",
         "docs_url": "https://aistudio.google.com/apikey",
     },
+    "Fake": {
+        "models": [
+            ("Fake — instant", "fake-instant"),
+            ("Fake — realistic latency", "fake-realistic"),
+            ("Fake — flaky (errors + truncation)", "fake-flaky"),
+        ],
+        "key_prefix": "",
+        "key_placeholder": "not required",
+        "docs_url": "",
+        "requires_key": False,
+    },
 }
 
 for key, val in DEFAULTS.items():
@@ -438,40 +506,295 @@ for key, val in DEFAULTS.items():
 TOTAL_STEPS = 7  # Identity, Audience, Personality, Emotion, Visual, Review, Generate
 
 
+# ---------------------------------------------------------------------------
+# HELPER: ARTIFACT STORE
+# ---------------------------------------------------------------------------
+# Artifact owners that are Streamlit session ids; only these are checked for liveness
+_streamlit_owners = set()
+
+
+def _session_owner(state) -> str:
+    if not state.get("session_id"):
+        ctx = get_script_run_ctx(suppress_warning=True) if state is st.session_state else None
+        if ctx is not None:
+            state["session_id"] = ctx.session_id
+            _streamlit_owners.add(ctx.session_id)
+        else:
+            state["session_id"] = uuid.uuid4().hex[:12]
+    return state["session_id"]
+
+
+def _owner_alive(owner: str) -> bool:
+    """False once Streamlit has dropped the session; owners from bare-mode scripts are always alive."""
+    if owner not in _streamlit_owners or not st.runtime.exists():
+        return True
+    if st.runtime.get_instance().is_active_session(owner):
+        return True
+    _streamlit_owners.discard(owner)
+    return False
+
+
+get_store().set_liveness(_owner_alive)
+
+
+def load_artifact(name: str, state=None):
+    """The value behind a session key, whether stored as an ArtifactRef or inline.
+
+    An artifact the store lost reads as None with a visible warning, and the key
+    is cleared. Lost concepts are not regenerated automatically, because that is
+    a paid call the user did not ask for.
+    """
+    state = st.session_state if state is None else state
+    try:
+        return resolve(state.get(name))
+    except ArtifactMissing as e:
+        logger.warning("%s", e)
+        state[name] = None
+        if state is st.session_state:
+            st.warning(f"The saved {name.replace('_', ' ')} is no longer available on the server.")
+            if name == "generated_narratives":
+                state["concepts_cancelled"] = True
+        return None
+
+
+def save_artifact(name: str, value, state=None):
+    """Store ``value`` for this session (``None`` clears it), releasing the previous one.
+
+    A plain dict state (batch runs, the HTTP service) keeps the value inline:
+    it lives only as long as the caller's dict, so nothing in the store would release it.
+    """
+    state = st.session_state if state is None else state
+    if state is not st.session_state:
+        state[name] = value
+        return
+    old = state.get(name)
+    if isinstance(old, ArtifactRef):
+        get_store().discard(old)
+    state[name] = None if value is None else get_store().put(value, name, _session_owner(state))
+
+
+def session_research(state=None) -> ResearchArtifact | None:
+    """The research artifact for the wizard's current brand inputs, if research has run."""
+    state = st.session_state if state is None else state
+    ref = (state.get("research_artifacts") or {}).get(
+        research_key(state.get("brand_name"), state.get("brand_url"), state.get("brand_category")))
+    try:
+        return resolve(ref)
+    except ArtifactMissing as e:
+        logger.warning("%s", e)
+        return None
+
+
+def session_memory_report(state=None) -> list[dict]:
+    """Per-key footprint of a session: bytes held inline and bytes parked in the artifact store."""
+    state = st.session_state if state is None else state
+    store = get_store()
+    rows = []
+    for key in list(state.keys()):
+        value = state[key]
+        refs = [value] if isinstance(value, ArtifactRef) else \
+            [v for v in value.values() if isinstance(v, ArtifactRef)] if isinstance(value, dict) else []
+        if refs:
+            rows.append({"key": key, "session_bytes": approx_size(value) if not isinstance(value, ArtifactRef) else 0,
+                         "stored_bytes": sum(r.size for r in refs),
+                         "where": ", ".join(sorted({store.location(r) for r in refs}))})
+        else:
+            size = approx_size(value)
+            if size >= 1024:
+                rows.append({"key": key, "session_bytes": size, "stored_bytes": 0, "where": "session"})
+    return sorted(rows, key=lambda r: -(r["session_bytes"] + r["stored_bytes"]))
+
+
 # ---------------------------------------------------------------------------
 # HELPER: LLM INTEGRATION (Multi-provider)
 # ---------------------------------------------------------------------------
-def call_llm(system_prompt: str, user_message: str, max_tokens: int = 4096, web_search: bool = False) -> str:
-    """Route LLM calls to the selected provider and model."""
+LLM_DEADLINE_GRACE_S = 5   # extra wait for the bridge to collect a timed-out call's error result
+
+
+def call_llm(system_prompt: str, user_message: str, max_tokens: int = 4096, web_search: bool = False,
+             *, stage: str = None, provider: str = None, model: str = None, effort: str = None,
+             api_key: str = None, max_search_uses: int = None) -> str:
+    """Route LLM calls to the selected provider and model.
+
+    Provider, model and key default to the sidebar settings in session state;
+    pass them explicitly to call outside a Streamlit session (benchmarks, scripts).
+    Without an explicit model, ``stage`` picks the model and effort from the
+    routing policy (see model_routing.py).
+    ``max_search_uses`` caps web-search rounds where the provider supports it.
+    Blocking wrapper around ``acall_llm`` (see async_bridge.py); inside a
+    ``stage_deadline`` the request is bounded by the stage's remaining budget,
+    and an active ``wait_hook`` is polled while it waits (see deadlines.py).
+    """
+    # Session state is only readable from the script thread, so resolve it before bridging
+    provider = provider or st.session_state.get("llm_provider", "Anthropic")
+    if model is None:
+        route = _session_route(provider, stage)
+        model, effort = route.model, route.effort
+    api_key = api_key if api_key is not None else st.session_state.get("api_key", "")
+    # acall_llm enforces the deadline itself; the bridge timeout is only a backstop
+    deadline = current_deadline()
+    backstop = deadline.remaining() + LLM_DEADLINE_GRACE_S if deadline else None
+    return run_sync(acall_llm(system_prompt, user_message, max_tokens, web_search, stage=stage, provider=provider,
+                              model=model, effort=effort, api_key=api_key, max_search_uses=max_search_uses),
+                    timeout=backstop, poll=poller())
+
+
+def _session_route(provider: str, stage: str | None) -> Route:
+    """The sidebar's route for ``stage``: its override, the provider default, or the sidebar model."""
+    return resolve_route(provider, stage, st.session_state.get("llm_model", "claude-sonnet-4-20250514"),
+                         overrides=st.session_state.get("stage_routes"),
+                         enabled=st.session_state.get("model_routing", True))
+
+
+async def acall_llm(system_prompt: str, user_message: str, max_tokens: int = 4096, web_search: bool = False,
+                    *, provider: str, model: str, stage: str = None, effort: str = None, api_key: str = "",
+                    max_search_uses: int = None) -> str:
+    """Async ``call_llm``: same routing and ``__LLM_*`` error contract, no thread per call.
+
+    Provider and model are required — coroutines may run off the script thread,
+    where session state is not available. ``stage`` only labels the call for
+    latency reporting here; ``effort`` is the reasoning budget (None = provider default).
+    """
+    async def live() -> str:
+        return await _adispatch_llm(system_prompt, user_message, max_tokens, web_search, provider, model, api_key,
+                                    max_search_uses, effort)
+
+    started = time.perf_counter()
+    with span("call_llm", concurrent=True, stage=stage, provider=provider, model=model, effort=effort,
+              max_tokens=max_tokens, web_search=web_search, max_search_uses=max_search_uses,
+              prompt_chars=len(system_prompt) + len(user_message)) as trace_span:
+        # Record/replay (see cassettes.py) — keys are never written to the cassette
+        cassette = get_active_cassette()
+        if cassette:
+            request = {
+                "provider": provider, "model": model, "system": system_prompt, "user": user_message,
+                "max_tokens": max_tokens, "web_search": web_search,
+            }
+            if max_search_uses is not None:
+                request["max_search_uses"] = max_search_uses
+            if effort is not None:
+                request["effort"] = effort
+            result = await cassette.intercept_async("llm", request, live)
+        else:
+            result = await live()
+        failed = bool(result and result.startswith("__LLM_"))
+        trace_span.set(response_chars=len(result or ""), failed=failed)
+        if stage:
+            record_latency(stage, model, time.perf_counter() - started, failed)
+        return result
+
+
+def call_llm_many(batch: list[dict], limit: int = MAX_IN_FLIGHT) -> list[str]:
+    """Run several ``call_llm`` requests (dicts of its keyword arguments) concurrently; results keep order."""
     provider = st.session_state.get("llm_provider", "Anthropic")
-    model = st.session_state.get("llm_model", "claude-sonnet-4-20250514")
     api_key = st.session_state.get("api_key", "")
-
-    if not api_key:
+    calls = []
+    for r in batch:
+        r = {k: v for k, v in r.items() if v is not None}
+        r.setdefault("provider", provider)
+        r.setdefault("api_key", api_key)
+        if "model" not in r:
+            route = _session_route(r["provider"], r.get("stage"))
+            r["model"], r["effort"] = route.model, route.effort
+        calls.append(acall_llm(**r))
+    deadline = current_deadline()
+    backstop = deadline.remaining() + LLM_DEADLINE_GRACE_S if deadline else None
+    return run_sync(gather_bounded(calls, limit), timeout=backstop, poll=poller())
+
+
+async def _adispatch_llm(system_prompt: str, user_message: str, max_tokens: int, web_search: bool,
+                         provider: str, model: str, api_key: str, max_search_uses: int = None,
+                         effort: str = None) -> str:
+    """Send one request to a provider adapter, folding failures into ``__LLM_*`` strings.
+
+    The stage deadline's remaining budget is passed to the SDK as its request
+    timeout and also enforced here, so a stalled stream cannot outlive it.
+    Cancellation (a Cancel click, a superseding rerun) propagates unchanged.
+    """
+    requires_key = LLM_PROVIDERS.get(provider, {}).get("requires_key", True)
+    if requires_key and not api_key:
         return "__LLM_UNAVAILABLE__: No API key configured. Open the sidebar (⚙️) to add your key."
 
+    deadline = current_deadline()
     try:
+        timeout = remaining()
         if provider == "Anthropic":
-            return _call_anthropic(system_prompt, user_message, model, api_key, max_tokens, web_search)
+            call = _acall_anthropic(system_prompt, user_message, model, api_key, max_tokens, web_search, max_search_uses,
+                                    effort=effort, timeout=timeout)
         elif provider == "OpenAI":
-            return _call_openai(system_prompt, user_message, model, api_key, max_tokens, web_search)
+            call = _acall_openai(system_prompt, user_message, model, api_key, max_tokens, web_search,
+                                 effort=effort, timeout=timeout)
         elif provider == "Google":
-            return _call_google(system_prompt, user_message, model, api_key, max_tokens, web_search)
+            call = _acall_google(system_prompt, user_message, model, api_key, max_tokens, web_search,
+                                 effort=effort, timeout=timeout)
+        elif provider == "Fake":
+            call = _acall_fake(system_prompt, user_message, model, api_key, max_tokens, web_search, max_search_uses)
         else:
             return f"__LLM_ERROR__: Unknown provider {provider}"
+        return await asyncio.wait_for(call, timeout)
+    except (TimeoutError, DeadlineExceeded) as e:
+        return f"__LLM_ERROR__: {deadline.describe() + ' exceeded' if deadline else str(e) or 'Request timed out'}"
     except Exception as e:
+        if deadline and deadline.expired:
+            return f"__LLM_ERROR__: {deadline.describe()} exceeded ({e})"
         return f"__LLM_ERROR__: {str(e)}"
 
 
-def _call_anthropic(system_prompt: str, user_message: str, model: str, api_key: str, max_tokens: int, web_search: bool = False) -> str:
-    """Call Anthropic Claude API with optional web search."""
+ASYNC_CLIENTS_MAX = 32          # SDK clients kept across providers, keys and loops; least recently used go first
+_async_clients = OrderedDict()  # (provider, api_key, loop id) → client
+_closing = set()                # close tasks of evicted clients, referenced until they finish
+
+
+def _async_client(provider: str, api_key: str, factory):
+    """One SDK client per provider, key and event loop, at most ``ASYNC_CLIENTS_MAX`` of them.
+
+    Anthropic and OpenAI clients are thin wrappers over the loop's shared pool
+    (sdk_warmup.py), so an evicted one is just dropped; closing it would close
+    the pool. Clients that own their connections (Gemini) are closed on eviction.
+    """
+    loop = asyncio.get_running_loop()
+    key = (provider, api_key, id(loop))
+    client = _async_clients.pop(key, None)
+    _async_clients[key] = client = factory() if client is None else client
+    while len(_async_clients) > ASYNC_CLIENTS_MAX:
+        (evicted_provider, _, loop_id), evicted = _async_clients.popitem(last=False)
+        # A client can only be closed on its own loop; one from a finished loop has nothing left to close
+        if evicted_provider not in ("Anthropic", "OpenAI") and loop_id == id(loop):
+            task = loop.create_task(_aclose_client(evicted))
+            _closing.add(task)
+            task.add_done_callback(_closing.discard)
+    return client
+
+
+async def _aclose_client(client):
+    close = getattr(getattr(client, "aio", client), "aclose", None)
+    if close is not None:
+        with contextlib.suppress(Exception):
+            await close()
+
+
+async def _acall_anthropic(system_prompt: str, user_message: str, model: str, api_key: str, max_tokens: int,
+                           web_search: bool = False, max_search_uses: int = None, *, effort: str = None,
+                           timeout: float = None) -> str:
+    """Call Anthropic Claude API with optional web search and extended thinking."""
     try:
         import anthropic
     except ImportError:
         return "__LLM_ERROR__: `anthropic` package not installed. Run: pip install anthropic"
 
-    client = anthropic.Anthropic(api_key=api_key)
+    client = _async_client("Anthropic", api_key, lambda: anthropic.AsyncAnthropic(api_key=api_key, http_client=http_client("Anthropic")))
+
+    kwargs = anthropic_request(system_prompt, user_message, model, max_tokens, web_search, max_search_uses, effort)
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+
+    response = await client.messages.create(**kwargs)
+    return anthropic_text(response)
 
+
+def anthropic_request(system_prompt: str, user_message: str, model: str, max_tokens: int, web_search: bool = False,
+                      max_search_uses: int = None, effort: str = None) -> dict:
+    """Messages API parameters for one request (also the ``params`` of a Message Batches entry)."""
     kwargs = {
         "model": model,
         "max_tokens": max_tokens,
@@ -480,77 +803,119 @@ def _call_anthropic(system_prompt: str, user_message: str, model: str, api_key:
     }
 
     if web_search:
-        kwargs["tools"] = [{"type": "web_search_20250305", "name": "web_search", "max_uses": 5}]
+        kwargs["tools"] = [{"type": "web_search_20250305", "name": "web_search", "max_uses": max_search_uses or FULL_SEARCH_USES}]
+    # Thinking tokens count against max_tokens, so the answer keeps its own budget
+    budget = thinking_budget(effort)
+    if budget:
+        kwargs["thinking"] = {"type": "enabled", "budget_tokens": budget}
+        kwargs["max_tokens"] = max_tokens + budget
+    return kwargs
 
-    response = client.messages.create(**kwargs)
 
-    # Extract text from response — may have multiple content blocks when web search is used
+def anthropic_text(message) -> str:
+    """Text of a Messages API response — may have multiple content blocks when web search is used."""
     text_parts = []
-    for block in response.content:
+    for block in message.content:
         if hasattr(block, "text"):
             text_parts.append(block.text)
-    return "\n".join(text_parts) if text_parts else response.content[0].text
+    return "\n".join(text_parts) if text_parts else message.content[0].text
 
 
-def _call_openai(system_prompt: str, user_message: str, model: str, api_key: str, max_tokens: int, web_search: bool = False) -> str:
+async def _acall_openai(system_prompt: str, user_message: str, model: str, api_key: str, max_tokens: int,
+                        web_search: bool = False, *, effort: str = None, timeout: float = None) -> str:
     """Call OpenAI API (GPT-4.x, GPT-5.x, and o-series)."""
     try:
         import openai
     except ImportError:
         return "__LLM_ERROR__: `openai` package not installed. Run: pip install openai"
 
-    client = openai.OpenAI(api_key=api_key)
+    client = _async_client("OpenAI", api_key, lambda: openai.AsyncOpenAI(api_key=api_key, http_client=http_client("OpenAI")))
+
+    # SDK default (10 min) outside a stage deadline
+    request_options = {"timeout": timeout} if timeout is not None else {}
 
-    # GPT-5.x and o-series are reasoning models
-    is_reasoning = model.startswith("o") or model.startswith("gpt-5")
+    # GPT-5.x and o-series are reasoning models; "high" unless the route sets an effort
+    is_reasoning = _openai_is_reasoning(model)
+    effort = effort or "high"
 
     # Web search requires the Responses API
     if web_search:
-        kwargs = {
-            "model": model,
-            "instructions": system_prompt,
-            "input": user_message,
-            "tools": [{"type": "web_search"}],
-            "max_output_tokens": max_tokens,
-        }
-        if is_reasoning:
-            kwargs["reasoning"] = {"effort": "high"}
-        response = client.responses.create(**kwargs)
+        kwargs = openai_responses_request(system_prompt, user_message, model, max_tokens, web_search, effort)
+        response = await client.responses.create(**kwargs, **request_options)
         return response.output_text
 
     # Standard Chat Completions API (no web search)
     if is_reasoning:
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=model,
             messages=[
                 {"role": "developer", "content": system_prompt},
                 {"role": "user", "content": user_message},
             ],
-            reasoning_effort="high",              # bare string for Chat Completions API
+            reasoning_effort=effort,              # bare string for Chat Completions API
             max_completion_tokens=max_tokens,     # NOT max_tokens — reasoning models reject it
+            **request_options,
         )
     else:
         # GPT-4.x and older non-reasoning models
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=model,
             max_tokens=max_tokens,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message},
             ],
+            **request_options,
         )
     return response.choices[0].message.content
 
 
-def _call_google(system_prompt: str, user_message: str, model: str, api_key: str, max_tokens: int, web_search: bool = False) -> str:
-    """Call Google Gemini API with optional Google Search grounding."""
+def _openai_is_reasoning(model: str) -> bool:
+    return model.startswith("o") or model.startswith("gpt-5")
+
+
+def openai_responses_request(system_prompt: str, user_message: str, model: str, max_tokens: int,
+                             web_search: bool = False, effort: str = None) -> dict:
+    """Responses API body for one request (also the ``body`` of a Batch API line)."""
+    kwargs = {
+        "model": model,
+        "instructions": system_prompt,
+        "input": user_message,
+        "max_output_tokens": max_tokens,
+    }
+    if web_search:
+        kwargs["tools"] = [{"type": "web_search"}]
+    if _openai_is_reasoning(model):
+        kwargs["reasoning"] = {"effort": effort or "high"}
+    return kwargs
+
+
+async def _acall_google(system_prompt: str, user_message: str, model: str, api_key: str, max_tokens: int,
+                        web_search: bool = False, *, effort: str = None, timeout: float = None) -> str:
+    """Call Google Gemini API with optional Google Search grounding and thinking budget."""
     try:
         from google import genai
         from google.genai import types
     except ImportError:
         return "__LLM_ERROR__: `google-genai` package not installed. Run: pip install google-genai"
 
-    client = genai.Client(api_key=api_key)
+    client = _async_client("Google", api_key, lambda: genai.Client(api_key=api_key))
+
+    config_kwargs = google_config(system_prompt, model, max_tokens, web_search, effort)
+    if timeout is not None:
+        config_kwargs["http_options"] = types.HttpOptions(timeout=int(timeout * 1000))   # milliseconds
+
+    response = await client.aio.models.generate_content(
+        model=model,
+        contents=user_message,
+        config=types.GenerateContentConfig(**config_kwargs),
+    )
+    return response.text
+
+
+def google_config(system_prompt: str, model: str, max_tokens: int, web_search: bool = False, effort: str = None) -> dict:
+    """``GenerateContentConfig`` arguments for one request (also used for batch-job inline requests)."""
+    from google.genai import types
 
     config_kwargs = {
         "system_instruction": system_prompt,
@@ -562,55 +927,188 @@ def _call_google(system_prompt: str, user_message: str, model: str, api_key: str
         tools.append(types.Tool(google_search=types.GoogleSearch()))
     if tools:
         config_kwargs["tools"] = tools
+    # Only 2.5 models think; Pro cannot switch thinking off (minimum 128 tokens)
+    budget = thinking_budget(effort, minimum=128 if "pro" in model else 0) if model.startswith("gemini-2.5") else None
+    if budget is not None:
+        config_kwargs["thinking_config"] = types.ThinkingConfig(thinking_budget=budget)
+        config_kwargs["max_output_tokens"] = max_tokens + budget
+    return config_kwargs
 
-    response = client.models.generate_content(
-        model=model,
-        contents=user_message,
-        config=types.GenerateContentConfig(**config_kwargs),
-    )
-    return response.text
+
+async def _acall_fake(system_prompt: str, user_message: str, model: str, api_key: str, max_tokens: int,
+                      web_search: bool = False, max_search_uses: int = None) -> str:
+    """Call the deterministic offline provider (benchmarks, load tests, demos)."""
+    return await fake_completion_async(system_prompt, user_message, model, max_tokens, web_search,
+                                       config=FakeLLMConfig.for_model(model),
+                                       search_rounds=max_search_uses or FULL_SEARCH_USES)
+
+
+HTTP_TIMEOUT_S = 10        # per page/asset fetch; less when the stage deadline is nearer
+_HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+_http_session = {"session": None}
+
+
+def _http() -> "requests.Session":
+    """Process-wide pooled session, so page, stylesheet and logo fetches reuse connections."""
+    if _http_session["session"] is None:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(_HTTP_HEADERS)
+        _http_session["session"] = session
+    return _http_session["session"]
+
+
+def _http_get_text(url: str) -> str:
+    """GET a page and return its body text; raises on network or HTTP errors."""
+    return _http_get_page(url)[0]
+
+
+def _http_get_page(url: str) -> tuple[str, str]:
+    """GET a page and return ``(body text, final URL after redirects)``; raises on network or HTTP errors.
+
+    Cassettes record only the body, so a replayed page reports the requested URL.
+    """
+    final = {"url": url}
+
+    def live() -> str:
+        resp = _http().get(url, timeout=remaining(cap=HTTP_TIMEOUT_S), allow_redirects=True)
+        resp.raise_for_status()
+        final["url"] = resp.url or url
+        return resp.text
+
+    with span("http_get", url=url) as trace_span:
+        cassette = get_active_cassette()
+        text = cassette.intercept("http", {"url": url}, live) if cassette else live()
+        trace_span.set(chars=len(text))
+        return text, final["url"]
+
+
+def _http_get_bytes(url: str, max_bytes: int = 512_000) -> bytes:
+    """GET a binary asset (logo, favicon); raises on network or HTTP errors. Larger bodies are cut off."""
+    def live() -> str:
+        resp = _http().get(url, timeout=remaining(cap=HTTP_TIMEOUT_S), allow_redirects=True)
+        resp.raise_for_status()
+        # Cassettes are JSON, so the body travels base64-encoded
+        return base64.b64encode(resp.content[:max_bytes]).decode("ascii")
+
+    with span("http_get_bytes", url=url) as trace_span:
+        cassette = get_active_cassette()
+        encoded = cassette.intercept("http_bytes", {"url": url}, live) if cassette else live()
+        data = base64.b64decode(encoded)
+        trace_span.set(bytes=len(data))
+        return data
 
 
 def _fetch_website_text(url: str, max_chars: int = 8000) -> str:
     """Fetch and extract readable text from a URL."""
+    return _fetch_website_page(url, max_chars)["text"]
+
+
+@traced()
+def _fetch_website_page(url: str, max_chars: int = 8000) -> dict:
+    """Fetch a URL and return its readable ``text``, ``metadata``, raw ``html`` and final ``url``."""
     if not HAS_SCRAPING or not url:
-        return ""
+        return {"text": "", "metadata": {}, "html": "", "url": url}
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        }
-        resp = requests.get(url, headers=headers, timeout=10, allow_redirects=True)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
+        html, final_url = _http_get_page(url)
+        # In a worker process when HTML_PARSE_WORKERS is set (see html_extract.py)
+        with span("parse_html", chars=len(html), workers=pool_workers()) as trace_span:
+            page = parse_page(html, max_chars)
+            trace_span.set(text_chars=page["text_chars"])
+        return {"text": page["text"], "metadata": page["metadata"], "html": html, "url": final_url}
+    except Exception as e:
+        current_span().set(error=f"{type(e).__name__}: {e}")
+        return {"text": "", "metadata": {}, "html": "", "url": url}
 
-        # Remove script, style, nav, footer noise
-        for tag in soup(["script", "style", "nav", "footer", "header", "noscript", "iframe"]):
-            tag.decompose()
 
-        text = soup.get_text(separator="\n", strip=True)
-        # Collapse multiple newlines
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        return text[:max_chars]
+@traced()
+def _sitemap_urls(base_url: str) -> list[str]:
+    """Page URLs from ``/sitemap.xml``; for a sitemap index, only its page sitemaps are read."""
+    try:
+        pages, children = parse_sitemap(_http_get_text(urljoin(base_url, "/sitemap.xml")))
     except Exception:
-        return ""
+        return []
+    for child in [c for c in children if "page" in c.lower()][:2]:
+        try:
+            pages += parse_sitemap(_http_get_text(child))[0]
+        except Exception:
+            continue
+    return pages
 
 
-def _try_fetch_about_page(base_url: str) -> str:
-    """Try to find and fetch an about/story page for richer brand info."""
+@traced()
+def _discover_story_pages(base_url: str, homepage_html: str = None) -> list:
+    """Rank the site's about/story/mission pages from homepage links, then the sitemap if needed."""
+    if homepage_html is None:
+        try:
+            homepage_html = _http_get_text(base_url)
+        except Exception:
+            homepage_html = ""
+    links = extract_links(homepage_html) if homepage_html else []
+    candidates = rank_candidates(base_url, links)
+    if len(candidates) < ABOUT_PAGES_MAX:
+        candidates = rank_candidates(base_url, links, _sitemap_urls(base_url))
+    return candidates
+
+
+@traced()
+def _try_fetch_about_page(base_url: str, homepage_html: str = None) -> str:
+    """Fetch the top-ranked brand story pages in parallel and return their combined text."""
     if not HAS_SCRAPING or not base_url:
         return ""
-    about_paths = ["/pages/about", "/about", "/pages/story", "/story", "/our-story", "/about-us"]
-    base = base_url.rstrip("/")
-    for path in about_paths:
+    urls = [c.url for c in _discover_story_pages(base_url, homepage_html)]
+    if not urls:
+        # Nothing linked (e.g. a JS-rendered nav) — fall back to the two most common paths
+        base = base_url.rstrip("/")
+        urls = [f"{base}/pages/about", f"{base}/about"]
+
+    with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+        texts = list(pool.map(bind_context(lambda u: _fetch_website_text(u, max_chars=4000)), urls))
+    sections = [
+        f"[{urlsplit(url).path}]\n{text}"
+        for url, text in zip(urls, texts)
+        if len(text) > 80  # Only keep pages with meaningful content
+    ]
+    return "\n\n".join(sections)[:6000]
+
+
+PALETTE_MAX_STYLESHEETS = 4
+PALETTE_MAX_IMAGES = 2
+
+
+@traced()
+def _fetch_brand_palette(base_url: str, homepage_html: str, metadata: dict) -> Palette:
+    """Palette from the homepage's inline CSS, its linked stylesheets and its logo/favicon."""
+    if not HAS_SCRAPING or not base_url:
+        return Palette()
+    json_ld_logo = (metadata.get("json_ld") or {}).get("logo")
+    css_urls = [urljoin(base_url, href) for href in (metadata.get("stylesheets") or [])[:PALETTE_MAX_STYLESHEETS]]
+    image_urls = [urljoin(base_url, href) for href in ([json_ld_logo] if isinstance(json_ld_logo, str) else [])
+                  + (metadata.get("icons") or [])][:PALETTE_MAX_IMAGES]
+
+    def fetch(job):
+        kind, url = job
         try:
-            text = _fetch_website_text(f"{base}{path}", max_chars=4000)
-            if len(text) > 200:  # Only return if we got meaningful content
-                return text
+            return _http_get_text(url) if kind == "css" else _http_get_bytes(url)
         except Exception:
-            continue
-    return ""
+            return "" if kind == "css" else b""
 
+    jobs = [("css", u) for u in css_urls] + [("image", u) for u in image_urls]
+    results = []
+    if jobs:
+        with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+            results = list(pool.map(bind_context(fetch), jobs))
+    stylesheets = inline_css(homepage_html) + [r for (kind, _), r in zip(jobs, results) if kind == "css"]
+    images = [r for (kind, _), r in zip(jobs, results) if kind == "image"]
+    with span("extract_palette", stylesheets=len(stylesheets), images=len(images)):
+        return extract_palette(stylesheets, images, hints=[metadata.get("theme-color", "")])
 
+
+@traced()
 def _parse_json_response(text: str) -> dict | list | None:
     """Parse JSON from an LLM response — matches the proven Synth.Human pattern."""
     if not text:
@@ -651,21 +1149,91 @@ def _parse_json_response(text: str) -> dict | list | None:
     return None
 
 
-def scrape_brand_info(brand_name: str, url: str, category: str) -> dict:
-    """Research a brand by scraping its website and using LLM to structure the data."""
-
+@traced()
+@with_deadline("research")
+def run_brand_research(brand_name: str, url: str, category: str, refresh: bool = False,
+                       llm: dict = None) -> ResearchArtifact | None:
+    """Scrape the website once and run the single web-search research call.
+
+    The shared research cache (research_cache.py) answers first: recently
+    checked research is served as-is, and an unchanged site skips the LLM call.
+    ``refresh`` forces new research. ``llm`` holds explicit ``call_llm``
+    settings (provider, model, effort, api_key) for callers outside a session.
+    """
+    llm = llm or {}
+    cache = get_research_cache()
+    key = cache_key(brand_name, url)
+    if not refresh:
+        cached = cache.recent(key)
+        if cached:
+            logger.info("research %s: served from cache (%s, %.1fh old)", brand_name, key, cached.cache["age_s"] / 3600)
+            return _as_requested(cached, brand_name, url, category)
+
+    started = time.perf_counter()
+    artifact, decision, system, user_msg = prepare_brand_research(
+        brand_name, url, category, llm.get("provider") or st.session_state.get("llm_provider", "Anthropic"),
+        llm.get("model") or st.session_state.get("llm_model", DEFAULTS["llm_model"]))
+    if not refresh:
+        cached = cache.revalidate(key, artifact)
+        if cached:
+            cached.duration_s = round(time.perf_counter() - started, 3)
+            logger.info("research %s: site unchanged, reusing cached research (%s)", brand_name, key)
+            return cached
+    result = call_llm(system, user_msg, max_tokens=RESEARCH_MAX_TOKENS, web_search=decision.web_search,
+                      stage="research", max_search_uses=decision.max_uses or None, **llm)
+    artifact.duration_s = round(time.perf_counter() - started, 3)
+    artifact = complete_brand_research(artifact, result)
+    if artifact:
+        cache.put(key, artifact)
+    return artifact
+
+
+def _as_requested(artifact: ResearchArtifact, brand_name: str, url: str, category: str) -> ResearchArtifact:
+    """A cached artifact relabelled with this request's inputs (the cache key ignores spelling and category)."""
+    artifact.brand_name, artifact.url, artifact.category = brand_name, url or artifact.url, category
+    return artifact
+
+
+RESEARCH_MAX_TOKENS = 1400
+
+
+def prepare_brand_research(brand_name: str, url: str, category: str, provider: str, model: str):
+    """Scrape the site and build the research request: (artifact, search decision, system, user).
+
+    Shared by the interactive path and batch runs (batch_runs.py); ``model``
+    only matters for the Fake provider's simulated search time.
+    """
     # --- Step 1: Try to scrape real website content ---
     site_text = ""
     about_text = ""
+    metadata = {}
+    palette = Palette()
     if url:
-        site_text = _fetch_website_text(url)
-        about_text = _try_fetch_about_page(url)
-
-    has_site_content = len(site_text) > 100
-
-    # --- Step 2: Build the LLM prompt based on what we have ---
+        homepage = _fetch_website_page(url)
+        site_text, metadata = homepage["text"], homepage["metadata"]
+        # Links are judged against the host that served the homepage (e.g. after an apex → www redirect)
+        about_text = _try_fetch_about_page(homepage["url"], homepage["html"])
+        palette = _fetch_brand_palette(url, homepage["html"], metadata)
+
+    artifact = ResearchArtifact(brand_name, url, category, homepage_text=site_text, about_text=about_text,
+                                metadata=metadata, palette=asdict(palette))
+
+    # --- Step 2: Decide how much web search the evidence still needs ---
+    round_s = None
+    if provider == "Fake":
+        round_s = FakeLLMConfig.for_model(model).search_round_s
+    decision = decide_search(provider, site_text, about_text, metadata, round_s=round_s)
+    artifact.web_search = decision.web_search
+    artifact.search = decision.to_dict()
+    logger.info("research %s: %s — %s", brand_name, decision.summary(), decision.reason)
+
+    # --- Step 3: Build the LLM prompt based on what we have ---
+    if decision.web_search:
+        search_instructions = "You have access to web search. ALWAYS search the web for the brand's website, social media, and any press or reviews before producing your profile. Do not rely solely on your training data."
+    else:
+        search_instructions = "Web search is not available for this request. The scraped website content is your primary source; fill findings from it."
     system = """You are a brand research analyst. Your job is to produce a structured brand profile.
-You have access to web search. ALWAYS search the web for the brand's website and any relevant information before producing your profile. Do not rely solely on your training data.
+""" + search_instructions + """
 Return ONLY a valid JSON object — no markdown fences, no commentary, no preamble. Just the raw JSON.
 The JSON must have exactly these fields:
 {
@@ -678,79 +1246,122 @@ The JSON must have exactly these fields:
     "aesthetic_description": "visual style, color tendencies, design language",
     "price_tier": "budget / accessible / mid-range / premium / luxury",
     "notable_info": "any other relevant brand context",
+    "findings": ["one concrete fact per item from the website, social media, press or reviews — brand colors, voice, founders, products, campaigns; at most 8"],
     "confidence": "high / medium / low"
 }
 CRITICAL: Return ONLY the JSON object. No other text before or after it."""
 
-    if has_site_content:
+    # Published metadata is exact, so less page text is needed alongside it
+    facts = format_facts(metadata)
+    if artifact.has_site_content:
         user_msg = f"""Analyze this brand and produce a structured profile.
 
 Brand: {brand_name}
 Website: {url}
 Category: {category}
+{facts}
 
 === HOMEPAGE CONTENT ===
-{site_text[:5000]}
+{site_text[:3000 if facts else 5000]}
 
 === ABOUT PAGE CONTENT ===
 {about_text[:3000] if about_text else 'Not found'}
 
-Use the website content above as your primary source. Extract the tagline, values, aesthetic, and audience from what you can see. Set confidence to 'high' if the site gave you clear brand signals, 'medium' if partial."""
+Use the website content above as your primary source; verified site metadata overrides anything that contradicts it. Extract the tagline, values, aesthetic, and audience from what you can see. Set confidence to 'high' if the site gave you clear brand signals, 'medium' if partial."""
     else:
         user_msg = f"""Analyze this brand and produce a structured profile based on your knowledge.
 
 Brand: {brand_name}
 Website: {url}
 Category: {category}
+{facts}
 
-IMPORTANT: Only provide information you are CERTAIN about from your training data. If you do not confidently know this specific brand, set ALL text fields to empty strings, set values to an empty array, set confidence to 'low', and set notable_info to 'Brand not found in training data — website could not be scraped. Manual input recommended.' Do NOT invent or guess a brand identity."""
+IMPORTANT: Only provide information you are CERTAIN about from your training data. If you do not confidently know this specific brand, set ALL text fields to empty strings, set values and findings to empty arrays, set confidence to 'low', and set notable_info to 'Brand not found in training data — website could not be scraped. Manual input recommended.' Do NOT invent or guess a brand identity."""
 
-    result = call_llm(system, user_msg, max_tokens=1024, web_search=True)
+    return artifact, decision, system, user_msg
 
+
+def complete_brand_research(artifact: ResearchArtifact, result: str) -> ResearchArtifact | None:
+    """Fold the research response into the artifact; None if the call failed or did not parse."""
     if result.startswith("__LLM_"):
         return None
 
     parsed = _parse_json_response(result)
-    return parsed
-
-
-def auto_fill_all_fields(brand_name: str, url: str, category: str, scraped_data: dict = None) -> dict:
-    """Use LLM to auto-fill every wizard field based on brand research."""
-
-    # Gather site content if available
-    site_text = ""
-    about_text = ""
-    if url:
-        site_text = _fetch_website_text(url)
-        about_text = _try_fetch_about_page(url)
-
-    scraped_context = ""
-    if scraped_data:
-        scraped_context = f"\n=== PREVIOUSLY SCRAPED BRAND DATA ===\n{json.dumps(scraped_data, indent=2)}"
-
-    site_context = ""
-    if len(site_text) > 100:
-        site_context = f"\n=== HOMEPAGE CONTENT ===\n{site_text[:5000]}"
-        if about_text:
-            site_context += f"\n=== ABOUT PAGE CONTENT ===\n{about_text[:3000]}"
+    if not isinstance(parsed, dict):
+        return None
+    findings = parsed.pop("findings", [])
+    artifact.profile = parsed
+    artifact.findings = [str(f) for f in findings if f] if isinstance(findings, list) else []
+    return artifact
+
+
+@traced()
+def get_brand_research(brand_name: str, url: str, category: str, state=None,
+                       refresh: bool = False) -> ResearchArtifact | None:
+    """The session's research artifact for these inputs; research runs only if there is none yet (or on ``refresh``)."""
+    state = st.session_state if state is None else state
+    if state.get("research_artifacts") is None:
+        state["research_artifacts"] = {}
+    key = research_key(brand_name, url, category)
+    artifact = None
+    if not refresh:
+        try:
+            artifact = resolve(state["research_artifacts"].get(key))
+        except ArtifactMissing as e:
+            # Re-research on this explicit request; the shared research cache usually answers it
+            logger.warning("%s; researching again", e)
+    if artifact is None:
+        artifact = run_brand_research(brand_name, url, category, refresh=refresh)
+        if artifact:
+            old = state["research_artifacts"].get(key)
+            if isinstance(old, ArtifactRef):
+                get_store().discard(old)
+            state["research_artifacts"][key] = get_store().put(artifact, "research", _session_owner(state))
+    return artifact
+
+
+@traced()
+def scrape_brand_info(brand_name: str, url: str, category: str, refresh: bool = False) -> dict:
+    """Research a brand (once per session) and return its structured identity."""
+    artifact = get_brand_research(brand_name, url, category, refresh=refresh)
+    return artifact.profile if artifact else None
+
+
+@traced()
+def auto_fill_all_fields(brand_name: str, url: str, category: str, scraped_data: dict = None,
+                         research: ResearchArtifact = None) -> dict:
+    """Fill every wizard field from the shared research artifact.
+
+    The identity fields are copied from research; the LLM only writes the
+    creative brief, without web search. Research runs first if the session has
+    none for this brand, under its own deadline; the brief call gets the
+    auto-fill budget.
+    """
+    if research is None:
+        research = get_brand_research(brand_name, url, category)
+    if research is None and scraped_data:
+        research = ResearchArtifact(brand_name, url, category, profile=scraped_data, web_search=False)
+
+    # Colors come from the measured palette when there is one; only ask the LLM otherwise
+    local = research.local_fields() if research else {}
+    if "color_primary" in local:
+        color_fields, color_instructions = "", ""
+    else:
+        color_fields = """    "color_primary": "#hexcode",
+    "color_secondary": "#hexcode",
+    "color_accent": "#hexcode",
+"""
+        color_instructions = "COLOR PALETTE: Use the brand colors named in the research or website content if possible. Use hex codes.\n"
 
-    system = """You are an expert brand strategist and creative director. Given a brand, you will fill out a complete creative brief for a 10-12 second brand messaging video.
+    system = """You are an expert brand strategist and creative director. Given a brand and its research dossier, you will fill out a complete creative brief for a 10-12 second brand messaging video.
 
-You have access to web search. ALWAYS search the web for the brand's website, social media, and any press or reviews before filling out the brief. Use real information from the web — do not guess or invent brand details.
+Base every field on the research dossier provided. Do not invent brand details the research does not support.
 
 Return ONLY a valid JSON object — no markdown fences, no commentary, no preamble. Just the raw JSON.
 
 The JSON must have EXACTLY these fields:
 {
     "brand_description": "1-2 sentence description of the brand — what they make and their vibe",
-    "tagline": "brand tagline or slogan, empty string if unknown",
-    "ethos": "1-2 sentence brand mission/ethos",
-    "values": ["value1", "value2", "value3"],
-    "anti_positioning": "what the brand explicitly is NOT or avoids being",
-    "emotional_territory": "the core feeling/emotion the brand owns",
-    "audience_description": "psychographic description of typical customer — lifestyle, not demographics",
-    "aesthetic_description": "visual style, color tendencies, design language",
-    "price_tier": "budget / accessible / mid-range / premium / luxury",
     "audience_lifestyle": "2-3 sentence psychographic portrait of the ideal customer — what they care about, how they discover brands, their relationship with the product category",
     "adjacent_brands": "3-5 brands the customer also loves, comma-separated",
     "platform": "Instagram Reels or TikTok or YouTube Shorts",
@@ -764,13 +1375,9 @@ The JSON must have EXACTLY these fields:
     "emotion_reject": "1-2 sentences describing the feelings/vibes the brand explicitly rejects",
     "emotion_movie_scene": "A specific movie scene description — if this brand were a moment in a film, what would be happening? Be concrete and visual, not abstract",
     "visual_styles": ["id1", "id2"],
-    "color_primary": "#hexcode",
-    "color_secondary": "#hexcode",
-    "color_accent": "#hexcode",
-    "product_presence": "None — no product visible at all | Ambient — worn/used naturally, never the focus | Visible — clearly present but story-first",
+""" + color_fields + """    "product_presence": "None — no product visible at all | Ambient — worn/used naturally, never the focus | Visible — clearly present but story-first",
     "text_overlay": "None — visuals only | Tagline at end only | Minimal text throughout (3-7 words max per overlay) | Text-heavy / typographic style",
-    "audio_direction": "genre, mood, voiceover preference — be specific",
-    "confidence": "high / medium / low"
+    "audio_direction": "genre, mood, voiceover preference — be specific"
 }
 
 PERSONALITY SLIDERS: Each is 0-100 where 0 is the first trait and 100 is the second trait. 
@@ -783,8 +1390,7 @@ PERSONALITY SLIDERS: Each is 0-100 where 0 is the first trait and 100 is the sec
 
 VISUAL STYLES: Pick 2-4 from: cinematic, documentary, editorial, surreal, lofi, minimal, maximalist, vintage, neon, organic, graphic, luxe
 
-COLOR PALETTE: Extract actual brand colors from the website content if possible. Use hex codes.
-
+""" + color_instructions + """
 PRODUCT PRESENCE: Pick exactly one of the three options listed.
 TEXT OVERLAY: Pick exactly one of the four options listed.
 
@@ -797,22 +1403,52 @@ CRITICAL: Return ONLY the JSON object. No other text before or after it."""
 Brand: {brand_name}
 Website: {url}
 Category: {category}
-{scraped_context}
-{site_context}
 
-Search the brand's website and social media to find real information. Extract actual brand colors, voice, audience, and aesthetic from what you find online. Every field should be based on real brand data, not guesses.
+{format_dossier(research) if research else "No research available — rely on the brand name and category only."}
 
 Be specific, creative, and insightful. Avoid generic filler. Every field should feel like it was written by someone who deeply understands this brand."""
 
-    result = call_llm(system, user_msg, max_tokens=3000, web_search=True)
+    with stage_deadline("auto_fill"):
+        result = call_llm(system, user_msg, max_tokens=2000, stage="auto_fill")
 
     if result.startswith("__LLM_"):
         return None
 
     parsed = _parse_json_response(result)
-    return parsed
+    if not isinstance(parsed, dict):
+        return None
+    # Research owns the identity; metadata and the measured palette own the
+    # slogan and colors. The brief call cannot overwrite either.
+    identity = research.identity() if research else {}
+    metadata_description = local.pop("brand_description", "")
+    return {
+        **parsed, **identity, **local,
+        "brand_description": parsed.get("brand_description") or metadata_description,
+        "confidence": identity.get("confidence", parsed.get("confidence", "low")),
+    }
+
 
+@traced()
+def apply_metadata_prefill(research: ResearchArtifact, state=None):
+    """Fill still-empty wizard fields from site metadata and the measured palette (no LLM involved).
 
+    ``state`` defaults to ``st.session_state``, as in ``build_brand_profile``.
+    """
+    if not research:
+        return
+    state = st.session_state if state is None else state
+    fields = research.local_fields()
+    if fields.get("brand_description") and not state["brand_description"]:
+        state["brand_description"] = fields["brand_description"]
+    for key in ("color_primary", "color_secondary", "color_accent"):
+        if fields.get(key) and state[key] == DEFAULTS[key]:
+            state[key] = fields[key]
+    scraped = load_artifact("scraped_data", state)
+    if fields.get("tagline") and scraped is not None and not scraped.get("tagline"):
+        save_artifact("scraped_data", {**scraped, "tagline": fields["tagline"]}, state)
+
+
+@traced()
 def apply_auto_fill(data: dict):
     """Apply auto-filled data to session state."""
     if not data:
@@ -823,7 +1459,7 @@ def apply_auto_fill(data: dict):
         st.session_state.brand_description = data["brand_description"]
 
     # Store scraped-style data
-    st.session_state.scraped_data = {
+    save_artifact("scraped_data", {
         "tagline": data.get("tagline", ""),
         "ethos": data.get("ethos", ""),
         "values": data.get("values", []),
@@ -833,7 +1469,7 @@ def apply_auto_fill(data: dict):
         "aesthetic_description": data.get("aesthetic_description", ""),
         "price_tier": data.get("price_tier", ""),
         "confidence": data.get("confidence", "medium"),
-    }
+    })
 
     # Audience
     if data.get("audience_lifestyle"):
@@ -887,24 +1523,48 @@ def apply_auto_fill(data: dict):
     st.session_state.scrape_attempted = True
 
 
-def generate_narrative_concepts(brand_profile: dict) -> str:
-    """Generate narrative concepts using the full system prompt."""
-    # Load the system prompt
-    system_prompt_path = os.path.join(os.path.dirname(__file__), "brand_narrative_system_prompt.md")
-    if os.path.exists(system_prompt_path):
-        with open(system_prompt_path, "r") as f:
-            system_prompt = f.read()
-    else:
-        # Fallback: use embedded core principles
-        system_prompt = """You are a world-class creative director specializing in short-form brand messaging video narratives.
+def _system_prompt(stage: str, brand_profile: dict, fallback: str) -> str:
+    """Compiled system prompt for ``stage`` (see prompt_index.py), or ``fallback`` if the file is missing."""
+    compiled = compile_system_prompt(stage, brand_profile.get("category", ""), brand_profile.get("maturity_mode", ""))
+    return compiled if compiled is not None else fallback
+
+
+def _note_prompt_size(stage: str, system_prompt: str):
+    """Keep this session's system prompt savings for the sidebar."""
+    stats = prompt_savings(system_prompt)
+    if stats:
+        st.session_state.prompt_token_stats = {**(st.session_state.get("prompt_token_stats") or {}), stage: stats}
+
+
+JSON_OUTPUT_RULES = """
+
+CRITICAL OUTPUT RULES:
+- Return ONLY a valid JSON object. No markdown code fences. No commentary before or after.
+- Do NOT wrap the response in ```json``` blocks.
+- The response must start with { and end with }
+- All string values must use double quotes and escape internal quotes properly."""
+
+
+def build_concepts_prompt(brand_profile: dict, count: int = 3, avoid: list = None,
+                          prompt_format: str = None) -> tuple[str, str]:
+    """Assemble the (system, user) prompt pair for narrative concept generation.
+
+    ``prompt_format`` ("compact" or "json") overrides ``PROMPT_FORMAT`` for the
+    embedded profile (see prompt_format.py).
+
+    ``avoid`` lists concepts already rejected or filtered as near-duplicates;
+    their premises are sent as negative examples.
+    """
+    # Fallback: use embedded core principles
+    system_prompt = _system_prompt("concepts", brand_profile, """You are a world-class creative director specializing in short-form brand messaging video narratives.
 Follow the Hook → Shift → Payoff micro-narrative structure. Start with a human truth / tension, not a brand message.
 The brand is never the hero. Content must pass the 'would someone share this without the brand?' test.
-Push past generic first ideas. Specificity beats beauty. Tension beats tone."""
+Push past generic first ideas. Specificity beats beauty. Tension beats tone.""")
 
-    user_msg = f"""Based on the following brand profile, generate exactly 3 narrative concepts for a 10-12 second brand messaging video.
+    user_msg = f"""Based on the following brand profile, generate exactly {count} narrative concept{"s" if count != 1 else ""} for a 10-12 second brand messaging video.
 
 BRAND PROFILE:
-{json.dumps(brand_profile, indent=2)}
+{format_profile(brand_profile, prompt_format)}
 
 For each concept, provide:
 1. CONCEPT TITLE — a working creative title
@@ -919,78 +1579,151 @@ Each object must have keys: title, human_truth, summary, emotional_arc, hook, ra
 
 CRITICAL: Do NOT generate generic concepts. No golden hour montages. No slow-motion smiling. No 'beautiful people doing beautiful things.' Each concept must have a specific, surprising, narratively coherent idea that could ONLY work for this brand."""
 
-    return call_llm(system_prompt, user_msg, max_tokens=3000)
+    if avoid:
+        rejected = "\n".join(
+            f"- {c.get('title', 'Untitled')}: {c.get('summary', '')}"
+            + (f" [cliché: {c['anti_generic_flags']}]" if c.get("anti_generic_flags") else "")
+            for c in avoid
+        )
+        user_msg += f"""
 
+ALREADY REJECTED — these premises have been seen and turned down. Do NOT repeat, reword, or re-skin them; find a different human truth and a different situation:
+{rejected}"""
 
-def generate_full_storyboard(brand_profile: dict, selected_concept: dict) -> str:
-    """Generate complete storyboard with keyframe and animation prompts."""
-    system_prompt_path = os.path.join(os.path.dirname(__file__), "brand_narrative_system_prompt.md")
-    if os.path.exists(system_prompt_path):
-        with open(system_prompt_path, "r") as f:
-            system_prompt = f.read()
-    else:
-        system_prompt = "You are a world-class creative director for short-form brand video."
+    return system_prompt, user_msg
 
-    # Add explicit JSON formatting instructions to the system prompt
-    system_prompt += """
 
-CRITICAL OUTPUT RULES:
-- Return ONLY a valid JSON object. No markdown code fences. No commentary before or after.
-- Do NOT wrap the response in ```json``` blocks.
-- The response must start with { and end with }
-- All string values must use double quotes and escape internal quotes properly."""
+@traced()
+@with_deadline("concepts")
+def generate_narrative_concepts(brand_profile: dict, count: int = 3, avoid: list = None) -> str:
+    """Generate narrative concepts using the full system prompt."""
+    system_prompt, user_msg = build_concepts_prompt(brand_profile, count, avoid)
+    _note_prompt_size("concepts", system_prompt)
+    return call_llm(system_prompt, user_msg, max_tokens=min(3000, 1000 * count + 200), stage="concepts")
+
 
+def build_storyboard_prompt(brand_profile: dict, selected_concept: dict, prompt_format: str = None,
+                            storyboard_format: str = None) -> tuple[str, str]:
+    """Assemble the (system, user) prompt pair for full storyboard generation."""
+    system_prompt = _system_prompt("storyboard", brand_profile, "You are a world-class creative director for short-form brand video.")
+
+    # Add explicit JSON formatting instructions to the system prompt
+    system_prompt += JSON_OUTPUT_RULES
+
+    produce, contract = response_schema(storyboard_format)
     user_msg = f"""Generate a COMPLETE storyboard for this brand and selected narrative concept.
 
 BRAND PROFILE:
-{json.dumps(brand_profile, indent=2)}
+{format_profile(brand_profile, prompt_format)}
 
 SELECTED NARRATIVE CONCEPT:
-{json.dumps(selected_concept, indent=2)}
+{format_concept(selected_concept, prompt_format)}
 
 Produce a storyboard with:
-- 5 detailed keyframes with timestamps, scene descriptions, camera, lighting, color, emotion, composition
-- A style suffix for image generation consistency
-- 5 complete image generation prompts
-- 4 animation/transition prompts
-- Anti-generic audit results
-- Creative director notes
+{produce}
 
 Return ONLY a raw JSON object (no markdown, no code fences, no preamble) with these keys:
-{{
-  "style_suffix": "persistent style string for all keyframes",
-  "keyframes": [
-    {{
-      "timestamp": "0s",
-      "narrative_beat": "HOOK",
-      "scene_description": "...",
-      "camera": "...",
-      "lighting": "...",
-      "color_palette": "...",
-      "emotion": "...",
-      "text_overlay": "none",
-      "product_presence": "...",
-      "composition_notes": "..."
-    }}
-  ],
-  "image_prompts": ["prompt 1", "prompt 2", "prompt 3", "prompt 4", "prompt 5"],
-  "animation_prompts": [
-    {{
-      "transition": "1→2",
-      "motion_type": "...",
-      "camera_motion": "...",
-      "subject_motion": "...",
-      "pacing": "...",
-      "visual_transition": "...",
-      "emotional_trajectory": "...",
-      "audio_cue": "..."
-    }}
-  ],
-  "anti_generic_audit": {{"all_passed": true, "notes": "..."}},
-  "creative_director_notes": "..."
-}}"""
-
-    return call_llm(system_prompt, user_msg, max_tokens=8000)
+{contract}"""
+
+    return system_prompt, user_msg
+
+
+def parse_storyboard(text: str):
+    """Parse a storyboard response (lean or full wire format) into the export shape."""
+    return expand_storyboard(_parse_json_response(text))
+
+
+@traced()
+@with_deadline("storyboard")
+def generate_full_storyboard(brand_profile: dict, selected_concept: dict) -> str:
+    """Generate complete storyboard with keyframe and animation prompts."""
+    system_prompt, user_msg = build_storyboard_prompt(brand_profile, selected_concept)
+    _note_prompt_size("storyboard", system_prompt)
+    return call_llm(system_prompt, user_msg, max_tokens=8000, stage="storyboard")
+
+
+@traced()
+def screen_storyboard(storyboard: dict, brand_name: str) -> dict:
+    """Run the local anti-generic screen over every keyframe; returns {position: reasons} for failures."""
+    prompts = storyboard.get("image_prompts") or []
+    failing = {}
+    for i, kf in enumerate(storyboard.get("keyframes") or []):
+        if not isinstance(kf, dict):
+            continue
+        hits = screen_keyframe(kf, i + 1, brand_name, prompts[i] if i < len(prompts) and isinstance(prompts[i], str) else "")
+        if fails(hits):
+            failing[i + 1] = describe(hits)
+    return failing
+
+
+def build_keyframe_repair_prompt(brand_profile: dict, selected_concept: dict, storyboard: dict, failing: dict,
+                                 prompt_format: str = None, storyboard_format: str = None) -> tuple[str, str]:
+    """Assemble the (system, user) prompt pair that rewrites only the flagged keyframes."""
+    system_prompt = _system_prompt("keyframe_repair", brand_profile, "You are a world-class creative director for short-form brand video.")
+    system_prompt += JSON_OUTPUT_RULES
+    positions = ", ".join(str(p) for p in sorted(failing))
+    reasons = "\n".join(f"- Keyframe {p}: {reason}" for p, reason in sorted(failing.items()))
+    prompt_rule, contract = repair_schema(storyboard_format)
+    current = {"style_suffix": storyboard.get("style_suffix", ""),
+               "keyframes": wire_keyframes(storyboard.get("keyframes", []), storyboard_format)}
+    user_msg = f"""REWRITE ONLY KEYFRAMES {positions} of the storyboard below. They tripped the ANTI-GENERIC FILTER:
+{reasons}
+
+KEYFRAMES TO REWRITE: {positions}
+
+Keep each keyframe's timestamp and narrative beat, keep subject and environment continuity with the untouched keyframes, and {prompt_rule}.
+
+SELECTED NARRATIVE CONCEPT:
+{format_concept(selected_concept, prompt_format)}
+
+CURRENT STORYBOARD:
+{format_json(current, prompt_format)}
+
+Return ONLY a raw JSON object (no markdown, no code fences, no preamble):
+{contract}"""
+    return system_prompt, user_msg
+
+
+@traced()
+@with_deadline("keyframe_repair")
+def repair_storyboard_keyframes(brand_profile: dict, selected_concept: dict, storyboard: dict, failing: dict) -> list[int]:
+    """Regenerate only the flagged keyframes in place; returns the positions that were replaced."""
+    system_prompt, user_msg = build_keyframe_repair_prompt(brand_profile, selected_concept, storyboard, failing)
+    _note_prompt_size("keyframe_repair", system_prompt)
+    result = call_llm(system_prompt, user_msg, max_tokens=min(8000, 1200 * len(failing)), stage="keyframe_repair")
+    return apply_keyframe_repair(storyboard, failing, result)
+
+
+def apply_keyframe_repair(storyboard: dict, failing: dict, result: str) -> list[int]:
+    """Splice a keyframe-repair response into the storyboard; returns the positions that were replaced.
+
+    Shared by the interactive path and the HTTP service (narrative_service.py).
+    """
+    if result.startswith("__LLM_"):
+        return []
+    parsed = _parse_json_response(result)
+    if not isinstance(parsed, dict):
+        return []
+
+    keyframes = storyboard.get("keyframes") or []
+    prompts = storyboard.get("image_prompts") or []
+    new_prompts = parsed.get("image_prompts") or {}
+    replaced = []
+    for kf in parsed.get("keyframes") or []:
+        if not isinstance(kf, dict):
+            continue
+        try:
+            position = int(kf.pop("position"))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if position not in failing or position > len(keyframes):
+            continue
+        kf = keyframes[position - 1] = expand_keyframe(kf)
+        prompt = new_prompts.get(str(position)) if isinstance(new_prompts, dict) else None
+        if position <= len(prompts):
+            prompts[position - 1] = prompt or image_prompt(kf, storyboard.get("style_suffix", ""))
+        replaced.append(position)
+    return replaced
 
 
 # ---------------------------------------------------------------------------
@@ -1063,6 +1796,31 @@ def nav_buttons(back=True, next_label="Continue", next_disabled=False):
                 st.rerun()
 
 
+@contextlib.contextmanager
+def cancellable(label: str, key: str):
+    """Show a Cancel button and a live elapsed-time caption while the block's LLM calls wait.
+
+    Any click (Cancel, Back, another step) makes Streamlit request a rerun; the
+    next caption update raises it and the bridge cancels the in-flight request
+    (see deadlines.py). Use ``cancel_requested(key)`` on the following run.
+    """
+    st.button("✕ Cancel", key=key)
+    status = st.empty()
+
+    def tick(elapsed: float, deadline):
+        left = f" · {deadline.remaining():.0f}s left of {deadline.seconds:.0f}s" if deadline else ""
+        status.caption(f"{label} — {elapsed:.0f}s{left}")
+
+    with wait_hook(tick):
+        yield
+    status.empty()
+
+
+def cancel_requested(key: str) -> bool:
+    """True on the run triggered by the ``cancellable`` Cancel button ``key``."""
+    return bool(st.session_state.get(key))
+
+
 # ---------------------------------------------------------------------------
 # CATEGORIES
 # ---------------------------------------------------------------------------
@@ -1108,6 +1866,7 @@ TEXT_OVERLAY_OPTIONS = [
 # ===========================================================================
 # STEP 1: BRAND IDENTITY
 # ===========================================================================
+@traced()
 def step_brand_identity():
     render_step_header(1, "Who's the brand?", "Start with the basics. If the brand has a web presence, we can auto-fill everything.")
 
@@ -1145,8 +1904,11 @@ def step_brand_identity():
         col1, col2 = st.columns(2)
         with col1:
             # Full auto-fill: research + fill all fields + jump to review
+            if cancel_requested("cancel_autofill"):
+                st.caption("Auto-fill cancelled.")
             if st.button("🚀 Research & Auto-Fill Everything", key="autofill_btn", use_container_width=True):
-                with st.spinner("Researching brand and filling all fields... (this may take 30-60 seconds)"):
+                with st.spinner("Researching brand and filling all fields... (this may take 30-60 seconds)"), \
+                        cancellable("Researching and filling", "cancel_autofill"):
                     try:
                         data = auto_fill_all_fields(
                             st.session_state.brand_name,
@@ -1169,24 +1931,27 @@ def step_brand_identity():
         with col2:
             # Research only: just populate scraped_data, stay on page
             if not st.session_state.scrape_attempted:
+                if cancel_requested("cancel_research"):
+                    st.caption("Research cancelled.")
                 if st.button("🔍 Research only (manual fill)", key="scrape_btn", use_container_width=True):
-                    with st.spinner("Researching brand..."):
+                    with st.spinner("Researching brand..."), cancellable("Researching", "cancel_research"):
                         try:
                             data = scrape_brand_info(
                                 st.session_state.brand_name,
                                 st.session_state.brand_url,
                                 st.session_state.brand_category,
                             )
-                            st.session_state.scraped_data = data
+                            save_artifact("scraped_data", data)
+                            apply_metadata_prefill(session_research())
                         except Exception as e:
                             st.error(f"Research failed: {e}")
-                            st.session_state.scraped_data = None
+                            save_artifact("scraped_data", None)
                         st.session_state.scrape_attempted = True
                         st.rerun()
 
         # Show scraped data preview if available
-        if st.session_state.scraped_data:
-            d = st.session_state.scraped_data
+        d = load_artifact("scraped_data")
+        if d:
             confidence = d.get("confidence", "unknown")
             conf_color = {"high": "#4a9", "medium": "#c93", "low": "#c55"}.get(confidence, "#888")
 
@@ -1215,6 +1980,37 @@ def step_brand_identity():
             </div>
             """, unsafe_allow_html=True)
 
+            research = session_research()
+            if research and research.cache:
+                unchanged = " · site unchanged" if research.cache["status"] == "revalidated" else ""
+                age_h = research.cache["age_s"] / 3600
+                age = f"{age_h:.0f}h" if age_h >= 1 else f"{research.cache['age_s'] / 60:.0f}m"
+                cache_col, refresh_col = st.columns([4, 1])
+                with cache_col:
+                    st.caption(f"Cached research from {age} ago{unchanged} · no research call made · {len(research.sources)} source(s)")
+                with refresh_col:
+                    refresh = st.button("↻ Refresh", key="refresh_research", use_container_width=True)
+                if refresh:
+                    with st.spinner("Researching brand..."), cancellable("Researching", "cancel_refresh"):
+                        try:
+                            data = scrape_brand_info(
+                                st.session_state.brand_name,
+                                st.session_state.brand_url,
+                                st.session_state.brand_category,
+                                refresh=True,
+                            )
+                            if data:
+                                save_artifact("scraped_data", data)
+                                apply_metadata_prefill(session_research())
+                        except Exception as e:
+                            st.error(f"Research failed: {e}")
+                    st.rerun()
+            elif research and research.search:
+                decision = research.search
+                mode = "skipped" if not decision["web_search"] else f"{decision['max_uses']} rounds max"
+                saved = f" · ~{decision['est_latency_saved_s']:.0f}s saved" if decision["est_latency_saved_s"] else ""
+                st.caption(f"Web search {mode} — evidence score {decision['score']:.2f}{saved} · research took {research.duration_s:.1f}s")
+
             if st.session_state.auto_filled:
                 st.markdown('<div class="info-box">✓ All fields auto-filled. Review everything on the next page.</div>', unsafe_allow_html=True)
             else:
@@ -1230,13 +2026,15 @@ def step_brand_identity():
 # ===========================================================================
 # STEP 2: AUDIENCE
 # ===========================================================================
+@traced()
 def step_audience():
     render_step_header(2, "Who are you talking to?", "Not demographics — psychographics. Help us understand the human on the other side.")
 
     # Pre-fill from scraped data if available
     default_lifestyle = st.session_state.audience_lifestyle
-    if not default_lifestyle and st.session_state.scraped_data:
-        default_lifestyle = st.session_state.scraped_data.get("audience_description", "")
+    scraped = load_artifact("scraped_data")
+    if not default_lifestyle and scraped:
+        default_lifestyle = scraped.get("audience_description", "")
 
     st.session_state.audience_lifestyle = st.text_area(
         "Describe your ideal customer's lifestyle in a sentence or two",
@@ -1265,6 +2063,7 @@ def step_audience():
 # ===========================================================================
 # STEP 3: BRAND PERSONALITY (Spectrum Sliders)
 # ===========================================================================
+@traced()
 def step_personality():
     render_step_header(3, "Brand personality", "Position your brand on each spectrum. Don't overthink it — go with your gut.")
 
@@ -1300,6 +2099,7 @@ def step_personality():
 # ===========================================================================
 # STEP 4: EMOTIONAL TERRITORY
 # ===========================================================================
+@traced()
 def step_emotion():
     render_step_header(4, "Emotional territory", "The feelings your brand owns — and the ones it rejects.")
 
@@ -1332,6 +2132,7 @@ def step_emotion():
 # ===========================================================================
 # STEP 5: VISUAL DIRECTION
 # ===========================================================================
+@traced()
 def step_visual():
     render_step_header(5, "Visual direction", "Pick 2-4 visual styles that feel like your brand. Then set your palette.")
 
@@ -1410,8 +2211,14 @@ def step_visual():
 # ===========================================================================
 # STEP 6: REVIEW
 # ===========================================================================
-def build_brand_profile() -> dict:
-    """Assemble the complete brand profile from all session state."""
+@traced()
+def build_brand_profile(state=None) -> dict:
+    """Assemble the complete brand profile from all session state.
+
+    ``state`` may be any mapping with the session-state keys (e.g. a plain dict
+    of wizard answers); it defaults to ``st.session_state``.
+    """
+    state = st.session_state if state is None else state
     # Interpret personality sliders
     def interpret_slider(val, low_label, high_label):
         if val < 30:
@@ -1426,28 +2233,28 @@ def build_brand_profile() -> dict:
             return f"Strongly {high_label}"
 
     personality = {
-        "exclusive_vs_accessible": interpret_slider(st.session_state.personality_exclusive_accessible, "Exclusive", "Accessible"),
-        "serious_vs_playful": interpret_slider(st.session_state.personality_serious_playful, "Serious", "Playful"),
-        "minimal_vs_expressive": interpret_slider(st.session_state.personality_minimal_expressive, "Minimal", "Expressive"),
-        "classic_vs_trendy": interpret_slider(st.session_state.personality_classic_trendy, "Classic", "Trendy"),
-        "loud_vs_quiet": interpret_slider(st.session_state.personality_loud_quiet, "Loud", "Quiet"),
-        "luxury_vs_everyday": interpret_slider(st.session_state.personality_luxury_everyday, "Luxury", "Everyday"),
+        "exclusive_vs_accessible": interpret_slider(state["personality_exclusive_accessible"], "Exclusive", "Accessible"),
+        "serious_vs_playful": interpret_slider(state["personality_serious_playful"], "Serious", "Playful"),
+        "minimal_vs_expressive": interpret_slider(state["personality_minimal_expressive"], "Minimal", "Expressive"),
+        "classic_vs_trendy": interpret_slider(state["personality_classic_trendy"], "Classic", "Trendy"),
+        "loud_vs_quiet": interpret_slider(state["personality_loud_quiet"], "Loud", "Quiet"),
+        "luxury_vs_everyday": interpret_slider(state["personality_luxury_everyday"], "Luxury", "Everyday"),
     }
 
     # Determine maturity mode
-    scraped = st.session_state.scraped_data
+    scraped = load_artifact("scraped_data", state)
     data_density_score = 0
     if scraped and scraped.get("confidence") == "high":
         data_density_score += 3
     elif scraped and scraped.get("confidence") == "medium":
         data_density_score += 2
-    if st.session_state.brand_description:
+    if state["brand_description"]:
         data_density_score += 1
-    if st.session_state.audience_lifestyle:
+    if state["audience_lifestyle"]:
         data_density_score += 1
-    if st.session_state.emotion_feel_after:
+    if state["emotion_feel_after"]:
         data_density_score += 1
-    if st.session_state.visual_selections:
+    if state["visual_selections"]:
         data_density_score += 1
 
     if data_density_score >= 6:
@@ -1457,13 +2264,13 @@ def build_brand_profile() -> dict:
     else:
         maturity = "DISCOVERY"
 
-    visual_style_labels = [s["label"] for s in VISUAL_STYLES if s["id"] in st.session_state.visual_selections]
+    visual_style_labels = [s["label"] for s in VISUAL_STYLES if s["id"] in state["visual_selections"]]
 
     profile = {
-        "brand_name": st.session_state.brand_name,
-        "website": st.session_state.brand_url,
-        "category": st.session_state.brand_category,
-        "description": st.session_state.brand_description,
+        "brand_name": state["brand_name"],
+        "website": state["brand_url"],
+        "category": state["brand_category"],
+        "description": state["brand_description"],
         "maturity_mode": maturity,
         "identity": {
             "tagline": scraped.get("tagline", "") if scraped else "",
@@ -1474,28 +2281,28 @@ def build_brand_profile() -> dict:
             "price_tier": scraped.get("price_tier", "") if scraped else "",
         },
         "audience": {
-            "lifestyle": st.session_state.audience_lifestyle,
-            "adjacent_brands": st.session_state.audience_brands,
-            "primary_platform": st.session_state.audience_platform,
+            "lifestyle": state["audience_lifestyle"],
+            "adjacent_brands": state["audience_brands"],
+            "primary_platform": state["audience_platform"],
         },
         "personality": personality,
         "emotional_direction": {
-            "desired_feeling": st.session_state.emotion_feel_after,
-            "rejected_feeling": st.session_state.emotion_reject,
-            "movie_scene": st.session_state.emotion_movie_scene,
+            "desired_feeling": state["emotion_feel_after"],
+            "rejected_feeling": state["emotion_reject"],
+            "movie_scene": state["emotion_movie_scene"],
         },
         "visual_direction": {
             "styles": visual_style_labels,
             "color_palette": {
-                "primary": st.session_state.color_primary,
-                "secondary": st.session_state.color_secondary,
-                "accent": st.session_state.color_accent,
+                "primary": state["color_primary"],
+                "secondary": state["color_secondary"],
+                "accent": state["color_accent"],
             },
         },
         "production": {
-            "product_presence": st.session_state.product_in_frame,
-            "text_overlay": st.session_state.text_overlay_pref,
-            "audio_direction": st.session_state.audio_direction,
+            "product_presence": state["product_in_frame"],
+            "text_overlay": state["text_overlay_pref"],
+            "audio_direction": state["audio_direction"],
             "duration": "10-12 seconds",
             "keyframes": 5,
         },
@@ -1504,11 +2311,16 @@ def build_brand_profile() -> dict:
     return profile
 
 
+@traced()
 def step_review():
     render_step_header(6, "Review your brand profile", "This is what we'll feed to the narrative engine. Click Edit on any section to refine it.")
 
     profile = build_brand_profile()
-    st.session_state.brand_profile_json = profile
+    digest = hashlib.sha256(json.dumps(profile, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    if digest != st.session_state.brand_profile_digest or st.session_state.brand_profile_json is None:
+        save_artifact("brand_profile_json", profile)
+        st.session_state.brand_profile_digest = digest
+    st.session_state.concepts_cancelled = False
 
     # Maturity badge
     mode = profile["maturity_mode"]
@@ -1573,10 +2385,10 @@ def step_review():
                 st.session_state.return_to_review = True
                 st.session_state.current_step = edit_step
                 # Clear generated content since profile is being modified
-                st.session_state.generated_narratives = None
+                save_artifact("generated_narratives", None)
                 st.session_state.selected_narrative = None
-                st.session_state.generated_storyboard = None
-                st.session_state.brand_profile_json = None
+                save_artifact("generated_storyboard", None)
+                save_artifact("brand_profile_json", None)
                 st.rerun()
             st.markdown('</div>', unsafe_allow_html=True)
 
@@ -1607,13 +2419,127 @@ def step_review():
 # ===========================================================================
 # STEP 7: GENERATE & SELECT
 # ===========================================================================
+CONCEPTS_PER_BATCH = 3
+CONCEPT_TOPUP_ROUNDS = 3  # initial request + re-requests for slots lost to near-duplicates
+
+
+def _concept_index(brand_name: str) -> ConceptIndex:
+    """Per-brand near-duplicate index, kept for the whole session."""
+    if st.session_state.concept_indexes is None:
+        st.session_state.concept_indexes = {}
+    key = brand_name.strip().lower()
+    if key not in st.session_state.concept_indexes:
+        st.session_state.concept_indexes[key] = ConceptIndex()
+    return st.session_state.concept_indexes[key]
+
+
+class GenerationFailed(Exception):
+    """A generation stage produced nothing usable; ``raw`` holds the response text when there was one."""
+
+    def __init__(self, message: str, raw: str = ""):
+        super().__init__(message)
+        self.raw = raw
+
+
+def generate_concepts(profile: dict, count: int, avoid: list, index: ConceptIndex, call,
+                      rounds: int = CONCEPT_TOPUP_ROUNDS) -> tuple[list[dict], dict]:
+    """Concepts for a brand, with top-up rounds for the slots lost to near-duplicates and clichés.
+
+    ``call(needed, avoid)`` returns the raw LLM text for one request. Near-duplicates
+    of anything in ``index`` are dropped and only the missing slots are re-requested,
+    with the losers as negative examples. Shared by step 7, the HTTP service
+    (narrative_service.py) and batch runs (batch_runs.py).
+
+    Returns ``(concepts, {"duplicates": n, "cliches": n})``. Raises ``GenerationFailed``
+    if the first round yields nothing usable.
+    """
+    concepts, duplicates, cliched = [], [], []
+    for _ in range(rounds):
+        needed = count - len(concepts)
+        result = call(needed, avoid + index.avoid_examples() + duplicates + cliched)
+        parsed, raw = None, result
+        if result.startswith("__LLM_"):
+            error, raw = f"LLM integration issue: {result}", ""
+        else:
+            error = "Could not parse narrative concepts"
+            try:
+                parsed = _parse_json_response(result)
+            except Exception as e:
+                error = f"JSON parsing failed: {e}"
+        if isinstance(parsed, dict):
+            parsed = [parsed]
+        if not isinstance(parsed, list):
+            if concepts:
+                break
+            raise GenerationFailed(error, raw)
+
+        fresh, repeats = index.partition(parsed[:needed])
+        duplicates.extend(repeats)
+        # Local anti-generic screen: clichéd concepts lose their slot too
+        for concept in fresh:
+            hits = screen_concept(concept)
+            if fails(hits):
+                cliched.append({**concept, "anti_generic_flags": describe(hits)})
+            else:
+                concepts.append(concept)
+        if len(concepts) >= count:
+            break
+
+    # Out of rounds: fill remaining slots with flagged concepts (shown with their flags),
+    # and if nothing new came back at all, return the repeats rather than nothing
+    concepts.extend(cliched[: count - len(concepts)])
+    filtered = {"duplicates": len(duplicates) if concepts else 0, "cliches": len(cliched)}
+    return concepts or duplicates[:count], filtered
+
+
+def screen_and_repair_storyboard(storyboard: dict, brand_name: str, repair=None) -> dict:
+    """Run the local anti-generic screen over a parsed storyboard and record it in ``anti_generic_audit``.
+
+    ``repair(failing)`` rewrites the failing keyframes in place and returns the
+    positions it replaced; the storyboard is screened again afterwards. Without
+    it the storyboard is only screened. Shared like ``generate_concepts``.
+    """
+    failing = screen_storyboard(storyboard, brand_name)
+    replaced = []
+    if failing and repair is not None:
+        replaced = repair(failing)
+        failing = screen_storyboard(storyboard, brand_name)
+    audit = storyboard.get("anti_generic_audit")
+    if not isinstance(audit, dict):
+        audit = storyboard["anti_generic_audit"] = {}
+    audit["local_screen"] = {
+        "passed": not failing,
+        "regenerated_keyframes": replaced,
+        "flagged_keyframes": {str(p): reason for p, reason in failing.items()},
+    }
+    return storyboard
+
+
+@traced()
 def step_generate():
     render_step_header(7, "Narrative concepts", "The creative engine has produced concepts based on your brand profile. Pick the one that resonates.")
 
-    profile = st.session_state.brand_profile_json or build_brand_profile()
+    profile = load_artifact("brand_profile_json") or build_brand_profile()
 
     # --- Generate concepts if not yet generated ---
-    if st.session_state.generated_narratives is None:
+    narratives = load_artifact("generated_narratives")
+    if narratives is None and (cancel_requested("cancel_concepts") or st.session_state.concepts_cancelled):
+        st.session_state.concepts_cancelled = True
+        st.markdown('<div class="info-box">Concept generation was cancelled.</div>', unsafe_allow_html=True)
+        retry_col, back_col, _ = st.columns([1, 1, 3])
+        with retry_col:
+            if st.button("✨ Generate concepts", key="retry_concepts", use_container_width=True):
+                st.session_state.concepts_cancelled = False
+                st.rerun()
+        with back_col:
+            st.markdown('<div class="back-btn">', unsafe_allow_html=True)
+            if st.button("← Back to Review", key="cancelled_to_review", use_container_width=True):
+                st.session_state.current_step = 6
+                st.rerun()
+            st.markdown('</div>', unsafe_allow_html=True)
+        st.stop()
+
+    if narratives is None:
         st.markdown("""
         <div class="generating">
             <div class="generating-text">GENERATING NARRATIVE CONCEPTS...</div>
@@ -1621,36 +2547,30 @@ def step_generate():
         </div>
         """, unsafe_allow_html=True)
 
-        try:
-            result = generate_narrative_concepts(profile)
-        except Exception as e:
-            st.error(f"LLM call failed: {e}")
-            st.stop()
+        def call(needed: int, avoid: list) -> str:
+            with cancellable("Generating concepts", "cancel_concepts"):
+                return generate_narrative_concepts(profile, count=needed, avoid=avoid)
 
-        if result.startswith("__LLM_"):
-            st.error(f"LLM integration issue: {result}")
-            st.stop()
-
-        # Parse the JSON response
         try:
-            parsed = _parse_json_response(result)
-            if isinstance(parsed, list):
-                st.session_state.generated_narratives = parsed
-            elif isinstance(parsed, dict):
-                st.session_state.generated_narratives = [parsed]
-            else:
-                st.error("Could not parse narrative concepts. Raw response:")
-                st.code(result[:2000], language=None)
-                st.stop()
+            concepts, filtered = generate_concepts(profile, CONCEPTS_PER_BATCH, [],
+                                                   _concept_index(profile["brand_name"]), call)
+        except GenerationFailed as e:
+            st.error(str(e))
+            if e.raw:
+                st.code(e.raw[:2000], language=None)
+            st.stop()
         except Exception as e:
-            st.error(f"JSON parsing failed: {e}")
-            st.code(result[:2000], language=None)
+            st.error(f"LLM call failed: {e}")
             st.stop()
-
+        save_artifact("generated_narratives", concepts)
+        st.session_state.concepts_filtered = filtered
         st.rerun()
 
     # --- Display concepts ---
-    narratives = st.session_state.generated_narratives
+
+    filtered = st.session_state.concepts_filtered or {}
+    if filtered.get("duplicates") or filtered.get("cliches"):
+        st.markdown(f'<div class="info-box">Filtered {filtered.get("duplicates", 0)} near-duplicate(s) of concepts you\'ve already seen and {filtered.get("cliches", 0)} cliché(s) caught by the anti-generic screen — only the missing slots were re-requested.</div>', unsafe_allow_html=True)
 
     if isinstance(narratives, list) and len(narratives) > 0:
         for i, concept in enumerate(narratives):
@@ -1664,6 +2584,8 @@ def step_generate():
             arc = concept.get("emotional_arc", "")
             hook = concept.get("hook", "")
             rationale = concept.get("rationale", "")
+            flags = concept.get("anti_generic_flags", "")
+            flag_html = f'<div style="margin-top:12px; font-size:0.7rem; color:#c93;">⚠ Anti-generic flags: {flags}</div>' if flags else ""
 
             st.markdown(f"""
             <div style="background:{bg}; border:1px solid {border}; border-radius:16px; padding:24px; margin-bottom:16px;">
@@ -1687,6 +2609,7 @@ def step_generate():
                     <span style="font-family:'Space Mono',monospace; font-size:0.6rem; color:#444; text-transform:uppercase;">WHY IT WORKS</span>
                     <div style="font-size:0.8rem; color:#666; margin-top:2px; line-height:1.4;">{rationale}</div>
                 </div>
+                {flag_html}
             </div>
             """, unsafe_allow_html=True)
 
@@ -1710,7 +2633,8 @@ def step_generate():
         with regen_col2:
             st.markdown('<div class="back-btn">', unsafe_allow_html=True)
             if st.button("🔄 Regenerate Concepts", key="regen", use_container_width=True):
-                st.session_state.generated_narratives = None
+                _concept_index(profile["brand_name"]).reject(narratives)
+                save_artifact("generated_narratives", None)
                 st.session_state.selected_narrative = None
                 st.rerun()
             st.markdown('</div>', unsafe_allow_html=True)
@@ -1725,12 +2649,16 @@ def step_generate():
                 st.error("Selected concept not found. Try selecting again.")
                 selected = None
 
-            if selected and st.session_state.generated_storyboard is None:
+            storyboard = load_artifact("generated_storyboard")
+            if selected and storyboard is None:
+                if cancel_requested("cancel_storyboard") or cancel_requested("cancel_repair"):
+                    st.caption("Storyboard generation cancelled.")
                 if st.button("🎬 Generate Full Storyboard & Prompts", key="gen_storyboard", use_container_width=True):
                     # Step 1: Call LLM
                     with st.spinner("Generating storyboard (this may take 30-60 seconds)..."):
                         try:
-                            sb_result = generate_full_storyboard(profile, selected)
+                            with cancellable("Generating storyboard", "cancel_storyboard"):
+                                sb_result = generate_full_storyboard(profile, selected)
                         except Exception as e:
                             st.error(f"LLM call failed: {e}")
                             st.stop()
@@ -1742,21 +2670,30 @@ def step_generate():
 
                     # Step 3: Parse JSON
                     try:
-                        parsed = _parse_json_response(sb_result)
-                        if parsed:
-                            st.session_state.generated_storyboard = parsed
+                        parsed = parse_storyboard(sb_result)
+                        if isinstance(parsed, dict) and parsed.get("keyframes"):
+                            # Local anti-generic screen; rewrite only the keyframes that fail
+                            def repair(failing: dict) -> list[int]:
+                                with st.spinner(f"Rewriting {len(failing)} clichéd keyframe(s)..."), \
+                                        cancellable("Rewriting keyframes", "cancel_repair"):
+                                    return repair_storyboard_keyframes(profile, selected, parsed, failing)
+
+                            save_artifact("generated_storyboard",
+                                          screen_and_repair_storyboard(parsed, profile["brand_name"], repair))
+                        elif parsed:
+                            save_artifact("generated_storyboard", parsed)
                         else:
                             # JSON parse failed — show raw response so user can see what happened
-                            st.session_state.generated_storyboard = {"raw": sb_result}
+                            save_artifact("generated_storyboard", {"raw": sb_result})
                     except Exception as e:
                         st.error(f"JSON parsing failed: {e}")
-                        st.session_state.generated_storyboard = {"raw": sb_result}
+                        save_artifact("generated_storyboard", {"raw": sb_result})
 
                     st.rerun()
 
             # Display storyboard
-            if st.session_state.generated_storyboard:
-                sb = st.session_state.generated_storyboard
+            if storyboard:
+                sb = storyboard
 
                 st.markdown(f"""
                 <div style="margin-top:1rem; margin-bottom:1.5rem;">
@@ -1780,9 +2717,12 @@ def step_generate():
                             </div>
                             """, unsafe_allow_html=True)
 
-                        for kf in sb.get("keyframes", []):
+                        local_flags = (sb.get("anti_generic_audit") or {}).get("local_screen", {}).get("flagged_keyframes", {})
+                        for kf_idx, kf in enumerate(sb.get("keyframes", [])):
                             ts = kf.get("timestamp", "")
                             beat = kf.get("narrative_beat", "")
+                            kf_flags = local_flags.get(str(kf_idx + 1), "")
+                            kf_flag_html = f'<div style="margin-top:10px; font-size:0.7rem; color:#c93;">⚠ Anti-generic flags: {kf_flags}</div>' if kf_flags else ""
                             st.markdown(f"""
                             <div style="background:#111; border:1px solid #1a1a1a; border-radius:12px; padding:20px; margin-bottom:12px;">
                                 <div style="display:flex; justify-content:space-between; margin-bottom:10px;">
@@ -1796,6 +2736,7 @@ def step_generate():
                                     <div><span style="color:#555;">Emotion:</span> <span style="color:#888;">{kf.get('emotion', '')}</span></div>
                                     <div><span style="color:#555;">Product:</span> <span style="color:#888;">{kf.get('product_presence', '')}</span></div>
                                 </div>
+                                {kf_flag_html}
                             </div>
                             """, unsafe_allow_html=True)
 
@@ -1842,6 +2783,24 @@ def step_generate():
                             mime="application/json",
                         )
 
+                        # Local hand-off to the image → animation stage
+                        if st.button("▶️ Run Pipeline Locally (placeholder backend)", key="run_pipeline"):
+                            # Slugged so a free-text brand name cannot escape pipeline_output/
+                            slug = re.sub(r"[^a-z0-9]+", "-", profile["brand_name"].lower()).strip("-")[:40] or "brand"
+                            out_dir = os.path.join("pipeline_output", slug)
+                            with st.spinner("Rendering keyframes and transitions..."):
+                                try:
+                                    result = run_pipeline(export, PlaceholderBackend(), out_dir)
+                                except ValueError as e:
+                                    st.error(f"Pipeline could not start: {e}")
+                                    result = None
+                            if result is not None:
+                                summary = result.summary()
+                                if result.succeeded:
+                                    st.success(f"Pipeline complete → {out_dir} (wall {summary['wall_time_s']}s, critical path {summary['critical_path_s']}s)")
+                                else:
+                                    st.warning(f"Pipeline finished with errors — re-run to resume. {summary['status_counts']}")
+
                 # Director notes and audit
                 if sb.get("creative_director_notes"):
                     st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
@@ -1856,7 +2815,7 @@ def step_generate():
                 st.markdown('<hr class="custom-divider">', unsafe_allow_html=True)
                 st.markdown('<div class="back-btn">', unsafe_allow_html=True)
                 if st.button("🔄 Regenerate Storyboard", key="regen_storyboard", use_container_width=False):
-                    st.session_state.generated_storyboard = None
+                    save_artifact("generated_storyboard", None)
                     st.rerun()
                 st.markdown('</div>', unsafe_allow_html=True)
 
@@ -1864,6 +2823,7 @@ def step_generate():
 # ===========================================================================
 # SIDEBAR: API SETTINGS
 # ===========================================================================
+@traced()
 def render_sidebar():
     """Render the API configuration sidebar."""
     with st.sidebar:
@@ -1888,6 +2848,7 @@ def render_sidebar():
         if provider != st.session_state.llm_provider:
             st.session_state.llm_provider = provider
             st.session_state.llm_model = LLM_PROVIDERS[provider]["models"][0][1]
+            st.session_state.stage_routes = None
             st.session_state.api_key = ""
             st.session_state.api_key_set = False
             st.rerun()
@@ -1914,29 +2875,35 @@ def render_sidebar():
         if selected_model_id != st.session_state.llm_model:
             st.session_state.llm_model = selected_model_id
 
-        # API Key
-        st.markdown(f"""
-        <div style="margin-top:1rem; margin-bottom:0.5rem;">
-            <span style="font-size:0.75rem; color:#666;">
-                Get your key → <a href="{provider_config['docs_url']}" target="_blank" style="color:#888;">{provider}</a>
-            </span>
-        </div>
-        """, unsafe_allow_html=True)
+        render_stage_routes(provider, model_labels, model_ids)
 
-        api_key_input = st.text_input(
-            "API Key",
-            value=st.session_state.api_key,
-            type="password",
-            placeholder=provider_config["key_placeholder"],
-            key="sidebar_api_key",
-        )
+        # API Key (the offline Fake provider needs none)
+        requires_key = provider_config.get("requires_key", True)
+        if requires_key:
+            st.markdown(f"""
+            <div style="margin-top:1rem; margin-bottom:0.5rem;">
+                <span style="font-size:0.75rem; color:#666;">
+                    Get your key → <a href="{provider_config['docs_url']}" target="_blank" style="color:#888;">{provider}</a>
+                </span>
+            </div>
+            """, unsafe_allow_html=True)
 
-        if api_key_input != st.session_state.api_key:
-            st.session_state.api_key = api_key_input
-            st.session_state.api_key_set = bool(api_key_input)
+            api_key_input = st.text_input(
+                "API Key",
+                value=st.session_state.api_key,
+                type="password",
+                placeholder=provider_config["key_placeholder"],
+                key="sidebar_api_key",
+            )
+
+            if api_key_input != st.session_state.api_key:
+                st.session_state.api_key = api_key_input
+                st.session_state.api_key_set = bool(api_key_input)
+        else:
+            st.markdown('<div style="font-size:0.75rem; color:#666; margin-top:1rem;">Offline deterministic provider — tune with <code>FAKE_LLM_*</code> env vars.</div>', unsafe_allow_html=True)
 
         # Status indicator
-        if st.session_state.api_key_set:
+        if st.session_state.api_key_set or not requires_key:
             st.markdown(f"""
             <div style="display:flex; align-items:center; gap:8px; margin-top:12px; padding:8px 12px; 
                  background:#0d1a0d; border:1px solid #1a331a; border-radius:6px;">
@@ -1953,6 +2920,50 @@ def render_sidebar():
             </div>
             """, unsafe_allow_html=True)
 
+        # Record/replay status
+        cassette = get_active_cassette()
+        if cassette:
+            report = cassette.report()
+            miss_color = "#c55" if report["misses"] else "#666"
+            st.markdown(f"""
+            <div style="margin-top:12px; padding:8px 12px; background:#111; border:1px solid #222; border-radius:6px; font-size:0.7rem; color:#888;">
+                <span style="font-family:'Space Mono',monospace; text-transform:uppercase;">Cassette · {report["mode"]}</span><br>
+                {report["recorded"]} recorded · {report["hits"]} replayed · <span style="color:{miss_color};">{report["misses"]} mismatches</span>
+            </div>
+            """, unsafe_allow_html=True)
+
+        # System prompt size per stage (this session's last call)
+        prompt_stats = st.session_state.prompt_token_stats
+        if prompt_stats:
+            rows = "<br>".join(
+                f'{stage.replace("_", " ")} · ~{stats["compiled_tokens"]:,} tok <span style="color:#4a9;">−{stats["saved_pct"]:.0f}%</span>'
+                for stage, stats in prompt_stats.items()
+            )
+            st.markdown(f"""
+            <div style="margin-top:12px; padding:8px 12px; background:#111; border:1px solid #222; border-radius:6px; font-size:0.7rem; color:#888;">
+                <span style="font-family:'Space Mono',monospace; text-transform:uppercase;">System prompt</span><br>
+                {rows}
+            </div>
+            """, unsafe_allow_html=True)
+
+        # Wall time per stage and routed model (this process)
+        latency = latency_report()
+        if latency:
+            rows = "<br>".join(
+                f'{STAGES.get(r["stage"], r["stage"]).lower()} · {r["model"]} · p50 {r["p50_s"]:.1f}s '
+                f'<span style="color:#555;">p95 {r["p95_s"]:.1f}s · {r["calls"]} calls'
+                + (f' · {r["failures"]} failed' if r["failures"] else "") + "</span>"
+                for r in latency
+            )
+            st.markdown(f"""
+            <div style="margin-top:12px; padding:8px 12px; background:#111; border:1px solid #222; border-radius:6px; font-size:0.7rem; color:#888;">
+                <span style="font-family:'Space Mono',monospace; text-transform:uppercase;">Stage latency</span><br>
+                {rows}
+            </div>
+            """, unsafe_allow_html=True)
+
+        render_developer()
+
         # Dependency info
         st.markdown('<hr style="border:none; border-top:1px solid #1a1a1a; margin:1.5rem 0;">', unsafe_allow_html=True)
         st.markdown(f"""
@@ -1963,7 +2974,10 @@ def render_sidebar():
 
         pkg_map = {"Anthropic": "anthropic", "OpenAI": "openai", "Google": "google-genai"}
         pkg = pkg_map.get(provider, "")
-        st.code(f"pip install {pkg}", language="bash")
+        if pkg:
+            st.code(f"pip install {pkg}", language="bash")
+        else:
+            st.markdown('<div style="font-size:0.7rem; color:#444;">None — built in</div>', unsafe_allow_html=True)
 
         st.markdown("""
         <div style="margin-top:1.5rem; padding-top:1rem; border-top:1px solid #1a1a1a;">
@@ -1977,35 +2991,135 @@ def render_sidebar():
         """, unsafe_allow_html=True)
 
 
-# ===========================================================================
-# MAIN ROUTER
-# ===========================================================================
-def main():
-    # Render sidebar settings
-    render_sidebar()
+def render_session_memory():
+    """What this tab holds inline vs. in the shared artifact store."""
+    memory = session_memory_report()
+    if not memory:
+        return
+    session_kb = sum(r["session_bytes"] for r in memory) / 1024
+    stored_kb = sum(r["stored_bytes"] for r in memory) / 1024
+    store = get_store().stats()
+    rows = "<br>".join(
+        f'{r["key"].replace("_", " ")} · {(r["session_bytes"] + r["stored_bytes"]) / 1024:,.1f} KB '
+        f'<span style="color:#555;">{r["where"]}</span>'
+        for r in memory[:6]
+    )
+    st.markdown(f"""
+    <div style="margin-top:12px; padding:8px 12px; background:#111; border:1px solid #222; border-radius:6px; font-size:0.7rem; color:#888;">
+        <span style="font-family:'Space Mono',monospace; text-transform:uppercase;">Session memory</span><br>
+        {session_kb:,.1f} KB in session · {stored_kb:,.1f} KB in store<br>
+        {rows}<br>
+        <span style="color:#555;">store: {store["memory_bytes"] / 1048576:,.1f} MB memory · {store["disk_bytes"] / 1048576:,.1f} MB disk · {store["spills"]} spills</span>
+    </div>
+    """, unsafe_allow_html=True)
 
-    # Constrain step range
-    st.session_state.current_step = max(1, min(TOTAL_STEPS, st.session_state.current_step))
 
-    render_progress()
+def render_developer():
+    """Sidebar expander: session memory, rerun profiling toggle, per-section times of recent reruns, flame-graph export."""
+    with st.expander("Developer"):
+        # Sizing pickles every session value, so it only runs while switched on
+        if st.toggle("Session memory", key="show_session_memory",
+                     help="Bytes this tab holds inline and in the shared artifact store."):
+            render_session_memory()
+        st.toggle("Profile reruns", key="profile_reruns", value=RERUN_PROFILE, disabled=RERUN_PROFILE,
+                  help="Sample every script run of this session and attribute its time to step_* / render_* "
+                       "functions. Takes effect from the next rerun.")
+        session = _session_owner(st.session_state)
+        profiles = recent_profiles(session)
+        if not profiles:
+            return
+        rows = "<br>".join(
+            f'{r["section"]} · {r["mean_ms"]:,.1f} ms <span style="color:#555;">{100 * r["share"]:.0f}%</span>'
+            for r in section_report(profiles)[:8]
+        )
+        last = profiles[-1]
+        st.markdown(f"""
+        <div style="padding:8px 12px; background:#111; border:1px solid #222; border-radius:6px; font-size:0.7rem; color:#888;">
+            <span style="font-family:'Space Mono',monospace; text-transform:uppercase;">Rerun time · last {len(profiles)}</span><br>
+            last: step {last.step} · {last.wall_s * 1000:,.0f} ms · {last.samples} samples<br>
+            {rows}
+        </div>
+        """, unsafe_allow_html=True)
+        st.download_button("🔥 Flame graph (.folded)", data=to_folded(profiles), key="download_folded",
+                           file_name=f"reruns_{session}.folded", mime="text/plain",
+                           help="Folded stacks for speedscope.app, flamegraph.pl or inferno")
+
+
+def render_stage_routes(provider: str, model_labels: list[str], model_ids: list[str]):
+    """Sidebar expander: model and effort per stage, defaulting to the provider's routing policy."""
+    with st.expander("Per-stage models"):
+        routing = st.toggle("Route stages to tuned models", value=st.session_state.model_routing, key="sidebar_routing",
+                            help="Fast models with little thinking for research, the premium model for concepts. "
+                                 "Off: every stage uses the model above.")
+        if routing != st.session_state.model_routing:
+            st.session_state.model_routing = routing
+        if not routing:
+            return
+
+        effort_options = ["default"] + EFFORTS
+        overrides = dict(st.session_state.stage_routes or {})
+        for stage, label in STAGES.items():
+            route = _session_route(provider, stage)
+            model_col, effort_col = st.columns([3, 2])
+            with model_col:
+                model_label = st.selectbox(
+                    label, model_labels,
+                    index=model_ids.index(route.model) if route.model in model_ids else 0,
+                    key=f"route_model_{stage}",
+                )
+            with effort_col:
+                effort = st.selectbox(
+                    "Effort", effort_options,
+                    index=effort_options.index(route.effort or "default"),
+                    key=f"route_effort_{stage}",
+                )
+            chosen = Route(model_ids[model_labels.index(model_label)], None if effort == "default" else effort)
+            if chosen == resolve_route(provider, stage, st.session_state.llm_model):
+                overrides.pop(stage, None)
+            else:
+                overrides[stage] = chosen
+        st.session_state.stage_routes = overrides or None
 
-    step = st.session_state.current_step
 
-    if step == 1:
-        step_brand_identity()
-    elif step == 2:
-        step_audience()
-    elif step == 3:
-        step_personality()
-    elif step == 4:
-        step_emotion()
-    elif step == 5:
-        step_visual()
-    elif step == 6:
-        step_review()
-    elif step == 7:
-        step_generate()
+# ===========================================================================
+# MAIN ROUTER
+# ===========================================================================
+def main():
+    # One trace per script run (see tracing.py; enabled with TRACE_DIR)
+    with span("script_run", step=st.session_state.current_step, session=st.session_state.session_id or ""):
+        # Render sidebar settings
+        render_sidebar()
+
+        # Constrain step range
+        st.session_state.current_step = max(1, min(TOTAL_STEPS, st.session_state.current_step))
+
+        render_progress()
+
+        step = st.session_state.current_step
+
+        if step == 1:
+            step_brand_identity()
+        elif step == 2:
+            step_audience()
+        elif step == 3:
+            step_personality()
+        elif step == 4:
+            step_emotion()
+        elif step == 5:
+            step_visual()
+        elif step == 6:
+            step_review()
+        elif step == 7:
+            step_generate()
 
 
 if __name__ == "__main__":
-    main()
+    # HTTP/JSON API on this process's engine when NARRATIVE_SERVICE_PORT is set (narrative_service.py)
+    start_service(sys.modules[__name__])
+    # Provider SDK imports, DNS/TLS and the prompt index, off the script thread (sdk_warmup.py)
+    start_warmup()
+    try:
+        main()
+    finally:
+        if _rerun_sampler is not None:
+            end_rerun(_rerun_sampler, session=_session_owner(st.session_state), step=st.session_state.get("current_step"))
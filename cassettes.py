@@ -0,0 +1,279 @@
+"""
+Cassettes — record/replay of LLM and HTTP traffic.
+In ``record`` mode every ``call_llm`` request/response and every website fetch is
+appended to a JSONL cassette with its measured latency. In ``replay`` mode the
+same requests are served back from the file — with the original latency, none,
+or a scaled amount — so slow sessions can be reproduced locally without keys.
+
+Replay is strict: a request with no recording raises ``CassetteMiss``, so a
+replay never reaches a live endpoint (or spends money) by accident. Live
+fallback on misses is an explicit opt-in.
+
+Enable for the app with environment variables:
+
+    NARRATIVE_CASSETTE=sessions/roxanne.jsonl
+    NARRATIVE_CASSETTE_MODE=record | replay
+    NARRATIVE_CASSETTE_LATENCY=original | zero | <scale factor>
+    NARRATIVE_CASSETTE_LIVE_FALLBACK=1     # make live calls on replay misses instead of raising
+
+Summarize a cassette with ``python cassettes.py sessions/roxanne.jsonl``.
+"""
+
+import asyncio
+import contextlib
+import difflib
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+
+logger = logging.getLogger(__name__)
+
+class CassetteMiss(LookupError):
+    """Replay found no recorded interaction for a request (unless live fallback is on)."""
+
+
+def request_key(kind: str, request: dict) -> str:
+    """Stable identity of a request; identical requests replay in recorded order."""
+    canonical = json.dumps({"kind": kind, **request}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _complete(entry: dict) -> bool:
+    return "response" in entry or "error" in entry
+
+
+def _describe(request: dict) -> str:
+    return "\n".join(f"{k}={request[k]}" for k in sorted(request))
+
+
+class Cassette:
+    """A JSONL file of recorded interactions plus replay bookkeeping. Thread-safe."""
+
+    def __init__(self, path: str, mode: str = "replay", latency: str | float = "original",
+                 live_fallback: bool = False):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.live_fallback = live_fallback
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.recorded = 0
+        self.mismatches = []
+        self._queues = defaultdict(deque)
+        self._last = {}
+        self._by_kind = defaultdict(list)
+
+        if mode == "record":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            open(path, "w").close()
+        else:
+            for entry in load_cassette(path):
+                self._queues[entry["key"]].append(entry)
+                self._by_kind[entry["kind"]].append(entry)
+
+    # -- replay -------------------------------------------------------------
+    def _replay_delay(self, entry: dict) -> float:
+        if self.latency == "original":
+            return entry.get("latency_s", 0.0)
+        if self.latency == "zero":
+            return 0.0
+        return entry.get("latency_s", 0.0) * float(self.latency)
+
+    def _closest(self, kind: str, request: dict) -> dict | None:
+        candidates = self._by_kind.get(kind, [])
+        if not candidates:
+            return None
+        target = _describe(request)
+        return max(candidates, key=lambda e: difflib.SequenceMatcher(None, target, _describe(e["request"])).quick_ratio())
+
+    def _miss(self, kind: str, request: dict):
+        closest = self._closest(kind, request)
+        diff = []
+        if closest:
+            for field in sorted(set(request) | set(closest["request"])):
+                if request.get(field) != closest["request"].get(field):
+                    diff.append(field)
+        mismatch = {"kind": kind, "request": request, "closest_differs_in": diff}
+        with self._lock:
+            self.mismatches.append(mismatch)
+        logger.warning("replay miss (%s); closest recording differs in: %s", kind, ", ".join(diff) or "n/a")
+        if not self.live_fallback:
+            raise CassetteMiss(f"No recorded {kind} interaction matches this request (differs in {diff}).")
+
+    def _lookup(self, kind: str, request: dict) -> dict | None:
+        key = request_key(kind, request)
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                entry = queue.popleft()
+                self._last[key] = entry
+            else:
+                # Requests repeated more often than recorded reuse the last answer
+                entry = self._last.get(key)
+            if entry is not None and not _complete(entry):
+                # Torn or hand-edited recordings replay as misses, not crashes
+                entry = None
+            if entry:
+                self.hits += 1
+        if entry is None:
+            self._miss(kind, request)
+        return entry
+
+    @staticmethod
+    def _result(entry: dict):
+        if "error" in entry:
+            raise RuntimeError(entry["error"])
+        return entry["response"]
+
+    def _replay(self, kind: str, request: dict, live):
+        entry = self._lookup(kind, request)
+        if entry is None:
+            return live()
+        time.sleep(self._replay_delay(entry))
+        return self._result(entry)
+
+    async def _replay_async(self, kind: str, request: dict, live):
+        entry = self._lookup(kind, request)
+        if entry is None:
+            return await live()
+        await asyncio.sleep(self._replay_delay(entry))
+        return self._result(entry)
+
+    # -- record -------------------------------------------------------------
+    def _write(self, entry: dict, started: float):
+        entry["latency_s"] = round(time.perf_counter() - started, 4)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.recorded += 1
+
+    def _record(self, kind: str, request: dict, live):
+        started = time.perf_counter()
+        entry = {"kind": kind, "key": request_key(kind, request), "request": request, "recorded_at": time.time()}
+        try:
+            response = live()
+        except Exception as e:
+            entry["error"] = str(e)
+            self._write(entry, started)
+            raise
+        entry["response"] = response
+        self._write(entry, started)
+        return response
+
+    async def _record_async(self, kind: str, request: dict, live):
+        started = time.perf_counter()
+        entry = {"kind": kind, "key": request_key(kind, request), "request": request, "recorded_at": time.time()}
+        try:
+            response = await live()
+        except Exception as e:
+            entry["error"] = str(e)
+            self._write(entry, started)
+            raise
+        # Cancellation and other BaseExceptions leave nothing on the tape
+        entry["response"] = response
+        self._write(entry, started)
+        return response
+
+    def intercept(self, kind: str, request: dict, live):
+        """Serve ``request`` from the cassette, or call ``live()`` and record it.
+
+        A replay miss raises ``CassetteMiss``; with ``live_fallback`` it calls
+        ``live()`` instead.
+        """
+        if self.mode == "record":
+            return self._record(kind, request, live)
+        return self._replay(kind, request, live)
+
+    async def intercept_async(self, kind: str, request: dict, live):
+        """``intercept`` for coroutine callers; ``live`` is an async function."""
+        if self.mode == "record":
+            return await self._record_async(kind, request, live)
+        return await self._replay_async(kind, request, live)
+
+    def report(self) -> dict:
+        with self._lock:
+            unused = sum(len(q) for q in self._queues.values())
+            return {
+                "path": self.path,
+                "mode": self.mode,
+                "recorded": self.recorded,
+                "hits": self.hits,
+                "misses": len(self.mismatches),
+                "unused_recordings": unused if self.mode == "replay" else 0,
+                "mismatches": list(self.mismatches),
+            }
+
+
+def load_cassette(path: str) -> list[dict]:
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ---------------------------------------------------------------------------
+# ACTIVE CASSETTE
+# ---------------------------------------------------------------------------
+_active = {"cassette": None, "configured": False}
+_active_lock = threading.Lock()
+
+
+def _latency_setting(value: str) -> str | float:
+    return value if value in ("original", "zero") else float(value)
+
+
+def get_active_cassette() -> Cassette | None:
+    """The process-wide cassette configured by ``NARRATIVE_CASSETTE*`` env vars, if any."""
+    if not _active["configured"]:
+        with _active_lock:
+            if not _active["configured"]:
+                path = os.environ.get("NARRATIVE_CASSETTE", "")
+                if path:
+                    _active["cassette"] = Cassette(
+                        path,
+                        mode=os.environ.get("NARRATIVE_CASSETTE_MODE", "replay"),
+                        latency=_latency_setting(os.environ.get("NARRATIVE_CASSETTE_LATENCY", "original")),
+                        live_fallback=os.environ.get("NARRATIVE_CASSETTE_LIVE_FALLBACK", "") == "1",
+                    )
+                _active["configured"] = True
+    return _active["cassette"]
+
+
+@contextlib.contextmanager
+def use_cassette(path: str, mode: str = "replay", latency: str | float = "original", live_fallback: bool = False):
+    """Activate a cassette for the duration of the block (scripts, benchmarks)."""
+    cassette = Cassette(path, mode=mode, latency=latency, live_fallback=live_fallback)
+    with _active_lock:
+        previous = (_active["cassette"], _active["configured"])
+        _active["cassette"], _active["configured"] = cassette, True
+    try:
+        yield cassette
+    finally:
+        with _active_lock:
+            _active["cassette"], _active["configured"] = previous
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("usage: python cassettes.py <cassette.jsonl>")
+        raise SystemExit(2)
+    entries = load_cassette(sys.argv[1])
+    totals = defaultdict(lambda: {"count": 0, "latency_s": 0.0, "errors": 0})
+    for entry in entries:
+        label = entry["kind"]
+        if entry["kind"] == "llm":
+            label += " (web search)" if entry["request"].get("web_search") else ""
+        totals[label]["count"] += 1
+        totals[label]["latency_s"] += entry.get("latency_s", 0.0)
+        totals[label]["errors"] += int("error" in entry)
+    for label, t in sorted(totals.items()):
+        print(f"{label:<20} {t['count']:>4} calls   {t['latency_s']:>8.2f}s total   {t['errors']} errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Concept Index — local near-duplicate detection for narrative concepts.
+Every concept shown for a brand is reduced to its stemmed content words and
+summarized with a MinHash signature. Regenerated concepts whose estimated Jaccard similarity to
+anything already seen crosses the threshold are filtered out before display, so
+only genuinely new premises cost a slot.
+
+The threshold is calibrated on recorded concept responses: concepts returned
+in the same call are distinct by construction, so the threshold should sit
+above nearly all of their pairwise similarities.
+
+Both defaults (single-word shingles, threshold 0.5) are provisional: they were
+calibrated on the Fake provider's concepts only. Re-run the calibration on
+cassettes recorded against real providers before relying on them; the shingle
+size changes every similarity, so recalibrate the threshold whenever it changes.
+
+    python concept_index.py sessions/roxanne.jsonl        # suggest a threshold from a cassette
+    CONCEPT_SHINGLE_SIZE=2 python concept_index.py sessions/roxanne.jsonl
+    CONCEPT_DUPLICATE_THRESHOLD=0.55 streamlit run brand_narrative_app.py
+"""
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import re
+import sys
+
+NUM_PERMUTATIONS = 64
+# Provisional: calibrated on the Fake provider only (see module docstring)
+SHINGLE_SIZE = int(os.environ.get("CONCEPT_SHINGLE_SIZE", "1"))
+# Above every within-response pair of the Fake provider's concepts at SHINGLE_SIZE 1 (max 0.5, p99 0.41)
+DUPLICATE_THRESHOLD = float(os.environ.get("CONCEPT_DUPLICATE_THRESHOLD", "0.5"))
+
+# Rejected concepts sent back as negative examples on Regenerate (most recent first)
+AVOID_EXAMPLES_MAX = 6
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Seeded once so signatures are comparable across sessions in the same process
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME | 1,
+        int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME,
+    )
+    for i in range(NUM_PERMUTATIONS)
+]
+
+_STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in into is it its of on or that the their them they this
+to was were with who what when where which while will would your you our we us not no so than then there
+been being do does did can could should may might must just also only very all any each every some such
+own same other more most about over after before until through during out up down off again once here
+his her him she he i me my mine yours ours theirs itself themselves whom why how these those
+""".split())
+
+# Fields that carry the premise; rationale and arc wording vary too much to compare
+PREMISE_FIELDS = ("title", "human_truth", "summary", "hook")
+
+
+def premise_text(concept: dict) -> str:
+    return " ".join(str(concept.get(field, "")) for field in PREMISE_FIELDS)
+
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping so rewordings ("tries"/"trying"/"tried") collide."""
+    for suffix in ("ing", "ies", "ied", "ed", "es", "ly", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[: -len(suffix)]
+    return word
+
+
+def _shingles(text: str, size: int = SHINGLE_SIZE) -> set[str]:
+    words = [_stem(w) for w in re.findall(r"[a-z0-9']+", text.lower()) if w not in _STOPWORDS]
+    if len(words) < size:
+        return set(words)
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text: str, shingle_size: int = SHINGLE_SIZE) -> tuple[int, ...]:
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "big")
+        for s in _shingles(text, shingle_size)
+    ]
+    if not hashes:
+        return tuple([_MAX_HASH] * NUM_PERMUTATIONS)
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimated_similarity(sig_a: tuple, sig_b: tuple) -> float:
+    """Fraction of matching MinHash slots — an unbiased estimate of Jaccard similarity."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERMUTATIONS
+
+
+class ConceptIndex:
+    """Every concept seen for one brand, plus the ones the user rejected."""
+
+    def __init__(self, threshold: float = DUPLICATE_THRESHOLD, shingle_size: int = SHINGLE_SIZE):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self._entries = []      # (signature, concept)
+        self.rejected = []      # concepts discarded via "Regenerate"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def nearest(self, concept: dict) -> tuple[float, dict | None]:
+        sig = minhash_signature(premise_text(concept), self.shingle_size)
+        best_score, best = 0.0, None
+        for other_sig, other in self._entries:
+            score = estimated_similarity(sig, other_sig)
+            if score > best_score:
+                best_score, best = score, other
+        return best_score, best
+
+    def add(self, concept: dict):
+        self._entries.append((minhash_signature(premise_text(concept), self.shingle_size), concept))
+
+    def partition(self, candidates: list[dict]) -> tuple[list[dict], list[dict]]:
+        """Split candidates into (new, near-duplicates); new ones are added to the index.
+
+        Candidates are also compared with each other, so a batch that repeats
+        itself keeps only the first version.
+        """
+        fresh, duplicates = [], []
+        for concept in candidates:
+            if not isinstance(concept, dict):
+                continue
+            score, _ = self.nearest(concept)
+            if score >= self.threshold:
+                duplicates.append(concept)
+            else:
+                self.add(concept)
+                fresh.append(concept)
+        return fresh, duplicates
+
+    def avoid_examples(self, limit: int = AVOID_EXAMPLES_MAX) -> list[dict]:
+        """The most recently rejected concepts, capped so the prompt does not grow with every Regenerate."""
+        return self.rejected[-limit:][::-1] if limit > 0 else []
+
+    def reject(self, concepts: list[dict]):
+        """Record concepts the user turned down; they become negative examples."""
+        for concept in concepts:
+            if isinstance(concept, dict) and concept not in self.rejected:
+                self.rejected.append(concept)
+                if self.nearest(concept)[0] < 1.0:
+                    self.add(concept)
+
+
+# ---------------------------------------------------------------------------
+# CALIBRATION
+# ---------------------------------------------------------------------------
+def concept_batches(entries: list[dict]) -> list[list[dict]]:
+    """Concept lists returned by the LLM calls recorded in a cassette."""
+    batches = []
+    for entry in entries:
+        if entry.get("kind") != "llm" or not isinstance(entry.get("response"), str):
+            continue
+        text = re.sub(r"^```(?:json)?\s*|\s*```$", "", entry["response"].strip())
+        try:
+            parsed = json.loads(text)
+        except ValueError:
+            continue
+        if isinstance(parsed, list):
+            concepts = [c for c in parsed if isinstance(c, dict) and "human_truth" in c]
+            if len(concepts) > 1:
+                batches.append(concepts)
+    return batches
+
+
+def calibrate(batches: list[list[dict]], percentile: float = 99) -> dict:
+    """Similarity of concepts returned together, and the threshold that keeps them apart."""
+    scores = sorted(
+        estimated_similarity(minhash_signature(premise_text(a)), minhash_signature(premise_text(b)))
+        for batch in batches for a, b in itertools.combinations(batch, 2)
+    )
+    if not scores:
+        return {"pairs": 0}
+    cutoff = scores[min(len(scores) - 1, int(len(scores) * percentile / 100))]
+    return {
+        "pairs": len(scores),
+        "mean": round(sum(scores) / len(scores), 3),
+        f"p{percentile:g}": cutoff,
+        "max": scores[-1],
+        # Next 0.05 step above the cutoff
+        "suggested_threshold": round(math.floor(cutoff * 20 + 1) / 20, 2),
+    }
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("usage: python concept_index.py <cassette.jsonl>")
+        raise SystemExit(2)
+    from cassettes import load_cassette
+
+    batches = concept_batches(load_cassette(sys.argv[1]))
+    report = calibrate(batches)
+    if not report["pairs"]:
+        print("No recorded concept responses with more than one concept.")
+        raise SystemExit(1)
+    print(f"{len(batches)} concept responses, {report['pairs']} within-response pairs")
+    print(f"similarity mean {report['mean']}  p99 {report['p99']}  max {report['max']}")
+    print(f"suggested threshold {report['suggested_threshold']} (current {DUPLICATE_THRESHOLD})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Deadlines — per-stage time budgets for research, auto-fill and generation.
+A stage opens a ``stage_deadline`` scope; everything it does underneath (page
+fetches, LLM calls, nested stages) reads the remaining budget from it and
+passes it on as the SDK/HTTP timeout, so a hung provider request ends with an
+error instead of a spinner that never stops. Scopes live in ``contextvars``
+and nest by taking the earlier expiry.
+
+UI code can also register a ``wait_hook``: a callback run a few times a second
+while a blocking call waits. The Streamlit app uses it to update an elapsed-time
+caption, and because every ``st`` call checks for a pending rerun, a Cancel
+click (or any navigation) interrupts the wait; the bridge then cancels the
+in-flight request instead of letting it finish and be discarded.
+"""
+
+import contextlib
+import contextvars
+import functools
+import threading
+import time
+from dataclasses import dataclass
+
+# Seconds per stage, end to end (scrapes + LLM call + parsing)
+STAGE_DEADLINES_S = {
+    "research": 120,
+    "auto_fill": 90,
+    "concepts": 90,
+    "storyboard": 180,
+    "keyframe_repair": 90,
+}
+DEFAULT_DEADLINE_S = 120
+POLL_INTERVAL_S = 0.25
+
+
+class DeadlineExceeded(TimeoutError):
+    """A stage ran out of its time budget."""
+
+
+@dataclass(frozen=True)
+class Deadline:
+    stage: str
+    seconds: float
+    expires_at: float       # time.monotonic()
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def describe(self) -> str:
+        return f"{self.stage} deadline of {self.seconds:g}s"
+
+
+_deadline = contextvars.ContextVar("stage_deadline", default=None)
+_wait_hook = contextvars.ContextVar("wait_hook", default=None)
+
+
+@contextlib.contextmanager
+def stage_deadline(stage: str, seconds: float | None = None):
+    """Run the block under ``stage``'s budget (or ``seconds``), never past an enclosing deadline."""
+    seconds = seconds if seconds is not None else STAGE_DEADLINES_S.get(stage, DEFAULT_DEADLINE_S)
+    deadline = Deadline(stage, seconds, time.monotonic() + seconds)
+    outer = _deadline.get()
+    if outer and outer.expires_at <= deadline.expires_at:
+        deadline = outer
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def with_deadline(stage: str):
+    """Decorator: run the function inside ``stage_deadline(stage)``."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_deadline(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def wait_hook(callback):
+    """Call ``callback(elapsed_s, deadline)`` while blocking calls in the block wait.
+
+    Only waits on the registering thread call it: pool threads inherit the
+    context, but UI callbacks must stay on the script thread.
+    """
+    token = _wait_hook.set((callback, threading.get_ident()))
+    try:
+        yield
+    finally:
+        _wait_hook.reset(token)
+
+
+def current_deadline() -> Deadline | None:
+    return _deadline.get()
+
+
+def remaining(cap: float | None = None) -> float | None:
+    """Seconds left in the current stage, capped at ``cap``; ``cap`` (or None) outside any stage.
+
+    Raises ``DeadlineExceeded`` once the budget is spent, so callers do not
+    start work that cannot finish.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return cap
+    left = deadline.remaining()
+    if left <= 0:
+        raise DeadlineExceeded(f"{deadline.describe()} exceeded")
+    return min(cap, left) if cap is not None else left
+
+
+def poller():
+    """The active wait hook bound to the current deadline, or None (for ``run_sync(poll=...)``)."""
+    hook = _wait_hook.get()
+    if hook is None or hook[1] != threading.get_ident():
+        return None
+    callback, deadline = hook[0], _deadline.get()
+    started = time.monotonic()
+    return lambda: callback(time.monotonic() - started, deadline)
@@ -0,0 +1,116 @@
+"""
+Evidence — decide whether brand research needs server-side web search.
+The scraped homepage, about page and page metadata are scored locally for how
+much brand signal they already carry (length, tagline/mission/about language,
+structured metadata). Rich evidence skips web search entirely, partial evidence
+gets a reduced search budget, and thin evidence keeps the full budget. Search
+rounds are the slowest part of research, so each decision records the latency
+it is expected to save.
+"""
+
+import re
+from dataclasses import asdict, dataclass
+
+FULL_SEARCH_USES = 5
+
+# Score thresholds: at or above SKIP → no search; at or above LIMIT → reduced budget
+SKIP_THRESHOLD = 0.75
+LIMIT_THRESHOLD = 0.4
+LIMITED_SEARCH_USES = 2
+
+# Per-provider search behavior. ``max_uses`` is only honored by providers whose
+# search tool takes a budget; the others can just turn search on or off.
+# ``round_s`` is a typical wall-clock cost of one search round.
+SEARCH_POLICY = {
+    "Anthropic": {"supports_max_uses": True, "round_s": 3.0},
+    "OpenAI": {"supports_max_uses": False, "round_s": 4.0},
+    "Google": {"supports_max_uses": False, "round_s": 2.0},
+    "Fake": {"supports_max_uses": True, "round_s": None},   # taken from the fake model's config
+}
+
+_SIGNALS = {
+    "tagline": re.compile(r"\b(tagline|slogan|motto)\b", re.IGNORECASE),
+    "mission": re.compile(r"\b(mission|ethos|we believe|our purpose|why we|our values?|manifesto)\b", re.IGNORECASE),
+    "story": re.compile(r"\b(our story|founded|founder|since \d{4}|started in|about us|who we are)\b", re.IGNORECASE),
+    "audience": re.compile(r"\b(for (people|anyone|those|women|men|kids|families)|our (customers|community))\b", re.IGNORECASE),
+    "product": re.compile(r"\b(collection|handmade|crafted|materials?|made (in|from|with))\b", re.IGNORECASE),
+}
+
+# "Brand — Line" style og:title; the part after the separator is usually the tagline
+_TITLE_TAGLINE = re.compile(r"\S\s+[|\u2013\u2014:-]\s+\S")
+
+_METADATA_KEYS = ("description", "og:description", "og:title", "og:site_name", "theme-color", "json_ld")
+
+
+@dataclass
+class SearchDecision:
+    score: float
+    signals: dict
+    web_search: bool
+    max_uses: int
+    reason: str
+    est_latency_saved_s: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def summary(self) -> str:
+        if not self.web_search:
+            mode = "skipped"
+        elif self.max_uses < FULL_SEARCH_USES:
+            mode = f"limited to {self.max_uses}"
+        else:
+            mode = "full"
+        saved = f", ~{self.est_latency_saved_s:.0f}s saved" if self.est_latency_saved_s else ""
+        return f"web search {mode} (evidence {self.score:.2f}{saved})"
+
+
+def score_evidence(homepage_text: str, about_text: str = "", metadata: dict | None = None) -> tuple[float, dict]:
+    """Return (score in [0, 1], per-signal breakdown) for the scraped evidence."""
+    text = f"{homepage_text}\n{about_text}"
+    signals = {
+        # Saturates at ~4k characters of readable text across both pages
+        "length": round(min(1.0, len(text.strip()) / 4000), 2),
+        "about_page": 1.0 if len(about_text) > 200 else 0.0,
+    }
+    for name, pattern in _SIGNALS.items():
+        signals[name] = 1.0 if pattern.search(text) else 0.0
+    metadata = metadata or {}
+    if (metadata.get("json_ld") or {}).get("slogan") or _TITLE_TAGLINE.search(metadata.get("og:title") or ""):
+        signals["tagline"] = 1.0
+    present = sum(1 for k in _METADATA_KEYS if metadata.get(k))
+    signals["metadata"] = round(min(1.0, present / 3), 2)
+
+    weights = {"length": 0.25, "about_page": 0.15, "tagline": 0.05, "mission": 0.15,
+               "story": 0.15, "audience": 0.05, "product": 0.05, "metadata": 0.15}
+    score = sum(signals[k] * w for k, w in weights.items())
+    return round(score, 3), signals
+
+
+def decide_search(provider: str, homepage_text: str, about_text: str = "", metadata: dict | None = None,
+                  round_s: float | None = None) -> SearchDecision:
+    """Choose the web-search setting for one research call.
+
+    ``round_s`` overrides the policy's per-round cost (the Fake provider passes
+    its configured ``search_round_s``).
+    """
+    score, signals = score_evidence(homepage_text, about_text, metadata)
+    policy = SEARCH_POLICY.get(provider, {"supports_max_uses": False, "round_s": 3.0})
+    per_round = round_s if round_s is not None else (policy["round_s"] or 0.0)
+
+    if score >= SKIP_THRESHOLD:
+        web_search, uses, reason = False, 0, "scraped pages already carry tagline, mission and story signals"
+    elif score >= LIMIT_THRESHOLD and policy["supports_max_uses"]:
+        web_search, uses, reason = True, LIMITED_SEARCH_USES, "partial evidence; search fills the gaps"
+    else:
+        web_search, uses, reason = True, FULL_SEARCH_USES, "thin evidence" if score < LIMIT_THRESHOLD else \
+            "partial evidence; provider search has no budget setting"
+
+    return SearchDecision(
+        score=score,
+        signals=signals,
+        web_search=web_search,
+        max_uses=uses,
+        reason=reason,
+        est_latency_saved_s=round((FULL_SEARCH_USES - uses) * per_round, 2),
+    )
@@ -0,0 +1,351 @@
+"""
+Fake LLM Provider — deterministic, offline stand-in for Anthropic/OpenAI/Google.
+Recognizes which app stage a request comes from (research, auto-fill, concepts,
+storyboard, keyframe repair) and returns a schema-conformant JSON payload for it. Latency, token
+rate, truncation and error injection are configurable so the app can be
+benchmarked and load-tested without API keys.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+
+from storyboard_format import lean_keyframe, lean_storyboard
+
+
+class FakeLLMError(RuntimeError):
+    """Injected provider failure. ``call_llm`` surfaces it as ``__LLM_ERROR__``."""
+
+
+# ---------------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True)
+class FakeLLMConfig:
+    latency_s: float = 0.0          # time to first token
+    tokens_per_s: float = 0.0       # output token rate; 0 = instant
+    search_round_s: float = 0.0     # added per server-side web-search round
+    truncate_rate: float = 0.0      # probability the response is cut off mid-JSON
+    error_rate: float = 0.0         # probability the call raises FakeLLMError
+    seed: int = 0
+
+    @classmethod
+    def for_model(cls, model: str) -> "FakeLLMConfig":
+        """Model presets, overridable with ``FAKE_LLM_*`` environment variables."""
+        config = FAKE_MODEL_PRESETS.get(model, cls())
+        env = {
+            "latency_s": os.environ.get("FAKE_LLM_LATENCY"),
+            "tokens_per_s": os.environ.get("FAKE_LLM_TOKENS_PER_S"),
+            "search_round_s": os.environ.get("FAKE_LLM_SEARCH_ROUND_S"),
+            "truncate_rate": os.environ.get("FAKE_LLM_TRUNCATE_RATE"),
+            "error_rate": os.environ.get("FAKE_LLM_ERROR_RATE"),
+            "seed": os.environ.get("FAKE_LLM_SEED"),
+        }
+        overrides = {k: (int(v) if k == "seed" else float(v)) for k, v in env.items() if v not in (None, "")}
+        return replace(config, **overrides) if overrides else config
+
+
+FAKE_MODEL_PRESETS = {
+    "fake-instant": FakeLLMConfig(),
+    "fake-realistic": FakeLLMConfig(latency_s=0.8, tokens_per_s=60.0, search_round_s=2.0),
+    "fake-flaky": FakeLLMConfig(latency_s=0.3, tokens_per_s=120.0, search_round_s=0.5, truncate_rate=0.15, error_rate=0.15),
+}
+
+
+# ---------------------------------------------------------------------------
+# REQUEST CLASSIFICATION
+# ---------------------------------------------------------------------------
+# First match wins; patterns key off the instructions each app stage sends.
+REQUEST_PATTERNS = [
+    ("keyframe_repair", re.compile(r"REWRITE ONLY KEYFRAMES")),
+    ("storyboard", re.compile(r"COMPLETE storyboard", re.IGNORECASE)),
+    ("concepts", re.compile(r"generate exactly \d+ narrative concepts?", re.IGNORECASE)),
+    ("auto_fill", re.compile(r"complete creative brief", re.IGNORECASE)),
+    ("research", re.compile(r"brand research analyst|structured (brand )?profile", re.IGNORECASE)),
+]
+
+
+def detect_request_kind(system_prompt: str, user_message: str) -> str:
+    """Return the app stage a request belongs to, or ``"text"`` if unrecognized."""
+    text = f"{system_prompt}\n{user_message}"
+    for kind, pattern in REQUEST_PATTERNS:
+        if pattern.search(text):
+            return kind
+    return "text"
+
+
+def _extract_brand(user_message: str) -> str:
+    for pattern in (r"^Brand:\s*(.+)$", r"^brand_name:\s*(.+)$", r'"brand_name":\s*"([^"]*)"', r'"brand":\s*"([^"]*)"'):
+        match = re.search(pattern, user_message, re.MULTILINE)
+        if match and match.group(1).strip():
+            return match.group(1).strip()
+    return "Acme"
+
+
+def _wants_lean_storyboard(user_message: str) -> bool:
+    """Lean storyboard/repair requests describe keyframes with the short ``"scene"`` key."""
+    return '"scene":' in user_message
+
+
+def _requested_count(user_message: str, default: int = 3) -> int:
+    match = re.search(r"generate exactly (\d+) narrative concept", user_message, re.IGNORECASE)
+    return int(match.group(1)) if match else default
+
+
+# ---------------------------------------------------------------------------
+# PAYLOADS
+# ---------------------------------------------------------------------------
+_TENSIONS = [
+    ("saving the good thing for a special occasion", "the occasion never arrives"),
+    ("wanting to be noticed", "dreading being looked at"),
+    ("craving routine", "feeling trapped by it"),
+    ("buying for the person they want to be", "living as the person they are"),
+    ("performing effortlessness", "working hard to look like it"),
+    ("loving the ritual", "never having time for it"),
+]
+_SETTINGS = [
+    "a cramped laundromat at 11pm", "a bus stop in sideways rain", "a wedding-reception coat check",
+    "an elevator stuck between floors", "a grandmother's overfilled kitchen", "a dentist's waiting room",
+    "the last table of a closing diner", "a hallway outside a job interview",
+]
+_CAMERAS = ["35mm handheld at eye level", "locked-off 50mm, f/2.8", "slow push-in on 85mm", "overhead static 24mm"]
+_LIGHTING = ["hard practical light from a vending machine", "flat overcast daylight", "single tungsten lamp, warm falloff", "cool fluorescent with green cast"]
+_ARCS = ["Embarrassment → Recognition → Quiet pride", "Boredom → Mischief → Delight", "Tension → Release → Belonging", "Doubt → Dare → Ownership"]
+_PRICE_TIERS = ["accessible", "mid-range", "premium"]
+_VISUAL_IDS = ["cinematic", "documentary", "editorial", "surreal", "lofi", "minimal", "maximalist", "vintage", "neon", "organic", "graphic", "luxe"]
+
+
+def _hex(rng: random.Random) -> str:
+    return "#{:02x}{:02x}{:02x}".format(rng.randrange(256), rng.randrange(256), rng.randrange(256))
+
+
+def _research_payload(rng: random.Random, brand: str) -> dict:
+    wanting, reality = rng.choice(_TENSIONS)
+    return {
+        "tagline": f"{brand}, on purpose.",
+        "ethos": f"{brand} makes everyday objects for people {wanting}. Quality that earns its place in a routine.",
+        "values": rng.sample(["craft", "humor", "honesty", "color", "longevity", "community", "ease"], 3),
+        "anti_positioning": "Not precious, not trend-chasing, never gatekept.",
+        "emotional_territory": "Small, private joy in the middle of an ordinary day",
+        "audience_description": f"People {wanting} who know {reality}. They discover brands through friends, not ads.",
+        "aesthetic_description": "Saturated primaries against worn neutrals; tactile, slightly imperfect, hand-made cues.",
+        "price_tier": rng.choice(_PRICE_TIERS),
+        "notable_info": "Deterministic fake research payload.",
+        "findings": [
+            f"{brand} homepage leads with a single hero product shot on a flat color field.",
+            f"Press coverage describes {brand} as {rng.choice(['cult', 'quietly popular', 'word-of-mouth'])} in its category.",
+            f"Social posts from {brand} favor customer photos over studio campaigns.",
+        ],
+        "confidence": rng.choice(["high", "medium"]),
+    }
+
+
+def _auto_fill_payload(rng: random.Random, brand: str) -> dict:
+    data = _research_payload(rng, brand)
+    data.pop("notable_info")
+    data.pop("findings")
+    data.update({
+        "brand_description": f"{brand} makes colorful, durable goods meant to be used every day, not saved for later.",
+        "audience_lifestyle": "Busy, image-literate people who mix high and low. They value self-expression over status and trust friends over ads.",
+        "adjacent_brands": ", ".join(rng.sample(["Glossier", "Jacquemus", "Mejuri", "Reformation", "Aesop", "Baggu", "Hay"], 4)),
+        "platform": rng.choice(["Instagram Reels", "TikTok", "YouTube Shorts"]),
+        "emotion_feel_after": "Like they were caught enjoying something small and decided not to apologize for it.",
+        "emotion_reject": "Aspirational distance, velvet-rope exclusivity, and guilt about treating yourself.",
+        "emotion_movie_scene": f"{rng.choice(_SETTINGS).capitalize()}: a stranger notices a tiny detail, smiles, and quietly copies it.",
+        "visual_styles": rng.sample(_VISUAL_IDS, 3),
+        "color_primary": _hex(rng),
+        "color_secondary": _hex(rng),
+        "color_accent": _hex(rng),
+        "product_presence": "Ambient — worn/used naturally, never the focus",
+        "text_overlay": "Tagline at end only",
+        "audio_direction": "Dry room tone, one found-sound rhythm, no voiceover.",
+    })
+    for key in ["personality_exclusive_accessible", "personality_serious_playful", "personality_minimal_expressive",
+                "personality_classic_trendy", "personality_loud_quiet", "personality_luxury_everyday"]:
+        data[key] = rng.randrange(10, 91)
+    return data
+
+
+_CONCEPT_SHAPES = [
+    ("{place} Rules", "In {setting}, someone quietly breaks an unspoken rule and everyone else follows.",
+     "Tight on a hand hesitating over something it shouldn't touch."),
+    ("The Understudy", "A stand-in rehearses a life that isn't theirs in {setting} until the real one never shows up.",
+     "A name tag with someone else's name, peeled off and stuck back on."),
+    ("Lost & Found", "Objects abandoned in {setting} are claimed by the wrong owners, who wear them better.",
+     "A cardboard box labelled UNCLAIMED slides across a counter."),
+    ("Dress Rehearsal", "Rain cancels the big day, so the outfit gets its debut in {setting} instead.",
+     "A phone lights up: POSTPONED. Nobody moves for a beat."),
+    ("Second Opinion", "A child critiques a grown-up's choices in {setting}, and the grown-up takes notes.",
+     "Small voice off-screen: 'That one? Really?'"),
+    ("Night Shift", "The only worker left in {setting} throws a one-person celebration nobody will believe happened.",
+     "Fluorescent tube flickers twice, then a radio clicks on."),
+]
+
+
+def _concepts_payload(rng: random.Random, brand: str, count: int) -> list:
+    concepts = []
+    for i, (title, summary, hook) in enumerate(rng.sample(_CONCEPT_SHAPES, min(count, len(_CONCEPT_SHAPES)))):
+        wanting, reality = rng.choice(_TENSIONS)
+        setting = rng.choice(_SETTINGS)
+        concepts.append({
+            "title": title.format(place=setting.split()[-1].title()),
+            "human_truth": f"People are motivated by {wanting}, but they experience {reality}, creating a tension that a small act of self-permission resolves.",
+            "summary": summary.format(setting=setting),
+            "emotional_arc": rng.choice(_ARCS),
+            "hook": hook,
+            "rationale": f"It turns {brand}'s everyday ethos into a moment of social permission without showing the product first.",
+        })
+    return concepts
+
+
+def _storyboard_payload(rng: random.Random, brand: str) -> dict:
+    setting = rng.choice(_SETTINGS)
+    style_suffix = f"shot on 35mm film, {rng.choice(_LIGHTING)}, natural grain, muted color science with saturated accents"
+    beats = ["HOOK", "SHIFT", "SHIFT", "PAYOFF", "PAYOFF"]
+    timestamps = ["0s", "2.5s", "5s", "8s", "11s"]
+    keyframes = []
+    for i in range(5):
+        keyframes.append({
+            "timestamp": timestamps[i],
+            "narrative_beat": beats[i],
+            "scene_description": f"Beat {i + 1} in {setting}: the rule-breaker's small gesture ripples outward to person {i + 1}.",
+            "camera": rng.choice(_CAMERAS),
+            "lighting": rng.choice(_LIGHTING),
+            "color_palette": "worn neutrals with one saturated accent",
+            "emotion": rng.choice(["suspense", "curiosity", "recognition", "delight", "belonging"]),
+            "text_overlay": "none" if i < 4 else f"{brand}, on purpose.",
+            "product_presence": "Ambient" if i in (2, 4) else "None",
+            "composition_notes": "subject on left third, negative space right",
+        })
+    return {
+        "style_suffix": style_suffix,
+        "keyframes": keyframes,
+        "image_prompts": [f"{kf['scene_description']} {kf['camera']}, {kf['lighting']}, {style_suffix}" for kf in keyframes],
+        "animation_prompts": [
+            {
+                "transition": f"{i + 1}→{i + 2}",
+                "motion_type": "camera and subject",
+                "camera_motion": rng.choice(["slow dolly in", "handheld drift left", "static", "rack focus to background"]),
+                "subject_motion": "the gesture passes from one person to the next",
+                "pacing": rng.choice(["slow", "medium", "accelerating"]),
+                "visual_transition": rng.choice(["cut", "match cut", "continuous shot"]),
+                "emotional_trajectory": f"{keyframes[i]['emotion']} → {keyframes[i + 1]['emotion']}",
+                "audio_cue": "room tone thickens with one repeating found sound",
+            }
+            for i in range(4)
+        ],
+        "anti_generic_audit": {"all_passed": True, "notes": "Deterministic fake storyboard."},
+        "creative_director_notes": f"Keep {brand} out of frame until beat 3; the rule, not the product, is the hero.",
+    }
+
+
+def _keyframe_repair_payload(rng: random.Random, brand: str, user_message: str) -> dict:
+    match = re.search(r"KEYFRAMES TO REWRITE:\s*([\d,\s]+)", user_message)
+    positions = [int(p) for p in re.findall(r"\d+", match.group(1))] if match else []
+    storyboard = _storyboard_payload(rng, brand)
+    lean = _wants_lean_storyboard(user_message)
+    keyframes, prompts = [], {}
+    for position in positions:
+        if 1 <= position <= len(storyboard["keyframes"]):
+            keyframe = storyboard["keyframes"][position - 1]
+            keyframes.append({"position": position, **(lean_keyframe(keyframe) if lean else keyframe)})
+            prompts[str(position)] = storyboard["image_prompts"][position - 1]
+    return {"keyframes": keyframes} if lean else {"keyframes": keyframes, "image_prompts": prompts}
+
+
+def build_fake_payload(kind: str, user_message: str, rng: random.Random) -> dict | list | str:
+    """Build the schema-conformant payload for a request kind."""
+    brand = _extract_brand(user_message)
+    if kind == "research":
+        return _research_payload(rng, brand)
+    if kind == "auto_fill":
+        return _auto_fill_payload(rng, brand)
+    if kind == "concepts":
+        return _concepts_payload(rng, brand, _requested_count(user_message))
+    if kind == "storyboard":
+        storyboard = _storyboard_payload(rng, brand)
+        return lean_storyboard(storyboard) if _wants_lean_storyboard(user_message) else storyboard
+    if kind == "keyframe_repair":
+        return _keyframe_repair_payload(rng, brand, user_message)
+    return "OK"
+
+
+# ---------------------------------------------------------------------------
+# ENTRY POINT
+# ---------------------------------------------------------------------------
+# Attempt numbers per distinct request, so retries of the same request draw fresh faults.
+# Least recently seen requests are forgotten past the cap; a forgotten one starts again at attempt 1.
+CALL_COUNTS_MAX = 4096
+_call_counts = OrderedDict()
+_call_counts_lock = threading.Lock()
+
+
+def _plan_completion(system_prompt: str, user_message: str, model: str, max_tokens: int,
+                     web_search: bool, config: FakeLLMConfig | None, search_rounds: int):
+    """Decide (text, wait before first token, injected error or None, streaming time) for one request."""
+    config = config or FakeLLMConfig.for_model(model)
+    digest = hashlib.sha256(f"{config.seed}\x00{system_prompt}\x00{user_message}".encode("utf-8")).hexdigest()
+    with _call_counts_lock:
+        attempt = _call_counts.pop(digest, 0)
+        _call_counts[digest] = attempt + 1
+        if len(_call_counts) > CALL_COUNTS_MAX:
+            _call_counts.popitem(last=False)
+
+    content_rng = random.Random(f"{config.seed}:{digest}")
+    fault_rng = random.Random(f"{config.seed}:{digest}:{attempt}")
+
+    kind = detect_request_kind(system_prompt, user_message)
+    payload = build_fake_payload(kind, user_message, content_rng)
+    text = payload if isinstance(payload, str) else json.dumps(payload, indent=2)
+
+    # ~4 characters per token; hitting max_tokens cuts the response like a real provider
+    limit_chars = max_tokens * 4
+    if len(text) > limit_chars:
+        text = text[:limit_chars]
+    elif fault_rng.random() < config.truncate_rate:
+        text = text[: max(1, int(len(text) * fault_rng.uniform(0.3, 0.9)))]
+
+    wait = config.latency_s + (search_rounds * config.search_round_s if web_search else 0.0)
+    error = None
+    if fault_rng.random() < config.error_rate:
+        error = FakeLLMError(f"injected {kind} failure (attempt {attempt + 1})")
+    streaming = (len(text) / 4) / config.tokens_per_s if config.tokens_per_s > 0 else 0.0
+    return text, wait, error, streaming
+
+
+def fake_completion(system_prompt: str, user_message: str, model: str, max_tokens: int,
+                    web_search: bool = False, config: FakeLLMConfig | None = None,
+                    search_rounds: int = 5) -> str:
+    """Return a deterministic response text for the request, simulating provider timing.
+
+    The same request sequence always yields the same responses: output is seeded
+    by the request content, and injected errors/truncations by how many times
+    that exact request has been seen in this process.
+    """
+    text, wait, error, streaming = _plan_completion(system_prompt, user_message, model, max_tokens,
+                                                    web_search, config, search_rounds)
+    time.sleep(wait)
+    if error:
+        raise error
+    time.sleep(streaming)
+    return text
+
+
+async def fake_completion_async(system_prompt: str, user_message: str, model: str, max_tokens: int,
+                                web_search: bool = False, config: FakeLLMConfig | None = None,
+                                search_rounds: int = 5) -> str:
+    """``fake_completion`` that waits with ``asyncio.sleep`` — thousands can be in flight on one thread."""
+    text, wait, error, streaming = _plan_completion(system_prompt, user_message, model, max_tokens,
+                                                    web_search, config, search_rounds)
+    await asyncio.sleep(wait)
+    if error:
+        raise error
+    await asyncio.sleep(streaming)
+    return text
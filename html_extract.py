@@ -0,0 +1,138 @@
+"""
+HTML Extract — page text and metadata, optionally parsed in worker processes.
+BeautifulSoup is pure Python and holds the GIL, so when several sessions (or a
+batch run) scrape at once, every page parses on one core while the fetch
+threads wait. With ``HTML_PARSE_WORKERS`` set, ``extract_page`` runs in a
+process pool instead. Fetching stays on threads; only the HTML string goes to
+a worker, and only the cleaned text and metadata come back.
+
+Queue depth is bounded. At most ``HTML_PARSE_QUEUE`` pages may be waiting on
+or running in the pool. Beyond that, callers block, which slows their own
+fetching: back-pressure. The wait never runs past the stage deadline. If the
+pool breaks (e.g. a worker was killed), it is replaced and the page is parsed
+in-process.
+
+    HTML_PARSE_WORKERS=4 streamlit run brand_narrative_app.py
+    python -m benchmarks.scrape_scaling      # pages/s with 0, 1, 2, 4 and 8 workers
+"""
+
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from deadlines import DeadlineExceeded, remaining
+from site_metadata import extract_metadata
+
+try:
+    from bs4 import BeautifulSoup
+    HAS_BS4 = True
+except ImportError:
+    HAS_BS4 = False
+
+HTML_PARSE_WORKERS = int(os.environ.get("HTML_PARSE_WORKERS", "0"))     # 0 = parse in the calling thread
+HTML_PARSE_QUEUE = int(os.environ.get("HTML_PARSE_QUEUE", "0"))         # 0 = 4 pages per worker
+HTML_PARSE_WAIT_S = 30      # longest wait for a queue slot or a result outside any stage deadline
+
+NOISE_TAGS = ["script", "style", "nav", "footer", "header", "noscript", "iframe"]
+
+
+def extract_page(html: str, max_chars: int = 8000) -> dict:
+    """``{"text", "metadata"}`` for a page: readable text with noise tags removed, and site metadata.
+
+    Runs in worker processes, so it must stay a picklable top-level function.
+    """
+    if not HAS_BS4:
+        return {"text": "", "metadata": extract_metadata(html), "text_chars": 0}
+    # Harvested before the noise tags (and the JSON-LD/CSS inside them) are stripped
+    metadata = extract_metadata(html)
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Remove script, style, nav, footer noise
+    for tag in soup(NOISE_TAGS):
+        tag.decompose()
+
+    text = soup.get_text(separator="\n", strip=True)
+    # Collapse multiple newlines
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return {"text": text[:max_chars], "metadata": metadata, "text_chars": len(text)}
+
+
+# ---------------------------------------------------------------------------
+# PROCESS POOL
+# ---------------------------------------------------------------------------
+_pool = {"executor": None, "slots": None, "workers": 0}
+_pool_lock = threading.Lock()
+
+
+def configure(workers: int, queue_depth: int = 0):
+    """Use ``workers`` parse processes (0 = in-process) with at most ``queue_depth`` pages in flight."""
+    with _pool_lock:
+        old = _pool["executor"]
+        _pool["executor"] = None
+        _pool["workers"] = max(0, workers)
+        _pool["slots"] = threading.BoundedSemaphore(queue_depth or 4 * workers) if workers > 0 else None
+    if old is not None:
+        old.shutdown(wait=False, cancel_futures=True)
+
+
+def _executor():
+    with _pool_lock:
+        if _pool["executor"] is None and _pool["workers"] > 0:
+            # Forking a process that runs Streamlit and the async bridge loop is unsafe; start workers clean
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool["executor"] = ProcessPoolExecutor(max_workers=_pool["workers"], mp_context=context)
+        return _pool["executor"], _pool["slots"]
+
+
+def _reset(broken):
+    with _pool_lock:
+        if _pool["executor"] is broken:
+            _pool["executor"] = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def pool_workers() -> int:
+    return _pool["workers"]
+
+
+def parse_page(html: str, max_chars: int = 8000) -> dict:
+    """``extract_page`` in the pool when one is configured, else in the calling thread.
+
+    Blocks while the queue is full. Raises ``DeadlineExceeded`` if the stage
+    deadline passes first.
+    """
+    executor, slots = _executor()
+    if executor is None:
+        return extract_page(html, max_chars)
+
+    wait = remaining(cap=HTML_PARSE_WAIT_S)
+    if not slots.acquire(timeout=wait):
+        raise DeadlineExceeded(f"no HTML parse slot within {wait:.1f}s ({pool_workers()} workers busy)")
+    try:
+        future = executor.submit(extract_page, html, max_chars)
+    except BrokenProcessPool:
+        slots.release()
+        _reset(executor)
+        return extract_page(html, max_chars)
+    except BaseException:
+        slots.release()
+        raise
+    # The slot is held until the worker is done with the page, not until this
+    # caller stops waiting, so abandoned parses still count against the queue
+    future.add_done_callback(lambda _: slots.release())
+    wait = remaining(cap=HTML_PARSE_WAIT_S)
+    try:
+        return future.result(timeout=wait)
+    except TimeoutError:
+        future.cancel()
+        raise DeadlineExceeded(f"HTML parse did not finish within {wait:.1f}s") from None
+    except BrokenProcessPool:
+        _reset(executor)
+        return extract_page(html, max_chars)
+
+
+configure(HTML_PARSE_WORKERS, HTML_PARSE_QUEUE)
@@ -0,0 +1,131 @@
+"""
+Model Routing — which model and reasoning budget each generation stage uses.
+Research and the auto-fill brief are mostly extraction and summarising, so by
+default they go to a fast model with little or no thinking; concepts get the
+premium model with the largest budget; the storyboard and keyframe repair sit
+in between. The sidebar can override any stage, or switch routing off so every
+stage uses the sidebar model (the provider's default effort, as before).
+
+Effort is provider-neutral ("low", "medium", "high") and translated by the
+adapters: OpenAI ``reasoning_effort``, Anthropic extended-thinking
+``budget_tokens`` and Gemini ``thinking_budget`` (see ``thinking_budget``).
+Per-stage latency is recorded for every call so the sidebar can show what each
+route costs in wall time.
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+
+# Stages that call the LLM, in wizard order, with their sidebar labels
+STAGES = {
+    "research": "Research",
+    "auto_fill": "Auto-fill brief",
+    "concepts": "Concepts",
+    "storyboard": "Storyboard",
+    "keyframe_repair": "Keyframe repair",
+}
+EFFORTS = ["low", "medium", "high"]
+
+# Thinking tokens per effort for providers that take a token budget (Anthropic, Gemini 2.5)
+THINKING_BUDGETS = {"low": 0, "medium": 2048, "high": 8192}
+
+
+@dataclass(frozen=True)
+class Route:
+    model: str
+    effort: str | None = None    # None = provider default (no thinking; "high" for OpenAI reasoning models)
+
+
+DEFAULT_ROUTES = {
+    "Anthropic": {
+        "research": Route("claude-haiku-4-5-20251001", "low"),
+        "auto_fill": Route("claude-haiku-4-5-20251001", "low"),
+        "concepts": Route("claude-opus-4-6", "high"),
+        "storyboard": Route("claude-sonnet-4-5-20250929", "medium"),
+        "keyframe_repair": Route("claude-sonnet-4-5-20250929", "low"),
+    },
+    "OpenAI": {
+        # nano has no web search tool; mini is the cheapest model research can use
+        "research": Route("gpt-4.1-mini"),
+        "auto_fill": Route("gpt-4.1-mini"),
+        "concepts": Route("gpt-5.2", "high"),
+        "storyboard": Route("gpt-5.2", "medium"),
+        "keyframe_repair": Route("gpt-5.1", "low"),
+    },
+    "Google": {
+        "research": Route("gemini-2.5-flash", "low"),
+        "auto_fill": Route("gemini-2.5-flash", "low"),
+        "concepts": Route("gemini-2.5-pro", "high"),
+        "storyboard": Route("gemini-2.5-pro", "medium"),
+        "keyframe_repair": Route("gemini-2.5-flash", "medium"),
+    },
+    # Fake has no tiers: every stage uses the sidebar preset
+}
+
+
+def resolve_route(provider: str, stage: str | None, fallback_model: str,
+                  overrides: dict | None = None, enabled: bool = True) -> Route:
+    """The route for ``stage``: a sidebar override, else the provider default, else the sidebar model."""
+    if not enabled or stage is None:
+        return Route(fallback_model)
+    override = (overrides or {}).get(stage)
+    if override is not None:
+        return override
+    return DEFAULT_ROUTES.get(provider, {}).get(stage) or Route(fallback_model)
+
+
+def thinking_budget(effort: str | None, minimum: int = 0) -> int | None:
+    """Thinking tokens for ``effort``; None leaves the provider default. ``minimum`` for models that cannot turn it off."""
+    if effort is None:
+        return None
+    return max(minimum, THINKING_BUDGETS.get(effort, 0))
+
+
+# ---------------------------------------------------------------------------
+# LATENCY
+# ---------------------------------------------------------------------------
+LATENCY_SAMPLES = 50    # per stage and model
+
+
+@dataclass
+class _StageLatency:
+    calls: int = 0
+    failures: int = 0
+    last_s: float = 0.0
+    samples: deque = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+
+_latency = {}
+_latency_lock = threading.Lock()
+
+
+def record_latency(stage: str, model: str, seconds: float, failed: bool = False):
+    with _latency_lock:
+        stats = _latency.setdefault((stage, model), _StageLatency())
+        stats.calls += 1
+        stats.failures += int(failed)
+        stats.last_s = seconds
+        stats.samples.append(seconds)
+
+
+def latency_report() -> list[dict]:
+    """One row per (stage, model) seen in this process, in wizard order."""
+    order = list(STAGES)
+    with _latency_lock:
+        items = sorted(_latency.items(), key=lambda kv: (order.index(kv[0][0]) if kv[0][0] in order else len(order), kv[0][1]))
+        rows = []
+        for (stage, model), stats in items:
+            ordered = sorted(stats.samples)
+            rows.append({
+                "stage": stage, "model": model, "calls": stats.calls, "failures": stats.failures,
+                "last_s": round(stats.last_s, 2),
+                "p50_s": round(ordered[len(ordered) // 2], 2),
+                "p95_s": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+            })
+    return rows
+
+
+def clear_latency():
+    with _latency_lock:
+        _latency.clear()
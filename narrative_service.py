@@ -0,0 +1,587 @@
+"""
+Narrative Service — the wizard's engine as a local HTTP/JSON API.
+Research, profile building, concepts and storyboards run through the same
+functions the Streamlit app uses: the same scraping and search gate, the same
+``build_brand_profile`` rules (maturity mode included), stage routing,
+deadlines, parsing and anti-generic screen. Only the standard library is
+used for HTTP.
+
+Profile building is quick, so it is answered directly. Research, concepts and
+storyboards are jobs. A POST returns ``202`` with a job id. Poll
+``GET /v1/jobs/<id>``, or stream ``GET /v1/jobs/<id>/events`` as server-sent
+events (status, progress, elapsed-time ticks, then the result).
+``DELETE /v1/jobs/<id>`` cancels a job; a request in flight is aborted.
+Jobs run on two bounded worker pools: research (scrape-heavy) and generation.
+Once ``MAX_QUEUED_JOBS`` are waiting, new jobs get ``503``.
+
+    python narrative_service.py --port 8765                              # standalone
+    NARRATIVE_SERVICE_PORT=8765 streamlit run brand_narrative_app.py     # inside the app process
+
+    POST /v1/research    {"brand_name", "brand_url", "brand_category", "refresh": false}
+    POST /v1/profile     {"answers": {wizard fields}, "research": "<research job id>"}
+    POST /v1/concepts    {"profile": {...} | "answers"/"research", "count": 3, "avoid": [...]}
+    POST /v1/storyboard  {"profile" | "answers"/"research", "concept": {...}, "repair": true}
+    GET  /v1/jobs/<id>   GET /v1/jobs/<id>/events   DELETE /v1/jobs/<id>   GET /v1/health
+
+Every job body may set ``provider`` and ``model``; without a model, stages
+follow the routing policy (model_routing.py). Keys come from
+``ANTHROPIC_API_KEY``, ``OPENAI_API_KEY`` or ``GEMINI_API_KEY``; the service
+never accepts keys over HTTP. With ``SDK_WARMUP=auto``, the standalone service
+imports those providers' SDKs and opens their connections at start
+(sdk_warmup.py).
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from concept_index import ConceptIndex
+from deadlines import stage_deadline, wait_hook
+from model_routing import resolve_route
+from research import ResearchArtifact
+from sdk_warmup import start_warmup
+
+logger = logging.getLogger(__name__)
+
+SERVICE_HOST = os.environ.get("NARRATIVE_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = os.environ.get("NARRATIVE_SERVICE_PORT", "")
+SERVICE_PROVIDER = os.environ.get("NARRATIVE_SERVICE_PROVIDER", "Anthropic")
+RESEARCH_WORKERS = int(os.environ.get("NARRATIVE_SERVICE_RESEARCH_WORKERS", "4"))
+GENERATION_WORKERS = int(os.environ.get("NARRATIVE_SERVICE_GENERATION_WORKERS", "8"))
+MAX_QUEUED_JOBS = 256
+JOB_HISTORY = 500            # finished jobs kept for polling; oldest are dropped first
+MAX_BODY_BYTES = 1_000_000
+SSE_KEEPALIVE_S = 15
+TICK_INTERVAL_S = 1.0        # elapsed-time events while a stage waits on the model
+MAX_CONCEPTS = 6
+CONCEPT_INDEX_BRANDS = 256   # brands whose concept history is kept for near-duplicate filtering
+
+API_KEY_ENV = {"Anthropic": "ANTHROPIC_API_KEY", "OpenAI": "OPENAI_API_KEY", "Google": "GEMINI_API_KEY"}
+
+# Wizard answers accepted by /v1/profile (session-state keys, as in batch runs)
+PROFILE_FIELDS = (
+    "brand_name", "brand_url", "brand_category", "brand_description", "scraped_data",
+    "audience_lifestyle", "audience_brands", "audience_platform",
+    "personality_exclusive_accessible", "personality_serious_playful", "personality_minimal_expressive",
+    "personality_classic_trendy", "personality_loud_quiet", "personality_luxury_everyday",
+    "emotion_feel_after", "emotion_reject", "emotion_movie_scene",
+    "visual_selections", "color_primary", "color_secondary", "color_accent",
+    "product_in_frame", "text_overlay_pref", "audio_direction",
+)
+
+TERMINAL = ("done", "failed", "cancelled")
+
+
+def _app():
+    """The Streamlit app module, imported in bare mode for its engine functions."""
+    return importlib.import_module("brand_narrative_app")
+
+
+class ServiceError(Exception):
+    """A request the service refuses; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once DELETE /v1/jobs/<id> was received."""
+
+
+# ---------------------------------------------------------------------------
+# JOBS
+# ---------------------------------------------------------------------------
+@dataclass
+class Job:
+    id: str
+    kind: str
+    params: dict
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: dict | None = None
+    error: str | None = None
+    events: list = field(default_factory=list)      # (id, event, data)
+    cancel_requested: threading.Event = field(default_factory=threading.Event)
+    changed: threading.Condition = field(default_factory=threading.Condition)
+    future: object = None
+    artifact: ResearchArtifact | None = None        # research jobs: the full artifact for /v1/profile
+
+    def emit(self, event: str, data: dict):
+        with self.changed:
+            self.events.append((len(self.events), event, data))
+            self.changed.notify_all()
+
+    def set_status(self, status: str, **data):
+        self.status = status
+        self.emit("status", {"status": status, **data})
+
+    def check_cancelled(self):
+        if self.cancel_requested.is_set():
+            raise JobCancelled()
+
+    def to_dict(self) -> dict:
+        end = self.finished_at or time.time()
+        out = {
+            "id": self.id, "kind": self.kind, "status": self.status,
+            "created_at": self.created_at, "started_at": self.started_at, "finished_at": self.finished_at,
+            "elapsed_s": round(end - self.started_at, 3) if self.started_at else None,
+            "links": {"self": f"/v1/jobs/{self.id}", "events": f"/v1/jobs/{self.id}/events"},
+        }
+        if self.error:
+            out["error"] = self.error
+        if self.status == "done":
+            out["result"] = self.result
+        return out
+
+
+class JobManager:
+    """Queues jobs on bounded worker pools and keeps recent ones for polling."""
+
+    def __init__(self, app, research_workers: int = RESEARCH_WORKERS, generation_workers: int = GENERATION_WORKERS,
+                 max_queued: int = MAX_QUEUED_JOBS):
+        self.app = app
+        self.max_queued = max_queued
+        self.pools = {
+            "research": ThreadPoolExecutor(max_workers=research_workers, thread_name_prefix="service-research"),
+            "generation": ThreadPoolExecutor(max_workers=generation_workers, thread_name_prefix="service-generation"),
+        }
+        self.workers = {"research": research_workers, "generation": generation_workers}
+        self._jobs = {}
+        self._concept_indexes = OrderedDict()   # brand key → ConceptIndex, least recently used first
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, params: dict) -> Job:
+        runner, pool = JOB_KINDS[kind]
+        job = Job(uuid.uuid4().hex[:16], kind, params)
+        with self._lock:
+            if sum(1 for j in self._jobs.values() if j.status == "queued") >= self.max_queued:
+                raise ServiceError(503, f"{self.max_queued} jobs already queued; retry later")
+            self._jobs[job.id] = job
+            self._prune()
+        job.emit("status", {"status": "queued"})
+        job.future = self.pools[pool].submit(self._run, job, runner)
+        return job
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise ServiceError(404, f"no job {job_id}")
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        job = self.get(job_id)
+        if job.status in TERMINAL:
+            return job
+        job.cancel_requested.set()
+        if job.future is not None and job.future.cancel():
+            job.finished_at = time.time()
+            job.set_status("cancelled")
+        return job
+
+    def concept_index(self, brand_name: str) -> ConceptIndex:
+        """Per-brand near-duplicate index shared by this service's concept jobs, as the wizard keeps per session."""
+        key = brand_name.strip().lower()
+        with self._lock:
+            index = self._concept_indexes.pop(key, None)
+            if index is None:
+                index = ConceptIndex()
+            self._concept_indexes[key] = index
+            while len(self._concept_indexes) > CONCEPT_INDEX_BRANDS:
+                self._concept_indexes.popitem(last=False)
+        return index
+
+    def stats(self) -> dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {status: 0 for status in ("queued", "running", *TERMINAL)}
+        for job in jobs:
+            counts[job.status] += 1
+        return {"jobs": counts, "workers": self.workers, "max_queued": self.max_queued}
+
+    def _run(self, job: Job, runner):
+        job.started_at = time.time()
+        job.set_status("running")
+        try:
+            job.check_cancelled()
+            job.result = runner(self.app, job)
+            status = "done"
+        except JobCancelled:
+            status = "cancelled"
+        except ServiceError as e:
+            job.error, status = str(e), "failed"
+        except Exception as e:
+            job.error, status = f"{type(e).__name__}: {e}", "failed"
+        job.finished_at = time.time()
+        if status == "done":
+            job.emit("result", job.result)
+        job.set_status(status, **({"error": job.error} if job.error else {}))
+        logger.info("%s %s: %s in %.1fs%s", job.kind, job.id, status, job.finished_at - job.started_at,
+                    f" — {job.error}" if job.error else "")
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j.status in TERMINAL]
+        for job in sorted(finished, key=lambda j: j.finished_at or 0)[:max(0, len(finished) - JOB_HISTORY)]:
+            del self._jobs[job.id]
+
+    def shutdown(self):
+        for job in list(self._jobs.values()):
+            job.cancel_requested.set()
+        for pool in self.pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------------------------------------------------------------------------
+# ENGINE
+# ---------------------------------------------------------------------------
+def _llm(app, params: dict, stage: str) -> dict:
+    """Explicit ``call_llm`` settings for a stage; jobs never touch Streamlit session state."""
+    provider = params.get("provider") or SERVICE_PROVIDER
+    if provider not in app.LLM_PROVIDERS:
+        raise ServiceError(400, f"unknown provider {provider!r}")
+    if params.get("model"):
+        model, effort = params["model"], None
+    else:
+        route = resolve_route(provider, stage, app.LLM_PROVIDERS[provider]["models"][0][1])
+        model, effort = route.model, route.effort
+    return {"provider": provider, "model": model, "effort": effort,
+            "api_key": os.environ.get(API_KEY_ENV.get(provider, ""), "")}
+
+
+def _watch(job: Job, stage: str):
+    """Emit elapsed-time ticks while the stage waits, and abort the wait once the job is cancelled."""
+    last = {"at": 0.0}
+
+    def tick(elapsed: float, deadline):
+        job.check_cancelled()
+        if elapsed - last["at"] >= TICK_INTERVAL_S:
+            last["at"] = elapsed
+            job.emit("tick", {"stage": stage, "elapsed_s": round(elapsed, 1),
+                              "remaining_s": round(deadline.remaining(), 1) if deadline else None})
+
+    return wait_hook(tick)
+
+
+def run_research(app, job: Job) -> dict:
+    """The app's research path, shared research cache included (``refresh`` skips it)."""
+    params = job.params
+    with stage_deadline("research"), _watch(job, "research"):
+        job.emit("progress", {"stage": "research", "message": "researching"})
+        artifact = app.run_brand_research(params["brand_name"], params["brand_url"], params["brand_category"],
+                                          refresh=params["refresh"], llm=_llm(app, params, "research"))
+    if artifact is None:
+        raise ServiceError(502, "research failed or its response did not parse")
+    job.artifact = artifact
+    return {
+        "brand_name": artifact.brand_name, "identity": artifact.profile, "findings": artifact.findings,
+        "sources": artifact.sources, "prefill": artifact.local_fields(), "palette": artifact.palette,
+        "search": artifact.search, "cache": artifact.cache, "content_hash": artifact.content_hash,
+        "duration_s": artifact.duration_s,
+    }
+
+
+def build_profile(app, manager: JobManager, body: dict) -> dict:
+    """``build_brand_profile`` over the posted answers, merged with a finished research job if given."""
+    answers = body.get("answers") or {}
+    if not isinstance(answers, dict):
+        raise ServiceError(400, "answers must be an object")
+    unknown = sorted(set(answers) - set(PROFILE_FIELDS))
+    if unknown:
+        raise ServiceError(400, f"unknown answer fields: {', '.join(unknown)}")
+    state = {**app.DEFAULTS, **answers}
+    for key in PROFILE_FIELDS:
+        if key.startswith("personality_"):
+            try:
+                state[key] = max(0, min(100, int(state[key])))
+            except (TypeError, ValueError):
+                raise ServiceError(400, f"{key} must be a number from 0 to 100")
+    if not state["brand_name"]:
+        raise ServiceError(400, "answers.brand_name is required")
+
+    artifact = None
+    if body.get("research"):
+        job = manager.get(body["research"])
+        if job.kind != "research" or job.status != "done":
+            raise ServiceError(409, f"job {job.id} is not a finished research job")
+        artifact = job.artifact
+        if not answers.get("scraped_data"):
+            state["scraped_data"] = artifact.profile
+    app.apply_metadata_prefill(artifact, state)
+    return app.build_brand_profile(state)
+
+
+def _profile_param(app, manager: JobManager, body: dict) -> dict:
+    if isinstance(body.get("profile"), dict):
+        if not body["profile"].get("brand_name"):
+            raise ServiceError(400, "profile.brand_name is required")
+        return body["profile"]
+    return build_profile(app, manager, body)
+
+
+def run_concepts(app, job: Job) -> dict:
+    """Concepts with the wizard's top-up rounds (``generate_concepts``) against the brand's concept index."""
+    params = job.params
+    profile = params["profile"]
+    llm = _llm(app, params, "concepts")
+
+    def call(needed: int, avoid: list) -> str:
+        job.check_cancelled()
+        job.emit("progress", {"stage": "concepts", "message": f"requesting {needed} concept(s)"})
+        system, user = app.build_concepts_prompt(profile, needed, avoid)
+        return app.call_llm(system, user, max_tokens=min(3000, 1000 * needed + 200), stage="concepts", **llm)
+
+    with stage_deadline("concepts"), _watch(job, "concepts"):
+        try:
+            concepts, filtered = app.generate_concepts(profile, params["count"], params["avoid"], params["index"], call)
+        except app.GenerationFailed as e:
+            raise ServiceError(502, str(e))
+    return {"concepts": concepts, "filtered": filtered, "maturity_mode": profile.get("maturity_mode")}
+
+
+def run_storyboard(app, job: Job) -> dict:
+    """Storyboard plus, when ``repair`` is set, one targeted rewrite of keyframes the local screen flags."""
+    params = job.params
+    profile, concept = params["profile"], params["concept"]
+    with stage_deadline("storyboard"), _watch(job, "storyboard"):
+        job.emit("progress", {"stage": "storyboard", "message": "generating storyboard"})
+        system, user = app.build_storyboard_prompt(profile, concept)
+        result = app.call_llm(system, user, max_tokens=8000, stage="storyboard", **_llm(app, params, "storyboard"))
+    if result.startswith("__LLM_"):
+        raise ServiceError(502, result)
+    parsed = app.parse_storyboard(result)
+    if not (isinstance(parsed, dict) and parsed.get("keyframes")):
+        return {"storyboard": parsed or {"raw": result}}
+
+    def repair(failing: dict) -> list[int]:
+        job.check_cancelled()
+        with stage_deadline("keyframe_repair"), _watch(job, "keyframe_repair"):
+            job.emit("progress", {"stage": "keyframe_repair", "message": f"rewriting {len(failing)} keyframe(s)"})
+            system, user = app.build_keyframe_repair_prompt(profile, concept, parsed, failing)
+            text = app.call_llm(system, user, max_tokens=min(8000, 1200 * len(failing)), stage="keyframe_repair",
+                                **_llm(app, params, "keyframe_repair"))
+        return app.apply_keyframe_repair(parsed, failing, text)
+
+    app.screen_and_repair_storyboard(parsed, profile["brand_name"], repair if params["repair"] else None)
+    return {"storyboard": parsed}
+
+
+# kind → (runner, worker pool)
+JOB_KINDS = {
+    "research": (run_research, "research"),
+    "concepts": (run_concepts, "generation"),
+    "storyboard": (run_storyboard, "generation"),
+}
+
+
+def _job_params(app, manager: JobManager, kind: str, body: dict) -> dict:
+    """Validate a job body up front so bad requests fail with 400, not as a failed job."""
+    llm = {k: body[k] for k in ("provider", "model") if body.get(k)}
+    _llm(app, llm, kind)
+    if kind == "research":
+        if not body.get("brand_name"):
+            raise ServiceError(400, "brand_name is required")
+        return {**llm, "brand_name": body["brand_name"], "brand_url": body.get("brand_url", ""),
+                "brand_category": body.get("brand_category", ""), "refresh": bool(body.get("refresh"))}
+    profile = _profile_param(app, manager, body)
+    if kind == "concepts":
+        try:
+            count = int(body.get("count", app.CONCEPTS_PER_BATCH))
+        except (TypeError, ValueError):
+            raise ServiceError(400, "count must be a number")
+        avoid = body.get("avoid") or []
+        if not isinstance(avoid, list):
+            raise ServiceError(400, "avoid must be a list of concepts")
+        return {**llm, "profile": profile, "count": max(1, min(MAX_CONCEPTS, count)),
+                "avoid": [c for c in avoid if isinstance(c, dict)], "index": manager.concept_index(profile["brand_name"])}
+    if not isinstance(body.get("concept"), dict):
+        raise ServiceError(400, "concept is required")
+    return {**llm, "profile": profile, "concept": body["concept"], "repair": bool(body.get("repair", True))}
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+class ServiceHandler(BaseHTTPRequestHandler):
+    server_version = "NarrativeService/1"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def manager(self) -> JobManager:
+        return self.server.manager
+
+    def log_request(self, code="-", size="-"):
+        # Polling is chatty; only failed requests are logged
+        if isinstance(code, int) and code >= 400:
+            super().log_request(code, size)
+
+    def log_message(self, fmt, *args):
+        logger.info("%s %s", self.address_string(), fmt % args)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method: str):
+        path = urlsplit(self.path).path.rstrip("/")
+        try:
+            if method == "GET" and path == "/v1/health":
+                return self._send_json(200, {"status": "ok", **self.manager.stats()})
+            if method == "POST" and path == "/v1/profile":
+                return self._send_json(200, {"profile": build_profile(self.manager.app, self.manager, self._body())})
+            match = re.fullmatch(r"/v1/(research|concepts|storyboard)", path)
+            if method == "POST" and match:
+                params = _job_params(self.manager.app, self.manager, match.group(1), self._body())
+                job = self.manager.submit(match.group(1), params)
+                return self._send_json(202, job.to_dict(), {"Location": f"/v1/jobs/{job.id}"})
+            match = re.fullmatch(r"/v1/jobs/([0-9a-f]+)(/events)?", path)
+            if match and method == "GET":
+                job = self.manager.get(match.group(1))
+                return self._stream(job) if match.group(2) else self._send_json(200, job.to_dict())
+            if match and method == "DELETE" and not match.group(2):
+                return self._send_json(202, self.manager.cancel(match.group(1)).to_dict())
+            raise ServiceError(404, f"no route for {method} {path or '/'}")
+        except ServiceError as e:
+            headers = {"Retry-After": "5"} if e.status == 503 else None
+            self._send_json(e.status, {"error": str(e)}, headers)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ServiceError(413, f"body larger than {MAX_BODY_BYTES} bytes")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            raise ServiceError(400, f"invalid JSON: {e}")
+        if not isinstance(body, dict):
+            raise ServiceError(400, "body must be a JSON object")
+        return body
+
+    def _send_json(self, status: int, payload: dict, headers: dict | None = None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, job: Job):
+        """Server-sent events from ``Last-Event-ID`` (or the start) until the job ends."""
+        try:
+            position = int(self.headers.get("Last-Event-ID", -1)) + 1
+        except ValueError:
+            position = 0
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        while True:
+            with job.changed:
+                if position >= len(job.events) and job.status not in TERMINAL:
+                    job.changed.wait(SSE_KEEPALIVE_S)
+                pending, finished = job.events[position:], job.status in TERMINAL
+            if not pending:
+                if finished:
+                    return
+                self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+                continue
+            for event_id, event, data in pending:
+                self.wfile.write(f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+                                 .encode("utf-8"))
+            self.wfile.flush()
+            position = pending[-1][0] + 1
+
+
+class NarrativeService(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, app, host: str = SERVICE_HOST, port: int = 8765, **pool_options):
+        self.manager = JobManager(app, **pool_options)
+        super().__init__((host, port), ServiceHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.manager.shutdown()
+
+
+# ---------------------------------------------------------------------------
+# RUNNING ALONGSIDE THE APP
+# ---------------------------------------------------------------------------
+_service = {"server": None, "error": None}
+_service_lock = threading.Lock()
+
+
+def start_service(app, host: str = SERVICE_HOST, port: int | None = None) -> NarrativeService | None:
+    """Serve the API from a daemon thread of this process, once; later calls return the running server.
+
+    ``port`` defaults to ``NARRATIVE_SERVICE_PORT``; without either, nothing starts.
+    """
+    with _service_lock:
+        if _service["server"] is not None or _service["error"] is not None:
+            return _service["server"]
+        port = port if port is not None else int(SERVICE_PORT) if SERVICE_PORT else None
+        if port is None:
+            return None
+        try:
+            server = NarrativeService(app, host, port)
+        except OSError as e:
+            # Do not retry on every rerun
+            _service["error"] = str(e)
+            logger.error("could not listen on %s:%s: %s", host, port, e)
+            return None
+        threading.Thread(target=server.serve_forever, name="narrative-service", daemon=True).start()
+        _service["server"] = server
+        logger.info("listening on http://%s:%s", host, server.server_address[1])
+        return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/JSON API for research, profiles, concepts and storyboards.")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=int(SERVICE_PORT or 8765))
+    parser.add_argument("--research-workers", type=int, default=RESEARCH_WORKERS)
+    parser.add_argument("--generation-workers", type=int, default=GENERATION_WORKERS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(module)s] %(message)s")
+
+    server = NarrativeService(_app(), args.host, args.port, research_workers=args.research_workers,
+                              generation_workers=args.generation_workers)
+    start_warmup(delay_s=0)
+    logger.info("listening on http://%s:%s", args.host, server.server_address[1])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
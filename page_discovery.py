@@ -0,0 +1,146 @@
+"""
+Page Discovery — find a brand's story pages from links it actually publishes.
+Anchors are read from the homepage HTML that was already downloaded (and from
+``sitemap.xml`` when the homepage links are not enough), scored by how likely
+they are to hold brand narrative — about, story, mission, sustainability,
+press — and only the top few are fetched. Replaces probing a fixed list of
+guessed paths, most of which 404.
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+# keyword (matched against path segments and anchor text) → weight
+PAGE_KEYWORDS = {
+    "about": 10, "about-us": 10, "our-story": 10, "story": 9, "who-we-are": 9, "journey": 8,
+    "mission": 8, "ethos": 8, "manifesto": 8, "values": 7, "founder": 7, "founders": 7, "history": 6,
+    "purpose": 6, "impact": 5, "sustainability": 5, "responsibility": 5, "craft": 4, "process": 3,
+    "press": 3, "team": 3,
+}
+
+# Paths that never carry brand narrative
+EXCLUDE = re.compile(
+    r"/(products?|collections?|cart|checkout|account|login|search|policies|policy|blogs?/[^/]+/tagged|"
+    r"cdn|wishlist|gift-?cards?|tools)(/|$)|\.(jpe?g|png|gif|webp|svg|pdf|zip|css|js)$",
+    re.IGNORECASE,
+)
+
+ABOUT_PAGES_MAX = 3
+
+
+@dataclass(frozen=True)
+class Candidate:
+    url: str
+    score: float
+    source: str      # "link" or "sitemap"
+    reason: str      # keywords that matched
+
+
+class _AnchorParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = []          # [(href, text)]
+        self._href = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            self._href = dict(attrs).get("href")
+            self._text = []
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._href is not None:
+            self.links.append((self._href, " ".join("".join(self._text).split())))
+            self._href = None
+
+
+def extract_links(html: str) -> list[tuple[str, str]]:
+    """``(href, anchor text)`` for every anchor in the page."""
+    parser = _AnchorParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        pass
+    return parser.links
+
+
+def parse_sitemap(xml_text: str) -> tuple[list[str], list[str]]:
+    """Return (page URLs, child sitemap URLs) from a sitemap or sitemap index."""
+    try:
+        root = ET.fromstring(xml_text.strip())
+    except ET.ParseError:
+        return [], []
+    pages, children = [], []
+    for element in root.iter():
+        if element.tag.rsplit("}", 1)[-1] != "loc" or not element.text:
+            continue
+        (children if root.tag.endswith("sitemapindex") else pages).append(element.text.strip())
+    return pages, children
+
+
+def _site(url: str) -> str:
+    """Host of a URL for same-site checks; ``www.`` is dropped so apex and www links both count."""
+    host = urlsplit(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _normalize(url: str) -> str:
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path.rstrip("/") or "/", "", ""))
+
+
+def score_url(url: str, text: str = "") -> tuple[float, str]:
+    """Score one URL (plus its anchor text) for brand-narrative content."""
+    path = urlsplit(url).path.lower()
+    if EXCLUDE.search(path):
+        return 0.0, ""
+    segments = [s for s in path.split("/") if s]
+    if not segments:
+        return 0.0, ""
+    last = segments[-1]
+    words = set(re.split(r"[-_.]", last)) | {last} | set(re.findall(r"[a-z]+", text.lower()))
+    matched = [k for k in PAGE_KEYWORDS if k in words]
+    if not matched:
+        return 0.0, ""
+    score = max(PAGE_KEYWORDS[k] for k in matched) + 0.5 * (len(matched) - 1)
+    # Shallow pages are the canonical ones; /pages/ is the Shopify convention
+    score -= 0.5 * max(0, len(segments) - 2)
+    if "pages" in segments[:-1]:
+        score += 0.5
+    return round(score, 2), ", ".join(matched)
+
+
+def rank_candidates(base_url: str, links: list[tuple[str, str]], sitemap_urls: list[str] = (),
+                    limit: int = ABOUT_PAGES_MAX) -> list[Candidate]:
+    """Same-site narrative pages from links and sitemap entries, best first.
+
+    ``base_url`` should be the homepage's final URL after redirects, so relative
+    links resolve against the host that served them.
+    """
+    site = _site(base_url)
+    home = _normalize(base_url)
+    best = {}
+    sources = [(href, text, "link") for href, text in links] + [(u, "", "sitemap") for u in sitemap_urls]
+    for href, text, source in sources:
+        if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+            continue
+        url = urljoin(base_url.rstrip("/") + "/", href)
+        if _site(url) != site:
+            continue
+        key = _normalize(url)
+        if key == home:
+            continue
+        score, reason = score_url(key, text)
+        if score <= 0:
+            continue
+        if key not in best or score > best[key].score:
+            best[key] = Candidate(key, score, source, reason)
+    return sorted(best.values(), key=lambda c: (-c.score, len(c.url)))[:limit]
@@ -0,0 +1,247 @@
+"""
+Palette — deterministic brand colors from a site's stylesheets and logo.
+Colors declared in CSS (weighted by the property they style) and pixels of the
+logo/favicon are pooled, converted to CIELAB, and clustered so near-identical
+shades merge the way a viewer would merge them. Primary is the heaviest
+chromatic cluster, accent the strongest clearly different one, secondary the
+next heaviest (neutrals allowed). The same inputs always give the same palette.
+
+numpy (vectorized k-means) and Pillow (image decoding) are optional: without
+numpy a greedy perceptual merge is used, without Pillow only CSS is read.
+"""
+
+import io
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+MAX_CLUSTERS = 6
+MERGE_DELTA_E = 15.0        # CIE76 distance below which two colors read as the same
+MIN_CHROMA = 12.0           # below this a color is a neutral (white/grey/black/beige)
+LOGO_SHARE = 0.5            # share of total weight given to logo pixels when both sources exist
+IMAGE_SIZE = 48             # logos are downsampled to this many pixels per side
+HINT_WEIGHT = 5.0           # weight of an explicitly declared brand color (same as a --brand-* variable)
+
+_HEX = re.compile(r"#([0-9a-fA-F]{8}|[0-9a-fA-F]{6}|[0-9a-fA-F]{3})\b")
+_RGB = re.compile(r"rgba?\(\s*(\d{1,3})[\s,]+(\d{1,3})[\s,]+(\d{1,3})(?:[\s,/]+([\d.]+%?))?\s*\)")
+_DECLARATION = re.compile(r"([\w-]+)\s*:\s*([^;{}]+)")
+
+
+@dataclass
+class Palette:
+    primary: str = ""
+    secondary: str = ""
+    accent: str = ""
+    clusters: list = field(default_factory=list)    # [(hex, share of weight)], heaviest first
+    sources: dict = field(default_factory=dict)     # {"css": n colors, "images": n images}
+
+    def as_fields(self) -> dict:
+        """``color_primary/secondary/accent`` for the roles that were found."""
+        return {f"color_{role}": value for role, value in
+                (("primary", self.primary), ("secondary", self.secondary), ("accent", self.accent)) if value}
+
+
+# ---------------------------------------------------------------------------
+# COLOR SPACE
+# ---------------------------------------------------------------------------
+def _hex_to_rgb(value: str) -> tuple[int, int, int]:
+    value = value.lstrip("#")
+    if len(value) == 3:
+        value = "".join(c * 2 for c in value)
+    return int(value[0:2], 16), int(value[2:4], 16), int(value[4:6], 16)
+
+
+def _rgb_to_hex(rgb) -> str:
+    return "#{:02x}{:02x}{:02x}".format(*(int(c) for c in rgb))
+
+
+def _lab(rgb) -> tuple[float, float, float]:
+    """sRGB (0-255) → CIELAB (D65)."""
+    linear = [((c / 255 + 0.055) / 1.055) ** 2.4 if c / 255 > 0.04045 else c / 255 / 12.92 for c in rgb]
+    x = (0.4124564 * linear[0] + 0.3575761 * linear[1] + 0.1804375 * linear[2]) / 0.95047
+    y = 0.2126729 * linear[0] + 0.7151522 * linear[1] + 0.0721750 * linear[2]
+    z = (0.0193339 * linear[0] + 0.1191920 * linear[1] + 0.9503041 * linear[2]) / 1.08883
+    fx, fy, fz = (t ** (1 / 3) if t > 0.008856 else 7.787 * t + 16 / 116 for t in (x, y, z))
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+
+def _lab_array(rgb):
+    """Vectorized ``_lab`` for an (N, 3) uint8 array."""
+    c = rgb.astype(np.float64) / 255
+    linear = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    m = np.array([[0.4124564, 0.3575761, 0.1804375],
+                  [0.2126729, 0.7151522, 0.0721750],
+                  [0.0193339, 0.1191920, 0.9503041]])
+    xyz = linear @ m.T / np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16 / 116)
+    return np.stack([116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]), 200 * (f[:, 1] - f[:, 2])], axis=1)
+
+
+def _delta_e(a, b) -> float:
+    return math.dist(a, b)
+
+
+def _chroma(lab) -> float:
+    return math.hypot(lab[1], lab[2])
+
+
+# ---------------------------------------------------------------------------
+# SOURCES
+# ---------------------------------------------------------------------------
+def _property_weight(prop: str) -> float:
+    prop = prop.lower()
+    if prop.startswith("--"):
+        return 5.0 if re.search(r"brand|primary|secondary|accent", prop) else 1.0
+    if prop.startswith("background"):
+        return 2.0
+    if prop == "color":
+        return 1.5
+    if "shadow" in prop:
+        return 0.3
+    return 1.0
+
+
+def css_colors(css_text: str) -> Counter:
+    """``{hex: weight}`` for opaque colors declared in a stylesheet."""
+    weights = Counter()
+    for prop, value in _DECLARATION.findall(css_text):
+        weight = _property_weight(prop)
+        for match in _HEX.finditer(value):
+            raw = match.group(1)
+            if len(raw) == 8 and int(raw[6:8], 16) < 128:
+                continue
+            weights[_rgb_to_hex(_hex_to_rgb(raw[:6] if len(raw) == 8 else raw))] += weight
+        for r, g, b, alpha in _RGB.findall(value):
+            if alpha and (float(alpha.rstrip("%")) / (100 if alpha.endswith("%") else 1)) < 0.5:
+                continue
+            weights[_rgb_to_hex((min(255, int(r)), min(255, int(g)), min(255, int(b))))] += weight
+    return weights
+
+
+def image_colors(data: bytes) -> Counter:
+    """``{hex: pixel count}`` of the opaque pixels of a downsampled image; empty without Pillow."""
+    if not HAS_PIL or not data:
+        return Counter()
+    try:
+        image = Image.open(io.BytesIO(data)).convert("RGBA")
+        image.thumbnail((IMAGE_SIZE, IMAGE_SIZE))
+    except Exception:
+        return Counter()
+    # 4-bit buckets per channel so anti-aliasing does not split colors; each
+    # bucket is reported as its most common real pixel value
+    buckets = {}
+    for count, (r, g, b, a) in image.getcolors(IMAGE_SIZE * IMAGE_SIZE) or []:
+        if a >= 128:
+            buckets.setdefault((r >> 4, g >> 4, b >> 4), Counter())[(r, g, b)] += count
+    return Counter({_rgb_to_hex(c.most_common(1)[0][0]): sum(c.values()) for c in buckets.values()})
+
+
+# ---------------------------------------------------------------------------
+# CLUSTERING
+# ---------------------------------------------------------------------------
+def _cluster_numpy(colors: list[str], weights: list[float], k: int) -> list[tuple[str, float]]:
+    rgb = np.array([_hex_to_rgb(c) for c in colors], dtype=np.uint8)
+    lab = _lab_array(rgb)
+    w = np.asarray(weights, dtype=np.float64)
+
+    # Deterministic farthest-point seeding from the heaviest color
+    centers = [lab[int(np.argmax(w))]]
+    for _ in range(1, k):
+        d = np.min(np.linalg.norm(lab[:, None, :] - np.array(centers)[None, :, :], axis=2), axis=1)
+        if d.max() < MERGE_DELTA_E:
+            break
+        centers.append(lab[int(np.argmax(w * d ** 2))])
+    centers = np.array(centers)
+
+    for _ in range(10):
+        assign = np.argmin(np.linalg.norm(lab[:, None, :] - centers[None, :, :], axis=2), axis=1)
+        totals = np.bincount(assign, weights=w, minlength=len(centers))
+        sums = np.stack([np.bincount(assign, weights=w * lab[:, i], minlength=len(centers)) for i in range(3)], axis=1)
+        updated = np.where(totals[:, None] > 0, sums / np.maximum(totals, 1e-12)[:, None], centers)
+        if np.allclose(updated, centers):
+            break
+        centers = updated
+
+    clusters = []
+    for i in range(len(centers)):
+        members = np.flatnonzero(assign == i)
+        if members.size:
+            # Represent each cluster by its heaviest real color, not the (possibly off-brand) mean
+            clusters.append((colors[int(members[np.argmax(w[members])])], float(w[members].sum())))
+    return clusters
+
+
+def _cluster_greedy(colors: list[str], weights: list[float], k: int) -> list[tuple[str, float]]:
+    clusters = []       # [hex, lab, weight]
+    for color, weight in sorted(zip(colors, weights), key=lambda cw: (-cw[1], cw[0])):
+        lab = _lab(_hex_to_rgb(color))
+        near = next((c for c in clusters if _delta_e(c[1], lab) < MERGE_DELTA_E), None)
+        if near:
+            near[2] += weight
+        else:
+            clusters.append([color, lab, weight])
+    return [(c[0], c[2]) for c in clusters]
+
+
+def cluster_colors(weighted: dict, k: int = MAX_CLUSTERS) -> list[tuple[str, float]]:
+    """Merge perceptually similar colors; returns ``[(hex, weight)]`` heaviest first."""
+    if not weighted:
+        return []
+    colors = sorted(weighted)
+    weights = [weighted[c] for c in colors]
+    clusters = _cluster_numpy(colors, weights, k) if HAS_NUMPY else _cluster_greedy(colors, weights, k)
+    return sorted(clusters, key=lambda c: (-c[1], c[0]))[:k]
+
+
+def extract_palette(stylesheets: list[str], images: list[bytes] = (), hints: list[str] = ()) -> Palette:
+    """Primary/secondary/accent from stylesheet text and logo/favicon bytes.
+
+    ``hints`` are colors the site declares explicitly (e.g. ``theme-color``);
+    they count like a brand custom property.
+    """
+    css = Counter()
+    for text in stylesheets:
+        css.update(css_colors(text))
+    for hint in hints:
+        if _HEX.fullmatch(hint or ""):
+            css[_rgb_to_hex(_hex_to_rgb(hint[1:7] if len(hint) == 9 else hint))] += HINT_WEIGHT
+    pixels = Counter()
+    for data in images:
+        pixels.update(image_colors(data))
+
+    pooled = Counter()
+    css_total, pixel_total = sum(css.values()), sum(pixels.values())
+    for source, total, share in ((css, css_total, 1 - LOGO_SHARE if pixel_total else 1.0),
+                                 (pixels, pixel_total, LOGO_SHARE if css_total else 1.0)):
+        for color, weight in source.items():
+            pooled[color] += share * weight / total
+    palette = Palette(sources={"css_colors": len(css), "images": sum(1 for d in images if d)})
+
+    clusters = cluster_colors(pooled)
+    if not clusters:
+        return palette
+    total = sum(w for _, w in clusters)
+    palette.clusters = [(c, round(w / total, 3)) for c, w in clusters]
+
+    labs = {c: _lab(_hex_to_rgb(c)) for c, _ in clusters}
+    chromatic = [(c, w) for c, w in clusters if _chroma(labs[c]) >= MIN_CHROMA and 15 <= labs[c][0] <= 95]
+    palette.primary = (chromatic or clusters)[0][0]
+    rest = [(c, w) for c, w in chromatic if c != palette.primary and w >= 0.05 * total]
+    if rest:
+        palette.accent = max(rest, key=lambda cw: (cw[1] * min(60.0, _delta_e(labs[cw[0]], labs[palette.primary])), cw[0]))[0]
+    palette.secondary = next((c for c, w in clusters
+                              if c not in (palette.primary, palette.accent) and w >= 0.03 * total), "")
+    return palette
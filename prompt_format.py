@@ -0,0 +1,109 @@
+"""
+Prompt Format — compact serialization of brand profiles and concepts for prompts.
+``json.dumps(profile, indent=2)`` spends much of a prompt on indentation,
+quoted nested keys, empty fields and ``\\u2014`` escapes. The compact form is
+one ``key: value`` line per field. Nested keys are flattened to short names and
+empty fields are dropped. Lists are joined with ``;``. Wizard option labels
+(product presence, text overlay) stay inline: each appears once per profile,
+so a code plus a legend would cost more than the label itself.
+
+    PROMPT_FORMAT=json streamlit run brand_narrative_app.py     # old indented JSON
+    python -m benchmarks.prompt_ab                              # token savings + output quality A/B
+"""
+
+import json
+import os
+import re
+
+FORMATS = ("compact", "json")
+PROMPT_FORMAT = os.environ.get("PROMPT_FORMAT", "compact")
+
+# Profile paths → compact keys, in prompt order; unknown paths keep their dotted name
+PROFILE_KEYS = {
+    "brand_name": "brand_name",
+    "website": "website",
+    "category": "category",
+    "description": "description",
+    "maturity_mode": "maturity_mode",
+    "identity.tagline": "tagline",
+    "identity.ethos": "ethos",
+    "identity.values": "values",
+    "identity.anti_positioning": "anti_positioning",
+    "identity.emotional_territory": "emotional_territory",
+    "identity.price_tier": "price_tier",
+    "audience.lifestyle": "audience",
+    "audience.adjacent_brands": "adjacent_brands",
+    "audience.primary_platform": "platform",
+    "personality": "personality",
+    "emotional_direction.desired_feeling": "feel_after",
+    "emotional_direction.rejected_feeling": "reject_feeling",
+    "emotional_direction.movie_scene": "movie_scene",
+    "visual_direction.styles": "visual_styles",
+    "visual_direction.color_palette": "colors",
+    "production.product_presence": "product",
+    "production.text_overlay": "text_overlay",
+    "production.audio_direction": "audio",
+    "production.duration": "duration",
+    "production.keyframes": "keyframes",
+}
+
+# Fields whose values are wizard option labels (benchmarks/prompt_ab reports their cost separately)
+ENUM_FIELDS = {"production.product_presence", "production.text_overlay"}
+
+
+def _flatten(value, prefix: str = "") -> dict:
+    """Dotted paths → leaf values; ``personality`` and the color palette stay whole (one line each)."""
+    if isinstance(value, dict) and prefix not in ("personality", "visual_direction.color_palette"):
+        out = {}
+        for key, child in value.items():
+            out.update(_flatten(child, f"{prefix}.{key}" if prefix else key))
+        return out
+    return {prefix: value}
+
+
+def _is_empty(value) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _text(value) -> str:
+    if isinstance(value, dict):
+        return ", ".join(f"{k} {_text(v)}" for k, v in value.items() if not _is_empty(v))
+    if isinstance(value, (list, tuple)):
+        return "; ".join(_text(v) for v in value if not _is_empty(v))
+    # One line per field: fold newlines so a value cannot fake a key
+    return re.sub(r"\s*\n\s*", " / ", str(value)).strip()
+
+
+def format_profile(profile: dict, style: str = None) -> str:
+    """The brand profile as prompt text: compact lines (default) or indented JSON."""
+    if (style or PROMPT_FORMAT) == "json":
+        return json.dumps(profile, indent=2)
+
+    flat = _flatten(profile)
+    ordered = [p for p in PROFILE_KEYS if p in flat] + [p for p in flat if p not in PROFILE_KEYS]
+    lines = []
+    for path in ordered:
+        value = flat[path]
+        if _is_empty(value):
+            continue
+        key = PROFILE_KEYS.get(path, path)
+        if path == "personality" and isinstance(value, dict):
+            text = "; ".join(str(v) for v in value.values() if not _is_empty(v))
+        else:
+            text = _text(value)
+        lines.append(f"{key}: {text}")
+    return "\n".join(lines)
+
+
+def format_concept(concept: dict, style: str = None) -> str:
+    """A narrative concept as prompt text: ``key: value`` lines without empty fields, or indented JSON."""
+    if (style or PROMPT_FORMAT) == "json":
+        return json.dumps(concept, indent=2)
+    return "\n".join(f"{key}: {_text(value)}" for key, value in concept.items() if not _is_empty(value))
+
+
+def format_json(value, style: str = None) -> str:
+    """Structured data the model must echo back as JSON (e.g. keyframes): minified, or indented JSON."""
+    if (style or PROMPT_FORMAT) == "json":
+        return json.dumps(value, indent=2)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
@@ -0,0 +1,243 @@
+"""
+Prompt Index — section-indexed view of ``brand_narrative_system_prompt.md``.
+The markdown is parsed once into a heading tree and re-parsed only when its
+mtime changes. Each generation stage gets a compiled system prompt that keeps
+the shared principles but includes only the active maturity mode, the active
+category's guidance, and the process steps that stage actually performs. The
+free-text OUTPUT FORMAT brief is always dropped — callers append their own JSON
+contract.
+
+    python prompt_index.py Jewelry AMPLIFICATION    # per-stage token report
+"""
+
+import os
+import re
+import sys
+import threading
+from dataclasses import dataclass, field
+
+PROMPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "brand_narrative_system_prompt.md")
+
+# Top-level sections sent to every stage, in document order
+SHARED_SECTIONS = ["CORE CREATIVE PHILOSOPHY", "ANTI-GENERIC FILTER", "CRITICAL REMINDERS"]
+
+# Process steps (keys under THE NARRATIVE GENERATION PROCESS) each stage performs
+STAGE_STEPS = {
+    "concepts": ["STEP 1", "STEP 2", "STEP 3"],
+    "storyboard": ["STEP 3", "STEP 4", "STEP 5", "STEP 6"],
+    "keyframe_repair": ["STEP 4", "STEP 5"],
+}
+
+# App categories without a guidance section of their own
+CATEGORY_ALIASES = {
+    "Shoes": "Apparel",
+    "Beverages & Tobacco": "Food & Beverages",
+    "Food": "Food & Beverages",
+    "Home": "Home & Furniture",
+    "Furniture": "Home & Furniture",
+    "Health Care": "Personal Care / Health Care",
+    "Personal Care": "Personal Care / Health Care",
+}
+
+
+@dataclass
+class Section:
+    level: int
+    title: str
+    body: str = ""                  # text between this heading and its first child heading
+    children: list = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        """Short lookup key: "STEP 3: Narrative Arc…" → "STEP 3", "DISCOVERY MODE (Low…)" → "DISCOVERY MODE"."""
+        return self.title.split(":")[0].split(" (")[0].strip()
+
+    def child(self, key: str):
+        return next((c for c in self.children if c.key == key or c.title == key), None)
+
+    def render(self, include_children: bool = True) -> str:
+        parts = [f"{'#' * self.level} {self.title}\n{self.body}".rstrip()]
+        if include_children:
+            parts.extend(c.render() for c in self.children)
+        return "\n\n".join(parts)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) — good enough for relative savings."""
+    return (len(text) + 3) // 4
+
+
+def parse_sections(text: str) -> tuple[str, list[Section]]:
+    """Split markdown into (preamble, top-level sections). Headings inside code fences are ignored."""
+    root = Section(level=0, title="")
+    stack = [root]
+    lines, in_fence = [], False
+
+    def flush():
+        stack[-1].body = "\n".join(lines).strip("\n")
+        lines.clear()
+
+    for line in text.splitlines():
+        if line.startswith("```"):
+            in_fence = not in_fence
+        heading = None if in_fence else re.match(r"^(#{2,6})\s+(.+?)\s*$", line)
+        if not heading:
+            lines.append(line)
+            continue
+        flush()
+        section = Section(level=len(heading.group(1)), title=heading.group(2))
+        while stack[-1].level >= section.level:
+            stack.pop()
+        stack[-1].children.append(section)
+        stack.append(section)
+    flush()
+
+    # Horizontal rules separate top-level sections in the source; they are re-added on render
+    for section in root.children:
+        section.body = re.sub(r"\n*^---\s*$\n*", "\n", section.body, flags=re.MULTILINE).strip("\n")
+        _strip_trailing_rule(section)
+    return _strip_rule(root.body), root.children
+
+
+def _strip_rule(text: str) -> str:
+    return re.sub(r"\n*^---\s*\Z", "", text.strip(), flags=re.MULTILINE).strip()
+
+
+def _strip_trailing_rule(section: Section):
+    section.body = _strip_rule(section.body)
+    for child in section.children:
+        _strip_trailing_rule(child)
+
+
+class PromptIndex:
+    """Parsed system prompt. ``version`` changes whenever the file is re-parsed."""
+
+    def __init__(self, text: str, version: float = 0.0):
+        self.full_text = text
+        self.version = version
+        self.preamble, self.sections = parse_sections(text)
+
+    def section(self, key: str) -> Section | None:
+        return next((s for s in self.sections if s.key == key or s.title == key), None)
+
+    def category_section(self, category: str) -> Section | None:
+        guidance = self.section("CONTEXT-SPECIFIC GUIDANCE BY CATEGORY")
+        if not guidance or not category:
+            return None
+        wanted = CATEGORY_ALIASES.get(category, category)
+        exact = guidance.child(wanted)
+        if exact:
+            return exact
+        # Fall back to word overlap ("Luggage" → "Luggage, Wallets & Handbags")
+        words = set(re.findall(r"[a-z]+", wanted.lower()))
+        best = max(guidance.children, key=lambda c: len(words & set(re.findall(r"[a-z]+", c.title.lower()))), default=None)
+        if best and words & set(re.findall(r"[a-z]+", best.title.lower())):
+            return best
+        return None
+
+    def compile(self, stage: str, category: str = "", maturity_mode: str = "") -> str:
+        """Build the system prompt for one stage of one brand."""
+        if stage not in STAGE_STEPS:
+            raise ValueError(f"Unknown prompt stage: {stage}")
+        parts = [self.preamble]
+
+        philosophy = self.section("CORE CREATIVE PHILOSOPHY")
+        if philosophy:
+            parts.append(philosophy.render())
+
+        maturity = self.section("BRAND MATURITY CLASSIFICATION")
+        mode = maturity.child(f"{maturity_mode.upper()} MODE") if maturity and maturity_mode else None
+        if mode:
+            parts.append(
+                f"## BRAND MATURITY MODE\n\nThis brand has already been classified as {maturity_mode.upper()} MODE "
+                f"from the data density of its profile. Apply this mode's behavior.\n\n{mode.render()}"
+            )
+        elif maturity:
+            parts.append(maturity.render())
+
+        process = self.section("THE NARRATIVE GENERATION PROCESS")
+        if process:
+            steps = [process.child(key) for key in STAGE_STEPS[stage]]
+            steps = [s for s in steps if s]
+            parts.append("\n\n".join(
+                [f"## THE NARRATIVE GENERATION PROCESS\n\nThe steps relevant to this task, in order:"]
+                + [s.render() for s in steps]
+            ))
+
+        for key in SHARED_SECTIONS[1:]:
+            section = self.section(key)
+            if section:
+                parts.append(section.render())
+
+        category_section = self.category_section(category)
+        if category_section:
+            guidance = self.section("CONTEXT-SPECIFIC GUIDANCE BY CATEGORY")
+            parts.append(f"## CATEGORY GUIDANCE\n\n{guidance.body}\n\n{category_section.render()}")
+
+        return "\n\n---\n\n".join(p for p in parts if p)
+
+    def savings(self, compiled: str) -> dict:
+        """Token size of ``compiled`` against sending the whole prompt file."""
+        full, lean = estimate_tokens(self.full_text), estimate_tokens(compiled)
+        return {
+            "full_tokens": full,
+            "compiled_tokens": lean,
+            "saved_tokens": full - lean,
+            "saved_pct": round(100 * (full - lean) / full, 1) if full else 0.0,
+        }
+
+    def token_report(self, stage: str, category: str = "", maturity_mode: str = "") -> dict:
+        return {"stage": stage, **self.savings(self.compile(stage, category, maturity_mode))}
+
+
+# ---------------------------------------------------------------------------
+# HOT-RELOADING SINGLETON
+# ---------------------------------------------------------------------------
+_state = {"index": None, "mtime": None}
+_lock = threading.Lock()
+
+
+def get_prompt_index(path: str = PROMPT_PATH) -> PromptIndex | None:
+    """The parsed prompt, re-parsed when the file's mtime changes; None if the file is missing."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return _state["index"]
+    if mtime != _state["mtime"]:
+        with _lock:
+            if mtime != _state["mtime"]:
+                with open(path, "r") as f:
+                    _state["index"] = PromptIndex(f.read(), version=mtime)
+                _state["mtime"] = mtime
+    return _state["index"]
+
+
+def compile_system_prompt(stage: str, category: str = "", maturity_mode: str = "") -> str | None:
+    """Compiled system prompt for a stage, or None if the prompt file is unavailable."""
+    index = get_prompt_index()
+    if index is None:
+        return None
+    return index.compile(stage, category, maturity_mode)
+
+
+def prompt_savings(system_prompt: str) -> dict | None:
+    """Token savings of a sent system prompt against the whole prompt file; None if the file is missing."""
+    index = get_prompt_index()
+    return index.savings(system_prompt) if index is not None else None
+
+
+def main():
+    category = sys.argv[1] if len(sys.argv) > 1 else "Jewelry"
+    mode = sys.argv[2] if len(sys.argv) > 2 else "AMPLIFICATION"
+    index = get_prompt_index()
+    if index is None:
+        print(f"Prompt file not found: {PROMPT_PATH}")
+        raise SystemExit(1)
+    print(f"category={category}  maturity_mode={mode}")
+    for stage in STAGE_STEPS:
+        r = index.token_report(stage, category, mode)
+        print(f"{stage:<16} {r['compiled_tokens']:>6} / {r['full_tokens']:>6} tokens   saved {r['saved_tokens']:>6} ({r['saved_pct']}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Rerun Profiler — where a Streamlit script run spends its time.
+While a rerun executes, a sampling thread reads the script thread's stack
+every ``RERUN_PROFILE_INTERVAL_MS``. Each sample is weighted by the time since
+the previous one and recorded three ways:
+
+- sections: the innermost ``step_*`` / ``render_*`` function on the stack, else
+  ``main``, else ``<module>`` (CSS injection and session setup). Sections add up
+  to the sampled part of the rerun's wall time.
+- functions: inclusive time of every app function (``build_brand_profile``,
+  ``save_artifact``, ...)
+- stacks: folded call stacks from the script's ``<module>`` frame down. Library
+  frames keep their module name, e.g. ``json.encoder:JSONEncoder.iterencode``.
+
+The sampler needs the GIL to read a stack. While the script thread is busy in
+Python, samples therefore land about once per interpreter switch interval
+(5 ms), even at a shorter ``RERUN_PROFILE_INTERVAL_MS``. Short reruns get only
+a few samples each, so read the buffered reruns together.
+
+The last ``RERUN_PROFILE_KEEP`` reruns (all sessions) are kept in a ring
+buffer. ``to_folded`` exports them in the folded-stack format that
+flamegraph.pl, speedscope (https://www.speedscope.app) and inferno read.
+
+    RERUN_PROFILE=1 streamlit run brand_narrative_app.py    # every rerun, every session
+    python rerun_profiler.py reruns.folded                  # top frames of an exported profile
+
+Without ``RERUN_PROFILE``, only sessions that turn on the sidebar's "Profile
+reruns" toggle are sampled. For every other rerun, ``begin_rerun`` returns
+None and ``end_rerun`` ignores it: no thread and no tracing hook.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+
+RERUN_PROFILE = os.environ.get("RERUN_PROFILE", "") not in ("", "0")
+RERUN_PROFILE_KEEP = int(os.environ.get("RERUN_PROFILE_KEEP", "20"))
+RERUN_PROFILE_INTERVAL_MS = float(os.environ.get("RERUN_PROFILE_INTERVAL_MS", "2"))
+
+SECTION_PREFIXES = ("step_", "render_")
+
+
+@dataclass
+class RerunProfile:
+    run_id: int
+    session: str
+    step: int | None
+    started: float                  # wall-clock start (time.time)
+    wall_s: float
+    samples: int
+    sections: dict = field(default_factory=dict)    # step_*/render_*/main/<module> → seconds
+    functions: dict = field(default_factory=dict)   # app function → inclusive seconds
+    stacks: dict = field(default_factory=dict)      # "a;b;c" → seconds
+
+
+class _Sampler(threading.Thread):
+    """Samples one thread's stack until ``stop``; frames above the script's ``<module>`` are dropped."""
+
+    def __init__(self, thread_id: int, script_path: str, interval_s: float):
+        super().__init__(name="rerun-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.script_path = script_path
+        self.interval_s = interval_s
+        self.started = time.time()
+        self.started_perf = time.perf_counter()
+        self.samples = 0
+        self.sections, self.functions, self.stacks = Counter(), Counter(), Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        last = self.started_perf
+        while not self._stop_event.wait(self.interval_s):
+            now = time.perf_counter()
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self._record(frame, now - last)
+            last = now
+            del frame
+
+    def _record(self, frame, weight: float):
+        codes = []
+        while frame is not None:
+            codes.append((frame.f_code, frame.f_globals.get("__name__", "")))
+            frame = frame.f_back
+        codes.reverse()
+        start = next((i for i, (code, _) in enumerate(codes) if code.co_filename == self.script_path), None)
+        if start is None:
+            # Between script runs, or Streamlit work outside the script
+            self.sections["(streamlit)"] += weight
+            return
+        names, app_names, section = [], set(), "<module>"
+        for code, module in codes[start:]:
+            if code.co_filename == self.script_path:
+                name = code.co_qualname
+                app_names.add(name)
+                if name.startswith(SECTION_PREFIXES) or (name == "main" and section == "<module>"):
+                    section = name
+            else:
+                name = f"{module}:{code.co_qualname}"
+            names.append(name)
+        self.samples += 1
+        self.sections[section] += weight
+        self.functions.update(dict.fromkeys(app_names, weight))
+        self.stacks[";".join(names)] += weight
+
+    def stop(self) -> float:
+        self._stop_event.set()
+        self.join()
+        return time.perf_counter() - self.started_perf
+
+
+_buffer = deque(maxlen=RERUN_PROFILE_KEEP)
+_buffer_lock = threading.Lock()
+_run_ids = {"next": 1}
+
+
+def begin_rerun(enabled: bool, script_path: str) -> _Sampler | None:
+    """Start sampling the calling (script) thread, or return None when profiling is off."""
+    if not enabled:
+        return None
+    sampler = _Sampler(threading.get_ident(), script_path, RERUN_PROFILE_INTERVAL_MS / 1000)
+    sampler.start()
+    return sampler
+
+
+def end_rerun(sampler: _Sampler | None, session: str = "", step: int | None = None) -> RerunProfile | None:
+    """Stop ``sampler`` and keep its profile in the ring buffer."""
+    if sampler is None:
+        return None
+    wall = sampler.stop()
+    with _buffer_lock:
+        run_id = _run_ids["next"]
+        _run_ids["next"] += 1
+        profile = RerunProfile(run_id, session, step, sampler.started, wall, sampler.samples,
+                               dict(sampler.sections), dict(sampler.functions), dict(sampler.stacks))
+        _buffer.append(profile)
+    return profile
+
+
+def recent_profiles(session: str | None = None) -> list[RerunProfile]:
+    """Buffered reruns, oldest first; only ``session``'s when given."""
+    with _buffer_lock:
+        return [p for p in _buffer if session is None or p.session == session]
+
+
+def section_report(profiles: list[RerunProfile]) -> list[dict]:
+    """Mean milliseconds and share of sampled time per section, slowest first."""
+    if not profiles:
+        return []
+    totals = Counter()
+    for profile in profiles:
+        totals.update(profile.sections)
+    sampled = sum(totals.values()) or 1
+    return [{"section": name, "mean_ms": round(1000 * seconds / len(profiles), 1),
+             "share": round(seconds / sampled, 3)}
+            for name, seconds in totals.most_common()]
+
+
+def to_folded(profiles: list[RerunProfile]) -> str:
+    """Folded stacks (``frame;frame;frame microseconds``) merged over ``profiles``."""
+    merged = Counter()
+    for profile in profiles:
+        merged.update(profile.stacks)
+    return "".join(f"{stack} {round(seconds * 1e6)}\n" for stack, seconds in sorted(merged.items()) if seconds > 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top frames of an exported rerun profile (folded stacks).")
+    parser.add_argument("path")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    inclusive, own = Counter(), Counter()
+    with open(args.path) as f:
+        for line in f:
+            stack, _, value = line.rstrip("\n").rpartition(" ")
+            frames = stack.split(";")
+            for frame in set(frames):
+                inclusive[frame] += int(value)
+            own[frames[-1]] += int(value)
+    total = sum(own.values()) or 1
+    print(f"{'inclusive ms':>12} {'self ms':>9} {'share':>6}  frame")
+    for frame, value in inclusive.most_common(args.top):
+        print(f"{value / 1000:>12.1f} {own[frame] / 1000:>9.1f} {100 * value / total:>5.1f}%  {frame}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Research — one shared research artifact per brand.
+"Research only" and "Research & Auto-Fill Everything" both read from the same
+artifact: the scraped homepage and about page, the web-search findings, and the
+structured identity the research call produced. Research runs once per brand
+per session; auto-fill only turns the artifact into a creative brief.
+"""
+
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from urllib.parse import urljoin
+
+from site_metadata import format_facts, join_values, prefill_fields
+
+# Fields of the structured identity; auto-fill copies these instead of regenerating them
+IDENTITY_FIELDS = (
+    "tagline", "ethos", "values", "anti_positioning", "emotional_territory",
+    "audience_description", "aesthetic_description", "price_tier", "confidence",
+)
+
+
+def research_key(brand_name: str, url: str, category: str) -> str:
+    """Identity of a research request; changing any wizard input invalidates the artifact."""
+    return "|".join(part.strip().lower().rstrip("/") for part in (brand_name or "", url or "", category or ""))
+
+
+@dataclass
+class ResearchArtifact:
+    brand_name: str
+    url: str
+    category: str
+    homepage_text: str = ""
+    about_text: str = ""
+    metadata: dict = field(default_factory=dict)    # site_metadata.extract_metadata() of the homepage
+    palette: dict = field(default_factory=dict)     # palette.Palette as a dict (primary/secondary/accent/...)
+    profile: dict | None = None                     # structured identity (IDENTITY_FIELDS + notable_info)
+    findings: list = field(default_factory=list)    # facts the web search surfaced, one per item
+    web_search: bool = True
+    search: dict | None = None                      # evidence.SearchDecision for the research call
+    created_at: float = field(default_factory=time.time)
+    duration_s: float = 0.0
+    content_hash: str = ""                          # research_cache.content_hash of the scraped pages
+    cache: dict | None = None                       # set when served from the research cache (status, age)
+
+    @property
+    def key(self) -> str:
+        return research_key(self.brand_name, self.url, self.category)
+
+    @property
+    def sources(self) -> list[str]:
+        """What the research read: the homepage, the story pages in ``about_text``, and web search if used."""
+        urls = [self.url] if self.homepage_text and self.url else []
+        urls += [urljoin(self.url, path) for path in re.findall(r"^\[(/[^\]\n]*)\]$", self.about_text, re.MULTILINE)]
+        return urls + (["web search"] if self.web_search and self.profile else [])
+
+    @property
+    def has_site_content(self) -> bool:
+        return len(self.homepage_text) > 100
+
+    def identity(self) -> dict:
+        """Non-empty identity fields, ready to merge into auto-fill output."""
+        profile = self.profile or {}
+        return {k: profile[k] for k in IDENTITY_FIELDS if profile.get(k) not in (None, "", [])}
+
+    def local_fields(self) -> dict:
+        """Wizard fields known without an LLM: metadata description/tagline, palette colors."""
+        fields = prefill_fields(self.metadata)
+        palette_colors = {f"color_{role}": self.palette[role] for role in ("primary", "secondary", "accent")
+                          if self.palette.get(role)}
+        if palette_colors:
+            # The measured palette replaces metadata's name-based color guesses
+            fields = {k: v for k, v in fields.items() if not k.startswith("color_")}
+            fields.update(palette_colors)
+        return fields
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ResearchArtifact":
+        known = {k: data[k] for k in cls.__dataclass_fields__ if k in data}
+        return cls(**known)
+
+
+def format_dossier(artifact: ResearchArtifact, homepage_chars: int = 3000, about_chars: int = 2000) -> str:
+    """Render the artifact as prompt context for the brief-filling call."""
+    parts = []
+    facts = format_facts(artifact.metadata)
+    if facts:
+        parts.append(facts)
+    if artifact.profile:
+        profile = {k: v for k, v in artifact.profile.items() if k != "findings"}
+        parts.append("=== STRUCTURED BRAND RESEARCH ===\n" + "\n".join(
+            f"{k}: {join_values(v)}" for k, v in profile.items() if v not in (None, "", [])
+        ))
+    if artifact.findings:
+        parts.append("=== WEB RESEARCH FINDINGS ===\n" + "\n".join(f"- {f}" for f in artifact.findings))
+    if artifact.has_site_content:
+        parts.append(f"=== HOMEPAGE CONTENT (excerpt) ===\n{artifact.homepage_text[:homepage_chars]}")
+        if artifact.about_text:
+            parts.append(f"=== ABOUT PAGE CONTENT (excerpt) ===\n{artifact.about_text[:about_chars]}")
+    return "\n\n".join(parts) if parts else "No research available — rely on the brand name, category and description only."
@@ -0,0 +1,238 @@
+"""
+Research Cache — brand research shared across sessions, users and processes.
+Completed research (the structured identity, its confidence, findings and
+sources) is stored under the brand's canonical domain. Brands without a URL
+are stored under the normalized brand name. Each entry keeps a hash of the
+scraped pages it was based on:
+
+- checked within the last ``RESEARCH_CACHE_TRUST_S``: served as-is (no scrape, no LLM)
+- older: the site is scraped again; same hash → served without the LLM call
+- a changed hash, ``refresh=True`` or an entry older than ``RESEARCH_CACHE_TTL_S``: full research
+
+Only research worth reusing is stored: an identity with no content, or one at
+``low`` confidence (the "brand not found" answer), is researched again next time.
+A hit only reads the entry file; it is rewritten when a revalidation confirms
+the site, which is also when ``hits`` is saved.
+
+Entries are JSON files in ``RESEARCH_CACHE_DIR``, so the Streamlit app, batch
+runs and the HTTP service share them. Set the variable to an empty string to
+turn the cache off.
+
+    python research_cache.py                    # list entries
+    python research_cache.py --drop example.com # forget one brand
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from research import IDENTITY_FIELDS, ResearchArtifact
+
+logger = logging.getLogger(__name__)
+
+RESEARCH_CACHE_DIR = os.environ.get("RESEARCH_CACHE_DIR", "research_cache")
+RESEARCH_CACHE_TTL_S = float(os.environ.get("RESEARCH_CACHE_TTL_S", str(7 * 24 * 3600)))
+RESEARCH_CACHE_TRUST_S = float(os.environ.get("RESEARCH_CACHE_TRUST_S", str(15 * 60)))
+
+_NAME_SUFFIXES = re.compile(r"\b(inc|llc|ltd|co|company|corp|gmbh|the)\b")
+
+
+def canonical_domain(url: str) -> str:
+    """``https://www.Example.com/shop?x=1`` → ``example.com``; non-default ports are kept."""
+    url = (url or "").strip()
+    if not url:
+        return ""
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    host = (parts.hostname or "").lower().rstrip(".")
+    host = re.sub(r"^(www\d*|m)\.", "", host)
+    return f"{host}:{parts.port}" if parts.port and parts.port not in (80, 443) else host
+
+
+def normalize_brand(name: str) -> str:
+    """``The Fixture Jewelry Co.`` → ``fixture jewelry``."""
+    text = re.sub(r"[^a-z0-9]+", " ", (name or "").lower())
+    return " ".join(_NAME_SUFFIXES.sub(" ", text).split())
+
+
+def cache_key(brand_name: str, url: str) -> str:
+    domain = canonical_domain(url)
+    return f"domain:{domain}" if domain else f"name:{normalize_brand(brand_name)}"
+
+
+def content_hash(artifact: ResearchArtifact) -> str:
+    """Hash of what the research call read from the site: page text and published metadata."""
+    digest = hashlib.sha256()
+    for part in (artifact.homepage_text, artifact.about_text, json.dumps(artifact.metadata, sort_keys=True)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def worth_caching(profile: dict | None) -> bool:
+    """False for an empty identity or a low-confidence one, so a miss is not served to every later session."""
+    if not profile or profile.get("confidence", "low") == "low":
+        return False
+    return any(profile.get(name) for name in IDENTITY_FIELDS if name != "confidence")
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    content_hash: str
+    stored_at: float          # when the research call ran
+    checked_at: float         # last time the site hash was confirmed (or stored)
+    hits: int
+    artifact: dict            # ResearchArtifact.to_dict()
+
+    @property
+    def confidence(self) -> str:
+        return (self.artifact.get("profile") or {}).get("confidence", "")
+
+    def age_s(self, now: float | None = None) -> float:
+        return (now or time.time()) - self.stored_at
+
+
+class ResearchCache:
+    """JSON-file cache of completed research; safe to share between threads and processes."""
+
+    def __init__(self, directory: str = RESEARCH_CACHE_DIR, ttl_s: float = RESEARCH_CACHE_TTL_S,
+                 trust_s: float = RESEARCH_CACHE_TRUST_S):
+        self.directory = directory
+        self.ttl_s = ttl_s
+        self.trust_s = trust_s
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + ".json")
+
+    def get(self, key: str) -> CacheEntry | None:
+        """The entry for ``key`` unless it is missing, unreadable or past its TTL (then it is deleted)."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = CacheEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        if entry.key != key:
+            return None
+        if entry.age_s() > self.ttl_s:
+            self.drop(key)
+            return None
+        return entry
+
+    def recent(self, key: str) -> ResearchArtifact | None:
+        """Research checked within the trust window, served without scraping."""
+        entry = self.get(key)
+        if entry is None or time.time() - entry.checked_at > self.trust_s:
+            return None
+        return self._serve(entry, "hit")
+
+    def revalidate(self, key: str, scraped: ResearchArtifact) -> ResearchArtifact | None:
+        """Stored research for a fresh scrape of an unchanged site, or None if the pages changed.
+
+        The fresh scrape's pages, metadata, palette and search decision are kept;
+        the identity and findings come from the cache.
+        """
+        entry = self.get(key)
+        if entry is None or entry.content_hash != content_hash(scraped):
+            return None
+        entry.checked_at = time.time()
+        cached = self._serve(entry, "revalidated")
+        self._write(entry)
+        scraped.profile, scraped.findings = cached.profile, cached.findings
+        scraped.content_hash, scraped.cache = cached.content_hash, cached.cache
+        return scraped
+
+    def put(self, key: str, artifact: ResearchArtifact):
+        if not self.enabled:
+            return
+        if not worth_caching(artifact.profile):
+            logger.info("not caching %s: research found no usable identity", key)
+            return
+        artifact.content_hash = content_hash(artifact)
+        artifact.cache = None
+        now = time.time()
+        self._write(CacheEntry(key, artifact.content_hash, now, now, 0, artifact.to_dict()))
+
+    def drop(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def entries(self) -> list[CacheEntry]:
+        if not self.enabled or not os.path.isdir(self.directory):
+            return []
+        out = []
+        for name in sorted(os.listdir(self.directory)):
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    out.append(CacheEntry(**json.load(f)))
+            except (OSError, ValueError, TypeError):
+                continue
+        return out
+
+    def _serve(self, entry: CacheEntry, status: str) -> ResearchArtifact:
+        entry.hits += 1
+        artifact = ResearchArtifact.from_dict(entry.artifact)
+        artifact.duration_s = 0.0
+        artifact.cache = {"status": status, "key": entry.key, "stored_at": entry.stored_at,
+                          "age_s": round(entry.age_s(), 1), "hits": entry.hits}
+        return artifact
+
+    def _write(self, entry: CacheEntry):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(entry.key)
+        with self._lock:
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(entry.__dict__, f)
+            os.replace(tmp, path)
+
+
+_cache = {"cache": None}
+_cache_lock = threading.Lock()
+
+
+def get_research_cache() -> ResearchCache:
+    """The process-wide cache over ``RESEARCH_CACHE_DIR``."""
+    with _cache_lock:
+        if _cache["cache"] is None:
+            _cache["cache"] = ResearchCache()
+        return _cache["cache"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List or drop shared brand research.")
+    parser.add_argument("--drop", metavar="DOMAIN_OR_NAME", help="forget the research for a domain or brand name")
+    args = parser.parse_args()
+
+    cache = get_research_cache()
+    if args.drop:
+        key = cache_key(args.drop, args.drop if "." in args.drop else "")
+        cache.drop(key)
+        print(f"dropped {key}")
+        return
+    now = time.time()
+    for entry in cache.entries():
+        sources = ResearchArtifact.from_dict(entry.artifact).sources
+        print(f"{entry.key:<40} {entry.confidence or '?':<7} age {entry.age_s(now) / 3600:6.1f}h  "
+              f"checked {(now - entry.checked_at) / 60:6.1f}m ago  hits {entry.hits:<4} "
+              f"hash {entry.content_hash[:10]}  sources {len(sources)}")
+
+
+if __name__ == "__main__":
+    main()
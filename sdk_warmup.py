@@ -0,0 +1,200 @@
+"""
+SDK Warm-up — pay the first-call costs before the first click.
+The first LLM call in a fresh process imports ``anthropic``, ``openai`` or
+``google.genai`` inside the adapter and builds the SDK client. It then
+resolves the provider host and opens a TLS connection, and the anti-generic
+screen parses the system prompt. Every deploy and autoscale event hits these
+costs. With ``SDK_WARMUP`` set, a daemon thread does this work at startup:
+
+- parse and index the system prompt; compile each stage's prompt and the red-flag rules
+- import each configured SDK and build a client, so lazily loaded resources are imported too
+- resolve the provider endpoint
+- open a connection in the shared pool the adapters use (Anthropic, OpenAI)
+
+Nothing waits for it. A call made before it finishes simply does the
+remaining work itself. Idle pooled connections are kept for
+``SDK_KEEPALIVE_S``, not httpx's 5 s, so the warmed connection (and any
+connection between wizard steps) is still open when the next call comes.
+
+    SDK_WARMUP=all streamlit run brand_narrative_app.py         # or "auto" (providers with a key in the env), or "Anthropic,OpenAI"
+    python -m benchmarks.cold_start --provider Anthropic        # cold vs warm first-call latency
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+from anti_generic import get_rules
+from prompt_index import STAGE_STEPS, compile_system_prompt, get_prompt_index
+
+logger = logging.getLogger(__name__)
+
+SDK_WARMUP = os.environ.get("SDK_WARMUP", "")                           # "", "auto", "all" or a provider list
+SDK_WARMUP_DELAY_S = float(os.environ.get("SDK_WARMUP_DELAY_S", "1"))   # let the first script run paint first
+SDK_KEEPALIVE_S = float(os.environ.get("SDK_KEEPALIVE_S", "60"))
+WARMUP_CONNECT_TIMEOUT_S = 5
+
+PROVIDERS = {
+    "Anthropic": {"modules": ["anthropic", "anthropic.types"], "endpoint": "https://api.anthropic.com",
+                  "key_env": "ANTHROPIC_API_KEY", "base_url_env": "ANTHROPIC_BASE_URL"},
+    "OpenAI": {"modules": ["openai", "openai.types.chat"], "endpoint": "https://api.openai.com",
+               "key_env": "OPENAI_API_KEY", "base_url_env": "OPENAI_BASE_URL"},
+    "Google": {"modules": ["google.genai", "google.genai.types"],
+               "endpoint": "https://generativelanguage.googleapis.com", "key_env": "GEMINI_API_KEY"},
+}
+
+
+def endpoint(provider: str) -> str:
+    """Where the SDK will connect: its base-URL override (e.g. a gateway) or the public API."""
+    spec = PROVIDERS[provider]
+    return os.environ.get(spec.get("base_url_env", "")) or spec["endpoint"]
+
+
+def configured_providers(setting: str = None) -> list[str]:
+    """Providers named by ``SDK_WARMUP``: ``auto`` = those with an API key in the environment."""
+    setting = (SDK_WARMUP if setting is None else setting).strip()
+    if setting.lower() in ("", "0", "off", "false", "no"):
+        return []
+    if setting.lower() in ("1", "all", "true", "yes"):
+        return list(PROVIDERS)
+    if setting.lower() == "auto":
+        return [p for p, spec in PROVIDERS.items() if os.environ.get(spec["key_env"])]
+    names = {p.lower(): p for p in PROVIDERS}
+    return [names[p.strip().lower()] for p in setting.split(",") if p.strip().lower() in names]
+
+
+# ---------------------------------------------------------------------------
+# SHARED CONNECTION POOLS
+# ---------------------------------------------------------------------------
+_http_clients = {}
+
+
+def http_client(provider: str):
+    """The httpx pool for ``provider`` on the running loop, shared by every key's SDK client; None if unsupported.
+
+    Uses the SDK's own default client (its timeouts, limits and redirects),
+    with idle connections kept for ``SDK_KEEPALIVE_S``.
+    """
+    key = (provider, id(asyncio.get_running_loop()))
+    if key not in _http_clients:
+        if provider not in ("Anthropic", "OpenAI"):
+            return None
+        import httpx
+        sdk = importlib.import_module(PROVIDERS[provider]["modules"][0])
+        _http_clients[key] = sdk.DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100, keepalive_expiry=SDK_KEEPALIVE_S))
+    return _http_clients[key]
+
+
+async def _connect(provider: str) -> int:
+    """Open (and leave pooled) a connection to the provider endpoint; returns the HTTP status."""
+    response = await http_client(provider).head(endpoint(provider), timeout=WARMUP_CONNECT_TIMEOUT_S)
+    return response.status_code
+
+
+# ---------------------------------------------------------------------------
+# WARM-UP STEPS
+# ---------------------------------------------------------------------------
+def _load_sdk(provider: str):
+    """Import the SDK and build a throwaway client, touching the resources the adapters call."""
+    for module in PROVIDERS[provider]["modules"]:
+        importlib.import_module(module)
+    if provider == "Anthropic":
+        import anthropic
+        anthropic.AsyncAnthropic(api_key="warm-up").messages
+    elif provider == "OpenAI":
+        import openai
+        client = openai.AsyncOpenAI(api_key="warm-up")
+        client.chat.completions, client.responses
+    elif provider == "Google":
+        from google import genai
+        genai.Client(api_key="warm-up").aio.models
+
+
+def _load_prompt():
+    get_prompt_index()
+    for stage in STAGE_STEPS:
+        compile_system_prompt(stage)
+    get_rules()
+
+
+def _resolve(provider: str):
+    parts = urlsplit(endpoint(provider))
+    socket.getaddrinfo(parts.hostname, parts.port or (443 if parts.scheme == "https" else 80), type=socket.SOCK_STREAM)
+
+
+def _step(report: dict, name: str, fn):
+    started = time.perf_counter()
+    try:
+        fn()
+        report["steps"][name] = round(time.perf_counter() - started, 3)
+    except Exception as e:
+        report["steps"][name] = round(time.perf_counter() - started, 3)
+        report["errors"][name] = f"{type(e).__name__}: {e}"[:200]
+
+
+def warm_up(providers: list[str]) -> dict:
+    """Run every warm-up step for ``providers`` in this thread; failures are recorded, never raised."""
+    from async_bridge import run_sync
+
+    report = {"providers": providers, "steps": {}, "errors": {}}
+    started = time.perf_counter()
+    _step(report, "prompt", _load_prompt)
+    for provider in providers:
+        _step(report, f"{provider}.import", lambda: _load_sdk(provider))
+        if f"{provider}.import" in report["errors"]:
+            continue
+        _step(report, f"{provider}.dns", lambda: _resolve(provider))
+        if provider in ("Anthropic", "OpenAI") and f"{provider}.dns" not in report["errors"]:
+            _step(report, f"{provider}.connect",
+                  lambda: run_sync(_connect(provider), timeout=WARMUP_CONNECT_TIMEOUT_S + 1))
+    report["total_s"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def format_report(report: dict) -> str:
+    parts = []
+    for name, seconds in report["steps"].items():
+        error = report["errors"].get(name)
+        parts.append(f"{name} {seconds * 1000:.0f} ms" + (f" (failed: {error})" if error else ""))
+    return " · ".join(parts) + f" — {report['total_s']:.2f}s total"
+
+
+_warmup = {"thread": None, "report": None}
+_warmup_lock = threading.Lock()
+
+
+def start_warmup(providers: list[str] | None = None, delay_s: float = SDK_WARMUP_DELAY_S) -> threading.Thread | None:
+    """Warm up once per process in a daemon thread; later calls return the same thread.
+
+    ``providers`` defaults to ``SDK_WARMUP``; with none configured, nothing starts.
+    """
+    with _warmup_lock:
+        if _warmup["thread"] is not None:
+            return _warmup["thread"]
+        providers = configured_providers() if providers is None else providers
+        if not providers:
+            return None
+
+        def run():
+            time.sleep(delay_s)
+            report = warm_up(providers)
+            _warmup["report"] = report
+            logger.info("%s", format_report(report))
+
+        _warmup["thread"] = threading.Thread(target=run, name="sdk-warmup", daemon=True)
+        _warmup["thread"].start()
+        return _warmup["thread"]
+
+
+def wait_warmup(timeout: float | None = None) -> dict | None:
+    """Block until the warm-up has finished (or ``timeout``); returns its report, or None."""
+    thread = _warmup["thread"]
+    if thread is not None:
+        thread.join(timeout)
+    return _warmup["report"]
@@ -0,0 +1,206 @@
+"""
+Site Metadata — deterministic brand facts from a page's HTML.
+Harvests what brand sites publish for machines before any of it is stripped
+for the LLM: ``application/ld+json`` Organization/Brand data, OpenGraph and
+description ``<meta>`` tags, ``theme-color``, and hex colors declared as CSS
+custom properties. The result prefills the brief locally (description,
+tagline, colors) and is passed to the LLM as high-confidence context.
+"""
+
+import json
+import re
+from html.parser import HTMLParser
+
+META_NAMES = ("description", "og:description", "og:title", "og:site_name", "og:image", "theme-color")
+JSON_LD_TYPES = {"Organization", "Brand", "Corporation", "OnlineStore", "Store", "LocalBusiness", "WebSite"}
+JSON_LD_FIELDS = ("name", "description", "slogan", "foundingDate", "logo", "sameAs", "founder")
+
+_CSS_VAR = re.compile(r"--([\w-]+)\s*:\s*(#(?:[0-9a-fA-F]{3}){1,2})\b")
+# CSS variable name hints → role; earlier roles win ties
+_COLOR_ROLES = (
+    ("primary", ("primary", "brand", "main")),
+    ("accent", ("accent", "highlight", "cta", "button")),
+    ("secondary", ("secondary", "alt")),
+)
+
+
+class _MetadataParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+        self.json_ld = []
+        self.css = []
+        self.stylesheets = []     # linked stylesheet hrefs
+        self.icons = []           # apple-touch-icon / icon hrefs, best first
+        self._capture = None      # "json_ld" | "css" while inside those elements
+        self._buffer = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "meta":
+            name = (attrs.get("name") or attrs.get("property") or "").lower()
+            if name in META_NAMES and attrs.get("content"):
+                self.meta.setdefault(name, attrs["content"].strip())
+        elif tag == "link" and attrs.get("href"):
+            rel = (attrs.get("rel") or "").lower().split()
+            if "stylesheet" in rel:
+                self.stylesheets.append(attrs["href"])
+            elif "apple-touch-icon" in rel:
+                self.icons.insert(0, attrs["href"])
+            elif "icon" in rel:
+                self.icons.append(attrs["href"])
+        elif tag == "script" and (attrs.get("type") or "").lower() == "application/ld+json":
+            self._capture, self._buffer = "json_ld", []
+        elif tag == "style":
+            self._capture, self._buffer = "css", []
+        if attrs.get("style") and "--" in attrs["style"]:
+            self.css.append(attrs["style"])
+
+    def handle_data(self, data):
+        if self._capture:
+            self._buffer.append(data)
+
+    def handle_endtag(self, tag):
+        if self._capture and tag in ("script", "style"):
+            text = "".join(self._buffer)
+            (self.json_ld if self._capture == "json_ld" else self.css).append(text)
+            self._capture = None
+
+
+def _json_ld_entities(blocks: list[str]) -> list[dict]:
+    entities = []
+    for block in blocks:
+        try:
+            data = json.loads(block.strip())
+        except (json.JSONDecodeError, ValueError):
+            continue
+        stack = data if isinstance(data, list) else [data]
+        while stack:
+            item = stack.pop(0)
+            if not isinstance(item, dict):
+                continue
+            stack.extend(item.get("@graph", []) if isinstance(item.get("@graph"), list) else [])
+            types = item.get("@type", [])
+            types = {types} if isinstance(types, str) else set(types)
+            if types & JSON_LD_TYPES:
+                entities.append(item)
+    # Organization/Brand before WebSite
+    return sorted(entities, key=lambda e: "WebSite" in str(e.get("@type")))
+
+
+def _flatten(value):
+    """A JSON-LD value as a string, or a flat list of strings for arrays."""
+    if isinstance(value, dict):
+        return _flatten(value.get("url") or value.get("@id") or value.get("name") or "")
+    if isinstance(value, list):
+        flat = []
+        for item in value:
+            item = _flatten(item)
+            flat.extend(item if isinstance(item, list) else [item] if item else [])
+        return flat
+    return "" if value is None else str(value)
+
+
+def join_values(value) -> str:
+    """Prompt text for a field value; nested lists are flattened and joined with commas."""
+    if isinstance(value, list):
+        return ", ".join(join_values(v) for v in value if v not in (None, "", []))
+    return str(value)
+
+
+def _css_colors(css_blocks: list[str]) -> dict:
+    """``{variable name: hex}`` for color custom properties, in declaration order."""
+    colors = {}
+    for block in css_blocks:
+        for name, value in _CSS_VAR.findall(block):
+            colors.setdefault(name.lower(), value.lower())
+    return colors
+
+
+def extract_metadata(html: str) -> dict:
+    """Harvest meta tags, JSON-LD brand data and CSS color variables from raw HTML."""
+    parser = _MetadataParser()
+    try:
+        parser.feed(html or "")
+        parser.close()
+    except Exception:
+        pass
+    metadata = dict(parser.meta)
+
+    json_ld = {}
+    for entity in _json_ld_entities(parser.json_ld):
+        for field in JSON_LD_FIELDS:
+            if field in entity and field not in json_ld:
+                value = _flatten(entity[field])
+                if value:
+                    json_ld[field] = value
+    if json_ld:
+        metadata["json_ld"] = json_ld
+
+    css_colors = _css_colors(parser.css)
+    if css_colors:
+        metadata["css_colors"] = css_colors
+    if parser.stylesheets:
+        metadata["stylesheets"] = parser.stylesheets
+    if parser.icons:
+        metadata["icons"] = parser.icons
+    return metadata
+
+
+def inline_css(html: str) -> list[str]:
+    """Contents of ``<style>`` blocks and ``style=""`` attributes."""
+    parser = _MetadataParser()
+    try:
+        parser.feed(html or "")
+        parser.close()
+    except Exception:
+        pass
+    return parser.css
+
+
+def brand_colors(metadata: dict) -> dict:
+    """Map primary/secondary/accent to hex colors from theme-color and named CSS variables."""
+    roles = {}
+    theme = (metadata.get("theme-color") or "").strip().lower()
+    if re.fullmatch(r"#(?:[0-9a-f]{3}){1,2}", theme):
+        roles["primary"] = theme
+    for name, value in (metadata.get("css_colors") or {}).items():
+        for role, hints in _COLOR_ROLES:
+            if role not in roles and value not in roles.values() and any(h in name for h in hints):
+                roles[role] = value
+                break
+    return roles
+
+
+def prefill_fields(metadata: dict) -> dict:
+    """Wizard fields that can be filled from metadata alone."""
+    json_ld = metadata.get("json_ld") or {}
+    fields = {}
+    description = json_ld.get("description") or metadata.get("description") or metadata.get("og:description")
+    if description:
+        fields["brand_description"] = description
+    slogan = json_ld.get("slogan")
+    if slogan:
+        fields["tagline"] = slogan[0] if isinstance(slogan, list) else slogan
+    for role, value in brand_colors(metadata).items():
+        fields[f"color_{role}"] = value
+    return fields
+
+
+def format_facts(metadata: dict) -> str:
+    """Metadata as a prompt block; empty string when nothing was harvested."""
+    lines = []
+    json_ld = metadata.get("json_ld") or {}
+    for field in JSON_LD_FIELDS:
+        if field in json_ld:
+            lines.append(f"{field}: {join_values(json_ld[field])}")
+    seen = {str(v) for v in json_ld.values()}
+    for name in META_NAMES:
+        if metadata.get(name) and name != "og:image" and metadata[name] not in seen:
+            lines.append(f"{name}: {metadata[name]}")
+    colors = brand_colors(metadata)
+    if colors:
+        lines.append("brand colors: " + ", ".join(f"{role} {value}" for role, value in colors.items()))
+    if not lines:
+        return ""
+    return "=== VERIFIED SITE METADATA (published by the brand — treat as fact) ===\n" + "\n".join(lines)
@@ -0,0 +1,241 @@
+"""
+Storyboard Format — the wire format the storyboard call is generated in.
+The full schema has the model write 5 keyframes and then 5 image prompts that
+restate each keyframe's scene, camera, lighting and the style suffix. It also
+writes 4 animation objects with long keys that repeat in every object.
+Output tokens are what make this call slow. The lean schema asks for each
+fact once, under short keys:
+
+- keyframes use short keys (``scene``, ``light``, ``comp``, ...)
+- image prompts are assembled locally from the keyframe fields and
+  ``style_suffix`` (``image_prompt``)
+- transitions drop their ``1→2`` label and emotional trajectory, which follow
+  from their position and the keyframe emotions
+
+``expand_storyboard`` turns either schema into the shape the UI, the export
+JSON and storyboard_pipeline.py read.
+
+    STORYBOARD_FORMAT=full streamlit run brand_narrative_app.py   # model writes the image prompts
+    python -m benchmarks.storyboard_wire                          # output tokens + latency, lean vs full
+"""
+
+import os
+import re
+
+FORMATS = ("lean", "full")
+STORYBOARD_FORMAT = os.environ.get("STORYBOARD_FORMAT", "lean")
+
+# Export keys → wire keys, in output order
+KEYFRAME_KEYS = {
+    "timestamp": "t",
+    "narrative_beat": "beat",
+    "scene_description": "scene",
+    "camera": "camera",
+    "lighting": "light",
+    "color_palette": "color",
+    "emotion": "emotion",
+    "text_overlay": "overlay",
+    "product_presence": "product",
+    "composition_notes": "comp",
+}
+TRANSITION_KEYS = {
+    "motion_type": "motion",
+    "camera_motion": "camera",
+    "subject_motion": "subject",
+    "pacing": "pace",
+    "visual_transition": "cut",
+    "audio_cue": "audio",
+}
+
+# Product/overlay values that mean "nothing in frame" ("None", "none — never shown", "n/a")
+_ABSENT = re.compile(r"(none|n/?a)\b|[-—]$", re.IGNORECASE)
+
+_WIRE_ONLY = {"style", "transitions", "audit", "notes"}
+
+_LEAN_KEYFRAME_FIELDS = ('"scene": "subject, action and setting, hyper-specific", "camera": "...", "light": "...", '
+                         '"color": "...", "emotion": "...", "overlay": "none", "product": "...", "comp": "..."')
+
+
+def _clean(value) -> str:
+    return re.sub(r"\s+", " ", str(value or "")).strip().rstrip(".,;")
+
+
+def _present(value) -> bool:
+    text = _clean(value)
+    return bool(text) and not _ABSENT.match(text)
+
+
+def image_prompt(keyframe: dict, style_suffix: str) -> str:
+    """The NanoBanana prompt for one keyframe: subject and setting, lighting and mood, camera and composition, style suffix.
+
+    Follows the STEP 5 structure of the system prompt. Empty/"none" product and
+    overlay fields are left out (describe what IS in the frame).
+    """
+    parts = [_clean(keyframe.get("scene_description"))]
+    if _present(keyframe.get("product_presence")):
+        parts.append(f"Product: {_clean(keyframe['product_presence'])}")
+    lighting = ", ".join(p for p in (_clean(keyframe.get("lighting")), _clean(keyframe.get("color_palette"))) if p)
+    if lighting:
+        parts.append(lighting)
+    if _clean(keyframe.get("emotion")):
+        parts.append(f"Mood: {_clean(keyframe['emotion'])}")
+    framing = ", ".join(p for p in (_clean(keyframe.get("camera")), _clean(keyframe.get("composition_notes"))) if p)
+    if framing:
+        parts.append(framing)
+    if _present(keyframe.get("text_overlay")):
+        parts.append(f'Visible text: "{_clean(keyframe["text_overlay"])}"')
+    parts.append(_clean(style_suffix))
+    return ". ".join(p for p in parts if p)
+
+
+def expand_keyframe(keyframe: dict) -> dict:
+    """Wire keys → export keys; a keyframe already in export keys comes back unchanged."""
+    wire_to_export = {wire: name for name, wire in KEYFRAME_KEYS.items()}
+    out = {}
+    for name in KEYFRAME_KEYS:
+        if name in keyframe:
+            out[name] = keyframe[name]
+        elif KEYFRAME_KEYS[name] in keyframe:
+            out[name] = keyframe[KEYFRAME_KEYS[name]]
+    out.update({k: v for k, v in keyframe.items() if k not in KEYFRAME_KEYS and k not in wire_to_export})
+    return out
+
+
+def lean_keyframe(keyframe: dict) -> dict:
+    return {KEYFRAME_KEYS.get(k, k): v for k, v in keyframe.items()}
+
+
+def wire_keyframes(keyframes: list, style: str = None) -> list:
+    """Keyframes as the model should see (and echo) them in ``style``."""
+    if (style or STORYBOARD_FORMAT) == "full":
+        return keyframes
+    return [lean_keyframe(kf) if isinstance(kf, dict) else kf for kf in keyframes]
+
+
+def _expand_transition(transition: dict, index: int, keyframes: list) -> dict:
+    values = {name: transition.get(name, transition.get(wire, "")) for name, wire in TRANSITION_KEYS.items()}
+    trajectory = transition.get("emotional_trajectory", "")
+    if not trajectory and index + 1 < len(keyframes):
+        trajectory = f"{keyframes[index].get('emotion', '')} → {keyframes[index + 1].get('emotion', '')}"
+    audio = values.pop("audio_cue")
+    return {"transition": transition.get("transition") or f"{index + 1}→{index + 2}", **values,
+            "emotional_trajectory": trajectory, "audio_cue": audio}
+
+
+def expand_storyboard(parsed):
+    """A parsed storyboard response in either schema → the export shape.
+
+    Missing image prompts are assembled from the keyframes; anything that is not
+    a storyboard dict is returned unchanged.
+    """
+    if not isinstance(parsed, dict) or not isinstance(parsed.get("keyframes"), list):
+        return parsed
+    suffix = parsed.get("style_suffix") or parsed.get("style") or ""
+    keyframes = [expand_keyframe(kf) if isinstance(kf, dict) else kf for kf in parsed["keyframes"]]
+    prompts = parsed.get("image_prompts")
+    if not isinstance(prompts, list) or not prompts:
+        prompts = [image_prompt(kf, suffix) if isinstance(kf, dict) else "" for kf in keyframes]
+    transitions = parsed.get("animation_prompts", parsed.get("transitions")) or []
+    audit = parsed.get("anti_generic_audit", parsed.get("audit"))
+    if isinstance(audit, dict) and "pass" in audit:
+        audit = {"all_passed": audit["pass"], **{k: v for k, v in audit.items() if k != "pass"}}
+
+    expanded = {
+        "style_suffix": suffix,
+        "keyframes": keyframes,
+        "image_prompts": prompts,
+        "animation_prompts": [_expand_transition(t, i, keyframes) if isinstance(t, dict) else t
+                              for i, t in enumerate(transitions)],
+        "anti_generic_audit": audit if audit is not None else {},
+        "creative_director_notes": parsed.get("creative_director_notes", parsed.get("notes", "")),
+    }
+    # Keys the model added on its own are kept
+    expanded.update({k: v for k, v in parsed.items() if k not in expanded and k not in _WIRE_ONLY})
+    return expanded
+
+
+def lean_storyboard(storyboard: dict) -> dict:
+    """The export shape → the lean wire schema (what a lean response looks like)."""
+    audit = storyboard.get("anti_generic_audit") or {}
+    return {
+        "style_suffix": storyboard.get("style_suffix", ""),
+        "keyframes": [lean_keyframe(kf) for kf in storyboard.get("keyframes") or []],
+        "transitions": [{wire: t.get(name, "") for name, wire in TRANSITION_KEYS.items()}
+                        for t in storyboard.get("animation_prompts") or []],
+        "audit": {"pass": audit.get("all_passed", True), "notes": audit.get("notes", "")},
+        "notes": storyboard.get("creative_director_notes", ""),
+    }
+
+
+def response_schema(style: str = None) -> tuple[str, str]:
+    """(what to produce, JSON contract) for the storyboard request in ``style``."""
+    if (style or STORYBOARD_FORMAT) == "full":
+        produce = """- 5 detailed keyframes with timestamps, scene descriptions, camera, lighting, color, emotion, composition
+- A style suffix for image generation consistency
+- 5 complete image generation prompts
+- 4 animation/transition prompts
+- Anti-generic audit results
+- Creative director notes"""
+        contract = """{
+  "style_suffix": "persistent style string for all keyframes",
+  "keyframes": [
+    {
+      "timestamp": "0s",
+      "narrative_beat": "HOOK",
+      "scene_description": "...",
+      "camera": "...",
+      "lighting": "...",
+      "color_palette": "...",
+      "emotion": "...",
+      "text_overlay": "none",
+      "product_presence": "...",
+      "composition_notes": "..."
+    }
+  ],
+  "image_prompts": ["prompt 1", "prompt 2", "prompt 3", "prompt 4", "prompt 5"],
+  "animation_prompts": [
+    {
+      "transition": "1→2",
+      "motion_type": "...",
+      "camera_motion": "...",
+      "subject_motion": "...",
+      "pacing": "...",
+      "visual_transition": "...",
+      "emotional_trajectory": "...",
+      "audio_cue": "..."
+    }
+  ],
+  "anti_generic_audit": {"all_passed": true, "notes": "..."},
+  "creative_director_notes": "..."
+}"""
+        return produce, contract
+
+    produce = """- 5 detailed keyframes with timestamps, scene descriptions, camera, lighting, color, emotion, composition
+- A style suffix for image generation consistency
+- 4 transitions, one per keyframe pair in order (1→2, 2→3, 3→4, 4→5)
+- Anti-generic audit results and creative director notes
+
+Do NOT write image prompts. Each image prompt is assembled from its keyframe as
+scene. product. light, color. Mood: emotion. camera, comp. style_suffix
+so "scene" must carry the hyper-specific subject, action and setting (identical
+subject and environment details across keyframes) and must not name the brand.
+Each transition's emotional trajectory is taken from the two keyframe emotions."""
+    contract = f"""{{
+  "style_suffix": "persistent style string for all keyframes",
+  "keyframes": [{{"t": "0s", "beat": "HOOK", {_LEAN_KEYFRAME_FIELDS}}}],
+  "transitions": [{{"motion": "camera, subject or both", "camera": "...", "subject": "...", "pace": "...", "cut": "...", "audio": "..."}}],
+  "audit": {{"pass": true, "notes": "..."}},
+  "notes": "creative director notes"
+}}"""
+    return produce, contract
+
+
+def repair_schema(style: str = None) -> tuple[str, str]:
+    """(image prompt rule, JSON contract) for the keyframe repair request in ``style``."""
+    if (style or STORYBOARD_FORMAT) == "full":
+        return "end every image prompt with the style suffix unchanged", """{
+  "keyframes": [{"position": 2, "timestamp": "...", "narrative_beat": "...", "scene_description": "...", "camera": "...", "lighting": "...", "color_palette": "...", "emotion": "...", "text_overlay": "...", "product_presence": "...", "composition_notes": "..."}],
+  "image_prompts": {"2": "full image prompt ending with the style suffix"}
+}"""
+    return ("do not write image prompts (they are assembled from each keyframe and the style suffix)",
+            f'{{"keyframes": [{{"position": 2, "t": "...", "beat": "...", {_LEAN_KEYFRAME_FIELDS}}}]}}')
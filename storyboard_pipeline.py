@@ -0,0 +1,369 @@
+"""
+Storyboard Pipeline — local executor for the NanoBanana Pro → Veo 3.1 stage.
+Turns a storyboard (or a full pipeline export) into a DAG of image and animation
+jobs and runs it with bounded concurrency, retries, and on-disk resumability.
+
+    python storyboard_pipeline.py roxanne_assoulin_narrative_pipeline.json --out pipeline_output
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+MANIFEST_NAME = "pipeline_manifest.json"
+
+
+# ---------------------------------------------------------------------------
+# JOB GRAPH
+# ---------------------------------------------------------------------------
+@dataclass
+class PipelineJob:
+    """A single unit of downstream work — one keyframe image or one transition clip."""
+    job_id: str
+    kind: str                       # "image" or "animation"
+    index: int
+    prompt: str | dict
+    deps: list = field(default_factory=list)
+
+    def fingerprint(self, upstream: list = ()) -> str:
+        """Stable hash of the job inputs; a changed prompt invalidates a resumed output.
+
+        ``upstream`` holds the dependencies' fingerprints, so a re-rendered keyframe
+        also invalidates the transitions that start or end on it.
+        """
+        payload = json.dumps({"kind": self.kind, "prompt": self.prompt, "deps": self.deps, "upstream": list(upstream)},
+                             sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _keyframe_job_id(n: int) -> str:
+    return f"keyframe_{n}"
+
+
+def build_storyboard_dag(storyboard: dict) -> list[PipelineJob]:
+    """Build the job graph: one image job per keyframe, one animation job per adjacent pair.
+
+    Accepts either a bare storyboard dict or the full pipeline export
+    (``{"storyboard": {...}, ...}``) produced by the Export tab.
+    """
+    if "storyboard" in storyboard and isinstance(storyboard["storyboard"], dict):
+        storyboard = storyboard["storyboard"]
+
+    image_prompts = storyboard.get("image_prompts") or []
+    animation_prompts = storyboard.get("animation_prompts") or []
+    if not image_prompts:
+        raise ValueError("Storyboard has no image_prompts — nothing to render.")
+
+    jobs = [
+        PipelineJob(job_id=_keyframe_job_id(i + 1), kind="image", index=i + 1, prompt=prompt)
+        for i, prompt in enumerate(image_prompts)
+    ]
+
+    # Transition N→N+1 needs both of its keyframes rendered before it can start
+    for i, anim in enumerate(animation_prompts[: max(0, len(image_prompts) - 1)]):
+        jobs.append(PipelineJob(
+            job_id=f"transition_{i + 1}_{i + 2}",
+            kind="animation",
+            index=i + 1,
+            prompt=anim,
+            deps=[_keyframe_job_id(i + 1), _keyframe_job_id(i + 2)],
+        ))
+    return jobs
+
+
+# ---------------------------------------------------------------------------
+# BACKENDS
+# ---------------------------------------------------------------------------
+class PipelineBackend:
+    """Interface for image/video generators. Implementations must be thread-safe."""
+
+    name = "base"
+
+    def generate_image(self, job: PipelineJob, out_dir: str) -> str:
+        """Render a keyframe image and return the output file path."""
+        raise NotImplementedError
+
+    def generate_animation(self, job: PipelineJob, start_frame: str, end_frame: str, out_dir: str) -> str:
+        """Render the clip between two keyframes and return the output file path."""
+        raise NotImplementedError
+
+
+def _write_png(path: str, width: int, height: int, top: tuple, bottom: tuple):
+    """Write a vertical-gradient RGB PNG using only the standard library."""
+    rows = []
+    for y in range(height):
+        t = y / max(1, height - 1)
+        px = bytes(int(top[c] + (bottom[c] - top[c]) * t) for c in range(3))
+        rows.append(b"\x00" + px * width)
+    raw = b"".join(rows)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw, 6)))
+        f.write(chunk(b"IEND", b""))
+
+
+def _prompt_colors(prompt) -> tuple[tuple, tuple]:
+    digest = hashlib.sha256(json.dumps(prompt, sort_keys=True).encode("utf-8")).digest()
+    return tuple(digest[0:3]), tuple(digest[3:6])
+
+
+class PlaceholderBackend(PipelineBackend):
+    """Offline stand-in: gradient PNG keyframes and JSON clip manifests.
+
+    ``image_latency`` / ``animation_latency`` simulate provider render time and
+    ``failure_rate`` injects transient errors so retries can be exercised.
+    """
+
+    name = "placeholder"
+
+    def __init__(self, image_latency: float = 0.0, animation_latency: float = 0.0,
+                 failure_rate: float = 0.0, size: tuple = (288, 512), seed: int = 0):
+        self.image_latency = image_latency
+        self.animation_latency = animation_latency
+        self.failure_rate = failure_rate
+        self.size = size
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _maybe_fail(self, job: PipelineJob):
+        with self._rng_lock:
+            roll = self._rng.random()
+        if roll < self.failure_rate:
+            raise RuntimeError(f"placeholder backend: injected failure for {job.job_id}")
+
+    def generate_image(self, job: PipelineJob, out_dir: str) -> str:
+        time.sleep(self.image_latency)
+        self._maybe_fail(job)
+        path = os.path.join(out_dir, f"{job.job_id}.png")
+        top, bottom = _prompt_colors(job.prompt)
+        _write_png(path, self.size[0], self.size[1], top, bottom)
+        return path
+
+    def generate_animation(self, job: PipelineJob, start_frame: str, end_frame: str, out_dir: str) -> str:
+        time.sleep(self.animation_latency)
+        self._maybe_fail(job)
+        path = os.path.join(out_dir, f"{job.job_id}.clip.json")
+        with open(path, "w") as f:
+            json.dump({
+                "backend": self.name,
+                "start_frame": os.path.basename(start_frame),
+                "end_frame": os.path.basename(end_frame),
+                "prompt": job.prompt,
+            }, f, indent=2)
+        return path
+
+
+PIPELINE_BACKENDS = {
+    "placeholder": PlaceholderBackend,
+}
+
+
+# ---------------------------------------------------------------------------
+# EXECUTOR
+# ---------------------------------------------------------------------------
+@dataclass
+class PipelineResult:
+    """Outcome of a pipeline run. ``jobs`` maps job_id → manifest entry."""
+    jobs: dict
+    wall_time: float
+    job_time_sum: float
+    critical_path: float
+
+    @property
+    def succeeded(self) -> bool:
+        return all(j["status"] in ("done", "cached") for j in self.jobs.values())
+
+    def summary(self) -> dict:
+        counts = {}
+        for j in self.jobs.values():
+            counts[j["status"]] = counts.get(j["status"], 0) + 1
+        return {
+            "status_counts": counts,
+            "wall_time_s": round(self.wall_time, 3),
+            "sum_of_job_times_s": round(self.job_time_sum, 3),
+            "critical_path_s": round(self.critical_path, 3),
+        }
+
+
+def _load_manifest(out_dir: str) -> dict:
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f).get("jobs", {})
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(out_dir: str, jobs: dict):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"jobs": jobs, "updated_at": time.time()}, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _critical_path(jobs: list[PipelineJob], durations: dict) -> float:
+    """Longest dependency chain through the DAG, weighted by measured job durations."""
+    finish = {}
+    for job in jobs:  # build_storyboard_dag emits jobs in topological order
+        start = max((finish.get(d, 0.0) for d in job.deps), default=0.0)
+        finish[job.job_id] = start + durations.get(job.job_id, 0.0)
+    return max(finish.values(), default=0.0)
+
+
+def run_pipeline(storyboard: dict, backend: PipelineBackend, out_dir: str, max_workers: int = 4,
+                 max_retries: int = 2, retry_backoff: float = 0.5, resume: bool = True,
+                 on_event=None) -> PipelineResult:
+    """Execute the storyboard DAG against ``backend``.
+
+    Jobs start as soon as their dependencies finish, so wall time tracks the
+    critical path rather than the sum of job times. Completed jobs are recorded
+    in ``pipeline_manifest.json``; with ``resume`` a re-run skips any job whose
+    output still exists and whose inputs are unchanged. ``on_event(job_id, status)``
+    is called from the coordinating thread on every state change.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = build_storyboard_dag(storyboard)
+    previous = _load_manifest(out_dir) if resume else {}
+
+    state = {}
+    for job in jobs:  # topological order, so dependencies are fingerprinted first
+        fingerprint = job.fingerprint([state[d]["fingerprint"] for d in job.deps])
+        prior = previous.get(job.job_id, {})
+        reusable = (
+            prior.get("status") in ("done", "cached")
+            and prior.get("fingerprint") == fingerprint
+            and prior.get("output") and os.path.exists(prior["output"])
+        )
+        state[job.job_id] = {
+            "kind": job.kind,
+            "fingerprint": fingerprint,
+            "status": "cached" if reusable else "pending",
+            "output": prior.get("output") if reusable else None,
+            "attempts": 0,
+            "duration_s": prior.get("duration_s", 0.0) if reusable else 0.0,
+            "error": None,
+        }
+
+    def emit(job_id: str):
+        if on_event:
+            on_event(job_id, state[job_id]["status"])
+
+    def execute(job: PipelineJob) -> tuple[str, float]:
+        last_error = None
+        for attempt in range(max_retries + 1):
+            state[job.job_id]["attempts"] = attempt + 1
+            started = time.perf_counter()
+            try:
+                if job.kind == "image":
+                    output = backend.generate_image(job, out_dir)
+                else:
+                    start_frame, end_frame = (state[d]["output"] for d in job.deps)
+                    output = backend.generate_animation(job, start_frame, end_frame, out_dir)
+                return output, time.perf_counter() - started
+            except Exception as e:
+                last_error = e
+                if attempt < max_retries:
+                    time.sleep(retry_backoff * (2 ** attempt))
+        raise last_error
+
+    def is_ready(job: PipelineJob) -> bool:
+        return state[job.job_id]["status"] == "pending" and all(
+            state[d]["status"] in ("done", "cached") for d in job.deps
+        )
+
+    def block_dependents(failed_id: str):
+        for job in jobs:
+            if failed_id in job.deps and state[job.job_id]["status"] == "pending":
+                state[job.job_id]["status"] = "blocked"
+                state[job.job_id]["error"] = f"dependency {failed_id} failed"
+                emit(job.job_id)
+                block_dependents(job.job_id)
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="pipeline") as pool:
+        in_flight = {}
+
+        def schedule():
+            for job in jobs:
+                if is_ready(job):
+                    state[job.job_id]["status"] = "running"
+                    emit(job.job_id)
+                    in_flight[pool.submit(execute, job)] = job.job_id
+
+        schedule()
+        while in_flight:
+            finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for fut in finished:
+                job_id = in_flight.pop(fut)
+                try:
+                    output, duration = fut.result()
+                    state[job_id].update(status="done", output=output, duration_s=round(duration, 4))
+                except Exception as e:
+                    state[job_id].update(status="failed", error=str(e))
+                    block_dependents(job_id)
+                emit(job_id)
+            _save_manifest(out_dir, state)
+            schedule()
+    wall_time = time.perf_counter() - wall_start
+
+    _save_manifest(out_dir, state)
+    ran = {jid: s["duration_s"] for jid, s in state.items() if s["status"] == "done"}
+    return PipelineResult(
+        jobs=state,
+        wall_time=wall_time,
+        job_time_sum=sum(ran.values()),
+        critical_path=_critical_path(jobs, ran),
+    )
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Run a storyboard export through the image → animation pipeline.")
+    parser.add_argument("export", help="Pipeline JSON downloaded from the app (or a bare storyboard JSON)")
+    parser.add_argument("--out", default="pipeline_output", help="Output directory (also holds the resume manifest)")
+    parser.add_argument("--backend", default="placeholder", choices=sorted(PIPELINE_BACKENDS))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--no-resume", action="store_true", help="Ignore the manifest and re-render everything")
+    parser.add_argument("--image-latency", type=float, default=0.0, help="Placeholder backend: seconds per image")
+    parser.add_argument("--animation-latency", type=float, default=0.0, help="Placeholder backend: seconds per clip")
+    args = parser.parse_args()
+
+    with open(args.export, "r") as f:
+        storyboard = json.load(f)
+
+    backend_cls = PIPELINE_BACKENDS[args.backend]
+    if backend_cls is PlaceholderBackend:
+        backend = PlaceholderBackend(image_latency=args.image_latency, animation_latency=args.animation_latency)
+    else:
+        backend = backend_cls()
+
+    result = run_pipeline(
+        storyboard, backend, args.out,
+        max_workers=args.workers, max_retries=args.retries, resume=not args.no_resume,
+        on_event=lambda job_id, status: print(f"  {job_id:<18} {status}"),
+    )
+    print(json.dumps(result.summary(), indent=2))
+    raise SystemExit(0 if result.succeeded else 1)
+
+
+if __name__ == "__main__":
+    main()
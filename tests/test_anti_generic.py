@@ -0,0 +1,70 @@
+import unittest
+
+from anti_generic import (
+    brand_mention,
+    compile_rules,
+    fails,
+    get_rules,
+    parse_red_flags,
+    screen_concept,
+    screen_keyframe,
+)
+
+PROMPT = """## ANTI-GENERIC FILTER
+
+### Narrative Red Flags
+- [ ] The opening is a slow establishing shot or fade-in (no hook)
+- [ ] The brand appears in the first half of the video (too early, breaks narrative)
+
+### Visual Red Flags
+- [ ] Overhead flat-lay compositions (overdone in lifestyle/fashion)
+- [ ] Something the lexicon has never heard of
+
+## NEXT SECTION
+"""
+
+
+class RuleCompilationTest(unittest.TestCase):
+    def test_checklist_items_are_parsed_per_section(self):
+        flags = parse_red_flags(PROMPT)
+        self.assertEqual([section for section, _ in flags], ["Narrative", "Narrative", "Visual", "Visual"])
+
+    def test_only_flags_with_a_lexicon_anchor_become_rules(self):
+        rules = compile_rules(PROMPT)
+        self.assertEqual([r.rule_id for r in rules],
+                         ["slow_establishing_shot", "brand_appears_in_the_first_half", "flat_lay"])
+
+    def test_shipped_prompt_compiles_every_lexicon_anchor(self):
+        rule_ids = {r.rule_id for r in get_rules()}
+        self.assertIn("desaturated_opening", rule_ids)
+        self.assertIn("gen_z_slang", rule_ids)
+
+
+class ScreeningTest(unittest.TestCase):
+    rules = compile_rules(PROMPT)
+
+    def test_concept_hits_and_fails(self):
+        hits = screen_concept({"title": "Stillness", "hook": "An overhead flat lay of the collection"}, self.rules)
+        self.assertEqual([h.rule_id for h in hits], ["flat_lay"])
+        self.assertTrue(fails(hits))
+        self.assertEqual(screen_concept({"title": "A kitchen argument about salt"}, self.rules), [])
+
+    def test_establishing_shot_only_flags_the_opening(self):
+        keyframe = {"scene_description": "An establishing shot of the harbour"}
+        self.assertTrue(screen_keyframe(keyframe, 1, rules=self.rules))
+        self.assertFalse(screen_keyframe(keyframe, 3, rules=self.rules))
+
+    def test_brand_in_the_first_half_is_flagged(self):
+        keyframe = {"scene_description": "A tote with the Away logo on a train"}
+        hits = screen_keyframe(keyframe, 2, brand_name="Away", rules=self.rules)
+        self.assertEqual([h.match for h in hits], ["Away"])
+        self.assertFalse(screen_keyframe(keyframe, 3, brand_name="Away", rules=self.rules))
+
+    def test_brand_mention_ignores_the_common_word(self):
+        self.assertEqual(brand_mention("She drives away from the station", "Away"), "")
+        self.assertEqual(brand_mention("A sign reading AWAY flickers", "Away"), "AWAY")
+        self.assertEqual(brand_mention("Nike shoes on a wet court", "nike"), "Nike")
+
+
+if __name__ == "__main__":
+    unittest.main()
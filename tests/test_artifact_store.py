@@ -0,0 +1,70 @@
+import os
+import unittest
+from unittest import mock
+
+import artifact_store
+from artifact_store import ArtifactMissing, ArtifactStore, resolve
+
+PAYLOAD = "x" * 1000
+
+
+class ArtifactStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = ArtifactStore(max_memory_bytes=2500, max_disk_bytes=100_000, max_owner_disk_bytes=2500)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_least_recently_used_spills_and_reloads(self):
+        refs = [self.store.put(PAYLOAD + str(i), "concepts", "a") for i in range(3)]
+        self.assertEqual(self.store.location(refs[0]), "disk")
+        self.assertEqual(self.store.location(refs[2]), "memory")
+        self.assertEqual(self.store.get(refs[0]), PAYLOAD + "0")
+        self.assertEqual(self.store.location(refs[0]), "memory")
+
+    def test_over_budget_session_evicts_only_its_own_artifacts(self):
+        other = self.store.put(PAYLOAD, "profile", "b")
+        self.store.put(PAYLOAD, "profile", "b")
+        for i in range(8):
+            self.store.put(PAYLOAD + str(i), "concepts", "a")
+        self.assertEqual(self.store.get(other), PAYLOAD)
+        self.assertGreater(self.store.stats()["evictions"], 0)
+
+    def test_evicted_ref_raises_instead_of_reading_as_none(self):
+        refs = [self.store.put(PAYLOAD + str(i), "concepts", "a") for i in range(8)]
+        self.assertEqual(self.store.location(refs[0]), "evicted")
+        with self.assertRaises(ArtifactMissing) as caught:
+            self.store.get(refs[0])
+        self.assertIs(caught.exception.ref, refs[0])
+
+    def test_release_owner_drops_memory_and_disk(self):
+        refs = [self.store.put(PAYLOAD + str(i), "concepts", "a") for i in range(3)]
+        kept = self.store.put(PAYLOAD, "profile", "b")
+        self.assertEqual(self.store.release_owner("a"), 3)
+        self.assertEqual([self.store.location(r) for r in refs], ["evicted"] * 3)
+        self.assertEqual(self.store.get(kept), PAYLOAD)
+        self.assertEqual(os.listdir(self.store.spill_dir), [])
+
+    def test_sweep_releases_sessions_reported_dead(self):
+        self.store.set_liveness(lambda owner: owner != "gone")
+        gone = self.store.put(PAYLOAD, "profile", "gone")
+        with mock.patch.object(artifact_store, "SWEEP_INTERVAL_S", 0):
+            self.store.put(PAYLOAD, "profile", "live")
+        self.assertEqual(self.store.location(gone), "evicted")
+        self.assertEqual(self.store.stats()["released"], 1)
+
+    def test_close_removes_temporary_spill_dir(self):
+        self.store.put(PAYLOAD, "a", "a")
+        self.store.put(PAYLOAD, "b", "a")
+        self.store.put(PAYLOAD, "c", "a")
+        self.store.close()
+        self.assertFalse(os.path.exists(self.store.spill_dir))
+
+    def test_resolve_passes_plain_values_through(self):
+        value = {"title": "inline"}
+        self.assertIs(resolve(value), value)
+        self.assertIsNone(resolve(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import unittest
+
+from async_bridge import gather_bounded, get_loop, run_sync
+
+request_id = contextvars.ContextVar("request_id", default="")
+
+
+class Interrupted(Exception):
+    pass
+
+
+class RunSyncTest(unittest.TestCase):
+    def test_result_and_caller_context(self):
+        async def read():
+            await asyncio.sleep(0)
+            return request_id.get()
+
+        token = request_id.set("r-1")
+        try:
+            self.assertEqual(run_sync(read()), "r-1")
+        finally:
+            request_id.reset(token)
+
+    def test_exceptions_propagate(self):
+        async def boom():
+            raise ValueError("provider said no")
+
+        with self.assertRaisesRegex(ValueError, "provider said no"):
+            run_sync(boom())
+
+    def _hanging(self):
+        cancelled = concurrent.futures.Future()
+
+        async def hang():
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.set_result(True)
+                raise
+
+        return hang(), cancelled
+
+    def test_timeout_cancels_the_task(self):
+        coro, cancelled = self._hanging()
+        with self.assertRaises(concurrent.futures.TimeoutError):
+            run_sync(coro, timeout=0.05)
+        self.assertTrue(cancelled.result(timeout=2))
+
+    def test_raising_poll_cancels_the_task(self):
+        coro, cancelled = self._hanging()
+        polls = []
+
+        def poll():
+            polls.append(1)
+            if len(polls) == 2:
+                raise Interrupted()
+
+        with self.assertRaises(Interrupted):
+            run_sync(coro, poll=poll, poll_interval=0.01)
+        self.assertTrue(cancelled.result(timeout=2))
+
+    def test_refuses_to_block_the_loop_thread(self):
+        async def inner():
+            return 1
+
+        async def outer():
+            coro = inner()
+            with self.assertRaises(RuntimeError):
+                run_sync(coro)
+            return True
+
+        self.assertTrue(asyncio.run_coroutine_threadsafe(outer(), get_loop()).result(timeout=2))
+
+
+class GatherBoundedTest(unittest.TestCase):
+    def test_limit_and_order(self):
+        running, peak = [0], [0]
+
+        async def job(n):
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.01 * (5 - n))
+            running[0] -= 1
+            return n
+
+        self.assertEqual(run_sync(gather_bounded([job(n) for n in range(5)], limit=2)), [0, 1, 2, 3, 4])
+        self.assertEqual(peak[0], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
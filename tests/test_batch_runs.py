@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import research_cache
+from batch_runs import BatchRun, LocalBatchBackend
+from research_cache import ResearchCache
+
+BRANDS = [
+    {"brand_name": "Fixture Jewelry Co", "brand_url": "", "brand_category": "Jewelry"},
+    {"brand_name": "Fixture Luggage", "brand_url": "", "brand_category": "Luggage"},
+]
+
+
+class CountingBackend(LocalBatchBackend):
+    def __init__(self, run_dir: str):
+        super().__init__(run_dir, delay_s=0)
+        self.submitted = []
+
+    def submit(self, requests):
+        self.submitted.append(requests[0].custom_id.split("-", 1)[0])
+        return super().submit(requests)
+
+
+class BatchRunTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.run_dir = os.path.join(self._dir.name, "run")
+        cache = ResearchCache(os.path.join(self._dir.name, "research_cache"))
+        patcher = mock.patch.dict(research_cache._cache, {"cache": cache})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_local_run_end_to_end(self):
+        run = BatchRun.create(self.run_dir, BRANDS, "Local", "fake-instant")
+        backend = CountingBackend(self.run_dir)
+        summary = run.run(backend, poll_interval=0)
+
+        self.assertEqual(summary["failed"], 0, summary["errors"])
+        self.assertEqual((summary["research"], summary["concepts"], summary["storyboard"]), (2, 2, 2))
+        self.assertEqual(backend.submitted, ["research", "concepts", "storyboard"])
+        self.assertEqual(len(os.listdir(os.path.join(self.run_dir, "results"))), 2)
+        brand = BatchRun.load(self.run_dir).manifest["brands"]["b00000"]
+        self.assertEqual(brand["profile"]["brand_name"], "Fixture Jewelry Co")
+        self.assertTrue(brand["storyboard"]["keyframes"])
+
+    def test_resume_polls_submitted_batches_instead_of_resubmitting(self):
+        run = BatchRun.create(self.run_dir, BRANDS, "Local", "fake-instant")
+        first = CountingBackend(self.run_dir)
+        run.run_phase("research", first, poll_interval=0)
+        # Interrupted after submitting concepts, before collecting them
+        concepts = run._build_requests("concepts", first.route_provider)
+        run.manifest["batches"]["concepts"] = {
+            "batch_id": first.submit(concepts), "custom_ids": [r.custom_id for r in concepts],
+            "model": concepts[0].model, "submitted_at": 0, "collected": False,
+        }
+        run.save()
+
+        resumed = CountingBackend(self.run_dir)
+        summary = BatchRun.load(self.run_dir).run(resumed, poll_interval=0)
+        self.assertEqual(resumed.submitted, ["storyboard"])
+        self.assertEqual(summary["storyboard"], 2)
+
+    def test_cached_research_skips_the_research_batch(self):
+        BatchRun.create(self.run_dir, BRANDS, "Local", "fake-instant").run(CountingBackend(self.run_dir), 0)
+
+        second_dir = os.path.join(self._dir.name, "second")
+        backend = CountingBackend(second_dir)
+        summary = BatchRun.create(second_dir, BRANDS, "Local", "fake-instant").run(backend, 0)
+        self.assertEqual(backend.submitted, ["concepts", "storyboard"])
+        self.assertEqual(summary["research"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from cassettes import Cassette, CassetteMiss, get_active_cassette, use_cassette
+
+
+class RecordCancelReplayTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, "session.jsonl")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _record_cancelled_call(self):
+        cassette = Cassette(self.path, mode="record")
+
+        async def live():
+            await asyncio.sleep(10)
+            return "never"
+
+        async def run():
+            task = asyncio.create_task(cassette.intercept_async("llm", {"prompt": "slow"}, live))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        return cassette
+
+    def test_cancelled_call_is_not_recorded(self):
+        cassette = self._record_cancelled_call()
+        self.assertEqual(cassette.recorded, 0)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "")
+
+    def test_replay_miss_raises_by_default(self):
+        self._record_cancelled_call()
+        replay = Cassette(self.path, mode="replay", latency="zero")
+        with self.assertRaises(CassetteMiss):
+            asyncio.run(replay.intercept_async("llm", {"prompt": "slow"}, self._offline))
+        self.assertEqual(replay.report()["misses"], 1)
+
+    def test_replay_miss_goes_live_only_when_opted_in(self):
+        self._record_cancelled_call()
+        replay = Cassette(self.path, mode="replay", latency="zero", live_fallback=True)
+        result = asyncio.run(replay.intercept_async("llm", {"prompt": "slow"}, self._offline))
+        self.assertEqual(result, "offline")
+        self.assertEqual(replay.report()["misses"], 1)
+
+    def test_errors_are_recorded_and_replayed(self):
+        cassette = Cassette(self.path, mode="record")
+
+        def live():
+            raise ValueError("rate limited")
+
+        with self.assertRaises(ValueError):
+            cassette.intercept("llm", {"prompt": "x"}, live)
+        replay = Cassette(self.path, mode="replay", latency="zero")
+        with self.assertRaisesRegex(RuntimeError, "rate limited"):
+            replay.intercept("llm", {"prompt": "x"}, lambda: "offline")
+
+    def test_malformed_entry_replays_as_miss(self):
+        cassette = Cassette(self.path, mode="record")
+        cassette.intercept("llm", {"prompt": "x"}, lambda: "ok")
+        with open(self.path) as f:
+            entry = json.loads(f.readline())
+        del entry["response"]
+        with open(self.path, "w") as f:
+            f.write(json.dumps(entry) + "\n")
+
+        replay = Cassette(self.path, mode="replay", latency="zero")
+        with self.assertRaises(CassetteMiss):
+            replay.intercept("llm", {"prompt": "x"}, lambda: "offline")
+        self.assertEqual(replay.hits, 0)
+
+    def test_identical_requests_replay_in_recorded_order(self):
+        cassette = Cassette(self.path, mode="record")
+        for answer in ("first", "second"):
+            cassette.intercept("llm", {"prompt": "x"}, lambda: answer)
+        replay = Cassette(self.path, mode="replay", latency="zero")
+        answers = [replay.intercept("llm", {"prompt": "x"}, lambda: "offline") for _ in range(2)]
+        self.assertEqual(answers, ["first", "second"])
+        self.assertEqual(replay.report()["unused_recordings"], 0)
+
+    def test_use_cassette_activates_only_inside_the_block(self):
+        before = get_active_cassette()
+        with use_cassette(self.path, mode="record") as cassette:
+            self.assertIs(get_active_cassette(), cassette)
+        self.assertIs(get_active_cassette(), before)
+
+    @staticmethod
+    async def _offline():
+        return "offline"
+
+
+if __name__ == "__main__":
+    unittest.main()
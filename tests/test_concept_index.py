@@ -0,0 +1,33 @@
+import json
+import unittest
+
+from concept_index import AVOID_EXAMPLES_MAX, ConceptIndex, calibrate, concept_batches
+
+
+def _concept(i: int) -> dict:
+    return {"title": f"Concept {i}", "human_truth": f"truth number {i}", "summary": f"scene {i}"}
+
+
+class ConceptIndexTest(unittest.TestCase):
+    def test_avoid_examples_are_capped_most_recent_first(self):
+        index = ConceptIndex()
+        index.reject([_concept(i) for i in range(AVOID_EXAMPLES_MAX + 4)])
+        avoid = index.avoid_examples()
+        self.assertEqual(len(avoid), AVOID_EXAMPLES_MAX)
+        self.assertEqual(avoid[0]["title"], f"Concept {AVOID_EXAMPLES_MAX + 3}")
+
+    def test_calibration_reads_concept_responses_from_a_cassette(self):
+        entries = [
+            {"kind": "llm", "response": "```json\n" + json.dumps([_concept(1), _concept(2), _concept(3)]) + "\n```"},
+            {"kind": "llm", "response": json.dumps({"keyframes": []})},
+            {"kind": "http", "response": "<html></html>"},
+        ]
+        batches = concept_batches(entries)
+        self.assertEqual(len(batches), 1)
+        report = calibrate(batches)
+        self.assertEqual(report["pairs"], 3)
+        self.assertGreater(report["suggested_threshold"], report["p99"])
+
+
+if __name__ == "__main__":
+    unittest.main()
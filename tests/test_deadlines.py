@@ -0,0 +1,72 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+import unittest
+
+from async_bridge import run_sync
+from deadlines import DeadlineExceeded, poller, remaining, stage_deadline, wait_hook, with_deadline
+
+
+class DeadlineTest(unittest.TestCase):
+    def test_outside_any_stage_the_cap_applies(self):
+        self.assertIsNone(remaining())
+        self.assertEqual(remaining(30), 30)
+
+    def test_nested_stage_never_outlives_its_parent(self):
+        with stage_deadline("storyboard", seconds=1) as outer:
+            with stage_deadline("keyframe_repair", seconds=60) as inner:
+                self.assertIs(inner, outer)
+                self.assertLessEqual(remaining(), 1)
+            with stage_deadline("keyframe_repair", seconds=0.5) as tighter:
+                self.assertEqual(tighter.stage, "keyframe_repair")
+        self.assertIsNone(remaining())
+
+    def test_spent_budget_raises_before_starting_work(self):
+        @with_deadline("concepts")
+        def stage():
+            return remaining(10)
+
+        self.assertLessEqual(stage(), 10)
+        with stage_deadline("concepts", seconds=0.01):
+            time.sleep(0.02)
+            with self.assertRaisesRegex(DeadlineExceeded, "concepts deadline"):
+                remaining(10)
+
+
+class WaitHookTest(unittest.TestCase):
+    def test_poller_only_on_the_registering_thread(self):
+        with wait_hook(lambda elapsed, deadline: None):
+            self.assertIsNotNone(poller())
+            other = []
+            thread = threading.Thread(target=lambda: other.append(poller()))
+            thread.start()
+            thread.join()
+            self.assertEqual(other, [None])
+        self.assertIsNone(poller())
+
+    def test_cancel_from_the_hook_cancels_the_in_flight_call(self):
+        cancelled = concurrent.futures.Future()
+
+        async def provider_call():
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.set_result(True)
+                raise
+
+        class CancelClicked(Exception):
+            pass
+
+        def on_wait(elapsed, deadline):
+            if elapsed > 0.02:
+                raise CancelClicked(deadline.stage)
+
+        with stage_deadline("storyboard"), wait_hook(on_wait):
+            with self.assertRaisesRegex(CancelClicked, "storyboard"):
+                run_sync(provider_call(), poll=poller(), poll_interval=0.01)
+        self.assertTrue(cancelled.result(timeout=2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+
+from evidence import score_evidence
+
+
+class TaglineAndProductSignalsTest(unittest.TestCase):
+    def test_storefront_nav_is_not_brand_evidence(self):
+        _, signals = score_evidence("Shop\nCart\nFree shipping on orders over $50")
+        self.assertEqual(signals["tagline"], 0.0)
+        self.assertEqual(signals["product"], 0.0)
+
+    def test_tagline_from_metadata(self):
+        _, signals = score_evidence("", metadata={"json_ld": {"slogan": "Made to be worn"}})
+        self.assertEqual(signals["tagline"], 1.0)
+        _, signals = score_evidence("", metadata={"og:title": "Acme — Made to be worn"})
+        self.assertEqual(signals["tagline"], 1.0)
+        _, signals = score_evidence("", metadata={"og:title": "Acme"})
+        self.assertEqual(signals["tagline"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+import fake_llm
+from fake_llm import FakeLLMConfig, FakeLLMError, detect_request_kind, fake_completion
+
+CONCEPTS = "Brand: Fixture Jewelry Co\nGenerate exactly 2 narrative concepts for this brand."
+
+
+class FakeLLMTest(unittest.TestCase):
+    def test_request_kinds_follow_the_stage_instructions(self):
+        cases = {
+            "concepts": CONCEPTS,
+            "storyboard": "Generate a COMPLETE storyboard for this brand.",
+            "keyframe_repair": "REWRITE ONLY KEYFRAMES 2 of the storyboard below.",
+            "text": "Say hello.",
+        }
+        for kind, user in cases.items():
+            with self.subTest(kind=kind):
+                self.assertEqual(detect_request_kind("", user), kind)
+
+    def test_same_request_gives_the_same_response(self):
+        first = fake_completion("system", CONCEPTS, "fake-instant", 3000)
+        self.assertEqual(fake_completion("system", CONCEPTS, "fake-instant", 3000), first)
+        concepts = json.loads(first)
+        self.assertEqual(len(concepts), 2)
+        self.assertNotEqual(fake_completion("system", CONCEPTS, "fake-instant", 3000,
+                                            config=FakeLLMConfig(seed=1)), first)
+
+    def test_max_tokens_truncates_like_a_provider(self):
+        self.assertEqual(len(fake_completion("system", CONCEPTS, "fake-instant", 10)), 40)
+
+    def test_injected_errors_and_env_overrides(self):
+        with mock.patch.dict(os.environ, {"FAKE_LLM_ERROR_RATE": "1"}):
+            config = FakeLLMConfig.for_model("fake-instant")
+        self.assertEqual(config.error_rate, 1.0)
+        with self.assertRaises(FakeLLMError):
+            fake_completion("system", "Say hello.", "fake-instant", 100, config=config)
+
+    def test_attempt_counts_are_capped(self):
+        with mock.patch.object(fake_llm, "CALL_COUNTS_MAX", 3), \
+                mock.patch.object(fake_llm, "_call_counts", fake_llm.OrderedDict()):
+            for n in range(5):
+                fake_completion("system", f"Say hello {n}.", "fake-instant", 100)
+            self.assertEqual(len(fake_llm._call_counts), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+import html_extract
+from deadlines import DeadlineExceeded, stage_deadline
+
+SLOW_PAGE = "<html><body>" + "<p>Handmade in small batches since 1998.</p>" * 60000 + "</body></html>"
+
+
+class ParsePoolBackPressureTest(unittest.TestCase):
+    def setUp(self):
+        html_extract.configure(1, 1)
+
+    def tearDown(self):
+        html_extract.configure(0)
+
+    def test_timed_out_parse_keeps_its_slot_until_the_worker_finishes(self):
+        # Start the worker first so the slow page is running, not queued, when the deadline hits
+        self.assertIn("Hello", html_extract.parse_page("<p>Hello</p>")["text"])
+        slots = html_extract._pool["slots"]
+
+        with stage_deadline("scrape", 0.2):
+            with self.assertRaises(DeadlineExceeded):
+                html_extract.parse_page(SLOW_PAGE)
+        self.assertFalse(slots.acquire(blocking=False))
+
+        self.assertTrue(slots.acquire(timeout=60))
+        slots.release()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+import model_routing
+from model_routing import (DEFAULT_ROUTES, EFFORTS, STAGES, Route, clear_latency, latency_report,
+                           record_latency, resolve_route, thinking_budget)
+
+
+class RoutingTableTest(unittest.TestCase):
+    def test_every_provider_routes_every_stage_with_a_known_effort(self):
+        for provider, routes in DEFAULT_ROUTES.items():
+            with self.subTest(provider=provider):
+                self.assertEqual(set(routes), set(STAGES))
+                for route in routes.values():
+                    self.assertIn(route.effort, EFFORTS + [None])
+
+    def test_resolution_order(self):
+        self.assertEqual(resolve_route("Anthropic", "concepts", "sidebar-model"), DEFAULT_ROUTES["Anthropic"]["concepts"])
+        override = Route("claude-sonnet-4-5-20250929", "low")
+        self.assertIs(resolve_route("Anthropic", "concepts", "sidebar-model", {"concepts": override}), override)
+        self.assertEqual(resolve_route("Anthropic", "concepts", "sidebar-model", enabled=False), Route("sidebar-model"))
+        self.assertEqual(resolve_route("Fake", "concepts", "fake-realistic"), Route("fake-realistic"))
+        self.assertEqual(resolve_route("Anthropic", None, "sidebar-model"), Route("sidebar-model"))
+
+
+class ThinkingBudgetTest(unittest.TestCase):
+    def test_effort_maps_to_tokens(self):
+        self.assertIsNone(thinking_budget(None))
+        self.assertEqual([thinking_budget(e) for e in EFFORTS], [0, 2048, 8192])
+
+    def test_minimum_for_models_that_always_think(self):
+        self.assertEqual(thinking_budget("low", minimum=128), 128)
+        self.assertEqual(thinking_budget("high", minimum=128), 8192)
+        self.assertIsNone(thinking_budget(None, minimum=128))
+
+
+class LatencyTest(unittest.TestCase):
+    def setUp(self):
+        clear_latency()
+        self.addCleanup(clear_latency)
+
+    def test_report_in_wizard_order_with_percentiles(self):
+        for seconds in (1.0, 2.0, 3.0, 4.0):
+            record_latency("concepts", "m", seconds)
+        record_latency("research", "m", 0.5, failed=True)
+        rows = latency_report()
+        self.assertEqual([r["stage"] for r in rows], ["research", "concepts"])
+        self.assertEqual(rows[0]["failures"], 1)
+        self.assertEqual((rows[1]["calls"], rows[1]["p50_s"], rows[1]["p95_s"], rows[1]["last_s"]), (4, 3.0, 4.0, 4.0))
+
+    def test_samples_are_bounded(self):
+        for n in range(model_routing.LATENCY_SAMPLES + 10):
+            record_latency("storyboard", "m", float(n))
+        self.assertEqual(latency_report()[0]["calls"], model_routing.LATENCY_SAMPLES + 10)
+        self.assertEqual(len(model_routing._latency[("storyboard", "m")].samples), model_routing.LATENCY_SAMPLES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import time
+import unittest
+from http.client import HTTPConnection
+from unittest import mock
+
+from benchmarks.fixtures import import_app
+from narrative_service import NarrativeService
+
+FAKE = {"provider": "Fake", "model": "fake-instant"}
+PROFILE = {"brand_name": "Fixture Jewelry Co", "category": "Jewelry"}
+CONCEPT = {"title": "Borrowed Color", "summary": "Two friends trade bracelets mid-conversation."}
+
+
+class NarrativeServiceTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = import_app()
+
+    def setUp(self):
+        self.server = None
+
+    def tearDown(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def _serve(self, **pool_options):
+        self.server = NarrativeService(self.app, "127.0.0.1", 0, **pool_options)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _request(self, method: str, path: str, body: dict | None = None) -> tuple[int, dict]:
+        connection = HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=30)
+        try:
+            data = json.dumps(body).encode("utf-8") if body is not None else None
+            connection.request(method, path, body=data, headers={"Content-Type": "application/json"} if data else {})
+            response = connection.getresponse()
+            return response.status, json.loads(response.read() or b"{}")
+        finally:
+            connection.close()
+
+    def _wait_for(self, job_id: str, statuses: tuple, timeout: float = 30) -> dict:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            status, job = self._request("GET", f"/v1/jobs/{job_id}")
+            self.assertEqual(status, 200)
+            if job["status"] in statuses:
+                return job
+            time.sleep(0.05)
+        self.fail(f"job {job_id} never reached {statuses}; last status {job['status']}")
+
+    def test_concepts_job_runs_to_done(self):
+        self._serve()
+        status, job = self._request("POST", "/v1/concepts", {**FAKE, "profile": PROFILE, "count": 3})
+        self.assertEqual(status, 202)
+        self.assertIn(job["status"], ("queued", "running", "done"))
+        job = self._wait_for(job["id"], ("done", "failed", "cancelled"))
+        self.assertEqual(job["status"], "done", job.get("error"))
+        self.assertEqual(len(job["result"]["concepts"]), 3)
+
+    def test_delete_cancels_a_running_job(self):
+        self._serve()
+        with mock.patch.dict(os.environ, {"FAKE_LLM_LATENCY": "30"}):
+            _, job = self._request("POST", "/v1/concepts", {**FAKE, "profile": PROFILE})
+            self._wait_for(job["id"], ("running",))
+            time.sleep(0.2)
+            status, _ = self._request("DELETE", f"/v1/jobs/{job['id']}")
+            self.assertEqual(status, 202)
+            job = self._wait_for(job["id"], ("done", "failed", "cancelled"), timeout=10)
+        self.assertEqual(job["status"], "cancelled")
+
+    def test_full_queue_answers_503(self):
+        self._serve(generation_workers=1, max_queued=1)
+        body = {**FAKE, "profile": PROFILE}
+        with mock.patch.dict(os.environ, {"FAKE_LLM_LATENCY": "30"}):
+            _, running = self._request("POST", "/v1/concepts", body)
+            self._wait_for(running["id"], ("running",))
+            status, queued = self._request("POST", "/v1/concepts", body)
+            self.assertEqual(status, 202)
+            status, error = self._request("POST", "/v1/concepts", body)
+            self.assertEqual(status, 503)
+            self.assertIn("queued", error["error"])
+            for job in (running, queued):
+                self._request("DELETE", f"/v1/jobs/{job['id']}")
+            self._wait_for(running["id"], ("cancelled",), timeout=10)
+
+    def test_invalid_job_bodies_answer_400(self):
+        self._serve()
+        cases = [
+            ("/v1/research", {**FAKE}, "brand_name is required"),
+            ("/v1/research", {"provider": "Nope", "brand_name": "Acme"}, "unknown provider"),
+            ("/v1/concepts", {**FAKE, "profile": {}}, "brand_name is required"),
+            ("/v1/concepts", {**FAKE, "profile": PROFILE, "count": "many"}, "count must be a number"),
+            ("/v1/concepts", {**FAKE, "profile": PROFILE, "avoid": "everything"}, "avoid must be a list"),
+            ("/v1/concepts", {**FAKE, "answers": {"brand_name": "Acme", "shoe_size": 9}}, "unknown answer fields"),
+            ("/v1/concepts", {**FAKE, "answers": {"brand_name": "Acme", "personality_loud_quiet": "x"}},
+             "personality_loud_quiet"),
+            ("/v1/storyboard", {**FAKE, "profile": PROFILE}, "concept is required"),
+        ]
+        for path, body, message in cases:
+            with self.subTest(path=path, body=body):
+                status, payload = self._request("POST", path, body)
+                self.assertEqual(status, 400)
+                self.assertIn(message, payload["error"])
+        self.assertEqual(self._request("GET", "/v1/health")[1]["jobs"]["queued"], 0)
+
+    def test_storyboard_job_with_concept_runs_to_done(self):
+        self._serve()
+        _, job = self._request("POST", "/v1/storyboard", {**FAKE, "profile": PROFILE, "concept": CONCEPT})
+        job = self._wait_for(job["id"], ("done", "failed", "cancelled"))
+        self.assertEqual(job["status"], "done", job.get("error"))
+        self.assertTrue(job["result"]["storyboard"]["keyframes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
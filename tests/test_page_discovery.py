@@ -0,0 +1,59 @@
+import unittest
+
+from page_discovery import extract_links, parse_sitemap, rank_candidates, score_url
+
+HOMEPAGE = """
+<nav>
+  <a href="/collections/rings">Rings</a>
+  <a href="/pages/our-story">Our <b>Story</b></a>
+  <a href="https://www.fixture.example/pages/sustainability">Impact</a>
+  <a href="https://elsewhere.example/about">Partner</a>
+  <a href="mailto:hello@fixture.example">Email</a>
+  <a href="/">Home</a>
+</nav>
+"""
+
+SITEMAP_INDEX = """<?xml version="1.0"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://fixture.example/sitemap_pages_1.xml</loc></sitemap>
+</sitemapindex>"""
+
+SITEMAP = """<?xml version="1.0"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://fixture.example/pages/about</loc></url>
+  <url><loc>https://fixture.example/products/silver-band</loc></url>
+</urlset>"""
+
+
+class PageDiscoveryTest(unittest.TestCase):
+    def test_anchor_text_is_collected_across_inline_tags(self):
+        self.assertIn(("/pages/our-story", "Our Story"), extract_links(HOMEPAGE))
+
+    def test_sitemap_index_and_urlset(self):
+        self.assertEqual(parse_sitemap(SITEMAP_INDEX), ([], ["https://fixture.example/sitemap_pages_1.xml"]))
+        pages, children = parse_sitemap(SITEMAP)
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(children, [])
+        self.assertEqual(parse_sitemap("<not xml"), ([], []))
+
+    def test_product_and_asset_paths_never_score(self):
+        self.assertEqual(score_url("https://fixture.example/products/about-ring")[0], 0.0)
+        self.assertEqual(score_url("https://fixture.example/pages/about.pdf")[0], 0.0)
+        self.assertGreater(score_url("https://fixture.example/pages/about")[0],
+                           score_url("https://fixture.example/blog/2020/about")[0])
+
+    def test_ranking_keeps_same_site_story_pages(self):
+        ranked = rank_candidates("https://fixture.example/", extract_links(HOMEPAGE))
+        self.assertEqual([c.url for c in ranked], [
+            "https://fixture.example/pages/our-story",
+            "https://www.fixture.example/pages/sustainability",
+        ])
+
+    def test_www_homepage_accepts_apex_links_and_sitemap_entries(self):
+        sitemap_pages, _ = parse_sitemap(SITEMAP)
+        ranked = rank_candidates("https://www.fixture.example/", [], sitemap_pages, limit=5)
+        self.assertEqual([(c.url, c.source) for c in ranked], [("https://fixture.example/pages/about", "sitemap")])
+
+
+if __name__ == "__main__":
+    unittest.main()
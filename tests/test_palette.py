@@ -0,0 +1,64 @@
+import io
+import unittest
+from unittest import mock
+
+import palette
+from palette import cluster_colors, css_colors, extract_palette
+
+CSS = """
+:root { --brand-primary: #0b5d3b; --brand-accent: #e4572e; }
+body { background: #ffffff; color: #222222; }
+.button { background-color: #0c5f3d; box-shadow: 0 0 4px rgba(0, 0, 0, 0.2); }
+.sale { color: #e4572e; }
+.overlay { background: #00000033; }
+"""
+
+
+class CssColorsTest(unittest.TestCase):
+    def test_weights_follow_the_property_and_skip_translucent_colors(self):
+        weights = css_colors(CSS)
+        self.assertEqual(weights["#0b5d3b"], 5.0)
+        self.assertEqual(weights["#e4572e"], 6.5)
+        self.assertEqual(weights["#ffffff"], 2.0)
+        self.assertNotIn("#000000", weights)
+
+
+class ClusteringTest(unittest.TestCase):
+    def _both_backends(self, weighted):
+        with mock.patch.object(palette, "HAS_NUMPY", True):
+            kmeans = cluster_colors(weighted)
+        with mock.patch.object(palette, "HAS_NUMPY", False):
+            greedy = cluster_colors(weighted)
+        return kmeans, greedy
+
+    def test_near_identical_shades_merge_into_the_heaviest(self):
+        for clusters in self._both_backends({"#0b5d3b": 5, "#0c5f3d": 2, "#e4572e": 3}):
+            with self.subTest(clusters=clusters):
+                self.assertEqual(clusters, [("#0b5d3b", 7.0), ("#e4572e", 3.0)])
+
+    def test_clustering_is_deterministic(self):
+        weighted = dict(css_colors(CSS))
+        self.assertEqual(cluster_colors(weighted), cluster_colors(dict(reversed(list(weighted.items())))))
+        self.assertEqual(cluster_colors({}), [])
+
+
+class ExtractPaletteTest(unittest.TestCase):
+    def test_roles_from_stylesheets(self):
+        result = extract_palette([CSS])
+        self.assertEqual(result.primary, "#0b5d3b")
+        self.assertEqual(result.accent, "#e4572e")
+        self.assertEqual(result.secondary, "#ffffff")
+        self.assertEqual(set(result.as_fields()), {"color_primary", "color_secondary", "color_accent"})
+
+    @unittest.skipUnless(palette.HAS_PIL, "Pillow not installed")
+    def test_logo_pixels_and_hints_count(self):
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.new("RGB", (8, 8), (30, 80, 200)).save(buffer, format="PNG")
+        result = extract_palette(["body { background: #ffffff; }"], images=[buffer.getvalue()], hints=["#1e50c8"])
+        self.assertEqual(result.primary, "#1e50c8")
+        self.assertEqual(result.sources, {"css_colors": 2, "images": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import json
+import unittest
+
+from prompt_format import format_concept, format_json, format_profile
+
+PROFILE = {
+    "brand_name": "Fixture Jewelry Co",
+    "website": "",
+    "category": "Jewelry",
+    "identity": {"tagline": "Worn in", "values": ["repair", "reclaimed silver"], "ethos": None},
+    "personality": {"voice": "dry", "energy": "quiet"},
+    "visual_direction": {"color_palette": {"primary": "#0b5d3b", "accent": "#e4572e"}},
+    "production": {"product_presence": "Subtle — product appears naturally", "duration": "15s"},
+    "emotional_direction": {"movie_scene": "The kitchen in Phantom Thread\nat breakfast"},
+    "extra": {"note": "kept"},
+}
+
+
+class FormatProfileTest(unittest.TestCase):
+    def test_compact_lines_in_prompt_order_without_empty_fields(self):
+        self.assertEqual(format_profile(PROFILE, "compact").splitlines(), [
+            "brand_name: Fixture Jewelry Co",
+            "category: Jewelry",
+            "tagline: Worn in",
+            "values: repair; reclaimed silver",
+            "personality: dry; quiet",
+            "movie_scene: The kitchen in Phantom Thread / at breakfast",
+            "colors: primary #0b5d3b, accent #e4572e",
+            "product: Subtle — product appears naturally",
+            "duration: 15s",
+            "extra.note: kept",
+        ])
+
+    def test_json_style_is_the_indented_profile(self):
+        self.assertEqual(json.loads(format_profile(PROFILE, "json")), PROFILE)
+
+    def test_concepts_and_echoed_json(self):
+        concept = {"title": "Salt", "hook": "", "beats": ["argue", "taste"]}
+        self.assertEqual(format_concept(concept, "compact"), "title: Salt\nbeats: argue; taste")
+        keyframes = [{"scene": "café — dawn"}]
+        self.assertEqual(format_json(keyframes, "compact"), '[{"scene":"café — dawn"}]')
+        self.assertEqual(json.loads(format_json(keyframes, "json")), keyframes)
+
+
+if __name__ == "__main__":
+    unittest.main()
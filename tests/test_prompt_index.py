@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import prompt_index
+from prompt_index import PromptIndex, get_prompt_index, parse_sections
+
+PROMPT = """You are a brand narrative director.
+
+---
+
+## CORE CREATIVE PHILOSOPHY
+
+Stories, not ads.
+
+---
+
+## THE NARRATIVE GENERATION PROCESS
+
+### STEP 1: Brand Truth
+Find the tension.
+
+### STEP 4: Keyframes (Visual Beats)
+Four beats.
+
+```markdown
+## Not a heading
+```
+
+## CONTEXT-SPECIFIC GUIDANCE BY CATEGORY
+
+Use the category.
+
+### Luggage, Wallets & Handbags
+Travel stories.
+
+### Apparel
+Bodies in motion.
+"""
+
+
+class ParseSectionsTest(unittest.TestCase):
+    def test_heading_tree_and_keys(self):
+        preamble, sections = parse_sections(PROMPT)
+        self.assertEqual(preamble, "You are a brand narrative director.")
+        self.assertEqual([s.key for s in sections],
+                         ["CORE CREATIVE PHILOSOPHY", "THE NARRATIVE GENERATION PROCESS",
+                          "CONTEXT-SPECIFIC GUIDANCE BY CATEGORY"])
+        process = sections[1]
+        self.assertEqual([c.key for c in process.children], ["STEP 1", "STEP 4"])
+        self.assertIn("## Not a heading", process.child("STEP 4").body)
+        self.assertEqual(sections[0].body, "Stories, not ads.")
+
+    def test_compile_keeps_only_the_stage_steps_and_category(self):
+        index = PromptIndex(PROMPT)
+        compiled = index.compile("keyframe_repair", category="Luggage")
+        self.assertIn("### STEP 4", compiled)
+        self.assertNotIn("### STEP 1", compiled)
+        self.assertIn("Travel stories.", compiled)
+        self.assertNotIn("Bodies in motion.", compiled)
+        with self.assertRaises(ValueError):
+            index.compile("voiceover")
+
+
+class ReloadTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, "prompt.md")
+        with open(self.path, "w") as f:
+            f.write(PROMPT)
+        patcher = mock.patch.dict(prompt_index._state, {"index": None, "mtime": None})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_reparsed_only_when_mtime_changes(self):
+        first = get_prompt_index(self.path)
+        self.assertIs(get_prompt_index(self.path), first)
+
+        with open(self.path, "w") as f:
+            f.write(PROMPT.replace("Stories, not ads.", "Stories, still not ads."))
+        os.utime(self.path, (first.version + 5, first.version + 5))
+        second = get_prompt_index(self.path)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.section("CORE CREATIVE PHILOSOPHY").body, "Stories, still not ads.")
+
+    def test_missing_file_keeps_the_last_parse(self):
+        first = get_prompt_index(self.path)
+        os.remove(self.path)
+        self.assertIs(get_prompt_index(self.path), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
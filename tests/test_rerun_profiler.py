@@ -0,0 +1,61 @@
+import time
+import unittest
+from collections import deque
+from unittest import mock
+
+import rerun_profiler
+from rerun_profiler import RerunProfile, begin_rerun, end_rerun, recent_profiles, section_report, to_folded
+
+
+def step_busy(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(200))
+
+
+def profile(session: str, sections: dict, stacks: dict) -> RerunProfile:
+    return RerunProfile(0, session, 1, 0.0, sum(sections.values()), len(stacks), sections, {}, stacks)
+
+
+class FoldedExportTest(unittest.TestCase):
+    def test_stacks_merge_across_reruns_in_microseconds(self):
+        profiles = [
+            profile("a", {"step_review": 0.003}, {"<module>;main;step_review": 0.002, "<module>;main": 0.001}),
+            profile("b", {"step_review": 0.001}, {"<module>;main;step_review": 0.0015, "<module>;idle": 0.0}),
+        ]
+        self.assertEqual(to_folded(profiles), "<module>;main 1000\n<module>;main;step_review 3500\n")
+        self.assertEqual(to_folded([]), "")
+
+    def test_section_report_means_and_shares(self):
+        profiles = [profile("a", {"step_review": 0.03, "<module>": 0.01}, {}),
+                    profile("a", {"step_review": 0.01}, {})]
+        self.assertEqual(section_report(profiles), [
+            {"section": "step_review", "mean_ms": 20.0, "share": 0.8},
+            {"section": "<module>", "mean_ms": 5.0, "share": 0.2},
+        ])
+
+
+class SamplerTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(rerun_profiler, "_buffer", deque(maxlen=2))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_disabled_profiling_starts_nothing(self):
+        self.assertIsNone(begin_rerun(False, __file__))
+        self.assertIsNone(end_rerun(None))
+        self.assertEqual(recent_profiles(), [])
+
+    def test_samples_attribute_time_to_the_step_function(self):
+        sampler = begin_rerun(True, __file__)
+        step_busy(0.15)
+        result = end_rerun(sampler, session="s1", step=3)
+        self.assertGreater(result.samples, 0)
+        self.assertEqual(max(result.sections, key=result.sections.get), "step_busy")
+        self.assertTrue(any(stack.endswith("step_busy") for stack in result.stacks))
+        self.assertEqual(recent_profiles("s1"), [result])
+        self.assertEqual(recent_profiles("other"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from research import ResearchArtifact, format_dossier, research_key
+
+
+def artifact(**overrides) -> ResearchArtifact:
+    fields = dict(
+        brand_name="Fixture Jewelry Co",
+        url="https://fixture.example/",
+        category="Jewelry",
+        homepage_text="Handmade rings from reclaimed silver. " * 5,
+        about_text="[/pages/our-story]\nFounded in a garage in 2011.",
+        metadata={"description": "Reclaimed silver rings"},
+        palette={"primary": "#1a2b3c", "accent": "#ffcc00"},
+        profile={"tagline": "Worn in", "values": ["repair"], "ethos": "", "confidence": "high"},
+        findings=["Sold at 40 stockists"],
+    )
+    fields.update(overrides)
+    return ResearchArtifact(**fields)
+
+
+class ResearchArtifactTest(unittest.TestCase):
+    def test_key_ignores_case_whitespace_and_trailing_slash(self):
+        self.assertEqual(research_key(" Fixture Jewelry Co", "https://fixture.example/", "Jewelry"),
+                         research_key("fixture jewelry co", "https://fixture.example", "jewelry "))
+        self.assertNotEqual(research_key("Fixture", "", "Jewelry"), research_key("Fixture", "", "Apparel"))
+
+    def test_dict_round_trip_drops_unknown_keys(self):
+        original = artifact()
+        restored = ResearchArtifact.from_dict({**original.to_dict(), "legacy_field": 1})
+        self.assertEqual(restored, original)
+
+    def test_identity_keeps_only_filled_fields(self):
+        self.assertEqual(artifact().identity(), {"tagline": "Worn in", "values": ["repair"], "confidence": "high"})
+        self.assertEqual(artifact(profile=None).identity(), {})
+
+    def test_sources_list_pages_read_and_web_search(self):
+        self.assertEqual(artifact().sources, [
+            "https://fixture.example/", "https://fixture.example/pages/our-story", "web search",
+        ])
+        self.assertEqual(artifact(homepage_text="", profile=None, about_text="").sources, [])
+
+    def test_measured_palette_fills_color_fields(self):
+        fields = artifact().local_fields()
+        self.assertEqual(fields["brand_description"], "Reclaimed silver rings")
+        self.assertEqual(fields["color_primary"], "#1a2b3c")
+        self.assertNotIn("color_secondary", fields)
+
+    def test_dossier_includes_each_available_block(self):
+        dossier = format_dossier(artifact())
+        for block in ("STRUCTURED BRAND RESEARCH", "WEB RESEARCH FINDINGS", "HOMEPAGE CONTENT", "ABOUT PAGE CONTENT"):
+            self.assertIn(block, dossier)
+        self.assertNotIn("ethos:", dossier)
+        empty = artifact(homepage_text="", metadata={}, profile=None, findings=[])
+        self.assertTrue(format_dossier(empty).startswith("No research available"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import time
+import unittest
+
+from research import ResearchArtifact
+from research_cache import ResearchCache, cache_key, canonical_domain, normalize_brand, worth_caching
+
+KEY = "domain:fixture.example"
+
+
+def scraped(homepage: str = "Handmade rings from reclaimed silver.") -> ResearchArtifact:
+    return ResearchArtifact("Fixture Jewelry Co", "https://fixture.example", "Jewelry", homepage_text=homepage)
+
+
+def researched() -> ResearchArtifact:
+    artifact = scraped()
+    artifact.profile = {"tagline": "Worn in", "confidence": "high"}
+    artifact.findings = ["Sold at 40 stockists"]
+    return artifact
+
+
+class KeyTest(unittest.TestCase):
+    def test_domain_and_name_keys(self):
+        self.assertEqual(canonical_domain("https://www.Fixture.example/shop?x=1"), "fixture.example")
+        self.assertEqual(canonical_domain("fixture.example:8443"), "fixture.example:8443")
+        self.assertEqual(normalize_brand("The Fixture Jewelry Co."), "fixture jewelry")
+        self.assertEqual(cache_key("Fixture", "https://m.fixture.example"), KEY)
+        self.assertEqual(cache_key("The Fixture Co", ""), "name:fixture")
+
+
+class ResearchCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.cache = ResearchCache(self._dir.name, ttl_s=3600, trust_s=60)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _age(self, stored: float, checked: float):
+        entry = self.cache.get(KEY)
+        entry.stored_at, entry.checked_at = time.time() - stored, time.time() - checked
+        self.cache._write(entry)
+
+    def test_recent_entry_is_served_without_rewriting_it(self):
+        self.cache.put(KEY, researched())
+        path = self.cache._path(KEY)
+        before = os.stat(path).st_mtime_ns
+        served = self.cache.recent(KEY)
+        self.assertEqual(served.profile["tagline"], "Worn in")
+        self.assertEqual(served.cache["status"], "hit")
+        self.assertEqual(os.stat(path).st_mtime_ns, before)
+
+    def test_unchanged_site_is_revalidated_and_changed_site_is_not(self):
+        self.cache.put(KEY, researched())
+        self._age(stored=600, checked=600)
+        self.assertIsNone(self.cache.recent(KEY))
+
+        self.assertIsNone(self.cache.revalidate(KEY, scraped("New collection, new story.")))
+        fresh = self.cache.revalidate(KEY, scraped())
+        self.assertEqual(fresh.findings, ["Sold at 40 stockists"])
+        self.assertEqual(fresh.cache["status"], "revalidated")
+        self.assertIsNotNone(self.cache.recent(KEY))
+
+    def test_entries_past_the_ttl_are_dropped(self):
+        self.cache.put(KEY, researched())
+        self._age(stored=7200, checked=0)
+        self.assertIsNone(self.cache.get(KEY))
+        self.assertEqual(self.cache.entries(), [])
+
+    def test_research_not_worth_reusing_is_not_stored(self):
+        self.assertFalse(worth_caching(None))
+        self.assertFalse(worth_caching({"tagline": "Worn in", "confidence": "low"}))
+        self.assertFalse(worth_caching({"tagline": "", "values": [], "confidence": "high"}))
+        missed = scraped()
+        missed.profile = {"confidence": "low"}
+        self.cache.put(KEY, missed)
+        self.assertIsNone(self.cache.get(KEY))
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = ResearchCache("")
+        cache.put(KEY, researched())
+        self.assertIsNone(cache.recent(KEY))
+        self.assertEqual(cache.entries(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
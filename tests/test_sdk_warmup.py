@@ -0,0 +1,45 @@
+import os
+import unittest
+from unittest import mock
+
+import sdk_warmup
+from sdk_warmup import configured_providers, endpoint, format_report, warm_up
+
+
+class ConfigurationTest(unittest.TestCase):
+    def test_setting_values(self):
+        self.assertEqual(configured_providers(""), [])
+        self.assertEqual(configured_providers("off"), [])
+        self.assertEqual(configured_providers("all"), ["Anthropic", "OpenAI", "Google"])
+        self.assertEqual(configured_providers(" openai, Nope ,google"), ["OpenAI", "Google"])
+
+    def test_auto_picks_providers_with_a_key(self):
+        keys = {"ANTHROPIC_API_KEY": "", "OPENAI_API_KEY": "sk-test", "GEMINI_API_KEY": ""}
+        with mock.patch.dict(os.environ, keys):
+            self.assertEqual(configured_providers("auto"), ["OpenAI"])
+
+    def test_endpoint_honours_base_url_override(self):
+        with mock.patch.dict(os.environ, {"ANTHROPIC_BASE_URL": "https://gateway.internal.example"}):
+            self.assertEqual(endpoint("Anthropic"), "https://gateway.internal.example")
+        with mock.patch.dict(os.environ, {"ANTHROPIC_BASE_URL": ""}):
+            self.assertEqual(endpoint("Anthropic"), "https://api.anthropic.com")
+
+
+class WarmUpTest(unittest.TestCase):
+    def test_failed_import_is_recorded_and_skips_the_network_steps(self):
+        with mock.patch.object(sdk_warmup, "_load_sdk", side_effect=ImportError("No module named 'openai'")), \
+                mock.patch.object(sdk_warmup, "_resolve") as resolve:
+            report = warm_up(["OpenAI"])
+        resolve.assert_not_called()
+        self.assertEqual(list(report["steps"]), ["prompt", "OpenAI.import"])
+        self.assertEqual(report["errors"], {"OpenAI.import": "ImportError: No module named 'openai'"})
+
+    def test_report_formatting(self):
+        report = {"steps": {"prompt": 0.012, "Google.import": 0.3}, "errors": {"Google.import": "ImportError: x"},
+                  "total_s": 0.312}
+        self.assertEqual(format_report(report),
+                         "prompt 12 ms · Google.import 300 ms (failed: ImportError: x) — 0.31s total")
+
+
+if __name__ == "__main__":
+    unittest.main()
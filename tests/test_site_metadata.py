@@ -0,0 +1,30 @@
+import json
+import unittest
+
+from research import ResearchArtifact, format_dossier
+from site_metadata import extract_metadata, format_facts
+
+
+def _json_ld_page(data: dict) -> str:
+    return f'<html><head><script type="application/ld+json">{json.dumps(data)}</script></head></html>'
+
+
+class NestedValuesTest(unittest.TestCase):
+    def test_nested_json_ld_lists_and_objects_are_flattened(self):
+        metadata = extract_metadata(_json_ld_page({
+            "@type": "Organization",
+            "sameAs": ["a", ["b"]],
+            "logo": [{"url": {"@id": "#logo"}}],
+        }))
+        self.assertEqual(metadata["json_ld"]["sameAs"], ["a", "b"])
+        facts = format_facts(metadata)
+        self.assertIn("sameAs: a, b", facts)
+        self.assertIn("logo: #logo", facts)
+
+    def test_dossier_joins_nested_llm_lists(self):
+        artifact = ResearchArtifact(brand_name="Acme", url="", category="", profile={"values": ["craft", ["care", 3]]})
+        self.assertIn("values: craft, care, 3", format_dossier(artifact))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from storyboard_format import (expand_storyboard, image_prompt, lean_storyboard, response_schema,
+                               wire_keyframes)
+
+SUFFIX = "35mm film, muted greens, grain"
+
+
+def keyframe(n: int, emotion: str) -> dict:
+    return {
+        "timestamp": f"{3 * (n - 1)}s", "narrative_beat": f"BEAT {n}",
+        "scene_description": f"A woman resizes a silver ring at a kitchen table, step {n}",
+        "camera": "50mm, eye level", "lighting": "overcast window light", "color_palette": "sage and steel",
+        "emotion": emotion, "text_overlay": "none", "product_presence": "the ring on her thumb",
+        "composition_notes": "subject left third",
+    }
+
+
+def storyboard() -> dict:
+    keyframes = [keyframe(n, e) for n, e in enumerate(["doubt", "focus", "relief"], start=1)]
+    return {
+        "style_suffix": SUFFIX,
+        "keyframes": keyframes,
+        "image_prompts": [image_prompt(kf, SUFFIX) for kf in keyframes],
+        "animation_prompts": [
+            {"transition": f"{i + 1}→{i + 2}", "motion_type": "camera", "camera_motion": "slow push",
+             "subject_motion": "hands work", "pacing": "steady", "visual_transition": "match cut",
+             "emotional_trajectory": f"{keyframes[i]['emotion']} → {keyframes[i + 1]['emotion']}",
+             "audio_cue": "file on metal"}
+            for i in range(2)
+        ],
+        "anti_generic_audit": {"all_passed": True, "notes": "no hands-reaching shots"},
+        "creative_director_notes": "Keep the ring in focus.",
+    }
+
+
+class StoryboardFormatTest(unittest.TestCase):
+    def test_lean_round_trip_restores_the_export_shape(self):
+        original = storyboard()
+        lean = lean_storyboard(original)
+        self.assertEqual(set(lean["keyframes"][0]), {"t", "beat", "scene", "camera", "light", "color",
+                                                     "emotion", "overlay", "product", "comp"})
+        self.assertNotIn("image_prompts", lean)
+        self.assertEqual(expand_storyboard(lean), original)
+
+    def test_full_schema_passes_through(self):
+        original = storyboard()
+        self.assertEqual(expand_storyboard(original), original)
+        self.assertEqual(expand_storyboard(None), None)
+        self.assertEqual(expand_storyboard({"raw": "not json"}), {"raw": "not json"})
+
+    def test_image_prompt_leaves_out_absent_fields(self):
+        prompt = image_prompt({**keyframe(1, "doubt"), "product_presence": "None — never shown",
+                               "text_overlay": "FIXED, NOT NEW"}, SUFFIX)
+        self.assertNotIn("Product:", prompt)
+        self.assertIn('Visible text: "FIXED, NOT NEW"', prompt)
+        self.assertTrue(prompt.endswith(SUFFIX))
+
+    def test_wire_keyframes_and_schemas_follow_the_style(self):
+        keyframes = [keyframe(1, "doubt")]
+        self.assertIs(wire_keyframes(keyframes, "full"), keyframes)
+        self.assertIn("scene", wire_keyframes(keyframes, "lean")[0])
+        self.assertIn('"image_prompts"', response_schema("full")[1])
+        self.assertNotIn('"image_prompts"', response_schema("lean")[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
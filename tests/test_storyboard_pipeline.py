@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from storyboard_pipeline import PlaceholderBackend, build_storyboard_dag, run_pipeline
+
+STORYBOARD = {
+    "image_prompts": [f"keyframe {n}, a kitchen at dawn" for n in range(1, 5)],
+    "animation_prompts": [{"motion": f"push in {n}"} for n in range(1, 4)],
+}
+
+
+class FlakyBackend(PlaceholderBackend):
+    """Fails the first ``failures`` attempts of each job id listed in ``flaky``."""
+
+    def __init__(self, flaky: dict):
+        super().__init__(size=(4, 4))
+        self.flaky = dict(flaky)
+        self.calls = []
+
+    def _maybe_fail(self, job):
+        self.calls.append(job.job_id)
+        if self.flaky.get(job.job_id, 0) > 0:
+            self.flaky[job.job_id] -= 1
+            raise RuntimeError(f"transient failure for {job.job_id}")
+
+
+class StoryboardPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.out = self._dir.name
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_dag_links_each_transition_to_its_two_keyframes(self):
+        jobs = build_storyboard_dag({"storyboard": STORYBOARD})
+        self.assertEqual([j.job_id for j in jobs[:4]], [f"keyframe_{n}" for n in range(1, 5)])
+        transitions = {j.job_id: j.deps for j in jobs if j.kind == "animation"}
+        self.assertEqual(transitions["transition_2_3"], ["keyframe_2", "keyframe_3"])
+        self.assertEqual(len(transitions), 3)
+
+    def test_storyboard_without_image_prompts_is_rejected(self):
+        with self.assertRaises(ValueError):
+            build_storyboard_dag({"keyframes": []})
+
+    def test_transient_failures_are_retried(self):
+        backend = FlakyBackend({"keyframe_2": 1})
+        result = run_pipeline(STORYBOARD, backend, self.out, retry_backoff=0)
+        self.assertTrue(result.succeeded)
+        self.assertEqual(result.jobs["keyframe_2"]["attempts"], 2)
+        self.assertTrue(os.path.exists(result.jobs["transition_3_4"]["output"]))
+
+    def test_failed_keyframe_blocks_only_its_transitions(self):
+        backend = FlakyBackend({"keyframe_1": 10})
+        result = run_pipeline(STORYBOARD, backend, self.out, max_retries=1, retry_backoff=0)
+        self.assertFalse(result.succeeded)
+        self.assertEqual(result.jobs["keyframe_1"]["status"], "failed")
+        self.assertEqual(result.jobs["transition_1_2"]["status"], "blocked")
+        self.assertEqual(result.jobs["transition_2_3"]["status"], "done")
+
+    def test_resume_reuses_unchanged_outputs_and_reruns_changed_prompts(self):
+        run_pipeline(STORYBOARD, PlaceholderBackend(size=(4, 4)), self.out)
+        changed = {**STORYBOARD, "image_prompts": STORYBOARD["image_prompts"][:3] + ["keyframe 4, a rooftop"]}
+        backend = FlakyBackend({})
+        result = run_pipeline(changed, backend, self.out)
+        self.assertTrue(result.succeeded)
+        self.assertEqual(sorted(backend.calls), ["keyframe_4", "transition_3_4"])
+        self.assertEqual(result.jobs["keyframe_1"]["status"], "cached")
+
+
+if __name__ == "__main__":
+    unittest.main()
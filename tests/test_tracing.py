@@ -0,0 +1,85 @@
+import asyncio
+import glob
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+import tracing
+from async_bridge import bind_context
+
+
+class TracingTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        tracing.enable(self._dir.name)
+
+    def tearDown(self):
+        tracing.disable()
+        self._dir.cleanup()
+
+    def _exported(self) -> list[dict]:
+        paths = glob.glob(os.path.join(self._dir.name, "trace_*.json"))
+        self.assertEqual(len(paths), 1)
+        with open(paths[0]) as f:
+            return json.load(f)["traceEvents"]
+
+    def test_disabled_tracing_is_a_noop(self):
+        tracing.disable()
+        with tracing.span("step") as s:
+            s.set(brand="x")
+        self.assertIs(s, tracing.current_span())
+        self.assertEqual(os.listdir(self._dir.name), [])
+
+    def test_nested_spans_export_as_one_trace(self):
+        @tracing.traced()
+        def scrape(url):
+            tracing.current_span().set(url=url, status=200)
+
+        with tracing.span("step_research", brand="Fixture"):
+            scrape("https://fixture.example/")
+            with self.assertRaises(ValueError):
+                with tracing.span("llm_call"):
+                    raise ValueError("bad json")
+
+        events = {e["name"]: e for e in self._exported()}
+        root = events["step_research"]
+        self.assertIsNone(root["args"]["parent_id"])
+        self.assertEqual(events["scrape"]["args"]["parent_id"], root["args"]["span_id"])
+        self.assertEqual(events["scrape"]["args"]["url"], "https://fixture.example/")
+        self.assertEqual(events["llm_call"]["args"]["error"], "ValueError: bad json")
+        self.assertTrue(all(e["ph"] == "X" for e in events.values()))
+
+    def test_spans_follow_pool_threads_and_async_tasks(self):
+        def in_pool():
+            with tracing.span("fetch"):
+                pass
+
+        async def call():
+            with tracing.span("llm", concurrent=True):
+                await asyncio.sleep(0)
+
+        with tracing.span("root"):
+            thread = threading.Thread(target=bind_context(in_pool))
+            thread.start()
+            thread.join()
+            asyncio.run(call())
+
+        events = self._exported()
+        root_id = next(e["args"]["span_id"] for e in events if e["name"] == "root")
+        self.assertEqual(next(e for e in events if e["name"] == "fetch")["args"]["parent_id"], root_id)
+        self.assertEqual([e["ph"] for e in events if e["name"] == "llm"], ["b", "e"])
+
+    def test_format_tree_indents_children(self):
+        with tracing.span("root"):
+            with tracing.span("child"):
+                pass
+        path = glob.glob(os.path.join(self._dir.name, "trace_*.json"))[0]
+        lines = tracing.format_tree(path).splitlines()
+        self.assertTrue(lines[0].startswith("root"))
+        self.assertTrue(lines[1].startswith("  child"))
+
+
+if __name__ == "__main__":
+    unittest.main()
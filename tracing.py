@@ -0,0 +1,214 @@
+"""
+Tracing — hierarchical spans for wizard steps, scrapes and LLM calls.
+Each Streamlit script run is one trace: spans nest through ``contextvars``
+(so they follow asyncio tasks and ``async_bridge.bind_context``-wrapped pool
+threads), carry attributes, and when the root span ends the whole trace is
+written as Chrome Trace Event JSON — open it in https://ui.perfetto.dev or
+chrome://tracing.
+
+    TRACE_DIR=traces streamlit run brand_narrative_app.py
+    python tracing.py traces/trace_*.json          # print the span tree
+
+Tracing is off unless ``TRACE_DIR`` is set (or ``enable()`` is called); then
+``span`` returns a shared no-op and ``traced`` adds one flag check per call.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+_state = {"dir": os.environ.get("TRACE_DIR") or None}
+_current = contextvars.ContextVar("current_span", default=None)
+_write_lock = threading.Lock()
+
+# Wall-clock anchor so perf_counter timestamps can be shown as real times
+_EPOCH_NS = time.time_ns() - time.perf_counter_ns()
+
+
+def enable(trace_dir: str):
+    os.makedirs(trace_dir, exist_ok=True)
+    _state["dir"] = trace_dir
+
+
+def disable():
+    _state["dir"] = None
+
+
+def is_enabled() -> bool:
+    return _state["dir"] is not None
+
+
+@dataclass
+class _Trace:
+    trace_id: str
+    spans: list = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+@dataclass
+class Span:
+    name: str
+    trace: _Trace
+    span_id: str
+    parent_id: str | None
+    attrs: dict
+    concurrent: bool = False    # overlaps its siblings on one thread (async calls); exported as async events
+    start_ns: int = 0
+    end_ns: int = 0
+    tid: int = 0
+    error: str | None = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        self.tid = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.perf_counter_ns()
+        _current.reset(self._token)
+        if exc_type is not None:
+            # st.stop()/st.rerun() end a run by raising; record them without calling them errors
+            self.error = exc_type.__name__ if "Stop" in exc_type.__name__ or "Rerun" in exc_type.__name__ \
+                else f"{exc_type.__name__}: {exc}"
+        with self.trace.lock:
+            self.trace.spans.append(self)
+        if self.parent_id is None:
+            _export(self.trace, self.name)
+        return False
+
+
+class _NoopSpan:
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, concurrent: bool = False, **attrs):
+    """Context manager for one span; a child of the current span, or the root of a new trace."""
+    if _state["dir"] is None:
+        return _NOOP
+    parent = _current.get()
+    trace = parent.trace if parent else _Trace(uuid.uuid4().hex[:16])
+    return Span(name, trace, uuid.uuid4().hex[:16], parent.span_id if parent else None, attrs, concurrent)
+
+
+def current_span():
+    """The active span (a no-op when tracing is off or no span is open)."""
+    return _current.get() or _NOOP
+
+
+def traced(name: str = None):
+    """Decorator: run the function inside a span named after it."""
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _state["dir"] is None:
+                return fn(*args, **kwargs)
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ---------------------------------------------------------------------------
+# EXPORT (Chrome Trace Event Format)
+# ---------------------------------------------------------------------------
+def _args(s: Span) -> dict:
+    args = {"span_id": s.span_id, "parent_id": s.parent_id, **{k: _jsonable(v) for k, v in s.attrs.items()}}
+    if s.error:
+        args["error"] = s.error
+    return args
+
+
+def _jsonable(value):
+    return value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+
+
+def to_chrome_events(trace: _Trace) -> list[dict]:
+    pid = os.getpid()
+    events = []
+    for s in sorted(trace.spans, key=lambda s: s.start_ns):
+        ts = (_EPOCH_NS + s.start_ns) / 1000
+        base = {"name": s.name, "cat": "app", "pid": pid, "tid": s.tid, "ts": ts, "args": _args(s)}
+        if s.concurrent:
+            events.append({**base, "ph": "b", "id": s.span_id})
+            events.append({"name": s.name, "cat": "app", "pid": pid, "tid": s.tid, "ph": "e", "id": s.span_id,
+                           "ts": (_EPOCH_NS + s.end_ns) / 1000})
+        else:
+            events.append({**base, "ph": "X", "dur": (s.end_ns - s.start_ns) / 1000})
+    return events
+
+
+def _export(trace: _Trace, root_name: str):
+    trace_dir = _state["dir"]
+    if trace_dir is None:
+        return
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(trace_dir, f"trace_{stamp}_{root_name}_{trace.trace_id}.json")
+    payload = {"traceEvents": to_chrome_events(trace), "displayTimeUnit": "ms",
+               "otherData": {"trace_id": trace.trace_id, "root": root_name}}
+    try:
+        with _write_lock:
+            os.makedirs(trace_dir, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(payload, f)
+    except OSError as e:
+        logger.warning("could not write %s: %s", path, e)
+
+
+def format_tree(path: str) -> str:
+    """Indented span tree with durations for one exported trace file."""
+    with open(path) as f:
+        events = json.load(f)["traceEvents"]
+    ends = {e["id"]: e["ts"] for e in events if e["ph"] == "e"}
+    spans = {}
+    for e in events:
+        if e["ph"] in ("X", "b"):
+            dur = e["dur"] if e["ph"] == "X" else ends.get(e["id"], e["ts"]) - e["ts"]
+            spans[e["args"]["span_id"]] = {**e, "dur": dur, "children": []}
+    roots = []
+    for s in sorted(spans.values(), key=lambda s: s["ts"]):
+        parent = spans.get(s["args"]["parent_id"])
+        (parent["children"] if parent else roots).append(s)
+
+    lines = []
+
+    def walk(s, depth):
+        attrs = {k: v for k, v in s["args"].items() if k not in ("span_id", "parent_id")}
+        detail = " ".join(f"{k}={v}" for k, v in attrs.items())
+        lines.append(f"{'  ' * depth}{s['name']:<{max(1, 40 - 2 * depth)}} {s['dur'] / 1000:9.1f} ms  {detail}".rstrip())
+        for child in s["children"]:
+            walk(child, depth + 1)
+
+    for root in roots:
+        walk(root, 0)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    for trace_path in sys.argv[1:]:
+        print(f"# {trace_path}")
+        print(format_tree(trace_path))